@@ -161,6 +161,7 @@ contract MarginalV1Pool is IMarginalV1Pool, ERC20 {
     error Amount1LessThanMin();
     error InvalidPosition();
     error PositionSafe();
+    error InvalidPositionsLength();
     error InvalidAmountSpecified();
 
     constructor(
@@ -633,6 +634,108 @@ contract MarginalV1Pool is IMarginalV1Pool, ERC20 {
         );
     }
 
+    /// @inheritdoc IMarginalV1Pool
+    function settleMany(
+        address recipient,
+        uint96[] calldata ids,
+        bytes calldata data
+    ) external lock returns (int256 amount0, int256 amount1, uint256 rewards) {
+        if (ids.length == 0) revert InvalidPositionsLength();
+        State memory _state = stateSynced();
+
+        // zero seconds ago for oracle tickCumulative, observed once for all positions
+        int56 oracleTickCumulative = oracleTickCumulatives(new uint32[](1))[0];
+
+        // insurance + debt returned to pool reserves summed over positions
+        int256 reserve0Delta;
+        int256 reserve1Delta;
+        uint128 liquidityUnlocked;
+
+        int256[] memory amounts0 = new int256[](ids.length);
+        int256[] memory amounts1 = new int256[](ids.length);
+        uint256[] memory positionRewards = new uint256[](ids.length);
+        for (uint256 i = 0; i < ids.length; i++) {
+            Position.Info memory position = positions.get(msg.sender, ids[i]);
+            if (position.size == 0) revert InvalidPosition();
+
+            // update debts for funding
+            position = position.sync(
+                _state.blockTimestamp,
+                _state.tickCumulative,
+                oracleTickCumulative,
+                tickCumulativeRateMax,
+                fundingPeriod
+            );
+
+            // size + margin out, debt in
+            int256 amountOut = -int256(
+                uint256(position.size) + uint256(position.margin)
+            );
+            (amounts0[i], amounts1[i]) = position.zeroForOne
+                ? (int256(uint256(position.debt0)), amountOut)
+                : (amountOut, int256(uint256(position.debt1)));
+
+            (uint256 amount0Unlocked, uint256 amount1Unlocked) = position
+                .amountsLocked();
+            reserve0Delta += int256(amount0Unlocked) + amounts0[i]; // insurance0 + debt0
+            reserve1Delta += int256(amount1Unlocked) + amounts1[i]; // insurance1 + debt1
+            liquidityUnlocked += position.liquidityLocked;
+
+            amount0 += amounts0[i];
+            amount1 += amounts1[i];
+            positionRewards[i] = position.rewards;
+            rewards += position.rewards;
+
+            positions.set(msg.sender, ids[i], position.settle());
+        }
+        liquidityLocked -= liquidityUnlocked;
+
+        // flash net size + margin + rewards out then callback for net debt owed in
+        TransferHelper.safeTransferETH(recipient, rewards); // ok given lock
+        if (amount0 < 0)
+            TransferHelper.safeTransfer(token0, recipient, uint256(-amount0));
+        if (amount1 < 0)
+            TransferHelper.safeTransfer(token1, recipient, uint256(-amount1));
+
+        (uint128 liquidityNext, uint160 sqrtPriceX96Next) = LiquidityMath
+            .liquiditySqrtPriceX96Next(
+                _state.liquidity,
+                _state.sqrtPriceX96,
+                reserve0Delta,
+                reserve1Delta
+            );
+        _state.liquidity = liquidityNext;
+        _state.sqrtPriceX96 = sqrtPriceX96Next;
+        _state.tick = TickMath.getTickAtSqrtRatio(sqrtPriceX96Next);
+
+        uint256 balance0Before = amount0 > 0 ? balance0() : 0;
+        uint256 balance1Before = amount1 > 0 ? balance1() : 0;
+        IMarginalV1SettleCallback(msg.sender).marginalV1SettleCallback(
+            amount0,
+            amount1,
+            data
+        );
+        if (amount0 > 0 && balance0Before + uint256(amount0) > balance0())
+            revert Amount0LessThanMin();
+        if (amount1 > 0 && balance1Before + uint256(amount1) > balance1())
+            revert Amount1LessThanMin();
+
+        // update pool state to latest
+        state = _state;
+
+        for (uint256 i = 0; i < ids.length; i++)
+            emit Settle(
+                msg.sender,
+                uint256(ids[i]),
+                recipient,
+                _state.liquidity,
+                _state.sqrtPriceX96,
+                amounts0[i],
+                amounts1[i],
+                positionRewards[i]
+            );
+    }
+
     /// @inheritdoc IMarginalV1Pool
     function liquidate(
         address recipient,
@@ -643,32 +746,108 @@ contract MarginalV1Pool is IMarginalV1Pool, ERC20 {
         Position.Info memory position = positions.get(owner, id);
         if (position.size == 0) revert InvalidPosition();
 
-        // oracle price averaged over seconds ago for liquidation calc
+        (
+            int56 oracleTickCumulativeLast,
+            uint160 oracleSqrtPriceX96
+        ) = oracleSynced();
+
+        // update debts for funding
+        position = position.sync(
+            _state.blockTimestamp,
+            _state.tickCumulative,
+            oracleTickCumulativeLast,
+            tickCumulativeRateMax,
+            fundingPeriod
+        );
+        if (position.safe(oracleSqrtPriceX96, maintenance))
+            revert PositionSafe();
+
+        rewards = liquidatePosition(_state, recipient, owner, id, position);
+
+        // update pool state to latest
+        state = _state;
+
+        TransferHelper.safeTransferETH(recipient, rewards); // ok given lock
+    }
+
+    /// @inheritdoc IMarginalV1Pool
+    function liquidateMany(
+        address recipient,
+        address[] calldata owners,
+        uint96[] calldata ids
+    ) external lock returns (uint256 rewards, uint256 count) {
+        if (owners.length != ids.length) revert InvalidPositionsLength();
+        State memory _state = stateSynced();
+
+        // oracle observed once on the first open position and kept in memory for the rest,
+        // so no observe call when every position is already settled or liquidated
+        int56 oracleTickCumulativeLast;
+        uint160 oracleSqrtPriceX96; // zero until observed
+
+        for (uint256 i = 0; i < owners.length; i++) {
+            Position.Info memory position = positions.get(owners[i], ids[i]);
+            if (position.size == 0) continue; // settled or liquidated
+
+            if (oracleSqrtPriceX96 == 0)
+                (oracleTickCumulativeLast, oracleSqrtPriceX96) = oracleSynced();
+
+            // update debts for funding
+            position = position.sync(
+                _state.blockTimestamp,
+                _state.tickCumulative,
+                oracleTickCumulativeLast,
+                tickCumulativeRateMax,
+                fundingPeriod
+            );
+            if (position.safe(oracleSqrtPriceX96, maintenance)) continue;
+
+            rewards += liquidatePosition(
+                _state,
+                recipient,
+                owners[i],
+                ids[i],
+                position
+            );
+            count++;
+        }
+
+        // update pool state to latest
+        if (count > 0) state = _state;
+
+        TransferHelper.safeTransferETH(recipient, rewards); // ok given lock
+    }
+
+    /// @dev Oracle tick cumulative now and time weighted average sqrt price over seconds ago for liquidation calcs
+    function oracleSynced()
+        private
+        view
+        returns (int56 oracleTickCumulativeLast, uint160 oracleSqrtPriceX96)
+    {
         uint32[] memory secondsAgos = new uint32[](2);
         secondsAgos[0] = secondsAgo;
 
         int56[] memory oracleTickCumulativesLast = oracleTickCumulatives(
             secondsAgos
         );
-        uint160 oracleSqrtPriceX96 = OracleLibrary.oracleSqrtPriceX96(
+        oracleTickCumulativeLast = oracleTickCumulativesLast[1]; // zero seconds ago
+        oracleSqrtPriceX96 = OracleLibrary.oracleSqrtPriceX96(
             OracleLibrary.oracleTickCumulativeDelta(
                 oracleTickCumulativesLast[0],
                 oracleTickCumulativesLast[1]
             ),
             secondsAgo
         );
+    }
 
-        // update debts for funding
-        position = position.sync(
-            _state.blockTimestamp,
-            _state.tickCumulative,
-            oracleTickCumulativesLast[1], // zero seconds ago
-            tickCumulativeRateMax,
-            fundingPeriod
-        );
-        if (position.safe(oracleSqrtPriceX96, maintenance))
-            revert PositionSafe();
-
+    /// @dev Returns position liquidity to `_state` in memory and stores the liquidated position. Caller must check
+    /// position is unsafe after syncing, store `_state` and transfer rewards to `recipient`
+    function liquidatePosition(
+        State memory _state,
+        address recipient,
+        address owner,
+        uint96 id,
+        Position.Info memory position
+    ) private returns (uint256 rewards) {
         liquidityLocked -= position.liquidityLocked;
         (uint256 amount0, uint256 amount1) = position.amountsLocked();
 
@@ -682,13 +861,8 @@ contract MarginalV1Pool is IMarginalV1Pool, ERC20 {
         _state.tick = TickMath.getTickAtSqrtRatio(_state.sqrtPriceX96);
 
         rewards = position.rewards;
-        TransferHelper.safeTransferETH(recipient, rewards); // ok given lock
-
         positions.set(owner, id, position.liquidate());
 
-        // update pool state to latest
-        state = _state;
-
         emit Liquidate(
             owner,
             uint256(id),
@@ -0,0 +1,167 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.17;
+
+import {IUniswapV3Pool} from "@uniswap/v3-core/contracts/interfaces/IUniswapV3Pool.sol";
+
+import {OracleLibrary} from "./libraries/OracleLibrary.sol";
+import {Position} from "./libraries/Position.sol";
+
+import {IMarginalV1Pool} from "./interfaces/IMarginalV1Pool.sol";
+import {IMarginalV1PoolLens} from "./interfaces/IMarginalV1PoolLens.sol";
+
+contract MarginalV1PoolLens is IMarginalV1PoolLens {
+    using Position for Position.Info;
+
+    struct Context {
+        uint24 maintenance;
+        uint24 tickCumulativeRateMax;
+        uint32 fundingPeriod;
+        uint32 blockTimestamp;
+        int56 tickCumulative;
+        int56 oracleTickCumulative;
+        int24 oracleTick;
+        uint160 oracleSqrtPriceX96;
+    }
+
+    /// @inheritdoc IMarginalV1PoolLens
+    function healths(
+        address pool,
+        PositionKey[] calldata keys
+    )
+        external
+        view
+        returns (
+            uint160 oracleSqrtPriceX96,
+            PositionHealth[] memory positionHealths
+        )
+    {
+        Context memory _context = contextSynced(pool);
+        oracleSqrtPriceX96 = _context.oracleSqrtPriceX96;
+
+        positionHealths = new PositionHealth[](keys.length);
+        for (uint256 i = 0; i < keys.length; i++) {
+            positionHealths[i] = health(pool, _context, keys[i]);
+        }
+    }
+
+    /// @dev Pool state synced to the current block and oracle values, mirroring IMarginalV1Pool#adjust
+    function contextSynced(
+        address pool
+    ) private view returns (Context memory context) {
+        context.maintenance = IMarginalV1Pool(pool).maintenance();
+        context.tickCumulativeRateMax = IMarginalV1Pool(pool)
+            .tickCumulativeRateMax();
+        context.fundingPeriod = IMarginalV1Pool(pool).fundingPeriod();
+
+        (
+            ,
+            ,
+            ,
+            int24 tick,
+            uint32 blockTimestamp,
+            int56 tickCumulative,
+            ,
+
+        ) = IMarginalV1Pool(pool).state();
+        unchecked {
+            uint32 delta = uint32(block.timestamp) - blockTimestamp;
+            tickCumulative += int56(tick) * int56(uint56(delta)); // overflow desired
+        }
+        context.blockTimestamp = uint32(block.timestamp);
+        context.tickCumulative = tickCumulative;
+
+        // single observe call for all positions
+        uint32 secondsAgo = IMarginalV1Pool(pool).secondsAgo();
+        uint32[] memory secondsAgos = new uint32[](2);
+        secondsAgos[0] = secondsAgo;
+
+        (int56[] memory oracleTickCumulativesLast, ) = IUniswapV3Pool(
+            IMarginalV1Pool(pool).oracle()
+        ).observe(secondsAgos);
+        int56 oracleTickCumulativeDelta = OracleLibrary
+            .oracleTickCumulativeDelta(
+                oracleTickCumulativesLast[0],
+                oracleTickCumulativesLast[1]
+            );
+
+        context.oracleTickCumulative = oracleTickCumulativesLast[1]; // zero seconds ago
+        context.oracleTick = int24(
+            oracleTickCumulativeDelta / int56(uint56(secondsAgo))
+        );
+        context.oracleSqrtPriceX96 = OracleLibrary.oracleSqrtPriceX96(
+            oracleTickCumulativeDelta,
+            secondsAgo
+        );
+    }
+
+    /// @dev Health of a single position given the synced pool context
+    function health(
+        address pool,
+        Context memory context,
+        PositionKey calldata key
+    ) private view returns (PositionHealth memory positionHealth) {
+        Position.Info memory position = positionsGet(pool, key.owner, key.id);
+        positionHealth.liquidated = position.liquidated;
+        if (position.size == 0) {
+            positionHealth.safe = true; // nothing to liquidate
+            return positionHealth;
+        }
+
+        uint128 marginMinimum = position.marginMinimum(context.maintenance);
+
+        // update debts for funding but won't store
+        position = position.sync(
+            context.blockTimestamp,
+            context.tickCumulative,
+            context.oracleTickCumulative,
+            context.tickCumulativeRateMax,
+            context.fundingPeriod
+        );
+        (positionHealth.amount0Locked, positionHealth.amount1Locked) = position
+            .amountsLocked();
+
+        positionHealth.size = position.size;
+        positionHealth.debt0 = position.debt0;
+        positionHealth.debt1 = position.debt1;
+        positionHealth.margin = position.margin;
+        positionHealth.rewards = position.rewards;
+        positionHealth.safe = position.safe(
+            context.oracleSqrtPriceX96,
+            context.maintenance
+        );
+
+        // min margin accounting for position pnl as in adjust
+        position.tick = context.oracleTick;
+        uint128 safeMarginMinimum = position.marginMinimum(
+            context.maintenance
+        );
+        positionHealth.marginMinimum = safeMarginMinimum > marginMinimum
+            ? safeMarginMinimum
+            : marginMinimum;
+    }
+
+    /// @dev Reads a position from the pool positions mapping
+    function positionsGet(
+        address pool,
+        address owner,
+        uint96 id
+    ) private view returns (Position.Info memory position) {
+        (
+            position.size,
+            position.debt0,
+            position.debt1,
+            position.insurance0,
+            position.insurance1,
+            position.zeroForOne,
+            position.liquidated,
+            position.tick,
+            position.blockTimestamp,
+            position.tickCumulativeDelta,
+            position.margin,
+            position.liquidityLocked,
+            position.rewards
+        ) = IMarginalV1Pool(pool).positions(
+            keccak256(abi.encodePacked(owner, id))
+        );
+    }
+}
@@ -191,6 +191,24 @@ interface IMarginalV1Pool is IERC20 {
         bytes calldata data
     ) external returns (int256 amount0, int256 amount1, uint256 rewards);
 
+    /// @notice Settles a batch of positions on the pool
+    /// @dev The caller of this method receives a single callback in the form of IMarginalV1SettleCallback#marginalV1SettleCallback with the
+    /// amounts summed over all positions, which may both be owed in (> 0) when settling positions on both sides.
+    /// If a contract, `recipient` must implement a `receive()` function to receive the escrowed liquidation rewards in the native (gas) token from the pool.
+    /// Net size, margin, and liquidation rewards are flashed out before the callback. Pool reserves are updated once with the insurance and debt summed over positions.
+    /// Reverts if any position has been settled or liquidated
+    /// @param recipient The address to receive the size, margin, and liquidation rewards of the settled positions
+    /// @param ids The IDs of the positions to settle
+    /// @param data Any data to be passed through to the callback
+    /// @return amount0 The net delta of the balance of token0 of the pool summed over positions, as for IMarginalV1Pool#settle
+    /// @return amount1 The net delta of the balance of token1 of the pool summed over positions, as for IMarginalV1Pool#settle
+    /// @return rewards The total amount of escrowed native (gas) token sent to `recipient`
+    function settleMany(
+        address recipient,
+        uint96[] calldata ids,
+        bytes calldata data
+    ) external returns (int256 amount0, int256 amount1, uint256 rewards);
+
     /// @notice Liquidates a position on the pool
     /// @dev Reverts if position is safe from liquidation. Position is considered safe if
     /// (`position.margin` + `position.size`) / oracleTwap >= (1 + `maintenance`) * `position.debt0` when position.zeroForOne = true
@@ -207,6 +225,22 @@ interface IMarginalV1Pool is IERC20 {
         uint96 id
     ) external returns (uint256 rewards);
 
+    /// @notice Liquidates a batch of positions on the pool
+    /// @dev Fetches the oracle time weighted average price once for all positions. Skips positions that are safe
+    /// from liquidation after syncing debts for funding, or that have been settled or liquidated, rather than reverting.
+    /// Safety checks are otherwise the same as for IMarginalV1Pool#liquidate
+    /// If a contract, `recipient` must implement a `receive()` function to receive the escrowed liquidation rewards in the native (gas) token from the pool.
+    /// @param recipient The address to receive liquidation rewards escrowed with all liquidated positions
+    /// @param owners The addresses of the owners of the positions to liquidate
+    /// @param ids The IDs of the positions to liquidate, in the order of `owners`
+    /// @return rewards The total amount of escrowed native (gas) token sent to `recipient`
+    /// @return count The number of positions liquidated
+    function liquidateMany(
+        address recipient,
+        address[] calldata owners,
+        uint96[] calldata ids
+    ) external returns (uint256 rewards, uint256 count);
+
     /// @notice Swap token0 for token1, or token1 for token0
     /// @dev The caller of this method receives a callback in the form of IMarginalV1SwapCallback#marginalV1SwapCallback
     /// @param recipient The address to receive the output of the swap
@@ -0,0 +1,52 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.0;
+
+/// @title The interface for the Marginal v1 pool lens
+/// @notice Batched view of leverage position health on a Marginal v1 pool
+interface IMarginalV1PoolLens {
+    struct PositionKey {
+        // owner of the position
+        address owner;
+        // ID of the position
+        uint96 id;
+    }
+
+    struct PositionHealth {
+        // size of position, zero if settled, liquidated or nonexistent in which case considered safe
+        uint128 size;
+        // debts after funding as of the current block
+        uint128 debt0;
+        uint128 debt1;
+        // minimum margin the position must hold as enforced by IMarginalV1Pool#adjust
+        uint128 marginMinimum;
+        // margin backing position
+        uint128 margin;
+        // whether the position is safe from liquidation at the oracle time weighted average price
+        bool safe;
+        // whether the position has been liquidated
+        bool liquidated;
+        // amounts of pool reserves locked in position after funding
+        uint256 amount0Locked;
+        uint256 amount1Locked;
+        // liquidation rewards escrowed with position in the native (gas) token
+        uint256 rewards;
+    }
+
+    /// @notice Returns the health of leverage positions on a pool as of the current block
+    /// @dev Makes a single call to the Uniswap v3 oracle for all positions. Debts are synced for funding
+    /// as IMarginalV1Pool#liquidate would sync them, without storing
+    /// @param pool The Marginal v1 pool address
+    /// @param keys The (owner, ID) keys of the positions
+    /// @return oracleSqrtPriceX96 The oracle time weighted average sqrt price positions are checked against
+    /// @return positionHealths The health of each position, in the order of `keys`
+    function healths(
+        address pool,
+        PositionKey[] calldata keys
+    )
+        external
+        view
+        returns (
+            uint160 oracleSqrtPriceX96,
+            PositionHealth[] memory positionHealths
+        );
+}
@@ -20,6 +20,8 @@ library Position {
     using SafeCast for uint256;
 
     // info stored for each trader's leverage position
+    // @dev packs into 5 slots: (size, debt0), (debt1, insurance0), (insurance1, zeroForOne, liquidated, tick, blockTimestamp, tickCumulativeDelta), (margin, liquidityLocked), (rewards)
+    // @dev a 4 slot layout leaves 14 bits for rewards, too few even in units of blockBaseFeeMin given rewards >= gasLiquidate * rewardPremium / 1e6 units
     struct Info {
         // size of position in token1 if zeroForOne = true or token0 if zeroForOne = false
         uint128 size;
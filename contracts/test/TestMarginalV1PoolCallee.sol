@@ -201,6 +201,31 @@ contract TestMarginalV1PoolCallee is
         emit SettleReturn(amount0, amount1, rewards);
     }
 
+    function settleMany(
+        address pool,
+        address recipient,
+        uint96[] calldata ids
+    ) external returns (int256 amount0, int256 amount1, uint256 rewards) {
+        (amount0, amount1, rewards) = IMarginalV1Pool(pool).settleMany(
+            recipient,
+            ids,
+            abi.encode(msg.sender)
+        );
+        emit SettleReturn(amount0, amount1, rewards);
+    }
+
+    /// @dev Settles a router batch of positions through one pool call so the oracle is observed once
+    function settleBatch(
+        address pool,
+        address recipient,
+        uint96[] calldata ids
+    ) external {
+        (int256 amount0, int256 amount1, uint256 rewards) = IMarginalV1Pool(
+            pool
+        ).settleMany(recipient, ids, abi.encode(msg.sender));
+        emit SettleReturn(amount0, amount1, rewards);
+    }
+
     function marginalV1SettleCallback(
         int256 amount0Delta,
         int256 amount1Delta,
@@ -210,21 +235,19 @@ contract TestMarginalV1PoolCallee is
 
         emit SettleCallback(amount0Delta, amount1Delta, sender);
 
-        if (amount0Delta > 0) {
+        // @dev both amounts may be owed when settling many positions on both sides
+        if (amount0Delta > 0)
             IERC20(IMarginalV1Pool(msg.sender).token0()).safeTransferFrom(
                 sender,
                 msg.sender,
                 uint256(amount0Delta)
             );
-        } else if (amount1Delta > 0) {
+        if (amount1Delta > 0)
             IERC20(IMarginalV1Pool(msg.sender).token1()).safeTransferFrom(
                 sender,
                 msg.sender,
                 uint256(amount1Delta)
             );
-        } else {
-            assert(amount0Delta == 0 && amount1Delta == 0);
-        }
     }
 
     function swap(
@@ -295,4 +318,19 @@ contract TestMarginalV1PoolCallee is
         rewards = IMarginalV1Pool(pool).liquidate(recipient, owner, id);
         emit LiquidateReturn(rewards);
     }
+
+    /// @dev Liquidates a router batch of positions through one pool call so the oracle is observed once
+    function liquidateBatch(
+        address pool,
+        address recipient,
+        address[] calldata owners,
+        uint96[] calldata ids
+    ) external {
+        (uint256 rewards, ) = IMarginalV1Pool(pool).liquidateMany(
+            recipient,
+            owners,
+            ids
+        );
+        emit LiquidateReturn(rewards);
+    }
 }
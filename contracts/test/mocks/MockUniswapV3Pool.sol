@@ -1,20 +1,22 @@
 // SPDX-License-Identifier: AGPL-3.0
 pragma solidity 0.8.17;
 
+import {Oracle} from "@uniswap/v3-core/contracts/libraries/Oracle.sol";
+
 contract MockUniswapV3Pool {
+    using Oracle for Oracle.Observation[65535];
+
     address public immutable token0;
     address public immutable token1;
     uint24 public immutable fee;
 
-    struct Observation {
-        uint32 blockTimestamp;
-        int56 tickCumulative;
-        uint160 secondsPerLiquidityCumulativeX128;
-        bool initialized;
-    }
-    Observation[65535] public observations;
+    Oracle.Observation[65535] public observations;
     uint256 private observationIndex;
 
+    uint128 public liquidity;
+    // whether observe follows Uniswap v3 instead of naively returning observations
+    bool public realistic;
+
     struct Slot0 {
         // the current price
         uint160 sqrtPriceX96;
@@ -47,6 +49,14 @@ contract MockUniswapV3Pool {
         slot0 = _slot0;
     }
 
+    function setLiquidity(uint128 _liquidity) external {
+        liquidity = _liquidity;
+    }
+
+    function setRealistic(bool _realistic) external {
+        realistic = _realistic;
+    }
+
     function pushObservation(
         uint32 blockTimestamp,
         int56 tickCumulative,
@@ -54,7 +64,7 @@ contract MockUniswapV3Pool {
         bool initialized
     ) external {
         observations[observationIndex % 65535] = (
-            Observation({
+            Oracle.Observation({
                 blockTimestamp: blockTimestamp,
                 tickCumulative: tickCumulative,
                 secondsPerLiquidityCumulativeX128: secondsPerLiquidityCumulativeX128,
@@ -64,9 +74,29 @@ contract MockUniswapV3Pool {
         observationIndex++;
     }
 
-    /// @dev unlike Uniswap V3, naively returns back observations so order matters
-    /// @dev assumes contracts query with e.g. secondsAgos[0] = secondsAgo; secondsAgos[1] = 0;
-    // TODO: fix to be more realistic
+    /// @dev each word packs, from high to low bits, blockTimestamp (32 bits),
+    /// tickCumulative (56 bits), secondsPerLiquidityCumulativeX128 (160 bits)
+    /// and initialized (8 bits)
+    function pushObservations(uint256[] calldata packed) external {
+        uint256 _observationIndex = observationIndex;
+        for (uint256 i = 0; i < packed.length; i++) {
+            uint256 word = packed[i];
+            uint256 j = (_observationIndex + i) % 65535;
+            observations[j] = Oracle.Observation({
+                blockTimestamp: uint32(word >> 224),
+                tickCumulative: int56(uint56(word >> 168)),
+                secondsPerLiquidityCumulativeX128: uint160(word >> 8),
+                initialized: uint8(word) != 0
+            });
+        }
+        observationIndex = _observationIndex + packed.length;
+    }
+
+    /// @dev unless realistic, naively returns back observations so order matters
+    /// @dev naive assumes contracts query with e.g. secondsAgos[0] = secondsAgo; secondsAgos[1] = 0;
+    /// @dev realistic binary searches and interpolates as Uniswap v3 `Oracle.observe`,
+    /// assuming observations pushed in chronological order. Extrapolates past the
+    /// last observation with slot0 tick and liquidity
     function observe(
         uint32[] calldata secondsAgos
     )
@@ -78,6 +108,24 @@ contract MockUniswapV3Pool {
         )
     {
         uint256 _observationIndex = observationIndex;
+        if (realistic) {
+            uint16 cardinality = uint16(
+                _observationIndex < 65535 ? _observationIndex : 65535
+            );
+            uint16 index = uint16(
+                cardinality > 0 ? (_observationIndex - 1) % 65535 : 0
+            );
+            return
+                observations.observe(
+                    uint32(block.timestamp),
+                    secondsAgos,
+                    slot0.tick,
+                    index,
+                    liquidity,
+                    cardinality
+                );
+        }
+
         require(
             secondsAgos.length <= _observationIndex,
             "not enough observations"
@@ -86,7 +134,7 @@ contract MockUniswapV3Pool {
         secondsPerLiquidityCumulativeX128s = new uint160[](secondsAgos.length);
         for (uint256 i = 0; i < secondsAgos.length; i++) {
             uint256 j = _observationIndex - secondsAgos.length + i;
-            Observation memory observation = observations[j];
+            Oracle.Observation memory observation = observations[j];
             tickCumulatives[i] = observation.tickCumulative;
             secondsPerLiquidityCumulativeX128s[i] = observation
                 .secondsPerLiquidityCumulativeX128;
@@ -35,4 +35,31 @@ contract MockLiquidityMath {
                 amount1
             );
     }
+
+    /// @dev Batched `toAmounts`, with `ok` false where it reverts
+    function toAmountsBatch(
+        uint128[] memory liquidity,
+        uint160[] memory sqrtPriceX96
+    )
+        external
+        view
+        returns (
+            bool[] memory ok,
+            uint256[] memory amount0s,
+            uint256[] memory amount1s
+        )
+    {
+        require(liquidity.length == sqrtPriceX96.length);
+        ok = new bool[](liquidity.length);
+        amount0s = new uint256[](liquidity.length);
+        amount1s = new uint256[](liquidity.length);
+        for (uint256 i = 0; i < liquidity.length; i++) {
+            try this.toAmounts(liquidity[i], sqrtPriceX96[i]) returns (
+                uint256 amount0,
+                uint256 amount1
+            ) {
+                (ok[i], amount0s[i], amount1s[i]) = (true, amount0, amount1);
+            } catch {}
+        }
+    }
 }
@@ -182,4 +182,22 @@ contract MockPosition {
     ) external pure returns (bool) {
         return position.safe(sqrtPriceX96, maintenance);
     }
+
+    /// @dev Batched `safe`, with `ok` false where it reverts
+    function safeBatch(
+        Position.Info[] memory positions,
+        uint160[] memory sqrtPriceX96s,
+        uint24 maintenance
+    ) external view returns (bool[] memory ok, bool[] memory results) {
+        require(positions.length == sqrtPriceX96s.length);
+        ok = new bool[](positions.length);
+        results = new bool[](positions.length);
+        for (uint256 i = 0; i < positions.length; i++) {
+            try this.safe(positions[i], sqrtPriceX96s[i], maintenance) returns (
+                bool result
+            ) {
+                (ok[i], results[i]) = (true, result);
+            } catch {}
+        }
+    }
 }
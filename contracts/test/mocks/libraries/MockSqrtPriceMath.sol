@@ -35,4 +35,62 @@ contract MockSqrtPriceMath {
                 amountSpecified
             );
     }
+
+    /// @dev Batched `sqrtPriceX96NextOpen`, with `ok` false where it reverts
+    function sqrtPriceX96NextOpenBatch(
+        uint128[] memory liquidity,
+        uint160[] memory sqrtPriceX96,
+        uint128[] memory liquidityDelta,
+        bool[] memory zeroForOne,
+        uint24 maintenance
+    ) external view returns (bool[] memory ok, uint160[] memory results) {
+        require(
+            liquidity.length == sqrtPriceX96.length &&
+                liquidity.length == liquidityDelta.length &&
+                liquidity.length == zeroForOne.length
+        );
+        ok = new bool[](liquidity.length);
+        results = new uint160[](liquidity.length);
+        for (uint256 i = 0; i < liquidity.length; i++) {
+            try
+                this.sqrtPriceX96NextOpen(
+                    liquidity[i],
+                    sqrtPriceX96[i],
+                    liquidityDelta[i],
+                    zeroForOne[i],
+                    maintenance
+                )
+            returns (uint160 result) {
+                (ok[i], results[i]) = (true, result);
+            } catch {}
+        }
+    }
+
+    /// @dev Batched `sqrtPriceX96NextSwap`, with `ok` false where it reverts
+    function sqrtPriceX96NextSwapBatch(
+        uint128[] memory liquidity,
+        uint160[] memory sqrtPriceX96,
+        bool[] memory zeroForOne,
+        int256[] memory amountSpecified
+    ) external view returns (bool[] memory ok, uint160[] memory results) {
+        require(
+            liquidity.length == sqrtPriceX96.length &&
+                liquidity.length == zeroForOne.length &&
+                liquidity.length == amountSpecified.length
+        );
+        ok = new bool[](liquidity.length);
+        results = new uint160[](liquidity.length);
+        for (uint256 i = 0; i < liquidity.length; i++) {
+            try
+                this.sqrtPriceX96NextSwap(
+                    liquidity[i],
+                    sqrtPriceX96[i],
+                    zeroForOne[i],
+                    amountSpecified[i]
+                )
+            returns (uint160 result) {
+                (ok[i], results[i]) = (true, result);
+            } catch {}
+        }
+    }
 }
@@ -19,4 +19,42 @@ contract MockSwapMath {
     ) external pure returns (uint256) {
         return SwapMath.swapFees(amount, fee, lessFee);
     }
+
+    /// @dev Batched `swapAmounts`, with `ok` false where it reverts
+    function swapAmountsBatch(
+        uint128[] memory liquidity,
+        uint160[] memory sqrtPriceX96,
+        uint160[] memory sqrtPriceX96Next
+    )
+        external
+        view
+        returns (
+            bool[] memory ok,
+            int256[] memory amount0Deltas,
+            int256[] memory amount1Deltas
+        )
+    {
+        require(
+            liquidity.length == sqrtPriceX96.length &&
+                liquidity.length == sqrtPriceX96Next.length
+        );
+        ok = new bool[](liquidity.length);
+        amount0Deltas = new int256[](liquidity.length);
+        amount1Deltas = new int256[](liquidity.length);
+        for (uint256 i = 0; i < liquidity.length; i++) {
+            try
+                this.swapAmounts(
+                    liquidity[i],
+                    sqrtPriceX96[i],
+                    sqrtPriceX96Next[i]
+                )
+            returns (int256 amount0Delta, int256 amount1Delta) {
+                (ok[i], amount0Deltas[i], amount1Deltas[i]) = (
+                    true,
+                    amount0Delta,
+                    amount1Delta
+                );
+            } catch {}
+        }
+    }
 }
@@ -0,0 +1,5 @@
+"""Exact integer ports of the Marginal v1 core libraries
+
+Modules mirror the Solidity libraries they port and match on-chain results to the wei,
+raising `marginal_math.errors.Revert` wherever the contracts would revert.
+"""
@@ -0,0 +1,113 @@
+from typing import Iterable
+
+import numpy as np
+
+from marginal_math.constants import MAINTENANCE_UNIT, Q96
+from marginal_math.position import Info
+
+# @dev relative error bound on float64 screening, well above the few ulps lost
+_REL_TOL = 1e-12
+
+
+class PositionColumns:
+    """Column storage of the `Position.Info` fields read by `Position.safe`
+
+    Integer columns are object dtype so values past 2**64 stay exact. Float64 mirrors
+    are kept alongside for screening in `safe_many`.
+    """
+
+    def __init__(
+        self,
+        size: np.ndarray,
+        margin: np.ndarray,
+        debt0: np.ndarray,
+        debt1: np.ndarray,
+        zero_for_one: np.ndarray,
+    ):
+        self.size = np.asarray(size, dtype=object)
+        self.margin = np.asarray(margin, dtype=object)
+        self.debt0 = np.asarray(debt0, dtype=object)
+        self.debt1 = np.asarray(debt1, dtype=object)
+        self.zero_for_one = np.asarray(zero_for_one, dtype=bool)
+
+        # collateral and debt owed in each row's debt token
+        self.collateral = self.margin + self.size
+        self.debt = np.where(self.zero_for_one, self.debt0, self.debt1)
+
+        self.collateral_f = self.collateral.astype(np.float64)
+        self.debt_f = self.debt.astype(np.float64)
+
+    @classmethod
+    def from_infos(cls, infos: Iterable[Info]) -> "PositionColumns":
+        infos = list(infos)
+        return cls(
+            [info.size for info in infos],
+            [info.margin for info in infos],
+            [info.debt0 for info in infos],
+            [info.debt1 for info in infos],
+            [info.zero_for_one for info in infos],
+        )
+
+    def __len__(self) -> int:
+        return len(self.zero_for_one)
+
+
+def _safe_exact(
+    collateral: np.ndarray,
+    debt: np.ndarray,
+    zero_for_one: np.ndarray,
+    sqrt_price_x96: int,
+    maintenance: int,
+) -> np.ndarray:
+    # elementwise Python int ops on object arrays, identical to `Position.safe`
+    debt_adjusted = (debt * (MAINTENANCE_UNIT + maintenance)) // MAINTENANCE_UNIT
+    liquidity_collateral = np.where(
+        zero_for_one,
+        (collateral << 96) // sqrt_price_x96,
+        (collateral * sqrt_price_x96) // Q96,
+    )
+    liquidity_debt = np.where(
+        zero_for_one,
+        (debt_adjusted * sqrt_price_x96) // Q96,
+        (debt_adjusted << 96) // sqrt_price_x96,
+    )
+    return (liquidity_collateral >= liquidity_debt).astype(bool)
+
+
+def safe_many(positions, oracle_sqrt_price_x96: int, maintenance: int) -> np.ndarray:
+    """Batched `Position.safe` returning a boolean mask over positions
+
+    Rows are first decided in float64, then rows within rounding distance of the
+    boundary are recomputed exactly with Python integers, so the mask matches
+    `Position.safe` exactly.
+
+    @param positions `PositionColumns` or an iterable of `Info`
+    """
+    if not isinstance(positions, PositionColumns):
+        positions = PositionColumns.from_infos(positions)
+    if len(positions) == 0:
+        return np.zeros(0, dtype=bool)
+
+    p = oracle_sqrt_price_x96 / Q96
+    factor = (MAINTENANCE_UNIT + maintenance) / MAINTENANCE_UNIT
+    zero_for_one = positions.zero_for_one
+
+    # zeroForOne: (c << 96) / sqrtP >= d * (1 + M) * sqrtP >> 96
+    # oneForZero: c * sqrtP >> 96 >= (d * (1 + M) << 96) / sqrtP
+    scale = np.where(zero_for_one, 1.0 / p, p)
+    lhs = positions.collateral_f * scale
+    rhs = (positions.debt_f * factor) / scale
+    mask = lhs >= rhs
+
+    # floors lose up to one unit each, and flooring the adjusted debt one unit before scaling
+    tol = _REL_TOL * np.maximum(lhs, rhs) + 2.0 + 1.0 / scale
+    ambiguous = np.flatnonzero(np.abs(lhs - rhs) <= tol)
+    if len(ambiguous) > 0:
+        mask[ambiguous] = _safe_exact(
+            positions.collateral[ambiguous],
+            positions.debt[ambiguous],
+            zero_for_one[ambiguous],
+            oracle_sqrt_price_x96,
+            maintenance,
+        )
+    return mask
@@ -0,0 +1,133 @@
+import heapq
+
+from copy import deepcopy
+from dataclasses import dataclass
+from math import log
+from typing import Hashable, List
+
+from marginal_math.constants import MAX_UINT32
+from marginal_math.liquidation_index import LiquidationIndex
+from marginal_math.pool import PoolSimulator
+
+
+@dataclass
+class CascadeRound:
+    """Liquidations in one round of a cascade, in the order they were executed"""
+
+    block_timestamp: int
+    oracle_sqrt_price_x96: int  # TWAP liquidations were checked against
+    sqrt_price_x96_start: int  # pool price before liquidations
+    sqrt_price_x96: int  # pool price after liquidations
+    liquidated: List[Hashable]
+    rewards: int
+
+
+class CascadeSimulator:
+    """Liquidation cascade on a snapshot of a `PoolSimulator` after an oracle shock
+
+    Each round advances `period` seconds and liquidates every position unsafe against the
+    oracle TWAP with `liquidate_many`. Liquidations return amounts locked to the pool,
+    moving the pool price, so the pool tick cumulative accrues at the new tick and
+    feeds back into funding and the safety of remaining positions in later rounds.
+
+    Positions are queued by distance to their liquidation boundary in a `LiquidationIndex`,
+    so each round checks only positions within the funding drift band of the TWAP. Those
+    that went unsafe are liquidated furthest past the boundary first.
+
+    Apply the shock to the oracle before constructing, e.g. with `UniswapV3Oracle.swap`.
+    The oracle's `block_timestamp`, if it has one, follows the simulator's each round.
+    """
+
+    def __init__(
+        self, sim: PoolSimulator, period: int = 600, recipient: str = "cascade"
+    ):
+        self.sim = deepcopy(sim)
+        self.period = period
+        self.recipient = recipient
+        self.rounds: List[CascadeRound] = []
+
+        self.index = LiquidationIndex(
+            sim.maintenance, sim.tick_cumulative_rate_max, sim.funding_period
+        )
+        for key, position in self.sim.positions.items():
+            if position.size > 0 and not position.liquidated:
+                self.index.add(key, position)
+
+    def _queue(self, keys: List[Hashable], oracle_sqrt_price_x96: int) -> List:
+        # max heap by log distance past the liquidation boundary
+        queue = []
+        for key in keys:
+            entry = self.index.entries[key]
+            distance = log(entry.threshold / oracle_sqrt_price_x96)
+            if entry.position.zero_for_one:
+                distance = -distance
+            queue.append((-distance, key))
+        heapq.heapify(queue)
+        return queue
+
+    def step(self) -> CascadeRound:
+        """Advances one round, liquidating all positions unsafe at the oracle TWAP"""
+        sim = self.sim
+        sim.block_timestamp += self.period
+        if hasattr(sim.oracle, "block_timestamp"):
+            sim.oracle.block_timestamp = sim.block_timestamp & MAX_UINT32
+
+        state = sim._state_synced()
+        (oracle_tick_cumulative_last, oracle_sqrt_price_x96_last) = sim._oracle_synced()
+        unsafe = self.index.update(
+            oracle_sqrt_price_x96_last,
+            state.block_timestamp,
+            state.tick_cumulative,
+            oracle_tick_cumulative_last,
+        )
+
+        queue = self._queue(unsafe, oracle_sqrt_price_x96_last)
+        keys = [heapq.heappop(queue)[1] for _ in range(len(queue))]
+        rewards = 0
+        if len(keys) > 0:
+            (rewards, _) = sim.liquidate_many(
+                self.recipient,
+                [owner for (owner, _) in keys],
+                [id for (_, id) in keys],
+            )
+
+        liquidated = [key for key in keys if sim.positions[key].liquidated]
+        for key in liquidated:
+            self.index.remove(key)
+
+        cascade_round = CascadeRound(
+            block_timestamp=state.block_timestamp,
+            oracle_sqrt_price_x96=oracle_sqrt_price_x96_last,
+            sqrt_price_x96_start=state.sqrt_price_x96,
+            sqrt_price_x96=sim.state.sqrt_price_x96,
+            liquidated=liquidated,
+            rewards=rewards,
+        )
+        self.rounds.append(cascade_round)
+        return cascade_round
+
+    def run(self, max_rounds: int = 1000) -> List[CascadeRound]:
+        """Steps rounds until a fixed point, returning the rounds run
+
+        @dev A fixed point is a round without liquidations once the TWAP has stopped moving,
+        i.e. the shock has passed through the whole seconds ago window
+        """
+        start = len(self.rounds)
+        for _ in range(max_rounds):
+            oracle_sqrt_price_x96_last = (
+                self.rounds[-1].oracle_sqrt_price_x96 if self.rounds else None
+            )
+            cascade_round = self.step()
+            if (
+                len(cascade_round.liquidated) == 0
+                and cascade_round.oracle_sqrt_price_x96 == oracle_sqrt_price_x96_last
+            ):
+                break
+        return self.rounds[start:]
+
+    @property
+    def liquidated(self) -> List[Hashable]:
+        """Keys of all positions liquidated so far, in order"""
+        return [
+            key for cascade_round in self.rounds for key in cascade_round.liquidated
+        ]
@@ -0,0 +1,38 @@
+MAX_UINT24 = 2**24 - 1
+MAX_UINT32 = 2**32 - 1
+MAX_UINT96 = 2**96 - 1
+MAX_UINT128 = 2**128 - 1
+MAX_UINT160 = 2**160 - 1
+MAX_UINT256 = 2**256 - 1
+
+# FixedPoint
+Q64 = 1 << 64
+Q96 = 1 << 96
+Q128 = 1 << 128
+Q192 = 1 << 192
+
+# TickMath
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+# Maintenance and fees
+MAINTENANCE_UNIT = 1000000
+FEE_UNIT = 1000000
+FEE = 1000  # 10 bps across all pools
+
+# Liquidation rewards
+REWARD_UNIT = 1000000
+BASE_FEE_MIN = 40000000000
+REWARD_PREMIUM = 2000000
+GAS_LIQUIDATE = 150000
+
+# Dust prevention
+MINIMUM_LIQUIDITY = 10000
+MINIMUM_SIZE = 10000
+
+# Oracle
+FUNDING_PERIOD = 604800  # 7 day
+SECONDS_AGO = 43200  # 12 hour
+TICK_CUMULATIVE_RATE_MAX = 920  # 920 bps per funding period
@@ -0,0 +1,262 @@
+from typing import Iterable, List, Optional, Tuple
+
+from ape.exceptions import ContractLogicError
+
+from marginal_math.errors import Revert
+from marginal_math.pool import PoolSimulator, ProtocolFees, State
+from marginal_math.position import Info, get_position_key
+
+
+def load(
+    pool,
+    oracle,
+    keys: Iterable[Tuple[str, int]] = (),
+    holders: Iterable[str] = (),
+    token0=None,
+    token1=None,
+) -> PoolSimulator:
+    """Loads a simulator from the state of a deployed pool
+
+    @dev Positions and LP balances are only loaded for the given (owner, id) keys and holders,
+    pool token balances only if the token contracts are given
+    """
+    sim = PoolSimulator(pool.maintenance(), oracle, address=pool.address)
+    s = pool.state()
+    sim.block_timestamp = s.blockTimestamp
+    sim.state = State(
+        sqrt_price_x96=s.sqrtPriceX96,
+        total_positions=s.totalPositions,
+        liquidity=s.liquidity,
+        tick=s.tick,
+        block_timestamp=s.blockTimestamp,
+        tick_cumulative=s.tickCumulative,
+        fee_protocol=s.feeProtocol,
+        initialized=s.initialized,
+    )
+    sim.liquidity_locked = pool.liquidityLocked()
+    sim.protocol_fees = ProtocolFees(*pool.protocolFees())
+
+    for owner, id in keys:
+        sim.positions[(owner, id)] = Info.from_struct(
+            pool.positions(get_position_key(owner, id))
+        )
+
+    sim.total_supply = pool.totalSupply()
+    for holder in list(holders) + [pool.address]:
+        sim.balances[holder] = pool.balanceOf(holder)
+
+    if token0 is not None:
+        sim.balance0 = token0.balanceOf(pool.address)
+    if token1 is not None:
+        sim.balance1 = token1.balanceOf(pool.address)
+    sim.balance = pool.balance
+    return sim
+
+
+def assert_in_sync(
+    sim: PoolSimulator, pool, keys: Iterable[Tuple[str, int]] = ()
+) -> None:
+    """Asserts simulator state matches deployed pool state for the given position keys"""
+    s = pool.state()
+    assert (
+        State(
+            sqrt_price_x96=s.sqrtPriceX96,
+            total_positions=s.totalPositions,
+            liquidity=s.liquidity,
+            tick=s.tick,
+            block_timestamp=s.blockTimestamp,
+            tick_cumulative=s.tickCumulative,
+            fee_protocol=s.feeProtocol,
+            initialized=s.initialized,
+        )
+        == sim.state
+    )
+    assert pool.liquidityLocked() == sim.liquidity_locked
+    assert ProtocolFees(*pool.protocolFees()) == sim.protocol_fees
+    assert pool.totalSupply() == sim.total_supply
+
+    for owner, id in keys:
+        assert Info.from_struct(
+            pool.positions(get_position_key(owner, id))
+        ) == sim.get_position(owner, id)
+
+
+class DifferentialPool:
+    """Runs operations against both a simulator and a deployed pool via `TestMarginalV1PoolCallee`
+
+    Each operation is sent on chain first, then replayed on the simulator at the mined block's
+    timestamp and base fee. Revert parity is asserted on every step, full state on sampled steps.
+
+    @dev Positions opened through the callee are owned by the callee, so keys are (callee, id)
+    """
+
+    def __init__(
+        self,
+        sim: PoolSimulator,
+        pool,
+        callee,
+        chain,
+        sample_every: int = 1,
+    ):
+        self.sim = sim
+        self.pool = pool
+        self.callee = callee
+        self.chain = chain
+        self.sample_every = sample_every
+
+        self.steps = 0
+        self.keys: List[Tuple[str, int]] = []
+
+    def _step(self, send, simulate):
+        # @dev pending block values, kept if the call reverts and never mines
+        self.sim.block_timestamp = self.chain.pending_timestamp
+        self.sim.block_base_fee = self.chain.provider.get_block("pending").base_fee
+
+        receipt: Optional[object] = None
+        try:
+            receipt = send()
+        except ContractLogicError:
+            pass
+
+        if receipt is not None:
+            block = self.chain.provider.get_block(receipt.block_number)
+            self.sim.block_timestamp = block.timestamp
+            self.sim.block_base_fee = block.base_fee
+
+        try:
+            result = simulate()
+        except Revert:
+            assert receipt is None, "simulator reverted but pool did not"
+            result = None
+        else:
+            assert receipt is not None, "pool reverted but simulator did not"
+
+        self.steps += 1
+        if self.steps % self.sample_every == 0:
+            self.check()
+        return result
+
+    def check(self):
+        assert_in_sync(self.sim, self.pool, self.keys)
+
+    def open(
+        self,
+        sender,
+        zero_for_one: bool,
+        liquidity_delta: int,
+        sqrt_price_limit_x96: int,
+        margin: int,
+        value: int,
+    ):
+        result = self._step(
+            lambda: self.callee.open(
+                self.pool.address,
+                self.callee.address,
+                zero_for_one,
+                liquidity_delta,
+                sqrt_price_limit_x96,
+                margin,
+                sender=sender,
+                value=value,
+            ),
+            lambda: self.sim.open(
+                self.callee.address,
+                zero_for_one,
+                liquidity_delta,
+                sqrt_price_limit_x96,
+                margin,
+                value,
+            ),
+        )
+        if result is not None:
+            self.keys.append((self.callee.address, result[0]))
+        return result
+
+    def adjust(self, sender, id: int, margin_delta: int):
+        return self._step(
+            lambda: self.callee.adjust(
+                self.pool.address, sender.address, id, margin_delta, sender=sender
+            ),
+            lambda: self.sim.adjust(
+                self.callee.address, sender.address, id, margin_delta
+            ),
+        )
+
+    def settle(self, sender, id: int):
+        return self._step(
+            lambda: self.callee.settle(
+                self.pool.address, sender.address, id, sender=sender
+            ),
+            lambda: self.sim.settle(self.callee.address, sender.address, id),
+        )
+
+    def settle_many(self, sender, ids: List[int]):
+        return self._step(
+            lambda: self.callee.settleMany(
+                self.pool.address, sender.address, ids, sender=sender
+            ),
+            lambda: self.sim.settle_many(self.callee.address, sender.address, ids),
+        )
+
+    def liquidate(self, sender, id: int):
+        return self._step(
+            lambda: self.pool.liquidate(
+                sender.address, self.callee.address, id, sender=sender
+            ),
+            lambda: self.sim.liquidate(sender.address, self.callee.address, id),
+        )
+
+    def liquidate_many(self, sender, ids: List[int]):
+        owners = [self.callee.address] * len(ids)
+        return self._step(
+            lambda: self.pool.liquidateMany(sender.address, owners, ids, sender=sender),
+            lambda: self.sim.liquidate_many(sender.address, owners, ids),
+        )
+
+    def swap(
+        self,
+        sender,
+        zero_for_one: bool,
+        amount_specified: int,
+        sqrt_price_limit_x96: int,
+    ):
+        return self._step(
+            lambda: self.callee.swap(
+                self.pool.address,
+                sender.address,
+                zero_for_one,
+                amount_specified,
+                sqrt_price_limit_x96,
+                sender=sender,
+            ),
+            lambda: self.sim.swap(
+                sender.address, zero_for_one, amount_specified, sqrt_price_limit_x96
+            ),
+        )
+
+    def mint(self, sender, liquidity_delta: int):
+        return self._step(
+            lambda: self.callee.mint(
+                self.pool.address, sender.address, liquidity_delta, sender=sender
+            ),
+            lambda: self.sim.mint(sender.address, liquidity_delta),
+        )
+
+    def burn(self, sender, shares: int):
+        # callee pulls shares from sender before burning
+        return self._step(
+            lambda: self.callee.burn(
+                self.pool.address, sender.address, shares, sender=sender
+            ),
+            lambda: self._burn(sender.address, shares),
+        )
+
+    def _burn(self, sender: str, shares: int):
+        if self.sim.balance_of(sender) < shares:
+            raise Revert("ERC20: transfer amount exceeds balance")
+        self.sim.transfer(sender, self.callee.address, shares)
+        try:
+            return self.sim.burn(self.callee.address, sender, shares)
+        except Revert:
+            self.sim.transfer(self.callee.address, sender, shares)
+            raise
@@ -0,0 +1,95 @@
+class Revert(Exception):
+    """Raised wherever the Solidity implementation would revert"""
+
+
+class Panic(Revert):
+    """Solidity `Panic(uint256)` builtin error"""
+
+    ARITHMETIC = 0x11  # checked arithmetic over/underflow
+    DIVISION_BY_ZERO = 0x12
+
+    def __init__(self, code: int):
+        super().__init__(hex(code))
+        self.code = code
+
+
+class SafeCastOverflow(Revert):
+    """OZ `SafeCast` downcast failure"""
+
+
+# @dev Uniswap v3 TickMath `T()`
+class InvalidTick(Revert):
+    pass
+
+
+# @dev Uniswap v3 TickMath `R()`
+class InvalidSqrtRatio(Revert):
+    pass
+
+
+# @dev Uniswap v3 Oracle `I`
+class OracleUninitialized(Revert):
+    pass
+
+
+# @dev Uniswap v3 Oracle `OLD`
+class ObservationTooOld(Revert):
+    pass
+
+
+# SqrtPriceMath
+class InvalidSqrtPriceX96(Revert):
+    pass
+
+
+class Amount0ExceedsReserve0(Revert):
+    pass
+
+
+class Amount1ExceedsReserve1(Revert):
+    pass
+
+
+# MarginalV1Pool
+class InvalidLiquidityDelta(Revert):
+    pass
+
+
+class InvalidSqrtPriceLimitX96(Revert):
+    pass
+
+
+class SqrtPriceX96ExceedsLimit(Revert):
+    pass
+
+
+class MarginLessThanMin(Revert):
+    pass
+
+
+class RewardsLessThanMin(Revert):
+    pass
+
+
+class Amount0LessThanMin(Revert):
+    pass
+
+
+class Amount1LessThanMin(Revert):
+    pass
+
+
+class InvalidPosition(Revert):
+    pass
+
+
+class PositionSafe(Revert):
+    pass
+
+
+class InvalidAmountSpecified(Revert):
+    pass
+
+
+class InvalidPositionsLength(Revert):
+    pass
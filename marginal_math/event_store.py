@@ -0,0 +1,391 @@
+import json
+import os
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# @dev 64 bit limbs per column kind, least significant first. Signed types are stored
+# two's complement
+LIMBS = {"uint96": 2, "uint128": 2, "uint160": 3, "uint256": 4, "int256": 4}
+DTYPES = {"address": np.dtype("S20"), "int24": np.dtype("<i4")}
+
+# @dev columns of each `MarginalV1Pool` event, in event order
+SCHEMAS = {
+    "Initialize": (("sqrtPriceX96", "uint160"), ("tick", "int24")),
+    "Open": (
+        ("sender", "address"),
+        ("owner", "address"),
+        ("id", "uint96"),
+        ("liquidityAfter", "uint128"),
+        ("sqrtPriceX96After", "uint160"),
+        ("margin", "uint128"),
+    ),
+    "Adjust": (
+        ("owner", "address"),
+        ("id", "uint96"),
+        ("recipient", "address"),
+        ("marginAfter", "uint256"),
+    ),
+    "Settle": (
+        ("owner", "address"),
+        ("id", "uint96"),
+        ("recipient", "address"),
+        ("liquidityAfter", "uint128"),
+        ("sqrtPriceX96After", "uint160"),
+        ("amount0", "int256"),
+        ("amount1", "int256"),
+        ("rewards", "uint256"),
+    ),
+    "Liquidate": (
+        ("owner", "address"),
+        ("id", "uint96"),
+        ("recipient", "address"),
+        ("liquidityAfter", "uint128"),
+        ("sqrtPriceX96After", "uint160"),
+        ("rewards", "uint256"),
+    ),
+    "Swap": (
+        ("sender", "address"),
+        ("recipient", "address"),
+        ("amount0", "int256"),
+        ("amount1", "int256"),
+        ("sqrtPriceX96", "uint160"),
+        ("liquidity", "uint128"),
+        ("tick", "int24"),
+    ),
+    "Mint": (
+        ("sender", "address"),
+        ("owner", "address"),
+        ("liquidityDelta", "uint128"),
+        ("amount0", "uint256"),
+        ("amount1", "uint256"),
+    ),
+    "Burn": (
+        ("owner", "address"),
+        ("recipient", "address"),
+        ("liquidityDelta", "uint128"),
+        ("amount0", "uint256"),
+        ("amount1", "uint256"),
+    ),
+}
+
+# @dev columns every event carries, ahead of its own
+COMMON_COLUMNS = (
+    ("block", np.dtype("<u8")),
+    ("log_index", np.dtype("<u4")),
+    ("pool", np.dtype("<u4")),
+)
+
+_MASK = (1 << 64) - 1
+
+
+def _dtype(kind: str) -> np.dtype:
+    return np.dtype("<u8") if kind in LIMBS else DTYPES[kind]
+
+
+def _shape(kind: str) -> tuple:
+    return (LIMBS[kind],) if kind in LIMBS else ()
+
+
+def _address(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return bytes.fromhex(str(value)[2:])
+
+
+def _ints(values: Sequence[int], kind: Optional[str], dtype: np.dtype) -> np.ndarray:
+    # ints for a fixed width column, raising rather than wrapping when out of range
+    if kind == "int24":
+        (low, high) = (-(1 << 23), (1 << 23) - 1)
+    else:
+        (low, high) = (int(np.iinfo(dtype).min), int(np.iinfo(dtype).max))
+    values = [int(value) for value in values]
+    if any(value < low or value > high for value in values):
+        raise ValueError(f"Values out of range [{low}, {high}]")
+    return np.array(values, dtype=dtype)
+
+
+def to_limbs(values: Sequence[int], kind: str) -> np.ndarray:
+    """Splits ints into 64 bit limbs, least significant first"""
+    values = np.asarray(values, dtype=object) % (1 << (64 * LIMBS[kind]))
+    return np.stack(
+        [((values >> (64 * i)) & _MASK).astype(np.uint64) for i in range(LIMBS[kind])],
+        axis=-1,
+    ).reshape(len(values), LIMBS[kind])
+
+
+def from_limbs(limbs: np.ndarray, kind: str) -> np.ndarray:
+    """Exact ints from limbs as an object array"""
+    values = np.zeros(len(limbs), dtype=object)
+    for i in range(LIMBS[kind]):
+        values += limbs[:, i].astype(object) << (64 * i)
+    if kind.startswith("int"):
+        bits = 64 * LIMBS[kind]
+        values = np.where(values >= 1 << (bits - 1), values - (1 << bits), values)
+    return values
+
+
+def floats_from_limbs(limbs: np.ndarray, kind: str) -> np.ndarray:
+    """Ints from limbs as float64, without leaving NumPy for unsigned and positive rows"""
+    values = np.zeros(len(limbs), dtype=np.float64)
+    for i in range(LIMBS[kind]):
+        values += limbs[:, i].astype(np.float64) * 2.0 ** (64 * i)
+    if kind.startswith("int"):
+        negative = np.flatnonzero(limbs[:, -1] >= 1 << 63)
+        values[negative] = from_limbs(limbs[negative], kind).astype(np.float64)
+    return values
+
+
+class Table:
+    """Columns of one event type as NumPy arrays, memory-mapped views when unfiltered"""
+
+    def __init__(self, event_name: str, columns: Dict[str, np.ndarray]):
+        self.event_name = event_name
+        self.columns = columns
+        self.types = dict(SCHEMAS[event_name])
+
+    def __len__(self) -> int:
+        return len(self.columns["block"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def ints(self, name: str) -> np.ndarray:
+        """Exact ints of a limb column as an object array"""
+        return from_limbs(self.columns[name], self.types[name])
+
+    def floats(self, name: str) -> np.ndarray:
+        """Limb column as float64, e.g. for volume and fee analytics"""
+        return floats_from_limbs(self.columns[name], self.types[name])
+
+    def take(self, index) -> "Table":
+        return Table(
+            self.event_name,
+            {name: column[index] for name, column in self.columns.items()},
+        )
+
+
+class EventStore:
+    """Append-only columnar store of `MarginalV1Pool` events in memory-mapped files
+
+    Each event type is a directory with one raw little endian file per column. Integers
+    wider than 64 bits are split into 64 bit limbs, stored as an (n, limbs) column. Rows
+    are appended in (block, log index) order across pools, so block ranges are binary
+    searched on the block column and returned as zero-copy views of the files.
+
+    @dev Row counts in `meta.json` are only advanced once column files are flushed, so rows
+    past the count from an interrupted append are truncated when next opened
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, "meta.json")
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        self.pools: List[str] = meta.get("pools", [])
+        self.counts: Dict[str, int] = meta.get("counts", {})
+        self.last: List[int] = meta.get("last", [-1, -1])  # (block, log index)
+        self._pool_indices = {pool: i for i, pool in enumerate(self.pools)}
+
+        for event_name in SCHEMAS:
+            os.makedirs(os.path.join(path, event_name), exist_ok=True)
+            self.counts.setdefault(event_name, 0)
+            for name, _, _ in self._columns(event_name):
+                self._truncate(event_name, name)
+
+    @staticmethod
+    def _columns(event_name: str):
+        for name, dtype in COMMON_COLUMNS:
+            yield (name, dtype, ())
+        for name, kind in SCHEMAS[event_name]:
+            yield (name, _dtype(kind), _shape(kind))
+
+    def _column_path(self, event_name: str, name: str) -> str:
+        return os.path.join(self.path, event_name, f"{name}.bin")
+
+    def _truncate(self, event_name: str, name: str):
+        # truncates a column file to the stored row count
+        for column, dtype, shape in self._columns(event_name):
+            if column == name:
+                break
+        size = self.counts[event_name] * dtype.itemsize * int(np.prod(shape, dtype=int))
+        with open(self._column_path(event_name, name), "ab") as f:
+            if f.tell() != size:
+                f.truncate(size)
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(
+                {"pools": self.pools, "counts": self.counts, "last": self.last}, f
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def pool_index(self, address: str) -> int:
+        """Index of `address` in the pool column, added if not yet stored"""
+        if address not in self._pool_indices:
+            self._pool_indices[address] = len(self.pools)
+            self.pools.append(address)
+        return self._pool_indices[address]
+
+    def append(self, event_name: str, rows: Dict[str, Sequence]):
+        """Appends columns of rows for one event type
+
+        `rows` maps every column to a sequence of values: `block`, `log_index`, `pool` as
+        an address, and the event's own fields by name. Rows must follow those already
+        stored in (block, log index) order.
+        """
+        self.append_many({event_name: rows})
+
+    def append_many(self, tables: Dict[str, Dict[str, Sequence]]):
+        """Appends rows of several event types, checking order across all of them"""
+        positions = []
+        for event_name, rows in tables.items():
+            positions += list(zip(rows["block"], rows["log_index"]))
+        positions.sort()
+        if positions and tuple(positions[0]) <= tuple(self.last):
+            raise ValueError(
+                f"Rows from {tuple(positions[0])} not after stored {tuple(self.last)}"
+            )
+        for event_name, rows in tables.items():
+            if list(zip(rows["block"], rows["log_index"])) != sorted(
+                zip(rows["block"], rows["log_index"])
+            ):
+                raise ValueError(f"{event_name} rows not in (block, log index) order")
+
+        # convert every column before writing any, so a bad value leaves files untouched
+        pools = len(self.pools)
+        columns = []
+        try:
+            for event_name, rows in tables.items():
+                if len(rows["block"]) == 0:
+                    continue
+                types = dict(SCHEMAS[event_name])
+                for name, dtype, shape in self._columns(event_name):
+                    values = rows[name]
+                    if name == "pool":
+                        column = np.array(
+                            [self.pool_index(pool) for pool in values], dtype=dtype
+                        )
+                    elif name in types and types[name] in LIMBS:
+                        column = to_limbs(values, types[name])
+                    elif name in types and types[name] == "address":
+                        column = np.array([_address(value) for value in values], dtype)
+                    else:
+                        column = _ints(values, types.get(name), dtype)
+                    if len(column) != len(rows["block"]):
+                        raise ValueError(f"{event_name} column {name} length mismatch")
+                    columns.append(
+                        (event_name, name, column.astype(dtype, copy=False).tobytes())
+                    )
+        except Exception:
+            for pool in self.pools[pools:]:
+                del self._pool_indices[pool]
+            del self.pools[pools:]
+            raise
+
+        try:
+            for event_name, name, data in columns:
+                with open(self._column_path(event_name, name), "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except Exception:
+            # drop partially written rows so columns stay aligned with counts
+            for event_name, name, _ in columns:
+                self._truncate(event_name, name)
+            raise
+
+        for event_name, rows in tables.items():
+            self.counts[event_name] += len(rows["block"])
+
+        if positions:
+            self.last = list(positions[-1])
+        self._write_meta()
+
+    def append_logs(self, logs: Iterable):
+        """Appends decoded pool logs, e.g. from `pool.Swap.range`, of any event type"""
+        tables = {}
+        for log in sorted(logs, key=lambda log: (log.block_number, log.log_index)):
+            rows = tables.setdefault(
+                log.event_name,
+                {
+                    name: []
+                    for name in ["block", "log_index", "pool"]
+                    + [name for name, _ in SCHEMAS[log.event_name]]
+                },
+            )
+            rows["block"].append(log.block_number)
+            rows["log_index"].append(log.log_index)
+            rows["pool"].append(log.contract_address)
+            for name, _ in SCHEMAS[log.event_name]:
+                rows[name].append(getattr(log, name))
+        self.append_many(tables)
+
+    def table(self, event_name: str) -> Table:
+        """All rows of an event type as zero-copy memory-mapped columns"""
+        count = self.counts[event_name]
+        columns = {}
+        for name, dtype, shape in self._columns(event_name):
+            columns[name] = (
+                np.memmap(
+                    self._column_path(event_name, name),
+                    dtype=dtype,
+                    mode="r",
+                    shape=(count,) + shape,
+                )
+                if count > 0
+                else np.zeros((0,) + shape, dtype=dtype)
+            )
+        return Table(event_name, columns)
+
+    def range(
+        self,
+        event_name: str,
+        start_block: int,
+        stop_block: int,
+        pool: Optional[str] = None,
+    ) -> Table:
+        """Rows with block in [start_block, stop_block], optionally for a single pool
+
+        @dev Block ranges are views of the memory-mapped files. Filtering by pool copies
+        only the rows in range for that pool
+        """
+        table = self.table(event_name)
+        block = table["block"]
+        i = int(np.searchsorted(block, start_block, side="left"))
+        j = int(np.searchsorted(block, stop_block, side="right"))
+        table = table.take(slice(i, j))
+        if pool is not None:
+            if pool not in self._pool_indices:
+                return table.take(slice(0, 0))
+            table = table.take(np.flatnonzero(table["pool"] == self.pool_index(pool)))
+        return table
+
+
+def ingest(
+    store: EventStore,
+    pools: Iterable,
+    start_block: int,
+    stop_block: int,
+    chunk_size: int = 2000,
+):
+    """Appends all events of deployed pools in [start_block, stop_block], chunk by chunk
+
+    @dev Pools are ingested together so rows stay in (block, log index) order across pools
+    """
+    pools = list(pools)
+    for chunk_start in range(start_block, stop_block + 1, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size - 1, stop_block)
+        logs = []
+        for pool in pools:
+            for event_name in SCHEMAS:
+                logs += getattr(pool, event_name).range(chunk_start, chunk_stop + 1)
+        store.append_logs(logs)
@@ -0,0 +1,65 @@
+from math import isqrt
+
+from marginal_math.constants import MAX_UINT128, MAX_UINT256
+from marginal_math.errors import Panic, Revert, SafeCastOverflow
+
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    """Port of OZ `Math.mulDiv` rounding down"""
+    prod = a * b
+    if denominator == 0:
+        # @dev OZ only divides directly when the product fits in 256 bits
+        if prod <= MAX_UINT256:
+            raise Panic(Panic.DIVISION_BY_ZERO)
+        raise Revert("mulDiv overflow")
+
+    result = prod // denominator
+    if result > MAX_UINT256:
+        raise Revert("mulDiv overflow")
+    return result
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    """Port of OZ `Math.mulDiv` with `Rounding.Up`"""
+    result = mul_div(a, b, denominator)
+    if (a * b) % denominator > 0:
+        if result == MAX_UINT256:
+            raise Panic(Panic.ARITHMETIC)
+        result += 1
+    return result
+
+
+def sqrt(a: int) -> int:
+    """Port of OZ `Math.sqrt` rounding down
+
+    @dev OZ Newton iterations terminate at floor(sqrt(a)), same as `math.isqrt`
+    """
+    return isqrt(a)
+
+
+def to_uint128(value: int) -> int:
+    """Port of OZ `SafeCast.toUint128`"""
+    if value > MAX_UINT128:
+        raise SafeCastOverflow("SafeCast: value doesn't fit in 128 bits")
+    return value
+
+
+def checked_sub(a: int, b: int) -> int:
+    """Checked unsigned subtraction"""
+    if b > a:
+        raise Panic(Panic.ARITHMETIC)
+    return a - b
+
+
+def wrap_int(value: int, bits: int) -> int:
+    """Two's complement wrap to a signed integer of the given width"""
+    half = 1 << (bits - 1)
+    return ((value + half) % (1 << bits)) - half
+
+
+def div_trunc(a: int, b: int) -> int:
+    """Signed integer division rounding toward zero as in Solidity"""
+    if b == 0:
+        raise Panic(Panic.DIVISION_BY_ZERO)
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b > 0) else -q
@@ -0,0 +1,252 @@
+import sqlite3
+
+from dataclasses import astuple, dataclass
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from marginal_math import position as Position
+from marginal_math.position import Info, get_position_key
+
+Key = Tuple[str, int]
+
+# @dev events carrying a position key. Adjust carries the only field it changes,
+# the rest need a `positions()` read for fields synced on chain but not logged
+EVENT_NAMES = ("Open", "Adjust", "Settle", "Liquidate")
+READ_EVENT_NAMES = ("Open", "Settle", "Liquidate")
+
+
+class ReorgError(Exception):
+    """Raised when a reorg replaces the last finalized checkpoint"""
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    block_number: int
+    block_hash: str
+
+
+@dataclass(frozen=True)
+class PositionLog:
+    """Fields of a decoded `Open`, `Adjust`, `Settle` or `Liquidate` log needed to fold"""
+
+    event_name: str
+    owner: str
+    id: int
+    block_number: int
+    log_index: int
+    margin_after: int = 0
+
+    @classmethod
+    def from_log(cls, log) -> "PositionLog":
+        return cls(
+            event_name=log.event_name,
+            owner=log.owner,
+            id=int(log.id),
+            block_number=log.block_number,
+            log_index=log.log_index,
+            margin_after=int(log.marginAfter) if log.event_name == "Adjust" else 0,
+        )
+
+
+def fold(
+    positions: Dict[Key, Info],
+    logs: Iterable[PositionLog],
+    read: Callable[[Key, int], Info],
+    block_number: int,
+    read_event_names: Tuple[str, ...] = READ_EVENT_NAMES,
+) -> Dict[Key, Info]:
+    """Folds position logs up to `block_number` into `positions`, returning changed positions
+
+    @dev Keys touched by an event in `read_event_names` are read once at `block_number`, which
+    already reflects any later event on the same key. Other keys apply Adjust margin and
+    `Position.settle` or `Position.liquidate` in place, without the sync before them
+    """
+    logs = sorted(logs, key=lambda log: (log.block_number, log.log_index))
+    for log in logs:
+        if log.event_name not in EVENT_NAMES:
+            raise ValueError(f"Unknown event {log.event_name}")
+    reads = {(log.owner, log.id) for log in logs if log.event_name in read_event_names}
+
+    changed = {}
+    for log in logs:
+        key = (log.owner, log.id)
+        if key in reads:
+            continue
+        position = changed.get(key) or Info(*astuple(positions.get(key, Info())))
+        if log.event_name == "Adjust":
+            position.margin = log.margin_after
+        elif log.event_name == "Settle":
+            position = Position.settle(position)
+        elif log.event_name == "Liquidate":
+            position = Position.liquidate(position)
+        changed[key] = position
+
+    for key in reads:
+        changed[key] = read(key, block_number)
+
+    positions.update(changed)
+    return changed
+
+
+def _encode(position: Info) -> str:
+    return ",".join(str(int(value)) for value in astuple(position))
+
+
+def _decode(info: str) -> Info:
+    position = Info(*map(int, info.split(",")))
+    position.zero_for_one = bool(position.zero_for_one)
+    position.liquidated = bool(position.liquidated)
+    return position
+
+
+class PositionStore:
+    """SQLite store of pool positions as of a finalized checkpoint
+
+    @dev Position fields are kept as a comma separated row of ints since uint128 and uint256
+    overflow SQLite integers
+    """
+
+    def __init__(self, path: str, pool_address: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                pool TEXT NOT NULL,
+                block_number INTEGER,
+                block_hash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS positions (
+                owner TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                info TEXT NOT NULL,
+                PRIMARY KEY (owner, id)
+            ) WITHOUT ROWID;
+            """
+        )
+
+        row = self.connection.execute("SELECT pool FROM meta").fetchone()
+        if row is None:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO meta (pool) VALUES (?)", (pool_address,)
+                )
+        elif row[0] != pool_address:
+            raise ValueError(f"Store at {path} indexes pool {row[0]}")
+
+    def checkpoint(self) -> Optional[Checkpoint]:
+        (block_number, block_hash) = self.connection.execute(
+            "SELECT block_number, block_hash FROM meta"
+        ).fetchone()
+        return (
+            Checkpoint(block_number, block_hash) if block_number is not None else None
+        )
+
+    def load(self) -> Dict[Key, Info]:
+        return {
+            (owner, id): _decode(info)
+            for (owner, id, info) in self.connection.execute(
+                "SELECT owner, id, info FROM positions"
+            )
+        }
+
+    def commit(self, checkpoint: Checkpoint, changed: Dict[Key, Info]):
+        """Writes changed positions and advances the checkpoint atomically"""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO positions (owner, id, info) VALUES (?, ?, ?)",
+                [(owner, id, _encode(info)) for (owner, id), info in changed.items()],
+            )
+            self.connection.execute(
+                "UPDATE meta SET block_number = ?, block_hash = ?",
+                (checkpoint.block_number, checkpoint.block_hash),
+            )
+
+    def close(self):
+        self.connection.close()
+
+
+class PositionIndexer:
+    """Incremental index of pool positions from `Open`, `Adjust`, `Settle` and `Liquidate` logs
+
+    Positions up to `confirmations` blocks behind head are folded into the store and
+    checkpointed. Positions in newer blocks are refolded on top of the checkpoint each
+    `sync`, so a reorg within the unfinalized window rolls back to the last finalized
+    checkpoint.
+    """
+
+    def __init__(
+        self,
+        pool,
+        chain,
+        store: PositionStore,
+        confirmations: int = 64,
+        chunk_size: int = 2000,
+        start_block: int = 0,
+    ):
+        self.pool = pool
+        self.chain = chain
+        self.store = store
+        self.confirmations = confirmations
+        self.chunk_size = chunk_size
+
+        self.checkpoint = store.checkpoint()
+        self.start_block = (
+            self.checkpoint.block_number + 1 if self.checkpoint else start_block
+        )
+        self.finalized = store.load()
+        self.positions = dict(self.finalized)
+
+    def _read(self, key: Key, block_number: int) -> Info:
+        return Info.from_struct(
+            self.pool.positions(get_position_key(*key), block_identifier=block_number)
+        )
+
+    def _logs(self, start: int, stop: int):
+        logs = []
+        for event_name in EVENT_NAMES:
+            logs += [
+                PositionLog.from_log(log)
+                for log in getattr(self.pool, event_name).range(start, stop + 1)
+            ]
+        return logs
+
+    def _fold(self, positions: Dict[Key, Info], start: int, stop: int):
+        for chunk_start in range(start, stop + 1, self.chunk_size):
+            chunk_stop = min(chunk_start + self.chunk_size - 1, stop)
+            yield (
+                chunk_stop,
+                fold(
+                    positions,
+                    self._logs(chunk_start, chunk_stop),
+                    self._read,
+                    chunk_stop,
+                ),
+            )
+
+    def sync(self) -> int:
+        """Indexes up to the current head, returning the head block number"""
+        if self.checkpoint is not None and (
+            self.chain.blocks[self.checkpoint.block_number].hash.hex()
+            != self.checkpoint.block_hash
+        ):
+            raise ReorgError(
+                f"Checkpoint at block {self.checkpoint.block_number} reorged"
+            )
+
+        head = self.chain.blocks.head.number
+        finalized = head - self.confirmations
+        if finalized >= self.start_block:
+            for chunk_stop, changed in self._fold(
+                self.finalized, self.start_block, finalized
+            ):
+                self.checkpoint = Checkpoint(
+                    chunk_stop, self.chain.blocks[chunk_stop].hash.hex()
+                )
+                self.store.commit(self.checkpoint, changed)
+            self.start_block = finalized + 1
+
+        # refold unfinalized blocks from the checkpoint, discarding any reorged logs
+        self.positions = dict(self.finalized)
+        if head >= self.start_block:
+            for _ in self._fold(self.positions, self.start_block, head):
+                pass
+        return head
@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+# @dev keeps each eth_call well under node gas caps (~30M) at ~15k gas per position
+CHUNK_SIZE = 500
+
+
+@dataclass
+class PositionHealth:
+    owner: str
+    id: int
+    size: int
+    debt0: int
+    debt1: int
+    margin_minimum: int
+    margin: int
+    safe: bool
+    liquidated: bool
+    amount0_locked: int
+    amount1_locked: int
+    rewards: int
+    oracle_sqrt_price_x96: int
+
+    @classmethod
+    def from_struct(cls, key: Tuple[str, int], health, oracle_sqrt_price_x96: int):
+        return cls(
+            owner=key[0],
+            id=key[1],
+            size=health.size,
+            debt0=health.debt0,
+            debt1=health.debt1,
+            margin_minimum=health.marginMinimum,
+            margin=health.margin,
+            safe=health.safe,
+            liquidated=health.liquidated,
+            amount0_locked=health.amount0Locked,
+            amount1_locked=health.amount1Locked,
+            rewards=health.rewards,
+            oracle_sqrt_price_x96=oracle_sqrt_price_x96,
+        )
+
+
+def chunks(keys: Sequence[Tuple[str, int]], chunk_size: int) -> Iterator[List]:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    for i in range(0, len(keys), chunk_size):
+        yield list(keys[i : i + chunk_size])
+
+
+def iter_healths(
+    lens, pool, keys: Iterable[Tuple[str, int]], chunk_size: int = CHUNK_SIZE
+) -> Iterator[PositionHealth]:
+    """Pages `MarginalV1PoolLens.healths` over (owner, id) keys in fixed size chunks
+
+    @dev Each chunk is a separate call so chunks may be evaluated at different blocks
+    if the chain advances mid iteration
+    """
+    keys = list(keys)
+    for chunk in chunks(keys, chunk_size):
+        oracle_sqrt_price_x96, healths = lens.healths(pool, chunk)
+        for key, health in zip(chunk, healths):
+            yield PositionHealth.from_struct(key, health, oracle_sqrt_price_x96)
+
+
+def healths(
+    lens, pool, keys: Iterable[Tuple[str, int]], chunk_size: int = CHUNK_SIZE
+) -> List[PositionHealth]:
+    """Returns the health of each position keyed by (owner, id), in the order of `keys`"""
+    return list(iter_healths(lens, pool, keys, chunk_size))
@@ -0,0 +1,364 @@
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from math import isqrt
+from typing import Dict, Hashable, List, Tuple
+
+from marginal_math import position as Position
+from marginal_math.constants import (
+    FUNDING_PERIOD,
+    MAINTENANCE_UNIT,
+    MAX_SQRT_RATIO,
+    MIN_SQRT_RATIO,
+    TICK_CUMULATIVE_RATE_MAX,
+)
+from marginal_math.oracle_library import oracle_tick_cumulative_delta
+
+# @dev relative slack on float bounds of threshold drift
+_REL_TOL = 1e-9
+
+
+def liquidation_sqrt_price_x96(position: Position.Info, maintenance: int) -> int:
+    """Boundary oracle sqrt price for `Position.safe` at the position's current debts
+
+    `Position.safe` is monotonic in sqrt price, so the boundary is exact:
+        - oneForZero (debt in token1) is safe iff sqrt price >= boundary
+        - zeroForOne (debt in token0) is safe iff sqrt price <= boundary
+
+    @dev Clamped to [MIN_SQRT_RATIO - 1, MAX_SQRT_RATIO], outside the range of valid oracle prices
+    """
+    if not position.zero_for_one:
+        # min sqrt price with safe == True
+        if Position.safe(position, MIN_SQRT_RATIO, maintenance):
+            return MIN_SQRT_RATIO
+        if not Position.safe(position, MAX_SQRT_RATIO - 1, maintenance):
+            return MAX_SQRT_RATIO
+
+        # (c * sqrtP) >> 96 >= (d * (1 + M) << 96) / sqrtP, so sqrtP ~ sqrt(d * (1 + M) / c) << 96
+        debt_adjusted = (
+            position.debt1 * (MAINTENANCE_UNIT + maintenance)
+        ) // MAINTENANCE_UNIT
+        collateral = position.margin + position.size
+        estimate = isqrt((debt_adjusted << 192) // collateral)
+        return _search(
+            lambda x: Position.safe(position, x, maintenance),
+            estimate,
+            MIN_SQRT_RATIO,
+            MAX_SQRT_RATIO - 1,
+        )
+    else:
+        # max sqrt price with safe == True
+        if Position.safe(position, MAX_SQRT_RATIO - 1, maintenance):
+            return MAX_SQRT_RATIO
+        if not Position.safe(position, MIN_SQRT_RATIO, maintenance):
+            return MIN_SQRT_RATIO - 1
+
+        # (c << 96) / sqrtP >= (d * (1 + M) * sqrtP) >> 96, so sqrtP ~ sqrt(c / (d * (1 + M))) << 96
+        debt_adjusted = (
+            position.debt0 * (MAINTENANCE_UNIT + maintenance)
+        ) // MAINTENANCE_UNIT
+        collateral = position.margin + position.size
+        estimate = isqrt((collateral << 192) // debt_adjusted)
+        return (
+            _search(
+                lambda x: not Position.safe(position, x, maintenance),
+                estimate,
+                MIN_SQRT_RATIO,
+                MAX_SQRT_RATIO - 1,
+            )
+            - 1
+        )
+
+
+def _search(predicate, estimate: int, lo: int, hi: int) -> int:
+    # least x in [lo, hi] with predicate(x) for monotonic predicate, given predicate(hi)
+    estimate = min(max(estimate, lo), hi)
+    step = max(estimate >> 32, 1)
+    if predicate(estimate):
+        # gallop down to bracket
+        upper = estimate
+        lower = estimate - step
+        while lower > lo and predicate(lower):
+            upper = lower
+            step <<= 1
+            lower = upper - step
+        lower = max(lower, lo - 1)
+    else:
+        lower = estimate
+        upper = estimate + step
+        while upper < hi and not predicate(upper):
+            lower = upper
+            step <<= 1
+            upper = lower + step
+        upper = min(upper, hi)
+
+    # predicate(lower) is False (or lower == lo - 1), predicate(upper) is True
+    while upper - lower > 1:
+        mid = (lower + upper) // 2
+        if predicate(mid):
+            upper = mid
+        else:
+            lower = mid
+    return upper
+
+
+@dataclass
+class _Entry:
+    position: Position.Info  # as stored on chain, synced only on settle or liquidate
+    threshold: int  # liquidation sqrt price at keyed debts
+    block_timestamp: int  # keyed at
+    tick_cumulative_delta: int  # oracle - pool tick cumulative keyed at
+    slack: float  # relative granularity of safe at threshold
+
+
+class LiquidationIndex:
+    """Sorted index of positions by liquidation sqrt price, one per zeroForOne side
+
+    Thresholds are keyed at the debts after funding when added or last re-keyed. Funding
+    only moves debts by a bounded amount, so `update` checks exact safety only for
+    positions within the drift band around the current oracle price and lazily re-keys
+    those. Everything beyond the band is decided by range query alone.
+    """
+
+    def __init__(
+        self,
+        maintenance: int,
+        tick_cumulative_rate_max: int = TICK_CUMULATIVE_RATE_MAX,
+        funding_period: int = FUNDING_PERIOD,
+    ):
+        self.maintenance = maintenance
+        self.tick_cumulative_rate_max = tick_cumulative_rate_max
+        self.funding_period = funding_period
+
+        self.entries: Dict[Hashable, _Entry] = {}
+        self.unsafe: set = set()
+
+        # (threshold, key) sorted; oneForZero unsafe below, zeroForOne unsafe above
+        self._one_for_zero: List[Tuple[int, Hashable]] = []
+        self._zero_for_one: List[Tuple[int, Hashable]] = []
+
+        # keyed at bounds for the global drift band
+        self._keyed_timestamps: List[int] = []
+        self._keyed_deltas: List[int] = []
+        self._slack_max = 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def _side(self, zero_for_one: bool) -> List[Tuple[int, Hashable]]:
+        return self._zero_for_one if zero_for_one else self._one_for_zero
+
+    def _key(
+        self,
+        key: Hashable,
+        position: Position.Info,
+        block_timestamp: int,
+        tick_cumulative_delta: int,
+    ):
+        synced = Position.sync(
+            position,
+            block_timestamp,
+            0,
+            tick_cumulative_delta,
+            self.tick_cumulative_rate_max,
+            self.funding_period,
+        )
+        threshold = liquidation_sqrt_price_x96(synced, self.maintenance)
+        slack = _slack(synced, threshold)
+        entry = _Entry(
+            position=position,
+            threshold=threshold,
+            block_timestamp=block_timestamp,
+            tick_cumulative_delta=tick_cumulative_delta,
+            slack=slack,
+        )
+        self.entries[key] = entry
+
+        insort(self._side(position.zero_for_one), (threshold, key))
+        insort(self._keyed_timestamps, block_timestamp)
+        insort(self._keyed_deltas, tick_cumulative_delta)
+        if slack > self._slack_max:
+            self._slack_max = slack
+
+    def _unkey(self, key: Hashable) -> _Entry:
+        entry = self.entries.pop(key)
+        side = self._side(entry.position.zero_for_one)
+        del side[bisect_left(side, (entry.threshold, key))]
+        del self._keyed_timestamps[
+            bisect_left(self._keyed_timestamps, entry.block_timestamp)
+        ]
+        del self._keyed_deltas[
+            bisect_left(self._keyed_deltas, entry.tick_cumulative_delta)
+        ]
+        return entry
+
+    def add(self, key: Hashable, position: Position.Info):
+        """Adds a position as stored on chain, keyed at its last sync
+
+        @dev Keys must be orderable, e.g. (owner, id)
+        """
+        if key in self.entries:
+            self.remove(key)
+        self._key(
+            key,
+            position,
+            position.block_timestamp,
+            position.tick_cumulative_delta,
+        )
+
+    def remove(self, key: Hashable):
+        """Removes a position, e.g. once settled or liquidated"""
+        self._unkey(key)
+        self.unsafe.discard(key)
+
+    def _growth(self, block_timestamp: int, drift: int, entry_timestamp: int) -> float:
+        # bound on the sqrt price threshold ratio after funding since keyed
+        #   delta clamps to +/- rate * dt, so |delta' - delta| <= |D' - D| + rate * (t' - t)
+        #   debts move by at most 1.0001 ** (ticks / 2), and thresholds by its sqrt
+        elapsed = (block_timestamp - entry_timestamp) % (1 << 32)
+        ticks = (abs(drift) + self.tick_cumulative_rate_max * elapsed) / (
+            self.funding_period // 2
+        ) + 1
+        return 1.0001 ** (ticks / 4)
+
+    def _band(self, block_timestamp: int, tick_cumulative_delta_last: int) -> float:
+        drift = max(
+            abs(
+                oracle_tick_cumulative_delta(
+                    self._keyed_deltas[0], tick_cumulative_delta_last
+                )
+            ),
+            abs(
+                oracle_tick_cumulative_delta(
+                    self._keyed_deltas[-1], tick_cumulative_delta_last
+                )
+            ),
+        )
+        return self._growth(block_timestamp, drift, self._keyed_timestamps[0]) * (
+            1 + _REL_TOL + self._slack_max
+        )
+
+    def update(
+        self,
+        oracle_sqrt_price_x96: int,
+        block_timestamp: int,
+        tick_cumulative_last: int,
+        oracle_tick_cumulative_last: int,
+    ) -> List[Hashable]:
+        """Returns keys of positions newly unsafe at the oracle price, in index order
+
+        Arguments mirror `MarginalV1Pool.liquidate`: the oracle TWAP sqrt price, the synced
+        pool block timestamp and tick cumulative, and the zero seconds ago oracle tick cumulative.
+        """
+        if len(self.entries) == 0:
+            return []
+
+        tick_cumulative_delta_last = oracle_tick_cumulative_delta(
+            tick_cumulative_last, oracle_tick_cumulative_last
+        )
+        band = self._band(block_timestamp, tick_cumulative_delta_last)
+        lower = int(oracle_sqrt_price_x96 / band)
+        upper = int(oracle_sqrt_price_x96 * band) + 1
+
+        unsafe = []
+        candidates = []
+
+        # oneForZero unsafe iff price < threshold; definitely unsafe above band
+        side = self._one_for_zero
+        i = bisect_right(side, (lower,))
+        j = bisect_right(side, (upper,))
+        candidates.extend(key for (_, key) in side[i:j])
+        unsafe.extend(key for (_, key) in side[j:])
+
+        # zeroForOne unsafe iff price > threshold; definitely unsafe below band
+        side = self._zero_for_one
+        i = bisect_left(side, (lower,))
+        j = bisect_left(side, (upper,))
+        unsafe.extend(key for (_, key) in side[:i])
+        candidates.extend(key for (_, key) in side[i:j])
+
+        for key in candidates:
+            if self._check(
+                key,
+                oracle_sqrt_price_x96,
+                block_timestamp,
+                tick_cumulative_delta_last,
+            ):
+                unsafe.append(key)
+
+        newly = [key for key in unsafe if key not in self.unsafe]
+        self.unsafe = set(unsafe)
+        return newly
+
+    def _check(
+        self,
+        key: Hashable,
+        oracle_sqrt_price_x96: int,
+        block_timestamp: int,
+        tick_cumulative_delta_last: int,
+    ) -> bool:
+        # whether unsafe, re-keying at current debts if within the entry's own drift band
+        entry = self.entries[key]
+        band = self._growth(
+            block_timestamp,
+            oracle_tick_cumulative_delta(
+                entry.tick_cumulative_delta, tick_cumulative_delta_last
+            ),
+            entry.block_timestamp,
+        ) * (1 + _REL_TOL + entry.slack)
+
+        zero_for_one = entry.position.zero_for_one
+        if not zero_for_one:
+            if entry.threshold / band > oracle_sqrt_price_x96:
+                return True
+            if entry.threshold * band <= oracle_sqrt_price_x96:
+                return False
+        else:
+            if entry.threshold * band < oracle_sqrt_price_x96:
+                return True
+            if entry.threshold / band >= oracle_sqrt_price_x96:
+                return False
+
+        self._unkey(key)
+        self._key(key, entry.position, block_timestamp, tick_cumulative_delta_last)
+        threshold = self.entries[key].threshold
+        return (
+            oracle_sqrt_price_x96 > threshold
+            if zero_for_one
+            else oracle_sqrt_price_x96 < threshold
+        )
+
+    def refresh(
+        self,
+        block_timestamp: int,
+        tick_cumulative_last: int,
+        oracle_tick_cumulative_last: int,
+    ):
+        """Re-keys every position at current debts, narrowing the drift band"""
+        tick_cumulative_delta_last = oracle_tick_cumulative_delta(
+            tick_cumulative_last, oracle_tick_cumulative_last
+        )
+        entries = self.entries
+        self.entries = {}
+        self._one_for_zero = []
+        self._zero_for_one = []
+        self._keyed_timestamps = []
+        self._keyed_deltas = []
+        self._slack_max = 0.0
+        for key, entry in entries.items():
+            self._key(key, entry.position, block_timestamp, tick_cumulative_delta_last)
+
+
+def _slack(position: Position.Info, threshold: int) -> float:
+    # floors in `Position.safe` make the boundary move in steps of 1 / liquidity value
+    if threshold < MIN_SQRT_RATIO or threshold >= MAX_SQRT_RATIO:
+        return 0.0
+    collateral = position.margin + position.size
+    value = (
+        (collateral << 96) // threshold
+        if position.zero_for_one
+        else (collateral * threshold) >> 96
+    )
+    return 4.0 / value if value > 0 else 1.0
@@ -0,0 +1,53 @@
+from typing import Tuple
+
+from marginal_math.constants import MAX_SQRT_RATIO, MAX_UINT256, MIN_SQRT_RATIO
+from marginal_math.errors import (
+    Amount0ExceedsReserve0,
+    Amount1ExceedsReserve1,
+    InvalidSqrtPriceX96,
+    Panic,
+)
+from marginal_math.full_math import sqrt, to_uint128
+
+
+def to_amounts(liquidity: int, sqrt_price_x96: int) -> Tuple[int, int]:
+    """Port of `LiquidityMath.toAmounts`"""
+    # x = L / sqrt(P); y = L * sqrt(P)
+    amount0 = (liquidity << 96) // sqrt_price_x96
+    amount1 = (liquidity * sqrt_price_x96) >> 96  # mulDiv by Q96 of uint128 * uint160
+    return (amount0, amount1)
+
+
+def to_liquidity_sqrt_price_x96(reserve0: int, reserve1: int) -> Tuple[int, int]:
+    """Port of `LiquidityMath.toLiquiditySqrtPriceX96`"""
+    # L = sqrt(x * y); sqrt(P) = sqrt(y / x)
+    prod = reserve0 * reserve1
+    if prod > MAX_UINT256:
+        raise Panic(Panic.ARITHMETIC)
+    liquidity = to_uint128(sqrt(prod))
+
+    if reserve0 == 0:
+        raise Panic(Panic.DIVISION_BY_ZERO)
+    sqrt_price_x96 = (liquidity << 96) // reserve0
+    if not (sqrt_price_x96 >= MIN_SQRT_RATIO and sqrt_price_x96 < MAX_SQRT_RATIO):
+        raise InvalidSqrtPriceX96()
+    return (liquidity, sqrt_price_x96)
+
+
+def liquidity_sqrt_price_x96_next(
+    liquidity: int, sqrt_price_x96: int, amount0: int, amount1: int
+) -> Tuple[int, int]:
+    """Port of `LiquidityMath.liquiditySqrtPriceX96Next`"""
+    (reserve0, reserve1) = to_amounts(liquidity, sqrt_price_x96)
+
+    if amount0 < 0 and -amount0 >= reserve0:
+        raise Amount0ExceedsReserve0()
+    if amount1 < 0 and -amount1 >= reserve1:
+        raise Amount1ExceedsReserve1()
+
+    reserve0_next = reserve0 + amount0
+    reserve1_next = reserve1 + amount1
+    if reserve0_next > MAX_UINT256 or reserve1_next > MAX_UINT256:
+        raise Panic(Panic.ARITHMETIC)
+
+    return to_liquidity_sqrt_price_x96(reserve0_next, reserve1_next)
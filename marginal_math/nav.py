@@ -0,0 +1,298 @@
+from dataclasses import dataclass
+from typing import Dict, Hashable, Tuple
+
+import numpy as np
+
+from marginal_math import position as Position
+from marginal_math.constants import (
+    FUNDING_PERIOD,
+    Q96,
+    Q192,
+    TICK_CUMULATIVE_RATE_MAX,
+)
+from marginal_math.liquidity_math import to_amounts
+from marginal_math.oracle_library import oracle_tick_cumulative_delta
+from marginal_math.tick_math import get_sqrt_ratio_at_tick
+
+# @dev columns read from `Position.Info` to mark a position, in storage order
+_FIELDS = (
+    "size",
+    "debt0",
+    "debt1",
+    "insurance0",
+    "insurance1",
+    "margin",
+    "block_timestamp",
+    "tick_cumulative_delta",
+)
+
+
+def _wrap_int(x: np.ndarray, bits: int) -> np.ndarray:
+    # elementwise `full_math.wrap_int` on object arrays
+    half = 1 << (bits - 1)
+    return (x + half) % (1 << bits) - half
+
+
+def _div_trunc(x: np.ndarray, y: int) -> np.ndarray:
+    # elementwise `full_math.div_trunc` on object arrays
+    return np.where(x < 0, -((-x) // y), x // y)
+
+
+@dataclass(frozen=True)
+class Valuation:
+    """Pool value marked at `sqrt_price_x96`, split into reserves and claims on positions
+
+    Claims are what LPs get back from open positions: debts plus insurance when the trader
+    would settle at the mark, otherwise all amounts locked as on liquidation.
+    """
+
+    sqrt_price_x96: int
+    reserve0: int
+    reserve1: int
+    claims0: int
+    claims1: int
+    total_supply: int
+
+    @property
+    def amount0(self) -> int:
+        return self.reserve0 + self.claims0
+
+    @property
+    def amount1(self) -> int:
+        return self.reserve1 + self.claims1
+
+    @property
+    def value1(self) -> int:
+        """Pool value in token1 at the mark"""
+        return (self.amount0 * self.sqrt_price_x96**2) // Q192 + self.amount1
+
+    @property
+    def value1_per_share(self) -> float:
+        """NAV per LP share in token1 at the mark"""
+        return self.value1 / self.total_supply if self.total_supply > 0 else 0.0
+
+
+class NAVEngine:
+    """Pool NAV per LP share with locked liquidity marked to the pool price and oracle TWAP
+
+    Open positions are held as columns, updated in place as `Open`, `Adjust`, `Settle` and
+    `Liquidate` events arrive. `value` syncs debts for funding and marks every position in
+    one vectorized pass over the columns.
+    """
+
+    def __init__(
+        self,
+        tick_cumulative_rate_max: int = TICK_CUMULATIVE_RATE_MAX,
+        funding_period: int = FUNDING_PERIOD,
+        capacity: int = 1024,
+    ):
+        self.tick_cumulative_rate_max = tick_cumulative_rate_max
+        self.funding_period = funding_period
+
+        self.rows: Dict[Hashable, int] = {}
+        self.keys = []
+        self.columns = {field: np.zeros(capacity, dtype=object) for field in _FIELDS}
+        self.zero_for_one = np.zeros(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.rows
+
+    def _grow(self):
+        capacity = 2 * len(self.zero_for_one)
+        for field, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=object)
+            grown[: len(column)] = column
+            self.columns[field] = grown
+        zero_for_one = np.zeros(capacity, dtype=bool)
+        zero_for_one[: len(self.zero_for_one)] = self.zero_for_one
+        self.zero_for_one = zero_for_one
+
+    def _set(self, row: int, position: Position.Info):
+        for field, column in self.columns.items():
+            column[row] = getattr(position, field)
+        self.zero_for_one[row] = position.zero_for_one
+
+    def update(self, key: Hashable, position: Position.Info):
+        """Upserts a position as stored on chain, removing it once settled or liquidated"""
+        if position.size == 0 or position.liquidated:
+            self.remove(key)
+            return
+
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.zero_for_one):
+                self._grow()
+            self.rows[key] = row
+            self.keys.append(key)
+        self._set(row, position)
+
+    def update_many(self, changed: Dict[Hashable, Position.Info]):
+        """Applies positions changed by events, e.g. as returned by `indexer.fold`"""
+        for key, position in changed.items():
+            self.update(key, position)
+
+    def remove(self, key: Hashable):
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+
+        # swap the last row into the hole
+        last = len(self.keys) - 1
+        if row != last:
+            for column in self.columns.values():
+                column[row] = column[last]
+            self.zero_for_one[row] = self.zero_for_one[last]
+            self.keys[row] = self.keys[last]
+            self.rows[self.keys[row]] = row
+        self.keys.pop()
+
+    def debts(
+        self,
+        block_timestamp_last: int,
+        tick_cumulative_last: int,
+        oracle_tick_cumulative_last: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Debts of every row after funding, matching `Position.sync` row by row"""
+        n = len(self.keys)
+        debt0 = self.columns["debt0"][:n]
+        debt1 = self.columns["debt1"][:n]
+        zero_for_one = self.zero_for_one[:n]
+        if n == 0:
+            return (debt0.copy(), debt1.copy())
+
+        tick_cumulative_delta_last = oracle_tick_cumulative_delta(
+            tick_cumulative_last, oracle_tick_cumulative_last
+        )
+        block_timestamp = self.columns["block_timestamp"][:n]
+        delta_max = _wrap_int(
+            self.tick_cumulative_rate_max
+            * ((block_timestamp_last - block_timestamp) % (1 << 32)),
+            56,
+        )
+
+        # oracle - pool tick cumulative delta since last sync, against the owed side
+        delta = _wrap_int(
+            tick_cumulative_delta_last - self.columns["tick_cumulative_delta"][:n], 56
+        )
+        delta = np.where(zero_for_one, delta, _wrap_int(-delta, 56))
+        delta = np.minimum(np.maximum(delta, -delta_max), delta_max)
+
+        # one tick math call per distinct mean tick
+        ticks = _wrap_int(_div_trunc(delta, self.funding_period // 2), 24)
+        (unique, inverse) = np.unique(ticks.astype(np.int64), return_inverse=True)
+        numerator_x96 = np.array(
+            [get_sqrt_ratio_at_tick(int(tick)) for tick in unique], dtype=object
+        )[inverse]
+
+        synced = block_timestamp != block_timestamp_last % (1 << 32)
+        debt0 = np.where(synced & zero_for_one, (debt0 * numerator_x96) // Q96, debt0)
+        debt1 = np.where(synced & ~zero_for_one, (debt1 * numerator_x96) // Q96, debt1)
+        return (debt0, debt1)
+
+    def claims(
+        self,
+        sqrt_price_x96: int,
+        block_timestamp_last: int,
+        tick_cumulative_last: int,
+        oracle_tick_cumulative_last: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """LP claims on each row in token0 and token1 marked at `sqrt_price_x96`
+
+        @dev A trader settles only if collateral covers debt at the mark, returning debts
+        plus insurance. Otherwise LPs are left with `Position.amountsLocked` on liquidation
+        """
+        n = len(self.keys)
+        (debt0, debt1) = self.debts(
+            block_timestamp_last, tick_cumulative_last, oracle_tick_cumulative_last
+        )
+        zero_for_one = self.zero_for_one[:n]
+        collateral = self.columns["size"][:n] + self.columns["margin"][:n]
+        insurance0 = self.columns["insurance0"][:n]
+        insurance1 = self.columns["insurance1"][:n]
+
+        price_x192 = sqrt_price_x96**2
+        settles = np.where(
+            zero_for_one,
+            (collateral << 192) >= debt0 * price_x192,
+            collateral * price_x192 >= (debt1 << 192),
+        ).astype(bool)
+
+        claims0 = insurance0 + np.where(
+            zero_for_one,
+            np.where(settles, debt0, 0),
+            debt0 + np.where(settles, 0, collateral),
+        )
+        claims1 = insurance1 + np.where(
+            zero_for_one,
+            debt1 + np.where(settles, 0, collateral),
+            np.where(settles, debt1, 0),
+        )
+        return (claims0, claims1)
+
+    def value(
+        self,
+        sqrt_price_x96: int,
+        liquidity: int,
+        pool_sqrt_price_x96: int,
+        total_supply: int,
+        block_timestamp_last: int,
+        tick_cumulative_last: int,
+        oracle_tick_cumulative_last: int,
+    ) -> Valuation:
+        """Pool value marked at `sqrt_price_x96` with reserves at the pool price
+
+        Arguments after the mark mirror the synced pool state: available liquidity, sqrt
+        price and LP total supply, the block timestamp and tick cumulative, and the zero
+        seconds ago oracle tick cumulative.
+        """
+        (reserve0, reserve1) = to_amounts(liquidity, pool_sqrt_price_x96)
+        (claims0, claims1) = self.claims(
+            sqrt_price_x96,
+            block_timestamp_last,
+            tick_cumulative_last,
+            oracle_tick_cumulative_last,
+        )
+        return Valuation(
+            sqrt_price_x96=sqrt_price_x96,
+            reserve0=reserve0,
+            reserve1=reserve1,
+            claims0=int(claims0.sum()),
+            claims1=int(claims1.sum()),
+            total_supply=total_supply,
+        )
+
+    def values(
+        self,
+        liquidity: int,
+        pool_sqrt_price_x96: int,
+        oracle_sqrt_price_x96: int,
+        total_supply: int,
+        block_timestamp_last: int,
+        tick_cumulative_last: int,
+        oracle_tick_cumulative_last: int,
+    ) -> Tuple[Valuation, Valuation]:
+        """Pool value marked at the pool price and at the oracle TWAP"""
+        return tuple(
+            self.value(
+                sqrt_price_x96,
+                liquidity,
+                pool_sqrt_price_x96,
+                total_supply,
+                block_timestamp_last,
+                tick_cumulative_last,
+                oracle_tick_cumulative_last,
+            )
+            for sqrt_price_x96 in (pool_sqrt_price_x96, oracle_sqrt_price_x96)
+        )
+
+    @classmethod
+    def from_positions(
+        cls, positions: Dict[Hashable, Position.Info], **kwargs
+    ) -> "NAVEngine":
+        engine = cls(**kwargs)
+        engine.update_many(positions)
+        return engine
@@ -0,0 +1,21 @@
+from marginal_math.full_math import div_trunc, wrap_int
+from marginal_math.tick_math import get_sqrt_ratio_at_tick
+
+
+def oracle_sqrt_price_x96(tick_cumulative_delta: int, time_delta: int) -> int:
+    """Port of `OracleLibrary.oracleSqrtPriceX96`
+
+    @dev Rounds toward zero for both positive and negative tick delta
+    """
+    arithmetic_mean_tick = wrap_int(div_trunc(tick_cumulative_delta, time_delta), 24)
+    return get_sqrt_ratio_at_tick(arithmetic_mean_tick)
+
+
+def oracle_tick_cumulative_delta(
+    tick_cumulative_start: int, tick_cumulative_end: int
+) -> int:
+    """Port of `OracleLibrary.oracleTickCumulativeDelta`
+
+    @dev Allows for int56 tick cumulative overflow
+    """
+    return wrap_int(tick_cumulative_end - tick_cumulative_start, 56)
@@ -0,0 +1,865 @@
+from dataclasses import dataclass, replace
+from typing import Dict, List, Tuple
+
+from marginal_math import position as Position
+from marginal_math.constants import (
+    BASE_FEE_MIN,
+    FEE,
+    FUNDING_PERIOD,
+    GAS_LIQUIDATE,
+    MAX_SQRT_RATIO,
+    MAX_UINT96,
+    MAX_UINT128,
+    MIN_SQRT_RATIO,
+    MINIMUM_LIQUIDITY,
+    MINIMUM_SIZE,
+    REWARD_PREMIUM,
+    SECONDS_AGO,
+    TICK_CUMULATIVE_RATE_MAX,
+)
+from marginal_math.errors import (
+    Amount0LessThanMin,
+    Amount1LessThanMin,
+    InvalidAmountSpecified,
+    InvalidLiquidityDelta,
+    InvalidPosition,
+    InvalidPositionsLength,
+    InvalidSqrtPriceLimitX96,
+    MarginLessThanMin,
+    Panic,
+    PositionSafe,
+    Revert,
+    RewardsLessThanMin,
+    SqrtPriceX96ExceedsLimit,
+)
+from marginal_math.full_math import (
+    checked_sub,
+    div_trunc,
+    mul_div,
+    to_uint128,
+    wrap_int,
+)
+from marginal_math.liquidity_math import liquidity_sqrt_price_x96_next, to_amounts
+from marginal_math.oracle_library import (
+    oracle_sqrt_price_x96,
+    oracle_tick_cumulative_delta,
+)
+from marginal_math.sqrt_price_math import (
+    sqrt_price_x96_next_open,
+    sqrt_price_x96_next_swap,
+)
+from marginal_math.swap_math import swap_amounts, swap_fees
+from marginal_math.tick_math import get_tick_at_sqrt_ratio
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@dataclass
+class State:
+    """Mirrors `MarginalV1Pool.State`"""
+
+    sqrt_price_x96: int = 0
+    total_positions: int = 0
+    liquidity: int = 0
+    tick: int = 0
+    block_timestamp: int = 0
+    tick_cumulative: int = 0
+    fee_protocol: int = 0
+    initialized: bool = False
+
+    def copy(self) -> "State":
+        # faster than dataclasses.replace on hot paths
+        return State(
+            self.sqrt_price_x96,
+            self.total_positions,
+            self.liquidity,
+            self.tick,
+            self.block_timestamp,
+            self.tick_cumulative,
+            self.fee_protocol,
+            self.initialized,
+        )
+
+
+@dataclass
+class ProtocolFees:
+    """Mirrors `MarginalV1Pool.ProtocolFees`"""
+
+    token0: int = 0
+    token1: int = 0
+
+    def copy(self) -> "ProtocolFees":
+        return ProtocolFees(self.token0, self.token1)
+
+
+def _add(a: int, b: int, max_value: int = MAX_UINT128) -> int:
+    # checked unsigned addition
+    c = a + b
+    if c > max_value:
+        raise Panic(Panic.ARITHMETIC)
+    return c
+
+
+class PoolSimulator:
+    """In-process state machine for `MarginalV1Pool`
+
+    Operations update state and raise the same `Revert` the contract would, leaving state
+    untouched on revert. Callbacks are assumed to pay exactly the amounts owed.
+
+    `oracle` must implement Uniswap v3 `observe(secondsAgos) -> (tickCumulatives, ...)`.
+    Set `block_timestamp` and `block_base_fee` before each operation to mirror the chain.
+    """
+
+    fee = FEE
+    reward_premium = REWARD_PREMIUM
+    tick_cumulative_rate_max = TICK_CUMULATIVE_RATE_MAX
+    seconds_ago = SECONDS_AGO
+    funding_period = FUNDING_PERIOD
+    block_base_fee_min = BASE_FEE_MIN
+    gas_liquidate = GAS_LIQUIDATE
+
+    def __init__(
+        self,
+        maintenance: int,
+        oracle,
+        block_timestamp: int = 0,
+        block_base_fee: int = 0,
+        address: str = "pool",
+    ):
+        self.maintenance = maintenance
+        self.oracle = oracle
+        self.address = address
+
+        self.block_timestamp = block_timestamp
+        self.block_base_fee = block_base_fee
+
+        self.state = State()
+        self.liquidity_locked = 0
+        self.protocol_fees = ProtocolFees()
+        self.positions: Dict[Tuple[str, int], Position.Info] = {}
+
+        # LP token
+        self.total_supply = 0
+        self.balances: Dict[str, int] = {}
+
+        # pool token and native (gas) token balances
+        self.balance0 = 0
+        self.balance1 = 0
+        self.balance = 0
+
+    def balance_of(self, account: str) -> int:
+        return self.balances.get(account, 0)
+
+    def get_position(self, owner: str, id: int) -> Position.Info:
+        return self.positions.get((owner, id), Position.Info())
+
+    def _state_synced(self) -> State:
+        state = self.state.copy()
+        # oracle update
+        delta = (self.block_timestamp - state.block_timestamp) % (1 << 32)
+        if delta == 0:
+            return state  # early exit if nothing to update
+        state.tick_cumulative = wrap_int(
+            state.tick_cumulative + state.tick * delta, 56
+        )  # overflow desired
+        state.block_timestamp = self.block_timestamp % (1 << 32)
+        return state
+
+    def _oracle_tick_cumulatives(self, seconds_agos: list) -> list:
+        return list(self.oracle.observe(seconds_agos)[0])
+
+    def _check_sqrt_price_limit_x96(
+        self, state: State, zero_for_one: bool, sqrt_price_limit_x96: int
+    ):
+        if (
+            not (
+                sqrt_price_limit_x96 < state.sqrt_price_x96
+                and sqrt_price_limit_x96 > MIN_SQRT_RATIO
+            )
+            if zero_for_one
+            else not (
+                sqrt_price_limit_x96 > state.sqrt_price_x96
+                and sqrt_price_limit_x96 < MAX_SQRT_RATIO
+            )
+        ):
+            raise InvalidSqrtPriceLimitX96()
+
+    @staticmethod
+    def _transfer_out(balance: int, value: int) -> int:
+        # TransferHelper.safeTransfer sends balance if value > balance
+        return balance - (value if value <= balance else balance)
+
+    def _initialize(self) -> State:
+        # reverts if not enough historical observations
+        oracle_tick_cumulatives_last = self._oracle_tick_cumulatives(
+            [self.seconds_ago, 0]
+        )
+
+        # use oracle price to initialize
+        sqrt_price_x96 = oracle_sqrt_price_x96(
+            oracle_tick_cumulative_delta(
+                oracle_tick_cumulatives_last[0], oracle_tick_cumulatives_last[1]
+            ),
+            self.seconds_ago,
+        )
+        return State(
+            sqrt_price_x96=sqrt_price_x96,
+            total_positions=0,
+            liquidity=0,
+            tick=get_tick_at_sqrt_ratio(sqrt_price_x96),
+            block_timestamp=self.block_timestamp % (1 << 32),
+            tick_cumulative=0,
+            fee_protocol=0,
+            initialized=True,
+        )
+
+    def open(
+        self,
+        recipient: str,
+        zero_for_one: bool,
+        liquidity_delta: int,
+        sqrt_price_limit_x96: int,
+        margin: int,
+        value: int,
+    ) -> Tuple[int, int, int, int, int]:
+        """Mirrors `MarginalV1Pool.open` with `value` as `msg.value`"""
+        state = self._state_synced()
+        if liquidity_delta == 0 or (
+            _add(liquidity_delta, MINIMUM_LIQUIDITY) > state.liquidity
+        ):
+            raise InvalidLiquidityDelta()
+        self._check_sqrt_price_limit_x96(state, zero_for_one, sqrt_price_limit_x96)
+
+        sqrt_price_x96_next = sqrt_price_x96_next_open(
+            state.liquidity,
+            state.sqrt_price_x96,
+            liquidity_delta,
+            zero_for_one,
+            self.maintenance,
+        )
+        if (
+            sqrt_price_x96_next < sqrt_price_limit_x96
+            if zero_for_one
+            else sqrt_price_x96_next > sqrt_price_limit_x96
+        ):
+            raise SqrtPriceX96ExceedsLimit()
+
+        # zero seconds ago for oracle tickCumulative
+        oracle_tick_cumulative = self._oracle_tick_cumulatives([0])[0]
+
+        position = Position.assemble(
+            state.liquidity,
+            state.sqrt_price_x96,
+            sqrt_price_x96_next,
+            liquidity_delta,
+            zero_for_one,
+            state.tick,
+            state.block_timestamp,
+            state.tick_cumulative,
+            oracle_tick_cumulative,
+        )
+        if (
+            position.size < MINIMUM_SIZE
+            or position.debt0 < MINIMUM_SIZE
+            or position.debt1 < MINIMUM_SIZE
+            or position.insurance0 < MINIMUM_SIZE
+            or position.insurance1 < MINIMUM_SIZE
+        ):
+            raise InvalidPosition()
+
+        margin_minimum = Position.margin_minimum(position, self.maintenance)
+        if margin_minimum == 0 or margin < margin_minimum:
+            raise MarginLessThanMin()
+        position.margin = margin
+
+        rewards_minimum = Position.liquidation_rewards(
+            self.block_base_fee,
+            self.block_base_fee_min,
+            self.gas_liquidate,
+            self.reward_premium,
+        )
+        if value < rewards_minimum:
+            raise RewardsLessThanMin()
+        position.rewards = value
+
+        state.liquidity -= liquidity_delta
+        state.sqrt_price_x96 = sqrt_price_x96_next
+
+        liquidity_locked = _add(self.liquidity_locked, liquidity_delta)
+        protocol_fees = self.protocol_fees.copy()
+        balance0 = self.balance0
+        balance1 = self.balance1
+
+        amount0 = 0
+        amount1 = 0
+        if not zero_for_one:
+            # long token0 (out) relative to token1 (in); margin in token0
+            fees0 = Position.fees(position.size, self.fee)
+            amount0 = margin + fees0
+            balance0 += amount0
+
+            # account for protocol fees if fee on
+            if state.fee_protocol > 0:
+                delta = fees0 // state.fee_protocol
+                fees0 -= delta
+                protocol_fees.token0 = _add(protocol_fees.token0, delta % (1 << 128))
+
+            # fees added to available liquidity
+            (state.liquidity, state.sqrt_price_x96) = liquidity_sqrt_price_x96_next(
+                state.liquidity, state.sqrt_price_x96, fees0, 0
+            )
+        else:
+            # long token1 (out) relative to token0 (in); margin in token1
+            fees1 = Position.fees(position.size, self.fee)
+            amount1 = margin + fees1
+            balance1 += amount1
+
+            # account for protocol fees if fee on
+            if state.fee_protocol > 0:
+                delta = fees1 // state.fee_protocol
+                fees1 -= delta
+                protocol_fees.token1 = _add(protocol_fees.token1, delta % (1 << 128))
+
+            # fees added to available liquidity
+            (state.liquidity, state.sqrt_price_x96) = liquidity_sqrt_price_x96_next(
+                state.liquidity, state.sqrt_price_x96, 0, fees1
+            )
+        state.tick = get_tick_at_sqrt_ratio(state.sqrt_price_x96)
+
+        id = state.total_positions
+        size = position.size
+        debt = position.debt0 if zero_for_one else position.debt1
+        state.total_positions = _add(state.total_positions, 1, MAX_UINT96)
+
+        # update pool state to latest
+        self.positions[(recipient, id)] = position
+        self.state = state
+        self.liquidity_locked = liquidity_locked
+        self.protocol_fees = protocol_fees
+        self.balance0 = balance0
+        self.balance1 = balance1
+        self.balance += value
+
+        return (id, size, debt, amount0, amount1)
+
+    def adjust(
+        self, sender: str, recipient: str, id: int, margin_delta: int
+    ) -> Tuple[int, int]:
+        """Mirrors `MarginalV1Pool.adjust` called by `sender`"""
+        state = self._state_synced()
+        position = self.get_position(sender, id)
+        if position.size == 0:
+            raise InvalidPosition()
+
+        # check min margin requirements accounting for position pnl
+        margin_minimum = Position.margin_minimum(
+            position, self.maintenance
+        )  # enforces max leverage
+
+        # oracle price averaged over seconds ago for min margin calc
+        oracle_tick_cumulatives_last = self._oracle_tick_cumulatives(
+            [self.seconds_ago, 0]
+        )
+
+        # update debts for funding but won't store to avoid frequent sync issues
+        position = Position.sync(
+            position,
+            state.block_timestamp,
+            state.tick_cumulative,
+            oracle_tick_cumulatives_last[1],  # zero seconds ago
+            self.tick_cumulative_rate_max,
+            self.funding_period,
+        )
+
+        oracle_tick = wrap_int(
+            div_trunc(
+                oracle_tick_cumulative_delta(
+                    oracle_tick_cumulatives_last[0], oracle_tick_cumulatives_last[1]
+                ),
+                self.seconds_ago,
+            ),
+            24,
+        )
+        safe_margin_minimum = Position.margin_minimum(
+            replace(position, tick=oracle_tick), self.maintenance
+        )  # won't store either
+        if safe_margin_minimum > margin_minimum:
+            margin_minimum = safe_margin_minimum
+
+        margin_after = position.margin + margin_delta
+        if margin_after < margin_minimum:
+            raise MarginLessThanMin()
+
+        # flash margin out then callback for margin in
+        margin0 = 0
+        margin1 = 0
+        balance0 = self.balance0
+        balance1 = self.balance1
+        if not position.zero_for_one:
+            margin0 = margin_after
+            balance0 = self._transfer_out(balance0, position.margin) + margin0
+        else:
+            margin1 = margin_after
+            balance1 = self._transfer_out(balance1, position.margin) + margin1
+
+        # reload position to avoid funding sync issues
+        self.positions[(sender, id)] = replace(
+            self.positions[(sender, id)], margin=to_uint128(margin_after)
+        )
+
+        # update pool state to latest
+        self.state = state
+        self.balance0 = balance0
+        self.balance1 = balance1
+
+        return (margin0, margin1)
+
+    def settle(self, sender: str, recipient: str, id: int) -> Tuple[int, int, int]:
+        """Mirrors `MarginalV1Pool.settle` called by `sender`"""
+        state = self._state_synced()
+        position = self.get_position(sender, id)
+        if position.size == 0:
+            raise InvalidPosition()
+
+        # zero seconds ago for oracle tickCumulative
+        oracle_tick_cumulative = self._oracle_tick_cumulatives([0])[0]
+
+        # update debts for funding
+        position = Position.sync(
+            position,
+            state.block_timestamp,
+            state.tick_cumulative,
+            oracle_tick_cumulative,
+            self.tick_cumulative_rate_max,
+            self.funding_period,
+        )
+
+        liquidity_locked = checked_sub(self.liquidity_locked, position.liquidity_locked)
+        (amount0_unlocked, amount1_unlocked) = Position.amounts_locked(position)
+
+        # flash size + margin + rewards out then callback for debt owed in
+        rewards = position.rewards
+        balance0 = self.balance0
+        balance1 = self.balance1
+        if not position.zero_for_one:
+            amount0 = -(position.size + position.margin)  # size + margin out
+            amount1 = position.debt1  # debt in
+
+            balance0 = self._transfer_out(balance0, -amount0)
+            (state.liquidity, state.sqrt_price_x96) = liquidity_sqrt_price_x96_next(
+                state.liquidity,
+                state.sqrt_price_x96,
+                amount0_unlocked
+                - position.size
+                - position.margin,  # insurance0 + debt0
+                amount1_unlocked + amount1,  # insurance1 + debt1
+            )
+            balance1 += amount1
+        else:
+            amount0 = position.debt0  # debt in
+            amount1 = -(position.size + position.margin)  # size + margin out
+
+            balance1 = self._transfer_out(balance1, -amount1)
+            (state.liquidity, state.sqrt_price_x96) = liquidity_sqrt_price_x96_next(
+                state.liquidity,
+                state.sqrt_price_x96,
+                amount0_unlocked + amount0,  # insurance0 + debt0
+                amount1_unlocked
+                - position.size
+                - position.margin,  # insurance1 + debt1
+            )
+            balance0 += amount0
+        state.tick = get_tick_at_sqrt_ratio(state.sqrt_price_x96)
+
+        # update pool state to latest
+        self.positions[(sender, id)] = Position.settle(position)
+        self.state = state
+        self.liquidity_locked = liquidity_locked
+        self.balance0 = balance0
+        self.balance1 = balance1
+        self.balance -= rewards
+
+        return (amount0, amount1, rewards)
+
+    def settle_many(
+        self, sender: str, recipient: str, ids: List[int]
+    ) -> Tuple[int, int, int]:
+        """Mirrors `MarginalV1Pool.settleMany` called by `sender`"""
+        if len(ids) == 0:
+            raise InvalidPositionsLength()
+        state = self._state_synced()
+
+        # zero seconds ago for oracle tickCumulative
+        oracle_tick_cumulative = self._oracle_tick_cumulatives([0])[0]
+
+        # insurance + debt returned to pool reserves summed over positions
+        reserve0_delta = 0
+        reserve1_delta = 0
+        liquidity_unlocked = 0
+
+        amount0 = 0
+        amount1 = 0
+        rewards = 0
+        positions = {}
+        for id in ids:
+            position = positions.get((sender, id), self.get_position(sender, id))
+            if position.size == 0:
+                raise InvalidPosition()
+
+            # update debts for funding
+            position = Position.sync(
+                position,
+                state.block_timestamp,
+                state.tick_cumulative,
+                oracle_tick_cumulative,
+                self.tick_cumulative_rate_max,
+                self.funding_period,
+            )
+
+            # size + margin out, debt in
+            amount_out = -(position.size + position.margin)
+            (position_amount0, position_amount1) = (
+                (position.debt0, amount_out)
+                if position.zero_for_one
+                else (amount_out, position.debt1)
+            )
+
+            (amount0_unlocked, amount1_unlocked) = Position.amounts_locked(position)
+            reserve0_delta += amount0_unlocked + position_amount0
+            reserve1_delta += amount1_unlocked + position_amount1
+            liquidity_unlocked = _add(liquidity_unlocked, position.liquidity_locked)
+
+            amount0 += position_amount0
+            amount1 += position_amount1
+            rewards += position.rewards
+
+            positions[(sender, id)] = Position.settle(position)
+
+        liquidity_locked = checked_sub(self.liquidity_locked, liquidity_unlocked)
+
+        # flash net size + margin + rewards out then callback for net debt owed in
+        balance0 = self.balance0
+        balance1 = self.balance1
+        if amount0 < 0:
+            balance0 = self._transfer_out(balance0, -amount0)
+        if amount1 < 0:
+            balance1 = self._transfer_out(balance1, -amount1)
+
+        (state.liquidity, state.sqrt_price_x96) = liquidity_sqrt_price_x96_next(
+            state.liquidity, state.sqrt_price_x96, reserve0_delta, reserve1_delta
+        )
+        state.tick = get_tick_at_sqrt_ratio(state.sqrt_price_x96)
+        if amount0 > 0:
+            balance0 += amount0
+        if amount1 > 0:
+            balance1 += amount1
+
+        # update pool state to latest
+        self.positions.update(positions)
+        self.state = state
+        self.liquidity_locked = liquidity_locked
+        self.balance0 = balance0
+        self.balance1 = balance1
+        self.balance -= rewards
+
+        return (amount0, amount1, rewards)
+
+    def liquidate(self, recipient: str, owner: str, id: int) -> int:
+        """Mirrors `MarginalV1Pool.liquidate`"""
+        state = self._state_synced()
+        position = self.get_position(owner, id)
+        if position.size == 0:
+            raise InvalidPosition()
+
+        (
+            oracle_tick_cumulative_last,
+            oracle_sqrt_price_x96_last,
+        ) = self._oracle_synced()
+
+        # update debts for funding
+        position = Position.sync(
+            position,
+            state.block_timestamp,
+            state.tick_cumulative,
+            oracle_tick_cumulative_last,
+            self.tick_cumulative_rate_max,
+            self.funding_period,
+        )
+        if Position.safe(position, oracle_sqrt_price_x96_last, self.maintenance):
+            raise PositionSafe()
+
+        liquidity_locked = checked_sub(self.liquidity_locked, position.liquidity_locked)
+        self._liquidate_position(state, position)
+
+        # update pool state to latest
+        self.positions[(owner, id)] = Position.liquidate(position)
+        self.state = state
+        self.liquidity_locked = liquidity_locked
+        self.balance -= position.rewards
+
+        return position.rewards
+
+    def liquidate_many(
+        self, recipient: str, owners: List[str], ids: List[int]
+    ) -> Tuple[int, int]:
+        """Mirrors `MarginalV1Pool.liquidateMany`"""
+        if len(owners) != len(ids):
+            raise InvalidPositionsLength()
+        state = self._state_synced()
+
+        # single oracle observation for all positions
+        (
+            oracle_tick_cumulative_last,
+            oracle_sqrt_price_x96_last,
+        ) = self._oracle_synced()
+
+        liquidity_locked = self.liquidity_locked
+        liquidated = {}
+        rewards = 0
+        for owner, id in zip(owners, ids):
+            position = liquidated.get((owner, id)) or self.get_position(owner, id)
+            if position.size == 0:
+                continue  # settled or liquidated
+
+            # update debts for funding
+            position = Position.sync(
+                position,
+                state.block_timestamp,
+                state.tick_cumulative,
+                oracle_tick_cumulative_last,
+                self.tick_cumulative_rate_max,
+                self.funding_period,
+            )
+            if Position.safe(position, oracle_sqrt_price_x96_last, self.maintenance):
+                continue
+
+            liquidity_locked = checked_sub(liquidity_locked, position.liquidity_locked)
+            self._liquidate_position(state, position)
+            liquidated[(owner, id)] = Position.liquidate(position)
+            rewards += position.rewards
+
+        # update pool state to latest
+        self.positions.update(liquidated)
+        if len(liquidated) > 0:
+            self.state = state
+        self.liquidity_locked = liquidity_locked
+        self.balance -= rewards
+
+        return (rewards, len(liquidated))
+
+    def _oracle_synced(self) -> Tuple[int, int]:
+        # oracle price averaged over seconds ago for liquidation calc
+        oracle_tick_cumulatives_last = self._oracle_tick_cumulatives(
+            [self.seconds_ago, 0]
+        )
+        return (
+            oracle_tick_cumulatives_last[1],  # zero seconds ago
+            oracle_sqrt_price_x96(
+                oracle_tick_cumulative_delta(
+                    oracle_tick_cumulatives_last[0], oracle_tick_cumulatives_last[1]
+                ),
+                self.seconds_ago,
+            ),
+        )
+
+    @staticmethod
+    def _liquidate_position(state: State, position: Position.Info):
+        # returns position liquidity to pool state in place
+        (amount0, amount1) = Position.amounts_locked(position)
+        (state.liquidity, state.sqrt_price_x96) = liquidity_sqrt_price_x96_next(
+            state.liquidity, state.sqrt_price_x96, amount0, amount1
+        )
+        state.tick = get_tick_at_sqrt_ratio(state.sqrt_price_x96)
+
+    def swap(
+        self,
+        recipient: str,
+        zero_for_one: bool,
+        amount_specified: int,
+        sqrt_price_limit_x96: int,
+    ) -> Tuple[int, int]:
+        """Mirrors `MarginalV1Pool.swap`"""
+        state = self._state_synced()
+        if amount_specified == 0:
+            raise InvalidAmountSpecified()
+        self._check_sqrt_price_limit_x96(state, zero_for_one, sqrt_price_limit_x96)
+
+        # add fees back in after swap calcs if exact input
+        exact_input = amount_specified > 0
+        amount_specified_less_fee = (
+            amount_specified - swap_fees(amount_specified, self.fee, False)
+            if exact_input
+            else amount_specified
+        )
+
+        sqrt_price_x96_next = sqrt_price_x96_next_swap(
+            state.liquidity,
+            state.sqrt_price_x96,
+            zero_for_one,
+            amount_specified_less_fee,
+        )
+        if (
+            sqrt_price_x96_next < sqrt_price_limit_x96
+            if zero_for_one
+            else sqrt_price_x96_next > sqrt_price_limit_x96
+        ):
+            raise SqrtPriceX96ExceedsLimit()
+
+        # amounts without fees
+        (amount0, amount1) = swap_amounts(
+            state.liquidity, state.sqrt_price_x96, sqrt_price_x96_next
+        )
+
+        protocol_fees = self.protocol_fees.copy()
+        balance0 = self.balance0
+        balance1 = self.balance1
+
+        # optimistic amount out with callback for amount in
+        if not zero_for_one:
+            amount0 = amount_specified if not exact_input else amount0
+            if amount0 < 0:
+                balance0 = self._transfer_out(balance0, -amount0)
+
+            fees1 = (
+                checked_sub(amount_specified, amount1 % (1 << 256))
+                if exact_input
+                else swap_fees(amount1 % (1 << 256), self.fee, True)
+            )
+            amount1 += fees1
+            if amount1 == 0:
+                raise Amount1LessThanMin()
+            balance1 += amount1
+
+            # account for protocol fees if fee on
+            delta = fees1 // state.fee_protocol if state.fee_protocol > 0 else 0
+            if delta > 0:
+                protocol_fees.token1 = _add(protocol_fees.token1, delta % (1 << 128))
+
+            # update state liquidity, sqrt price accounting for fee growth
+            (state.liquidity, state.sqrt_price_x96) = liquidity_sqrt_price_x96_next(
+                state.liquidity,
+                state.sqrt_price_x96,
+                amount0,
+                amount1 - delta,  # exclude protocol fees if any
+            )
+        else:
+            amount1 = amount_specified if not exact_input else amount1
+            if amount1 < 0:
+                balance1 = self._transfer_out(balance1, -amount1)
+
+            fees0 = (
+                checked_sub(amount_specified, amount0 % (1 << 256))
+                if exact_input
+                else swap_fees(amount0 % (1 << 256), self.fee, True)
+            )
+            amount0 += fees0
+            if amount0 == 0:
+                raise Amount0LessThanMin()
+            balance0 += amount0
+
+            # account for protocol fees if fee on
+            delta = fees0 // state.fee_protocol if state.fee_protocol > 0 else 0
+            if delta > 0:
+                protocol_fees.token0 = _add(protocol_fees.token0, delta % (1 << 128))
+
+            # update state liquidity, sqrt price accounting for fee growth
+            (state.liquidity, state.sqrt_price_x96) = liquidity_sqrt_price_x96_next(
+                state.liquidity,
+                state.sqrt_price_x96,
+                amount0 - delta,  # exclude protocol fees if any
+                amount1,
+            )
+        state.tick = get_tick_at_sqrt_ratio(state.sqrt_price_x96)
+
+        # update pool state to latest
+        self.state = state
+        self.protocol_fees = protocol_fees
+        self.balance0 = balance0
+        self.balance1 = balance1
+
+        return (amount0, amount1)
+
+    def mint(self, recipient: str, liquidity_delta: int) -> Tuple[int, int, int]:
+        """Mirrors `MarginalV1Pool.mint`"""
+        total_supply = self.total_supply
+
+        initializing = total_supply == 0
+        state = self._initialize() if initializing else self._state_synced()
+
+        liquidity_delta_minimum = MINIMUM_LIQUIDITY if initializing else 0
+        if liquidity_delta <= liquidity_delta_minimum:
+            raise InvalidLiquidityDelta()
+
+        (amount0, amount1) = to_amounts(liquidity_delta, state.sqrt_price_x96)
+        amount0 += 1  # rough round up on amounts in when add liquidity
+        amount1 += 1
+
+        # total liquidity is available liquidity if all locked liquidity was returned to pool
+        total_liquidity_after = _add(
+            _add(state.liquidity, self.liquidity_locked), liquidity_delta
+        )
+        shares = (
+            total_liquidity_after
+            if initializing
+            else mul_div(
+                total_supply, liquidity_delta, total_liquidity_after - liquidity_delta
+            )
+        )
+        state.liquidity = _add(state.liquidity, liquidity_delta)
+
+        if recipient == ZERO_ADDRESS:
+            raise Revert("ERC20: mint to the zero address")
+
+        # update pool state to latest
+        self.state = state
+        self.balance0 += amount0
+        self.balance1 += amount1
+
+        # lock min liquidity on initial mint to avoid stuck states with price
+        if initializing:
+            shares -= MINIMUM_LIQUIDITY
+            self._mint(self.address, MINIMUM_LIQUIDITY)
+
+        self._mint(recipient, shares)
+        return (shares, amount0, amount1)
+
+    def burn(self, sender: str, recipient: str, shares: int) -> Tuple[int, int, int]:
+        """Mirrors `MarginalV1Pool.burn` called by `sender`"""
+        state = self._state_synced()
+        total_supply = self.total_supply
+
+        # total liquidity is available liquidity if all locked liquidity were returned to pool
+        total_liquidity_before = _add(state.liquidity, self.liquidity_locked)
+        liquidity_delta = mul_div(total_liquidity_before, shares, total_supply) % (
+            1 << 128
+        )
+        if _add(liquidity_delta, MINIMUM_LIQUIDITY) > state.liquidity:
+            raise InvalidLiquidityDelta()
+
+        (amount0, amount1) = to_amounts(liquidity_delta, state.sqrt_price_x96)
+        state.liquidity -= liquidity_delta
+
+        if self.balance_of(sender) < shares:
+            raise Revert("ERC20: burn amount exceeds balance")
+
+        # update pool state to latest
+        self.state = state
+        if amount0 > 0:
+            self.balance0 = self._transfer_out(self.balance0, amount0)
+        if amount1 > 0:
+            self.balance1 = self._transfer_out(self.balance1, amount1)
+
+        self.balances[sender] -= shares
+        self.total_supply -= shares
+        return (liquidity_delta, amount0, amount1)
+
+    def transfer(self, sender: str, recipient: str, shares: int):
+        """Mirrors ERC20 `transfer` of LP shares"""
+        if self.balance_of(sender) < shares:
+            raise Revert("ERC20: transfer amount exceeds balance")
+        self.balances[sender] -= shares
+        self.balances[recipient] = self.balance_of(recipient) + shares
+
+    def _mint(self, account: str, amount: int):
+        self.total_supply += amount
+        self.balances[account] = self.balance_of(account) + amount
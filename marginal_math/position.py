@@ -0,0 +1,359 @@
+from dataclasses import dataclass, replace
+from typing import Tuple
+
+from eth_abi.packed import encode_packed
+from eth_utils import keccak
+
+from marginal_math.constants import (
+    MAINTENANCE_UNIT,
+    MAX_UINT128,
+    MAX_UINT256,
+    Q64,
+    Q96,
+    Q128,
+    Q192,
+)
+from marginal_math.errors import Panic
+from marginal_math.full_math import checked_sub, mul_div, to_uint128, wrap_int
+from marginal_math.oracle_library import (
+    oracle_sqrt_price_x96,
+    oracle_tick_cumulative_delta,
+)
+from marginal_math.tick_math import get_sqrt_ratio_at_tick
+
+
+@dataclass
+class Info:
+    """Mirrors `Position.Info`, with fields in struct order"""
+
+    size: int = 0
+    debt0: int = 0
+    debt1: int = 0
+    insurance0: int = 0
+    insurance1: int = 0
+    zero_for_one: bool = False
+    liquidated: bool = False
+    tick: int = 0
+    block_timestamp: int = 0
+    tick_cumulative_delta: int = 0
+    margin: int = 0
+    liquidity_locked: int = 0
+    rewards: int = 0
+
+    @classmethod
+    def from_struct(cls, struct) -> "Info":
+        """Builds from a decoded `Position.Info` struct, e.g. `pool.positions(key)`"""
+        return cls(
+            size=struct.size,
+            debt0=struct.debt0,
+            debt1=struct.debt1,
+            insurance0=struct.insurance0,
+            insurance1=struct.insurance1,
+            zero_for_one=struct.zeroForOne,
+            liquidated=struct.liquidated,
+            tick=struct.tick,
+            block_timestamp=struct.blockTimestamp,
+            tick_cumulative_delta=struct.tickCumulativeDelta,
+            margin=struct.margin,
+            liquidity_locked=struct.liquidityLocked,
+            rewards=struct.rewards,
+        )
+
+    def to_struct(self) -> tuple:
+        """Tuple in `Position.Info` field order for passing to contracts"""
+        return (
+            self.size,
+            self.debt0,
+            self.debt1,
+            self.insurance0,
+            self.insurance1,
+            self.zero_for_one,
+            self.liquidated,
+            self.tick,
+            self.block_timestamp,
+            self.tick_cumulative_delta,
+            self.margin,
+            self.liquidity_locked,
+            self.rewards,
+        )
+
+
+def get_position_key(address: str, id: int) -> bytes:
+    """Mirrors the `positions` mapping key in `Position.get`"""
+    return keccak(encode_packed(["address", "uint96"], [address, id]))
+
+
+def sync(
+    position: Info,
+    block_timestamp_last: int,
+    tick_cumulative_last: int,
+    oracle_tick_cumulative_last: int,
+    tick_cumulative_rate_max: int,
+    funding_period: int,
+) -> Info:
+    """Port of `Position.sync`
+
+    @dev Returns a synced copy rather than updating `position` in place
+    """
+    # early exit if nothing to update
+    if block_timestamp_last == position.block_timestamp:
+        return position
+
+    # oracle tick - marginal tick (bar{a}_t - a_t)
+    tick_cumulative_delta_last = oracle_tick_cumulative_delta(
+        tick_cumulative_last, oracle_tick_cumulative_last
+    )
+    (debt0, debt1) = debts_after_funding(
+        position,
+        block_timestamp_last,
+        tick_cumulative_delta_last,
+        tick_cumulative_rate_max,
+        funding_period,
+    )
+    return replace(
+        position,
+        debt0=debt0,
+        debt1=debt1,
+        block_timestamp=block_timestamp_last,
+        tick_cumulative_delta=tick_cumulative_delta_last,
+    )
+
+
+def liquidate(position: Info) -> Info:
+    """Port of `Position.liquidate`"""
+    return Info(
+        zero_for_one=position.zero_for_one,
+        liquidated=True,
+        tick=position.tick,
+        block_timestamp=position.block_timestamp,
+        tick_cumulative_delta=position.tick_cumulative_delta,
+    )
+
+
+def settle(position: Info) -> Info:
+    """Port of `Position.settle`"""
+    return Info(
+        zero_for_one=position.zero_for_one,
+        liquidated=position.liquidated,
+        tick=position.tick,
+        block_timestamp=position.block_timestamp,
+        tick_cumulative_delta=position.tick_cumulative_delta,
+    )
+
+
+def assemble(
+    liquidity: int,
+    sqrt_price_x96: int,
+    sqrt_price_x96_next: int,
+    liquidity_delta: int,
+    zero_for_one: bool,
+    tick: int,
+    block_timestamp_start: int,
+    tick_cumulative_start: int,
+    oracle_tick_cumulative_start: int,
+) -> Info:
+    """Port of `Position.assemble`"""
+    tick_cumulative_delta = oracle_tick_cumulative_start - tick_cumulative_start
+    if tick_cumulative_delta != wrap_int(tick_cumulative_delta, 56):
+        raise Panic(Panic.ARITHMETIC)
+
+    position_size = size(liquidity, sqrt_price_x96, sqrt_price_x96_next, zero_for_one)
+    (insurance0, insurance1) = insurances(
+        liquidity, sqrt_price_x96, sqrt_price_x96_next, liquidity_delta, zero_for_one
+    )
+    (debt0, debt1) = debts(sqrt_price_x96_next, liquidity_delta, insurance0, insurance1)
+    return Info(
+        size=position_size,
+        debt0=debt0,
+        debt1=debt1,
+        insurance0=insurance0,
+        insurance1=insurance1,
+        zero_for_one=zero_for_one,
+        tick=tick,
+        block_timestamp=block_timestamp_start,
+        tick_cumulative_delta=tick_cumulative_delta,
+        liquidity_locked=liquidity_delta,
+    )
+
+
+def size(
+    liquidity: int, sqrt_price_x96: int, sqrt_price_x96_next: int, zero_for_one: bool
+) -> int:
+    """Port of `Position.size`"""
+    if not zero_for_one:
+        # L / sqrt(P) - L / sqrt(P')
+        return to_uint128(
+            checked_sub(
+                (liquidity << 96) // sqrt_price_x96,
+                (liquidity << 96) // sqrt_price_x96_next,
+            )
+        )
+    else:
+        # L * sqrt(P) - L * sqrt(P')
+        return to_uint128(
+            mul_div(liquidity, checked_sub(sqrt_price_x96, sqrt_price_x96_next), Q96)
+        )
+
+
+def insurances(
+    liquidity: int,
+    sqrt_price_x96: int,
+    sqrt_price_x96_next: int,
+    liquidity_delta: int,
+    zero_for_one: bool,
+) -> Tuple[int, int]:
+    """Port of `Position.insurances`"""
+    liquidity_after = checked_sub(liquidity, liquidity_delta)
+    prod = (
+        mul_div(liquidity_after, sqrt_price_x96_next, sqrt_price_x96)
+        if not zero_for_one
+        else mul_div(liquidity_after, sqrt_price_x96, sqrt_price_x96_next)
+    )
+
+    diff = checked_sub(liquidity, prod)
+    insurance0 = to_uint128((diff << 96) // sqrt_price_x96)
+    insurance1 = to_uint128(mul_div(diff, sqrt_price_x96, Q96))
+    return (insurance0, insurance1)
+
+
+def debts(
+    sqrt_price_x96_next: int, liquidity_delta: int, insurance0: int, insurance1: int
+) -> Tuple[int, int]:
+    """Port of `Position.debts`"""
+    # ix + dx = del L / sqrt(P'); iy + dy = del L * sqrt(P')
+    debt0 = to_uint128(
+        checked_sub((liquidity_delta << 96) // sqrt_price_x96_next, insurance0)
+    )
+    debt1 = to_uint128(
+        checked_sub(mul_div(liquidity_delta, sqrt_price_x96_next, Q96), insurance1)
+    )
+    return (debt0, debt1)
+
+
+def fees(size: int, fee: int) -> int:
+    """Port of `Position.fees`"""
+    return (size * fee) // 1000000
+
+
+def liquidation_rewards(
+    block_base_fee: int, block_base_fee_min: int, gas: int, premium: int
+) -> int:
+    """Port of `Position.liquidationRewards`"""
+    base_fee = (
+        block_base_fee if block_base_fee > block_base_fee_min else block_base_fee_min
+    )
+    prod = base_fee * gas * premium
+    if prod > MAX_UINT256:
+        raise Panic(Panic.ARITHMETIC)
+    return prod // 1000000
+
+
+def margin_minimum(position: Info, maintenance: int) -> int:
+    """Port of `Position.marginMinimum`"""
+    sqrt_price_x96 = get_sqrt_ratio_at_tick(position.tick)  # price before open
+    if not position.zero_for_one:
+        # cx >= (1+M) * dy / P - sx
+        debt1_adjusted = (
+            position.debt1 * (MAINTENANCE_UNIT + maintenance)
+        ) // MAINTENANCE_UNIT
+        prod = (
+            mul_div(debt1_adjusted, Q192, sqrt_price_x96 * sqrt_price_x96)
+            if sqrt_price_x96 <= MAX_UINT128
+            else mul_div(
+                debt1_adjusted, Q128, mul_div(sqrt_price_x96, sqrt_price_x96, Q64)
+            )
+        )
+    else:
+        # cy >= (1+M) * dx * P - sy
+        debt0_adjusted = (
+            position.debt0 * (MAINTENANCE_UNIT + maintenance)
+        ) // MAINTENANCE_UNIT
+        prod = (
+            mul_div(debt0_adjusted, sqrt_price_x96 * sqrt_price_x96, Q192)
+            if sqrt_price_x96 <= MAX_UINT128
+            else mul_div(
+                debt0_adjusted, mul_div(sqrt_price_x96, sqrt_price_x96, Q64), Q128
+            )
+        )
+
+    # check necessary due to funding
+    return to_uint128(prod - position.size) if prod > position.size else 0
+
+
+def amounts_locked(position: Info) -> Tuple[int, int]:
+    """Port of `Position.amountsLocked`"""
+    if not position.zero_for_one:
+        amount0 = position.size + position.margin + position.debt0 + position.insurance0
+        amount1 = position.insurance1
+    else:
+        amount0 = position.insurance0
+        amount1 = position.size + position.margin + position.debt1 + position.insurance1
+    return (amount0, amount1)
+
+
+def debts_after_funding(
+    position: Info,
+    block_timestamp_last: int,
+    tick_cumulative_delta_last: int,
+    tick_cumulative_rate_max: int,
+    funding_period: int,
+) -> Tuple[int, int]:
+    """Port of `Position.debtsAfterFunding`"""
+    delta_max = wrap_int(
+        tick_cumulative_rate_max
+        * ((block_timestamp_last - position.block_timestamp) % (1 << 32)),
+        56,
+    )
+    if delta_max == -(2**55):
+        raise Panic(Panic.ARITHMETIC)  # checked negation below
+
+    if not position.zero_for_one:
+        # debt1Now = debt1Start * (P / bar{P}) ** (now - start) / fundingPeriod
+        # delta = (a_t - bar{a}_t) - (a_0 - bar{a}_0), clamped by funding rate bounds
+        delta = oracle_tick_cumulative_delta(
+            tick_cumulative_delta_last, position.tick_cumulative_delta
+        )
+        if delta > delta_max:
+            delta = delta_max
+        elif delta < -delta_max:
+            delta = -delta_max
+
+        numerator_x96 = oracle_sqrt_price_x96(delta, funding_period // 2)
+        debt0 = position.debt0
+        debt1 = to_uint128(mul_div(position.debt1, numerator_x96, Q96))
+    else:
+        # debt0Now = debt0Start * (bar{P} / P) ** (now - start) / fundingPeriod
+        # delta = (bar{a}_t - a_t) - (bar{a}_0 - a_0), clamped by funding rate bounds
+        delta = oracle_tick_cumulative_delta(
+            position.tick_cumulative_delta, tick_cumulative_delta_last
+        )
+        if delta > delta_max:
+            delta = delta_max
+        elif delta < -delta_max:
+            delta = -delta_max
+
+        numerator_x96 = oracle_sqrt_price_x96(delta, funding_period // 2)
+        debt0 = to_uint128(mul_div(position.debt0, numerator_x96, Q96))
+        debt1 = position.debt1
+    return (debt0, debt1)
+
+
+def safe(position: Info, sqrt_price_x96: int, maintenance: int) -> bool:
+    """Port of `Position.safe`"""
+    if not position.zero_for_one:
+        debt1_adjusted = (
+            position.debt1 * (MAINTENANCE_UNIT + maintenance)
+        ) // MAINTENANCE_UNIT
+        liquidity_collateral = mul_div(
+            position.margin + position.size, sqrt_price_x96, Q96
+        )
+        liquidity_debt = (debt1_adjusted << 96) // sqrt_price_x96
+    else:
+        debt0_adjusted = (
+            position.debt0 * (MAINTENANCE_UNIT + maintenance)
+        ) // MAINTENANCE_UNIT
+        liquidity_collateral = (
+            (position.margin + position.size) << 96
+        ) // sqrt_price_x96
+        liquidity_debt = mul_div(debt0_adjusted, sqrt_price_x96, Q96)
+    return liquidity_collateral >= liquidity_debt
@@ -0,0 +1,526 @@
+from dataclasses import dataclass
+from fractions import Fraction
+from math import isqrt
+from typing import Iterable, Optional
+
+import numpy as np
+
+from marginal_math import position as Position
+from marginal_math.constants import (
+    FEE,
+    FEE_UNIT,
+    MAINTENANCE_UNIT,
+    MAX_SQRT_RATIO,
+    MAX_UINT128,
+    MAX_UINT256,
+    MIN_SQRT_RATIO,
+    MINIMUM_LIQUIDITY,
+    MINIMUM_SIZE,
+    Q96,
+)
+from marginal_math.errors import (
+    Amount0LessThanMin,
+    Amount1LessThanMin,
+    InvalidAmountSpecified,
+    InvalidLiquidityDelta,
+    InvalidPosition,
+    InvalidSqrtPriceLimitX96,
+    MarginLessThanMin,
+    Revert,
+    SqrtPriceX96ExceedsLimit,
+)
+from marginal_math.full_math import checked_sub
+from marginal_math.liquidity_math import liquidity_sqrt_price_x96_next
+from marginal_math.pool import State
+from marginal_math.sqrt_price_math import (
+    sqrt_price_x96_next_open,
+    sqrt_price_x96_next_swap,
+)
+from marginal_math.swap_math import swap_amounts, swap_fees
+from marginal_math.tick_math import get_tick_at_sqrt_ratio
+
+
+@dataclass
+class OpenQuote:
+    """Outcome of `MarginalV1Pool.open` for a given `liquidity_delta`"""
+
+    liquidity_delta: int
+    sqrt_price_x96_next: int
+    size: int
+    debt: int  # debt0 if zero_for_one else debt1
+    fees: int  # in margin token, owed on top of margin
+    margin_minimum: int
+    position: Position.Info  # as assembled, before margin and rewards set
+
+
+def quote_open(
+    state: State,
+    maintenance: int,
+    zero_for_one: bool,
+    liquidity_delta: int,
+    fee: int = FEE,
+) -> OpenQuote:
+    """Quotes `MarginalV1Pool.open` for `liquidity_delta`, exact to the contract's rounding
+
+    @dev Raises the `Revert` open would for invalid liquidity delta or dust positions,
+    ignoring the sqrt price limit, margin and rewards checks
+    """
+    if liquidity_delta == 0 or liquidity_delta + MINIMUM_LIQUIDITY > state.liquidity:
+        raise InvalidLiquidityDelta()
+
+    sqrt_price_x96_next = sqrt_price_x96_next_open(
+        state.liquidity,
+        state.sqrt_price_x96,
+        liquidity_delta,
+        zero_for_one,
+        maintenance,
+    )
+    position = Position.assemble(
+        state.liquidity,
+        state.sqrt_price_x96,
+        sqrt_price_x96_next,
+        liquidity_delta,
+        zero_for_one,
+        state.tick,
+        state.block_timestamp,
+        0,
+        0,
+    )
+    if (
+        position.size < MINIMUM_SIZE
+        or position.debt0 < MINIMUM_SIZE
+        or position.debt1 < MINIMUM_SIZE
+        or position.insurance0 < MINIMUM_SIZE
+        or position.insurance1 < MINIMUM_SIZE
+    ):
+        raise InvalidPosition()
+
+    margin_minimum = Position.margin_minimum(position, maintenance)
+    if margin_minimum == 0:
+        raise MarginLessThanMin()
+
+    return OpenQuote(
+        liquidity_delta=liquidity_delta,
+        sqrt_price_x96_next=sqrt_price_x96_next,
+        size=position.size,
+        debt=position.debt0 if zero_for_one else position.debt1,
+        fees=Position.fees(position.size, fee),
+        margin_minimum=margin_minimum,
+        position=position,
+    )
+
+
+def _size(state: State, maintenance: int, zero_for_one: bool, liquidity_delta: int):
+    # position size for liquidity delta, or None if open would revert on sqrt price
+    try:
+        sqrt_price_x96_next = sqrt_price_x96_next_open(
+            state.liquidity,
+            state.sqrt_price_x96,
+            liquidity_delta,
+            zero_for_one,
+            maintenance,
+        )
+        return Position.size(
+            state.liquidity, state.sqrt_price_x96, sqrt_price_x96_next, zero_for_one
+        )
+    except Revert:
+        return None
+
+
+def _liquidity_delta_estimate(
+    state: State, maintenance: int, zero_for_one: bool, size: int
+) -> int:
+    # size = scale * (1 - 2 * (1 - x) / (1 + sqrt(1 - 4 * k * x * (1 - x)))) with x = del L / L
+    # and k = 1 / (1 + M) from `sqrtPriceX96NextOpen`, which inverts to
+    # 1 - x = (1 / t - k) / (1 / t**2 - k) with t = 1 - size / scale
+    scale = (
+        (state.liquidity * state.sqrt_price_x96) // Q96
+        if zero_for_one
+        else (state.liquidity * Q96) // state.sqrt_price_x96
+    )
+    if size >= scale:
+        return state.liquidity
+
+    k = MAINTENANCE_UNIT / (MAINTENANCE_UNIT + maintenance)
+    t = 1 - size / scale
+    u = (1 / t - k) / (1 / t**2 - k) if t < 1 else 1.0
+    return int((1 - u) * state.liquidity)
+
+
+def solve_open_liquidity_delta(
+    state: State, maintenance: int, zero_for_one: bool, size: int
+) -> int:
+    """Least liquidity delta for which `open` gives a position of at least `size`
+
+    @dev Inverts `sqrtPriceX96NextOpen` and `Position.size` in closed form, then corrects
+    the float estimate by galloping and bisecting on the exact integer size. Deltas are
+    bounded by the largest for which the next sqrt price stays within tick math bounds
+    """
+    lo = 1
+    hi = state.liquidity - MINIMUM_LIQUIDITY
+    if hi < lo or _size(state, maintenance, zero_for_one, lo) is None:
+        raise InvalidLiquidityDelta()
+
+    # largest liquidity delta open doesn't revert for, as sqrt price next moves
+    # monotonically with liquidity delta
+    if _size(state, maintenance, zero_for_one, hi) is None:
+        (lower, upper) = (lo, hi)
+        while upper - lower > 1:
+            mid = (lower + upper) // 2
+            if _size(state, maintenance, zero_for_one, mid) is None:
+                upper = mid
+            else:
+                lower = mid
+        hi = lower
+
+    def reached(liquidity_delta: int) -> bool:
+        return _size(state, maintenance, zero_for_one, liquidity_delta) >= size
+
+    if not reached(hi):
+        raise InvalidLiquidityDelta()
+
+    estimate = _liquidity_delta_estimate(state, maintenance, zero_for_one, size)
+    estimate = min(max(estimate, lo), hi)
+    step = max(estimate >> 40, 1)
+    if reached(estimate):
+        upper = estimate
+        lower = estimate - step
+        while lower >= lo and reached(lower):
+            upper = lower
+            step <<= 1
+            lower = upper - step
+        lower = max(lower, lo - 1)
+    else:
+        lower = estimate
+        upper = estimate + step
+        while upper < hi and not reached(upper):
+            lower = upper
+            step <<= 1
+            upper = lower + step
+        upper = min(upper, hi)
+
+    # reached(lower) is False (or lower == lo - 1), reached(upper) is True
+    while upper - lower > 1:
+        mid = (lower + upper) // 2
+        if reached(mid):
+            upper = mid
+        else:
+            lower = mid
+    return upper
+
+
+def quote_open_by_size(
+    state: State, maintenance: int, zero_for_one: bool, size: int, fee: int = FEE
+) -> OpenQuote:
+    """Quotes the least liquidity delta `open` for a position of at least `size`"""
+    liquidity_delta = solve_open_liquidity_delta(state, maintenance, zero_for_one, size)
+    return quote_open(state, maintenance, zero_for_one, liquidity_delta, fee)
+
+
+def quote_open_by_margin(
+    state: State,
+    maintenance: int,
+    zero_for_one: bool,
+    margin: int,
+    leverage,
+    fee: int = FEE,
+) -> OpenQuote:
+    """Quotes `open` for `margin` at `leverage` = (size + margin) / margin
+
+    @dev Raises `MarginLessThanMin` if leverage exceeds the max allowed by `maintenance`
+    """
+    size = int(Fraction(leverage) * margin) - margin
+    quote = quote_open_by_size(state, maintenance, zero_for_one, size, fee)
+    if margin < quote.margin_minimum:
+        raise MarginLessThanMin()
+    return quote
+
+
+@dataclass
+class SwapQuote:
+    """Outcome of `MarginalV1Pool.swap` for a given `amount_specified`"""
+
+    amount0: int  # > 0 is amount in, < 0 is amount out, fees included
+    amount1: int
+    fees: int  # in token in, including protocol fees
+    protocol_fees: int  # in token in
+    sqrt_price_x96_next: int  # from swap amounts before fees reinvested
+    liquidity_after: int
+    sqrt_price_x96_after: int
+    tick_after: int
+
+
+def _sqrt_price_limit_x96(zero_for_one: bool, sqrt_price_limit_x96: Optional[int]):
+    if sqrt_price_limit_x96 is not None:
+        return sqrt_price_limit_x96
+    return MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+
+def quote_swap(
+    state: State,
+    zero_for_one: bool,
+    amount_specified: int,
+    sqrt_price_limit_x96: Optional[int] = None,
+    fee: int = FEE,
+) -> SwapQuote:
+    """Quotes `MarginalV1Pool.swap` for `amount_specified`, exact to the contract's rounding
+
+    @dev Raises the `Revert` swap would, ignoring token balance and protocol fee overflow
+    checks. Sqrt price limit defaults to no limit
+    """
+    if amount_specified == 0:
+        raise InvalidAmountSpecified()
+
+    sqrt_price_limit_x96 = _sqrt_price_limit_x96(zero_for_one, sqrt_price_limit_x96)
+    if (
+        not (
+            sqrt_price_limit_x96 < state.sqrt_price_x96
+            and sqrt_price_limit_x96 > MIN_SQRT_RATIO
+        )
+        if zero_for_one
+        else not (
+            sqrt_price_limit_x96 > state.sqrt_price_x96
+            and sqrt_price_limit_x96 < MAX_SQRT_RATIO
+        )
+    ):
+        raise InvalidSqrtPriceLimitX96()
+
+    # add fees back in after swap calcs if exact input
+    exact_input = amount_specified > 0
+    amount_specified_less_fee = (
+        amount_specified - swap_fees(amount_specified, fee, False)
+        if exact_input
+        else amount_specified
+    )
+
+    sqrt_price_x96_next = sqrt_price_x96_next_swap(
+        state.liquidity,
+        state.sqrt_price_x96,
+        zero_for_one,
+        amount_specified_less_fee,
+    )
+    if (
+        sqrt_price_x96_next < sqrt_price_limit_x96
+        if zero_for_one
+        else sqrt_price_x96_next > sqrt_price_limit_x96
+    ):
+        raise SqrtPriceX96ExceedsLimit()
+
+    # amounts without fees
+    (amount0, amount1) = swap_amounts(
+        state.liquidity, state.sqrt_price_x96, sqrt_price_x96_next
+    )
+
+    # amount specified overrides calculated amount to avoid rounding issues
+    if not zero_for_one:
+        amount0 = amount_specified if not exact_input else amount0
+        fees = (
+            checked_sub(amount_specified, amount1 % (1 << 256))
+            if exact_input
+            else swap_fees(amount1 % (1 << 256), fee, True)
+        )
+        amount1 += fees
+        if amount1 == 0:
+            raise Amount1LessThanMin()
+    else:
+        amount1 = amount_specified if not exact_input else amount1
+        fees = (
+            checked_sub(amount_specified, amount0 % (1 << 256))
+            if exact_input
+            else swap_fees(amount0 % (1 << 256), fee, True)
+        )
+        amount0 += fees
+        if amount0 == 0:
+            raise Amount0LessThanMin()
+
+    # reinvest fees less protocol fees in pool liquidity
+    delta = fees // state.fee_protocol if state.fee_protocol > 0 else 0
+    (liquidity_after, sqrt_price_x96_after) = liquidity_sqrt_price_x96_next(
+        state.liquidity,
+        state.sqrt_price_x96,
+        amount0 - delta if zero_for_one else amount0,
+        amount1 if zero_for_one else amount1 - delta,
+    )
+
+    return SwapQuote(
+        amount0=amount0,
+        amount1=amount1,
+        fees=fees,
+        protocol_fees=delta,
+        sqrt_price_x96_next=sqrt_price_x96_next,
+        liquidity_after=liquidity_after,
+        sqrt_price_x96_after=sqrt_price_x96_after,
+        tick_after=get_tick_at_sqrt_ratio(sqrt_price_x96_after),
+    )
+
+
+@dataclass
+class SwapQuotes:
+    """Column storage of `SwapQuote` fields over a grid of amounts specified
+
+    Integer columns are object dtype so values stay exact. Rows where `swap` would revert
+    have `valid` False and zeros elsewhere.
+    """
+
+    amount_specified: np.ndarray
+    valid: np.ndarray
+    amount0: np.ndarray
+    amount1: np.ndarray
+    fees: np.ndarray
+    protocol_fees: np.ndarray
+    sqrt_price_x96_next: np.ndarray
+    liquidity_after: np.ndarray
+    sqrt_price_x96_after: np.ndarray
+    tick_after: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def __getitem__(self, i: int) -> Optional[SwapQuote]:
+        if not self.valid[i]:
+            return None
+        return SwapQuote(
+            amount0=self.amount0[i],
+            amount1=self.amount1[i],
+            fees=self.fees[i],
+            protocol_fees=self.protocol_fees[i],
+            sqrt_price_x96_next=self.sqrt_price_x96_next[i],
+            liquidity_after=self.liquidity_after[i],
+            sqrt_price_x96_after=self.sqrt_price_x96_after[i],
+            tick_after=self.tick_after[i],
+        )
+
+
+_isqrt = np.frompyfunc(isqrt, 1, 1)
+_get_tick_at_sqrt_ratio = np.frompyfunc(get_tick_at_sqrt_ratio, 1, 1)
+
+
+def _safe(valid: np.ndarray, values: np.ndarray, default: int) -> np.ndarray:
+    # replaces values on reverted rows so later elementwise ops stay defined
+    return np.where(valid, values, default)
+
+
+def quote_swaps(
+    state: State,
+    zero_for_one: bool,
+    amounts_specified: Iterable[int],
+    sqrt_price_limit_x96: Optional[int] = None,
+    fee: int = FEE,
+) -> SwapQuotes:
+    """Batched `quote_swap` over a grid of amounts specified in one vectorized pass
+
+    @dev Elementwise Python int ops on object arrays, identical to `quote_swap` on valid rows.
+    Amounts may mix exact input (> 0) and exact output (< 0)
+    """
+    liquidity = state.liquidity
+    sqrt_price_x96 = state.sqrt_price_x96
+    (reserve0, reserve1) = (
+        (liquidity << 96) // sqrt_price_x96,
+        (liquidity * sqrt_price_x96) >> 96,
+    )
+
+    amount_specified = np.asarray(list(amounts_specified), dtype=object)
+    n = len(amount_specified)
+    zeros = np.zeros(n, dtype=object)
+
+    sqrt_price_limit_x96 = _sqrt_price_limit_x96(zero_for_one, sqrt_price_limit_x96)
+    if (
+        not (
+            sqrt_price_limit_x96 < sqrt_price_x96
+            and sqrt_price_limit_x96 > MIN_SQRT_RATIO
+        )
+        if zero_for_one
+        else not (
+            sqrt_price_limit_x96 > sqrt_price_x96
+            and sqrt_price_limit_x96 < MAX_SQRT_RATIO
+        )
+    ):
+        valid = np.zeros(n, dtype=bool)
+    else:
+        valid = (amount_specified != 0).astype(bool)
+
+    exact_input = (amount_specified > 0).astype(bool)
+    amount_in = np.where(exact_input, amount_specified, 0)
+    amount_out = np.where(exact_input, 0, -amount_specified)
+
+    # add fees back in after swap calcs if exact input
+    valid &= (amount_in * fee <= MAX_UINT256).astype(bool)
+    amount_in_less_fee = amount_in - (amount_in * fee) // FEE_UNIT
+
+    # sqrt price next from `sqrtPriceX96NextSwap`
+    if not zero_for_one:
+        prod_in = (amount_in_less_fee * Q96) // liquidity
+        valid &= (amount_out < reserve0).astype(bool)
+        prod_out = (amount_out * sqrt_price_x96) // _safe(
+            valid, reserve0 - amount_out, 1
+        )
+        sqrt_price_x96_next = sqrt_price_x96 + np.where(exact_input, prod_in, prod_out)
+        valid &= (sqrt_price_x96_next <= sqrt_price_limit_x96).astype(bool)
+    else:
+        prod_in = (amount_in_less_fee * sqrt_price_x96) // _safe(
+            valid & exact_input, reserve0 + amount_in_less_fee, 1
+        )
+        valid &= (amount_out < reserve1).astype(bool)
+        prod_out = (amount_out * Q96) // liquidity
+        sqrt_price_x96_next = sqrt_price_x96 - np.where(exact_input, prod_in, prod_out)
+        valid &= (sqrt_price_x96_next >= sqrt_price_limit_x96).astype(bool)
+    sqrt_price_x96_next = _safe(valid, sqrt_price_x96_next, sqrt_price_x96)
+
+    # amounts without fees from `SwapMath.swapAmounts`
+    amount0 = (liquidity << 96) // sqrt_price_x96_next - reserve0
+    amount1 = (
+        -((liquidity * (sqrt_price_x96 - sqrt_price_x96_next)) // Q96)
+        if zero_for_one
+        else (liquidity * (sqrt_price_x96_next - sqrt_price_x96)) // Q96
+    )
+
+    # amount specified overrides calculated amount to avoid rounding issues
+    if not zero_for_one:
+        amount0 = np.where(exact_input, amount0, amount_specified)
+        amount_fee = amount1 % (1 << 256)
+        valid &= (~exact_input | (amount_fee <= amount_in)).astype(bool)
+        fees = np.where(
+            exact_input, amount_in - amount_fee, (amount_fee * fee) // (FEE_UNIT - fee)
+        )
+        amount1 = amount1 + fees
+        valid &= (amount1 != 0).astype(bool)
+    else:
+        amount1 = np.where(exact_input, amount1, amount_specified)
+        amount_fee = amount0 % (1 << 256)
+        valid &= (~exact_input | (amount_fee <= amount_in)).astype(bool)
+        fees = np.where(
+            exact_input, amount_in - amount_fee, (amount_fee * fee) // (FEE_UNIT - fee)
+        )
+        amount0 = amount0 + fees
+        valid &= (amount0 != 0).astype(bool)
+
+    # reinvest fees less protocol fees in pool liquidity via `liquiditySqrtPriceX96Next`
+    delta = fees // state.fee_protocol if state.fee_protocol > 0 else zeros
+    reserve0_next = reserve0 + (amount0 - delta if zero_for_one else amount0)
+    reserve1_next = reserve1 + (amount1 if zero_for_one else amount1 - delta)
+    valid &= ((reserve0_next > 0) & (reserve1_next > 0)).astype(bool)
+
+    prod = _safe(valid, reserve0_next * reserve1_next, 0)
+    valid &= (prod <= MAX_UINT256).astype(bool)
+    liquidity_after = _isqrt(prod)
+    valid &= (liquidity_after <= MAX_UINT128).astype(bool)
+
+    sqrt_price_x96_after = (liquidity_after << 96) // _safe(valid, reserve0_next, 1)
+    valid &= (
+        (sqrt_price_x96_after >= MIN_SQRT_RATIO)
+        & (sqrt_price_x96_after < MAX_SQRT_RATIO)
+    ).astype(bool)
+    sqrt_price_x96_after = _safe(valid, sqrt_price_x96_after, MIN_SQRT_RATIO)
+
+    return SwapQuotes(
+        amount_specified=amount_specified,
+        valid=valid,
+        amount0=_safe(valid, amount0, 0),
+        amount1=_safe(valid, amount1, 0),
+        fees=_safe(valid, fees, 0),
+        protocol_fees=_safe(valid, delta, 0),
+        sqrt_price_x96_next=_safe(valid, sqrt_price_x96_next, 0),
+        liquidity_after=_safe(valid, liquidity_after, 0),
+        sqrt_price_x96_after=_safe(valid, sqrt_price_x96_after, 0),
+        tick_after=_safe(valid, _get_tick_at_sqrt_ratio(sqrt_price_x96_after), 0),
+    )
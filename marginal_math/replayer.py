@@ -0,0 +1,433 @@
+import json
+import sqlite3
+import zlib
+
+from dataclasses import asdict, dataclass, field
+from itertools import groupby
+from typing import Callable, Dict, Iterable, List, Optional
+
+from marginal_math.full_math import wrap_int
+from marginal_math.indexer import (
+    EVENT_NAMES as POSITION_EVENT_NAMES,
+    Key,
+    PositionLog,
+    _decode,
+    _encode,
+    fold,
+)
+from marginal_math.pool import State
+from marginal_math.position import Info, get_position_key
+from marginal_math.tick_math import get_tick_at_sqrt_ratio
+
+# @dev every pool event writes synced state. Open, Settle and Liquidate log the price and
+# liquidity after. Only Open needs a `positions()` read, as settled and liquidated
+# positions have zero size and are dropped from snapshots without one
+EVENT_NAMES = ("Initialize", "Mint", "Burn", "Swap") + POSITION_EVENT_NAMES
+AFTER_EVENT_NAMES = ("Open", "Settle", "Liquidate")
+READ_EVENT_NAMES = ("Open",)
+
+
+@dataclass(frozen=True)
+class PoolLog:
+    """Fields of a decoded pool log needed to replay state, with its block timestamp"""
+
+    event_name: str
+    block_number: int
+    log_index: int
+    block_timestamp: int
+    owner: str = ""
+    id: int = 0
+    sqrt_price_x96: int = 0  # after for Open, Settle and Liquidate
+    liquidity: int = 0  # after for Open, Settle and Liquidate, delta for Mint and Burn
+    tick: int = 0
+    margin_after: int = 0
+
+    @classmethod
+    def from_log(cls, log, block_timestamp: int) -> "PoolLog":
+        name = log.event_name
+        fields = {}
+        if name in POSITION_EVENT_NAMES:
+            fields.update(owner=log.owner, id=int(log.id))
+        if name in ("Initialize", "Swap"):
+            fields.update(sqrt_price_x96=int(log.sqrtPriceX96), tick=int(log.tick))
+        if name == "Swap":
+            fields.update(liquidity=int(log.liquidity))
+        elif name in AFTER_EVENT_NAMES:
+            fields.update(
+                sqrt_price_x96=int(log.sqrtPriceX96After),
+                liquidity=int(log.liquidityAfter),
+            )
+        elif name in ("Mint", "Burn"):
+            fields.update(liquidity=int(log.liquidityDelta))
+        elif name == "Adjust":
+            fields.update(margin_after=int(log.marginAfter))
+        return cls(
+            event_name=name,
+            block_number=log.block_number,
+            log_index=log.log_index,
+            block_timestamp=block_timestamp,
+            **fields,
+        )
+
+    def to_position_log(self) -> PositionLog:
+        return PositionLog(
+            event_name=self.event_name,
+            owner=self.owner,
+            id=self.id,
+            block_number=self.block_number,
+            log_index=self.log_index,
+            margin_after=self.margin_after,
+        )
+
+
+@dataclass
+class PoolSnapshot:
+    """Pool `state`, `liquidityLocked` and open positions as of the end of `block_number`
+
+    @dev Settled and liquidated positions are dropped from `positions`
+    """
+
+    block_number: int
+    state: State = field(default_factory=State)
+    liquidity_locked: int = 0
+    positions: Dict[Key, Info] = field(default_factory=dict)
+
+    def copy(self) -> "PoolSnapshot":
+        return PoolSnapshot(
+            self.block_number,
+            self.state.copy(),
+            self.liquidity_locked,
+            dict(self.positions),
+        )
+
+    def encode(self) -> bytes:
+        return zlib.compress(
+            json.dumps(
+                {
+                    "state": _encode(self.state),
+                    "liquidity_locked": self.liquidity_locked,
+                    "positions": [
+                        [owner, id, _encode(info)]
+                        for (owner, id), info in self.positions.items()
+                    ],
+                },
+                separators=(",", ":"),
+            ).encode()
+        )
+
+    @classmethod
+    def decode(cls, block_number: int, data: bytes) -> "PoolSnapshot":
+        data = json.loads(zlib.decompress(data))
+        state = State(*map(int, data["state"].split(",")))
+        state.initialized = bool(state.initialized)
+        return cls(
+            block_number,
+            state,
+            data["liquidity_locked"],
+            {(owner, id): _decode(info) for (owner, id, info) in data["positions"]},
+        )
+
+
+def _apply(state: State, log: PoolLog) -> State:
+    # mirrors the state written by the pool function emitting `log`, updated in place
+    # except on Initialize
+    if log.event_name == "Initialize":
+        return State(
+            sqrt_price_x96=log.sqrt_price_x96,
+            tick=log.tick,
+            block_timestamp=log.block_timestamp % (1 << 32),
+            initialized=True,
+        )
+
+    # stateSynced
+    delta = (log.block_timestamp - state.block_timestamp) % (1 << 32)
+    if delta > 0:
+        state.tick_cumulative = wrap_int(
+            state.tick_cumulative + state.tick * delta, 56
+        )  # overflow desired
+        state.block_timestamp = log.block_timestamp % (1 << 32)
+
+    if log.event_name == "Mint":
+        state.liquidity += log.liquidity
+    elif log.event_name == "Burn":
+        state.liquidity -= log.liquidity
+    elif log.event_name == "Swap":
+        state.sqrt_price_x96 = log.sqrt_price_x96
+        state.liquidity = log.liquidity
+        state.tick = log.tick
+    elif log.event_name in AFTER_EVENT_NAMES:
+        state.sqrt_price_x96 = log.sqrt_price_x96
+        state.liquidity = log.liquidity
+        state.tick = get_tick_at_sqrt_ratio(log.sqrt_price_x96)
+        if log.event_name == "Open":
+            state.total_positions += 1
+    return state
+
+
+def replay(
+    snapshot: PoolSnapshot,
+    logs: Iterable[PoolLog],
+    read: Callable[[Key, int], Info],
+    block_number: int,
+) -> PoolSnapshot:
+    """Replays logs after `snapshot` up to `block_number`, returning a new snapshot
+
+    @dev Positions are folded block by block with `indexer.fold`, reading keys opened at
+    the end of their block and settling or liquidating the rest in place
+    """
+    snapshot = snapshot.copy()
+    logs = sorted(
+        (
+            log
+            for log in logs
+            if snapshot.block_number < log.block_number <= block_number
+        ),
+        key=lambda log: (log.block_number, log.log_index),
+    )
+    for log_block_number, block_logs in groupby(logs, key=lambda log: log.block_number):
+        position_logs = []
+        for log in block_logs:
+            snapshot.state = _apply(snapshot.state, log)
+            if log.event_name in POSITION_EVENT_NAMES:
+                position_logs.append(log.to_position_log())
+        if len(position_logs) == 0:
+            continue
+
+        # liquidity locked by touched positions before the block, to net against after
+        liquidity_locked = {
+            (log.owner, log.id): snapshot.positions.get(
+                (log.owner, log.id), Info()
+            ).liquidity_locked
+            for log in position_logs
+        }
+        changed = fold(
+            snapshot.positions, position_logs, read, log_block_number, READ_EVENT_NAMES
+        )
+        for key, position in changed.items():
+            snapshot.liquidity_locked += (
+                position.liquidity_locked - liquidity_locked[key]
+            )
+            if position.size == 0:
+                del snapshot.positions[key]
+
+    snapshot.block_number = block_number
+    return snapshot
+
+
+class PoolHistoryStore:
+    """SQLite store of pool logs, position reads and periodic snapshots
+
+    @dev Snapshots are zlib compressed JSON of state and open positions. Position fields
+    are kept as comma separated ints as in `PositionStore`
+    """
+
+    def __init__(self, path: str, pool_address: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                pool TEXT NOT NULL,
+                block_number INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS logs (
+                block_number INTEGER NOT NULL,
+                log_index INTEGER NOT NULL,
+                log TEXT NOT NULL,
+                PRIMARY KEY (block_number, log_index)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS reads (
+                owner TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                block_number INTEGER NOT NULL,
+                info TEXT NOT NULL,
+                PRIMARY KEY (owner, id, block_number)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS snapshots (
+                block_number INTEGER PRIMARY KEY,
+                data BLOB NOT NULL
+            );
+            """
+        )
+
+        row = self.connection.execute("SELECT pool FROM meta").fetchone()
+        if row is None:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO meta (pool) VALUES (?)", (pool_address,)
+                )
+        elif row[0] != pool_address:
+            raise ValueError(f"Store at {path} replays pool {row[0]}")
+
+    def block_number(self) -> Optional[int]:
+        """Last block replayed through"""
+        return self.connection.execute("SELECT block_number FROM meta").fetchone()[0]
+
+    def logs(self, start: int, stop: int) -> List[PoolLog]:
+        return [
+            PoolLog(**json.loads(log))
+            for (log,) in self.connection.execute(
+                "SELECT log FROM logs WHERE block_number BETWEEN ? AND ? "
+                + "ORDER BY block_number, log_index",
+                (start, stop),
+            )
+        ]
+
+    def read(self, key: Key, block_number: int) -> Info:
+        row = self.connection.execute(
+            "SELECT info FROM reads WHERE owner = ? AND id = ? AND block_number = ?",
+            (key[0], key[1], block_number),
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No read of position {key} at block {block_number}")
+        return _decode(row[0])
+
+    def snapshot(self, block_number: int) -> Optional[PoolSnapshot]:
+        """Latest snapshot at or before `block_number`"""
+        row = self.connection.execute(
+            "SELECT block_number, data FROM snapshots WHERE block_number <= ? "
+            + "ORDER BY block_number DESC LIMIT 1",
+            (block_number,),
+        ).fetchone()
+        return PoolSnapshot.decode(*row) if row is not None else None
+
+    def commit(
+        self,
+        block_number: int,
+        logs: Iterable[PoolLog],
+        reads: Dict[tuple, Info],
+        snapshots: Iterable[PoolSnapshot],
+    ):
+        """Writes logs, reads keyed by (owner, id, block number) and snapshots atomically"""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO logs (block_number, log_index, log) "
+                + "VALUES (?, ?, ?)",
+                [
+                    (
+                        log.block_number,
+                        log.log_index,
+                        json.dumps(asdict(log), separators=(",", ":")),
+                    )
+                    for log in logs
+                ],
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO reads (owner, id, block_number, info) "
+                + "VALUES (?, ?, ?, ?)",
+                [
+                    (owner, id, read_block_number, _encode(info))
+                    for (owner, id, read_block_number), info in reads.items()
+                ],
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO snapshots (block_number, data) VALUES (?, ?)",
+                [(snapshot.block_number, snapshot.encode()) for snapshot in snapshots],
+            )
+            self.connection.execute("UPDATE meta SET block_number = ?", (block_number,))
+
+    def close(self):
+        self.connection.close()
+
+
+class PoolReplayer:
+    """Historical pool state from replaying logs on top of periodic snapshots
+
+    `sync` stores finalized pool logs with the position reads they need, writing a
+    snapshot every `snapshot_interval` blocks. `at` then loads the latest snapshot at or
+    before a block and replays at most `snapshot_interval` blocks of stored logs, so no
+    archive node calls are needed to seek.
+
+    `sync` reads `positions()` at the block of each `Open`, so the node must serve state
+    that far back. Syncing within the node's recent state window works on a full node,
+    while syncing history from `start_block` needs an archive node.
+    """
+
+    def __init__(
+        self,
+        pool,
+        chain,
+        store: PoolHistoryStore,
+        snapshot_interval: int = 1000,
+        confirmations: int = 64,
+        chunk_size: int = 2000,
+        start_block: int = 0,
+    ):
+        self.pool = pool
+        self.chain = chain
+        self.store = store
+        self.snapshot_interval = snapshot_interval
+        self.confirmations = confirmations
+        self.chunk_size = chunk_size
+
+        block_number = store.block_number()
+        self.start_block = block_number + 1 if block_number is not None else start_block
+        self.head = (
+            self.at(block_number)
+            if block_number is not None
+            else PoolSnapshot(start_block - 1)
+        )
+
+    def at(self, block_number: int) -> PoolSnapshot:
+        """Pool state, liquidity locked and open positions as of the end of `block_number`"""
+        if block_number >= self.start_block:
+            raise ValueError(f"Block {block_number} not replayed yet")
+        snapshot = self.store.snapshot(block_number) or PoolSnapshot(-1)
+        return replay(
+            snapshot,
+            self.store.logs(snapshot.block_number + 1, block_number),
+            self.store.read,
+            block_number,
+        )
+
+    def extend(self, logs: List[PoolLog], reads: Dict[tuple, Info], block_number: int):
+        """Replays logs through `block_number` from the head, storing them with snapshots
+
+        @param reads Positions opened keyed by (owner, id, block number), as read at the
+        end of that block
+        """
+
+        def read(key: Key, read_block_number: int) -> Info:
+            return reads[(*key, read_block_number)]
+
+        snapshots = []
+        first = -(-self.start_block // self.snapshot_interval) * self.snapshot_interval
+        for snapshot_block in range(first, block_number + 1, self.snapshot_interval):
+            self.head = replay(self.head, logs, read, snapshot_block)
+            snapshots.append(self.head)
+        self.head = replay(self.head, logs, read, block_number)
+
+        self.store.commit(block_number, logs, reads, snapshots)
+        self.start_block = block_number + 1
+
+    def _logs(self, start: int, stop: int) -> List[PoolLog]:
+        timestamps = {}
+        logs = []
+        for event_name in EVENT_NAMES:
+            for log in getattr(self.pool, event_name).range(start, stop + 1):
+                if log.block_number not in timestamps:
+                    timestamps[log.block_number] = self.chain.blocks[
+                        log.block_number
+                    ].timestamp
+                logs.append(PoolLog.from_log(log, timestamps[log.block_number]))
+        return logs
+
+    def _reads(self, logs: List[PoolLog]) -> Dict[tuple, Info]:
+        return {
+            (log.owner, log.id, log.block_number): Info.from_struct(
+                self.pool.positions(
+                    get_position_key(log.owner, log.id),
+                    block_identifier=log.block_number,
+                )
+            )
+            for log in logs
+            if log.event_name in READ_EVENT_NAMES
+        }
+
+    def sync(self) -> int:
+        """Replays finalized blocks up to `confirmations` behind head, returning the last"""
+        finalized = self.chain.blocks.head.number - self.confirmations
+        for chunk_start in range(self.start_block, finalized + 1, self.chunk_size):
+            chunk_stop = min(chunk_start + self.chunk_size - 1, finalized)
+            logs = self._logs(chunk_start, chunk_stop)
+            self.extend(logs, self._reads(logs), chunk_stop)
+        return self.start_block - 1
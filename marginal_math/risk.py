@@ -0,0 +1,367 @@
+from dataclasses import dataclass
+from math import log, sqrt
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from marginal_math import position as Position
+from marginal_math.constants import (
+    FUNDING_PERIOD,
+    MAINTENANCE_UNIT,
+    MAX_TICK,
+    MIN_TICK,
+    Q192,
+    SECONDS_AGO,
+    TICK_CUMULATIVE_RATE_MAX,
+)
+from marginal_math.oracle_library import oracle_sqrt_price_x96
+from marginal_math.tick_math import get_sqrt_ratio_at_tick
+
+# @dev log of price per tick, price = 1.0001 ** tick
+_LOG_TICK = log(1.0001)
+
+
+def _wrap_int(x: np.ndarray, bits: int) -> np.ndarray:
+    # elementwise `full_math.wrap_int` on int64 arrays, for bits < 63
+    half = 1 << (bits - 1)
+    return (x + half) % (1 << bits) - half
+
+
+def _div_trunc(x: np.ndarray, y: int) -> np.ndarray:
+    # elementwise `full_math.div_trunc` on int64 arrays
+    return np.where(x < 0, -((-x) // y), x // y)
+
+
+def _price(tick: np.ndarray) -> np.ndarray:
+    return np.exp(tick * _LOG_TICK)
+
+
+def tick_paths(
+    n_paths: int,
+    n_steps: int,
+    tick_start: int,
+    period: int = 3600,
+    drift: float = 0.0,
+    volatility: float = 0.0,
+    seed: int = 0,
+) -> np.ndarray:
+    """Oracle tick paths of `n_steps` steps `period` seconds apart, starting at `tick_start`
+
+    Ticks follow the random walk of `univ3_oracle.synthetic_observations`, with `drift`
+    ticks per second and Gaussian `volatility` in ticks per square root second.
+
+    @return int64 array of shape (n_paths, n_steps + 1)
+    """
+    rng = np.random.default_rng(seed)
+    steps = drift * period + volatility * sqrt(period) * rng.standard_normal(
+        (n_paths, n_steps)
+    )
+    ticks = np.empty((n_paths, n_steps + 1), dtype=np.int64)
+    ticks[:, 0] = tick_start
+    ticks[:, 1:] = np.clip(
+        np.rint(tick_start + np.cumsum(steps, axis=1)), MIN_TICK, MAX_TICK
+    )
+    return ticks
+
+
+@dataclass
+class Shortfalls:
+    """Liquidation outcomes of each position on each path, in token1 at the oracle spot price
+
+    Rows are paths and columns positions. Steps index the path, with -1 where a position
+    stays safe over the whole path. Positions are liquidated at `liquidated_at`, a delay
+    after first going unsafe and capped at the last step. `deficit` is debt less collateral
+    at liquidation, and `shortfall` what remains after insurances, i.e. what LPs lose.
+    """
+
+    first_unsafe: np.ndarray
+    liquidated_at: np.ndarray
+    deficit: np.ndarray
+    shortfall: np.ndarray
+
+    @property
+    def shortfall_per_path(self) -> np.ndarray:
+        return self.shortfall.sum(axis=1)
+
+    def probability(self) -> float:
+        """Fraction of paths on which insurances fail to cover liquidations"""
+        return float(np.mean(self.shortfall_per_path > 0))
+
+    def quantile(self, q: float) -> float:
+        """Shortfall per path at quantile `q`, e.g. 0.99 for 99% shortfall at risk"""
+        return float(np.quantile(self.shortfall_per_path.astype(np.float64), q))
+
+
+class RiskEngine:
+    """Monte Carlo stress test of a pool's book against oracle price paths
+
+    Paths step `period` seconds at a time from `block_timestamp_start`, with oracle and
+    pool ticks held constant between steps. Every step syncs debts for funding as
+    `Position.debtsAfterFunding` does, clamped by `tick_cumulative_rate_max`, and checks
+    `Position.safe` against the oracle TWAP over `seconds_ago`. Before the start, the
+    oracle tick is taken to have been constant at its starting value.
+
+    `simulate` evaluates all paths by positions as float64 arrays, one step at a time.
+    `verify` replays a single path with the exact integer ports for final verification.
+    """
+
+    def __init__(
+        self,
+        positions: Iterable[Position.Info],
+        maintenance: int,
+        block_timestamp_start: int,
+        tick_cumulative_start: int,
+        oracle_tick_cumulative_start: int,
+        period: int = 3600,
+        seconds_ago: int = SECONDS_AGO,
+        tick_cumulative_rate_max: int = TICK_CUMULATIVE_RATE_MAX,
+        funding_period: int = FUNDING_PERIOD,
+    ):
+        if seconds_ago % period != 0:
+            raise ValueError("seconds_ago must be a multiple of period")
+
+        self.positions = [
+            position
+            for position in positions
+            if position.size > 0 and not position.liquidated
+        ]
+        self.maintenance = maintenance
+        self.block_timestamp_start = block_timestamp_start
+        self.tick_cumulative_start = tick_cumulative_start
+        self.oracle_tick_cumulative_start = oracle_tick_cumulative_start
+        self.period = period
+        self.seconds_ago = seconds_ago
+        self.tick_cumulative_rate_max = tick_cumulative_rate_max
+        self.funding_period = funding_period
+
+    def _tick_cumulatives(self, oracle_ticks: np.ndarray, pool_ticks: np.ndarray):
+        # pool tick cumulatives at each step, and oracle tick cumulatives from a window
+        # before the first step so the TWAP at step k is oracle[k + w] - oracle[k]
+        window = self.seconds_ago // self.period
+        (n_paths, n) = oracle_ticks.shape
+
+        tick_cumulatives = np.empty((n_paths, n), dtype=np.int64)
+        tick_cumulatives[:, 0] = self.tick_cumulative_start
+        tick_cumulatives[:, 1:] = self.tick_cumulative_start + np.cumsum(
+            pool_ticks[:, :-1] * self.period, axis=1
+        )
+
+        oracle_tick_cumulatives = np.empty((n_paths, window + n), dtype=np.int64)
+        history = oracle_ticks[:, :1] * self.period * np.arange(window, -1, -1)
+        elapsed = np.cumsum(oracle_ticks[:, :-1] * self.period, axis=1)
+        oracle_tick_cumulatives[:, : window + 1] = (
+            self.oracle_tick_cumulative_start - history
+        )
+        oracle_tick_cumulatives[:, window + 1 :] = (
+            self.oracle_tick_cumulative_start + elapsed
+        )
+        return (tick_cumulatives, oracle_tick_cumulatives)
+
+    def _inputs(self, oracle_ticks, pool_ticks, delay):
+        oracle_ticks = np.atleast_2d(np.asarray(oracle_ticks, dtype=np.int64))
+        pool_ticks = np.broadcast_to(
+            np.asarray(
+                oracle_ticks if pool_ticks is None else pool_ticks, dtype=np.int64
+            ),
+            oracle_ticks.shape,
+        )
+        delay = np.broadcast_to(
+            np.asarray(delay, dtype=np.int64).reshape(
+                (-1, 1) if np.ndim(delay) == 1 else np.shape(delay)
+            ),
+            (len(oracle_ticks), len(self.positions)),
+        )
+        return (oracle_ticks, pool_ticks, delay)
+
+    def simulate(
+        self,
+        oracle_ticks: np.ndarray,
+        pool_ticks: Optional[np.ndarray] = None,
+        delay: Union[int, np.ndarray] = 0,
+    ) -> Shortfalls:
+        """Liquidation shortfalls of every position on every path, in float64
+
+        @param oracle_ticks Oracle ticks of shape (n_paths, n_steps + 1), e.g. from `tick_paths`
+        @param pool_ticks Pool ticks, broadcast to the shape of `oracle_ticks`. Defaults to
+        tracking the oracle spot tick
+        @param delay Steps from going unsafe to liquidation, per path or per path and position
+        """
+        (oracle_ticks, pool_ticks, delay) = self._inputs(
+            oracle_ticks, pool_ticks, delay
+        )
+        (tick_cumulatives, oracle_tick_cumulatives) = self._tick_cumulatives(
+            oracle_ticks, pool_ticks
+        )
+        (n_paths, n) = oracle_ticks.shape
+        window = self.seconds_ago // self.period
+        last = n - 1
+
+        positions = self.positions
+        zero_for_one = np.array([p.zero_for_one for p in positions], dtype=bool)
+        collateral = np.array([p.size + p.margin for p in positions], dtype=np.float64)
+        debt = np.array(
+            [p.debt0 if p.zero_for_one else p.debt1 for p in positions],
+            dtype=np.float64,
+        )
+        insurance0 = np.array([p.insurance0 for p in positions], dtype=np.float64)
+        insurance1 = np.array([p.insurance1 for p in positions], dtype=np.float64)
+        block_timestamp = np.array(
+            [p.block_timestamp for p in positions], dtype=np.int64
+        )
+        tick_cumulative_delta = np.array(
+            [p.tick_cumulative_delta for p in positions], dtype=np.int64
+        )
+        factor = (MAINTENANCE_UNIT + self.maintenance) / MAINTENANCE_UNIT
+
+        shape = (n_paths, len(positions))
+        first_unsafe = np.full(shape, -1, dtype=np.int64)
+        liquidated_at = np.full(shape, -1, dtype=np.int64)
+        deficit = np.zeros(shape, dtype=np.float64)
+        shortfall = np.zeros(shape, dtype=np.float64)
+
+        for k in range(n):
+            block_timestamp_last = (self.block_timestamp_start + k * self.period) % (
+                1 << 32
+            )
+
+            # debts after funding, with (oracle - pool) tick cumulative deltas since open
+            delta_max = _wrap_int(
+                self.tick_cumulative_rate_max
+                * ((block_timestamp_last - block_timestamp) % (1 << 32)),
+                56,
+            )
+            tick_cumulative_delta_last = _wrap_int(
+                oracle_tick_cumulatives[:, window + k] - tick_cumulatives[:, k], 56
+            )
+            delta = _wrap_int(
+                tick_cumulative_delta_last[:, None] - tick_cumulative_delta[None, :], 56
+            )
+            delta = np.where(zero_for_one, delta, -delta)
+            delta = np.clip(delta, -delta_max, delta_max)
+            ticks = _wrap_int(_div_trunc(delta, self.funding_period // 2), 24)
+            synced = block_timestamp != block_timestamp_last
+            debts = debt * np.where(synced, _price(ticks / 2), 1.0)
+
+            # safe against the oracle TWAP, in price rather than sqrt price terms
+            price = _price(
+                _div_trunc(
+                    oracle_tick_cumulatives[:, window + k]
+                    - oracle_tick_cumulatives[:, k],
+                    self.seconds_ago,
+                )
+            )[:, None]
+            debts_adjusted = debts * factor
+            safe = np.where(
+                zero_for_one,
+                collateral >= debts_adjusted * price,
+                collateral * price >= debts_adjusted,
+            )
+
+            newly = (first_unsafe == -1) & ~safe
+            first_unsafe[newly] = k
+            liquidated_at[newly] = np.minimum(k + delay[newly], last)
+
+            due = liquidated_at == k
+            if not due.any():
+                continue
+
+            # LPs keep collateral and insurances for debt owed, valued at spot in token1
+            spot = np.broadcast_to(_price(oracle_ticks[:, k])[:, None], shape)[due]
+            zero_for_one_due = np.broadcast_to(zero_for_one, shape)[due]
+            collateral_due = np.broadcast_to(collateral, shape)[due]
+            debt_value = np.where(zero_for_one_due, debts[due] * spot, debts[due])
+            collateral_value = np.where(
+                zero_for_one_due, collateral_due, collateral_due * spot
+            )
+            insurance_value = (
+                np.broadcast_to(insurance0, shape)[due] * spot
+                + np.broadcast_to(insurance1, shape)[due]
+            )
+            deficit[due] = np.maximum(debt_value - collateral_value, 0.0)
+            shortfall[due] = np.maximum(deficit[due] - insurance_value, 0.0)
+
+        return Shortfalls(
+            first_unsafe=first_unsafe,
+            liquidated_at=liquidated_at,
+            deficit=deficit,
+            shortfall=shortfall,
+        )
+
+    def verify(
+        self,
+        oracle_ticks: np.ndarray,
+        pool_ticks: Optional[np.ndarray] = None,
+        delay: Union[int, np.ndarray] = 0,
+    ) -> Shortfalls:
+        """Exact integer replay of `simulate` over a single path, one position at a time
+
+        Debts sync with `Position.sync`, safety is `Position.safe` at the TWAP from
+        `OracleLibrary.oracleSqrtPriceX96` and values are floored at the spot sqrt price
+        from `TickMath`. Returns `Shortfalls` with a single row of exact ints.
+        """
+        (oracle_ticks, pool_ticks, delay) = self._inputs(
+            oracle_ticks, pool_ticks, delay
+        )
+        if len(oracle_ticks) != 1:
+            raise ValueError("verify replays a single path")
+        (tick_cumulatives, oracle_tick_cumulatives) = self._tick_cumulatives(
+            oracle_ticks, pool_ticks
+        )
+        n = oracle_ticks.shape[1]
+        window = self.seconds_ago // self.period
+        last = n - 1
+
+        shape = (1, len(self.positions))
+        first_unsafe = np.full(shape, -1, dtype=np.int64)
+        liquidated_at = np.full(shape, -1, dtype=np.int64)
+        deficit = np.zeros(shape, dtype=object)
+        shortfall = np.zeros(shape, dtype=object)
+
+        for i, position in enumerate(self.positions):
+            for k in range(n):
+                block_timestamp_last = (
+                    self.block_timestamp_start + k * self.period
+                ) % (1 << 32)
+                synced = Position.sync(
+                    position,
+                    block_timestamp_last,
+                    int(tick_cumulatives[0, k]),
+                    int(oracle_tick_cumulatives[0, window + k]),
+                    self.tick_cumulative_rate_max,
+                    self.funding_period,
+                )
+
+                if first_unsafe[0, i] == -1:
+                    sqrt_price_x96 = oracle_sqrt_price_x96(
+                        int(
+                            oracle_tick_cumulatives[0, window + k]
+                            - oracle_tick_cumulatives[0, k]
+                        ),
+                        self.seconds_ago,
+                    )
+                    if not Position.safe(synced, sqrt_price_x96, self.maintenance):
+                        first_unsafe[0, i] = k
+                        liquidated_at[0, i] = min(k + int(delay[0, i]), last)
+
+                if liquidated_at[0, i] == k:
+                    price_x192 = get_sqrt_ratio_at_tick(int(oracle_ticks[0, k])) ** 2
+                    collateral = synced.size + synced.margin
+                    if synced.zero_for_one:
+                        debt_value = (synced.debt0 * price_x192) // Q192
+                        collateral_value = collateral
+                    else:
+                        debt_value = synced.debt1
+                        collateral_value = (collateral * price_x192) // Q192
+                    insurance_value = (
+                        synced.insurance0 * price_x192
+                    ) // Q192 + synced.insurance1
+                    deficit[0, i] = max(debt_value - collateral_value, 0)
+                    shortfall[0, i] = max(deficit[0, i] - insurance_value, 0)
+                    break
+
+        return Shortfalls(
+            first_unsafe=first_unsafe,
+            liquidated_at=liquidated_at,
+            deficit=deficit,
+            shortfall=shortfall,
+        )
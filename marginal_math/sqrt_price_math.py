@@ -0,0 +1,103 @@
+from marginal_math.constants import (
+    MAINTENANCE_UNIT,
+    MAX_SQRT_RATIO,
+    MAX_UINT256,
+    MIN_SQRT_RATIO,
+    Q96,
+)
+from marginal_math.errors import (
+    Amount0ExceedsReserve0,
+    Amount1ExceedsReserve1,
+    InvalidSqrtPriceX96,
+    Panic,
+)
+from marginal_math.full_math import checked_sub, mul_div, sqrt
+
+
+def _negate(amount: int) -> int:
+    # @dev checked negation of int256 min overflows
+    if amount == -(2**255):
+        raise Panic(Panic.ARITHMETIC)
+    return -amount
+
+
+def sqrt_price_x96_next_open(
+    liquidity: int,
+    sqrt_price_x96: int,
+    liquidity_delta: int,
+    zero_for_one: bool,
+    maintenance: int,
+) -> int:
+    """Port of `SqrtPriceMath.sqrtPriceX96NextOpen`"""
+    liquidity_after = checked_sub(liquidity, liquidity_delta)
+    prod = liquidity_delta * liquidity_after
+    prod = mul_div(prod, MAINTENANCE_UNIT, MAINTENANCE_UNIT + maintenance)
+
+    under = liquidity**2 - 4 * prod
+    root = sqrt(under)
+
+    next_x96 = (
+        mul_div(sqrt_price_x96, liquidity + root, 2 * liquidity_after)
+        if not zero_for_one
+        else mul_div(sqrt_price_x96, 2 * liquidity_after, liquidity + root)
+    )
+    if not (next_x96 >= MIN_SQRT_RATIO and next_x96 < MAX_SQRT_RATIO):
+        raise InvalidSqrtPriceX96()
+
+    return next_x96
+
+
+def sqrt_price_x96_next_swap(
+    liquidity: int,
+    sqrt_price_x96: int,
+    zero_for_one: bool,
+    amount_specified: int,
+) -> int:
+    """Port of `SqrtPriceMath.sqrtPriceX96NextSwap`
+
+    @dev Assumes amount_specified != 0
+    """
+    exact_input = amount_specified > 0
+
+    if exact_input:
+        if not zero_for_one:
+            # 1 is known
+            # sqrt(P') = sqrt(P) + del y / L
+            prod = mul_div(amount_specified, Q96, liquidity)
+            next_x96 = sqrt_price_x96 + prod
+            if next_x96 > MAX_UINT256:
+                raise Panic(Panic.ARITHMETIC)
+        else:
+            # 0 is known
+            # sqrt(P') = sqrt(P) - (del x * sqrt(P)) / (L / sqrt(P) + del x)
+            reserve0 = (liquidity << 96) // sqrt_price_x96
+            prod = mul_div(
+                amount_specified, sqrt_price_x96, reserve0 + amount_specified
+            )
+            next_x96 = sqrt_price_x96 - prod
+    else:
+        amount = _negate(amount_specified)
+        if not zero_for_one:
+            # 0 is known
+            # sqrt(P') = sqrt(P) - (del x * sqrt(P)) / (L / sqrt(P) + del x)
+            reserve0 = (liquidity << 96) // sqrt_price_x96
+            if reserve0 <= amount:
+                raise Amount0ExceedsReserve0()
+
+            prod = mul_div(amount, sqrt_price_x96, reserve0 - amount)
+            next_x96 = sqrt_price_x96 + prod
+            if next_x96 > MAX_UINT256:
+                raise Panic(Panic.ARITHMETIC)
+        else:
+            # 1 is known
+            # sqrt(P') = sqrt(P) + del y / L
+            reserve1 = mul_div(liquidity, sqrt_price_x96, Q96)
+            if reserve1 <= amount:
+                raise Amount1ExceedsReserve1()
+
+            prod = mul_div(amount, Q96, liquidity)
+            next_x96 = checked_sub(sqrt_price_x96, prod)
+
+    if not (next_x96 >= MIN_SQRT_RATIO and next_x96 < MAX_SQRT_RATIO):
+        raise InvalidSqrtPriceX96()
+    return next_x96
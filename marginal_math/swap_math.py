@@ -0,0 +1,33 @@
+from typing import Tuple
+
+from marginal_math.constants import FEE_UNIT, MAX_UINT256, Q96
+from marginal_math.errors import Panic
+from marginal_math.full_math import mul_div
+
+
+def swap_amounts(
+    liquidity: int, sqrt_price_x96: int, sqrt_price_x96_next: int
+) -> Tuple[int, int]:
+    """Port of `SwapMath.swapAmounts`
+
+    @dev amount > 0 is amount in, amount < 0 is amount out
+    """
+    # del x = L * del (1 / sqrt(P)); del y = L * del sqrt(P)
+    zero_for_one = sqrt_price_x96_next < sqrt_price_x96
+    amount0_delta = (liquidity << 96) // sqrt_price_x96_next - (
+        liquidity << 96
+    ) // sqrt_price_x96
+    amount1_delta = (
+        -mul_div(liquidity, sqrt_price_x96 - sqrt_price_x96_next, Q96)
+        if zero_for_one
+        else mul_div(liquidity, sqrt_price_x96_next - sqrt_price_x96, Q96)
+    )
+    return (amount0_delta, amount1_delta)
+
+
+def swap_fees(amount: int, fee: int, less_fee: bool) -> int:
+    """Port of `SwapMath.swapFees`"""
+    prod = amount * fee
+    if prod > MAX_UINT256:
+        raise Panic(Panic.ARITHMETIC)
+    return prod // FEE_UNIT if not less_fee else prod // (FEE_UNIT - fee)
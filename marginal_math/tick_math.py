@@ -0,0 +1,81 @@
+from functools import lru_cache
+from math import log
+
+from marginal_math.constants import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MAX_UINT256,
+    MIN_SQRT_RATIO,
+)
+from marginal_math.errors import InvalidSqrtRatio, InvalidTick
+
+# @dev 2**128 / sqrt(1.0001) ** (2**i) for each bit i of abs(tick)
+_RATIOS = (
+    0xFFF97272373D413259A46990580E213A,
+    0xFFF2E50F5F656932EF12357CF3C7FDCC,
+    0xFFE5CACA7E10E4E61C3624EAA0941CD0,
+    0xFFCB9843D60F6159C9DB58835C926644,
+    0xFF973B41FA98C081472E6896DFB254C0,
+    0xFF2EA16466C96A3843EC78B326B52861,
+    0xFE5DEE046A99A2A811C461F1969C3053,
+    0xFCBE86C7900A88AEDCFFC83B479AA3A4,
+    0xF987A7253AC413176F2B074CF7815E54,
+    0xF3392B0822B70005940C7A398E4B70F3,
+    0xE7159475A2C29B7443B29C7FA6E889D9,
+    0xD097F3BDFD2022B8845AD8F792AA5825,
+    0xA9F746462D870FDF8A65DC1F90E061E5,
+    0x70D869A156D2A1B890BB3DF62BAF32F7,
+    0x31BE135F97D08FD981231505542FCFA6,
+    0x9AA508B5B7A84E1C677DE54F3E99BC9,
+    0x5D6AF8DEDB81196699C329225EE604,
+    0x2216E584F5FA1EA926041BEDFE98,
+    0x48A170391F7DC42444E8FA2,
+)
+
+_LOG_SQRT_10001 = log(1.0001) / 2
+
+
+@lru_cache(maxsize=1 << 16)
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """Port of Uniswap v3 `TickMath.getSqrtRatioAtTick`
+
+    @dev Cached as simulations revisit a narrow band of ticks
+    """
+    abs_tick = -tick if tick < 0 else tick
+    if abs_tick > MAX_TICK:
+        raise InvalidTick("T")
+
+    ratio = (
+        0xFFFCB933BD6FAD37AA2D162D1A594001
+        if abs_tick & 0x1 != 0
+        else 0x100000000000000000000000000000000
+    )
+    bit = 0x2
+    for r in _RATIOS:
+        if abs_tick & bit != 0:
+            ratio = (ratio * r) >> 128
+        bit <<= 1
+
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+
+    # round up to Q96 so getTickAtSqrtRatio of the output is consistent
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """Port of Uniswap v3 `TickMath.getTickAtSqrtRatio`
+
+    @dev Uniswap returns the greatest tick with getSqrtRatioAtTick(tick) <= sqrt_price_x96,
+    so a float estimate corrected against the exact ratio gives the same result
+    """
+    if not (sqrt_price_x96 >= MIN_SQRT_RATIO and sqrt_price_x96 < MAX_SQRT_RATIO):
+        raise InvalidSqrtRatio("R")
+
+    tick = int((log(sqrt_price_x96) - 96 * log(2)) // _LOG_SQRT_10001)
+    tick = min(max(tick, -MAX_TICK), MAX_TICK - 1)
+    while tick < MAX_TICK - 1 and get_sqrt_ratio_at_tick(tick + 1) <= sqrt_price_x96:
+        tick += 1
+    while get_sqrt_ratio_at_tick(tick) > sqrt_price_x96:
+        tick -= 1
+    return tick
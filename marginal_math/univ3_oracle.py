@@ -0,0 +1,346 @@
+from math import sqrt
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from marginal_math.constants import MAX_TICK, MAX_UINT32, MAX_UINT160, MIN_TICK
+from marginal_math.errors import ObservationTooOld, OracleUninitialized
+from marginal_math.full_math import div_trunc, wrap_int
+
+
+class Observation(NamedTuple):
+    """Mirrors Uniswap v3 `Oracle.Observation`, with fields in struct order"""
+
+    block_timestamp: int = 0
+    tick_cumulative: int = 0
+    seconds_per_liquidity_cumulative_x128: int = 0
+    initialized: bool = False
+
+
+def transform(
+    last: Observation, block_timestamp: int, tick: int, liquidity: int
+) -> Observation:
+    """Port of Uniswap v3 `Oracle.transform`"""
+    delta = (block_timestamp - last.block_timestamp) & MAX_UINT32
+    return Observation(
+        block_timestamp & MAX_UINT32,
+        wrap_int(last.tick_cumulative + tick * delta, 56),
+        (
+            last.seconds_per_liquidity_cumulative_x128
+            + (delta << 128) // (liquidity if liquidity > 0 else 1)
+        )
+        & MAX_UINT160,
+        True,
+    )
+
+
+def lte(time: int, a: int, b: int) -> bool:
+    """Port of Uniswap v3 `Oracle.lte`
+
+    @dev Compares 32 bit timestamps `a` and `b` relative to `time`, accounting for overflow
+    """
+    if a <= time and b <= time:
+        return a <= b
+    a_adjusted = a if a > time else a + 2**32
+    b_adjusted = b if b > time else b + 2**32
+    return a_adjusted <= b_adjusted
+
+
+class UniswapV3Oracle:
+    """Mirror of a Uniswap v3 pool observation ring buffer
+
+    Fed by the pool's `Swap`, `Mint`, `Burn` and `IncreaseObservationCardinalityNext` events,
+    `observe` follows `IUniswapV3Pool.observe` including interpolation between observations.
+    Set `block_timestamp` to the current block time before calling `observe` when the last
+    event fed is older.
+    """
+
+    def __init__(
+        self,
+        block_timestamp: int,
+        tick: int,
+        liquidity: int = 0,
+        observations: Optional[List[Observation]] = None,
+        observation_index: int = 0,
+        observation_cardinality: int = 1,
+        observation_cardinality_next: int = 1,
+    ):
+        self.block_timestamp = block_timestamp
+        self.tick = tick
+        self.liquidity = liquidity
+        self.observation_index = observation_index
+        self.observation_cardinality = observation_cardinality
+        self.observation_cardinality_next = observation_cardinality_next
+
+        # initialize if observations not given
+        self.observations = (
+            list(observations)
+            if observations is not None
+            else [Observation(block_timestamp, 0, 0, True)]
+        )
+        self.observations += [Observation(1, 0, 0, False)] * (
+            observation_cardinality_next - len(self.observations)
+        )
+
+    @classmethod
+    def from_pool(cls, pool, block_timestamp: int) -> "UniswapV3Oracle":
+        """Loads the ring buffer of a deployed Uniswap v3 pool
+
+        @dev Reads every stored observation once, up to `observationCardinalityNext`
+        """
+        slot0 = pool.slot0()
+        return cls(
+            block_timestamp,
+            slot0.tick,
+            pool.liquidity(),
+            observations=[
+                Observation(*pool.observations(i))
+                for i in range(slot0.observationCardinalityNext)
+            ],
+            observation_index=slot0.observationIndex,
+            observation_cardinality=slot0.observationCardinality,
+            observation_cardinality_next=slot0.observationCardinalityNext,
+        )
+
+    def _write(self, block_timestamp: int):
+        # port of `Oracle.write` with tick and liquidity before the update
+        block_timestamp &= MAX_UINT32
+        self.block_timestamp = block_timestamp
+        last = self.observations[self.observation_index]
+        if last.block_timestamp == block_timestamp:
+            return
+
+        if (
+            self.observation_cardinality_next > self.observation_cardinality
+            and self.observation_index == self.observation_cardinality - 1
+        ):
+            self.observation_cardinality = self.observation_cardinality_next
+
+        self.observation_index = (
+            self.observation_index + 1
+        ) % self.observation_cardinality
+        self.observations[self.observation_index] = transform(
+            last, block_timestamp, self.tick, self.liquidity
+        )
+
+    def swap(self, block_timestamp: int, tick: int, liquidity: int):
+        """Applies a `Swap` event with the pool tick and liquidity after the swap
+
+        @dev Mirrors `UniswapV3Pool.swap`, which only writes an observation if the tick changes
+        """
+        if tick != self.tick:
+            self._write(block_timestamp)
+        else:
+            self.block_timestamp = block_timestamp
+        self.tick = tick
+        self.liquidity = liquidity
+
+    def modify_position(
+        self,
+        block_timestamp: int,
+        tick_lower: int,
+        tick_upper: int,
+        liquidity_delta: int,
+    ):
+        """Applies a `Mint` (positive) or `Burn` (negative) event liquidity delta
+
+        @dev Mirrors `UniswapV3Pool._modifyPosition`, which only writes an observation
+        and updates in range liquidity if the current tick is within the position range
+        """
+        self.block_timestamp = block_timestamp
+        if liquidity_delta == 0 or not (tick_lower <= self.tick < tick_upper):
+            return
+        self._write(block_timestamp)
+        self.liquidity += liquidity_delta
+
+    def increase_observation_cardinality_next(self, observation_cardinality_next: int):
+        """Port of `Oracle.grow` on `IncreaseObservationCardinalityNext`"""
+        if observation_cardinality_next <= self.observation_cardinality_next:
+            return
+        self.observations += [Observation(1, 0, 0, False)] * (
+            observation_cardinality_next - self.observation_cardinality_next
+        )
+        self.observation_cardinality_next = observation_cardinality_next
+
+    def apply(self, log, block_timestamp: int):
+        """Applies a decoded Uniswap v3 pool log emitted at `block_timestamp`"""
+        if log.event_name == "Swap":
+            self.swap(block_timestamp, log.tick, log.liquidity)
+        elif log.event_name == "Mint":
+            self.modify_position(
+                block_timestamp, log.tickLower, log.tickUpper, log.amount
+            )
+        elif log.event_name == "Burn":
+            self.modify_position(
+                block_timestamp, log.tickLower, log.tickUpper, -log.amount
+            )
+        elif log.event_name == "IncreaseObservationCardinalityNext":
+            self.increase_observation_cardinality_next(
+                log.observationCardinalityNextNew
+            )
+
+    def _binary_search(self, time: int, target: int) -> Tuple[Observation, Observation]:
+        # port of `Oracle.binarySearch`
+        cardinality = self.observation_cardinality
+        l = (self.observation_index + 1) % cardinality  # oldest observation
+        r = l + cardinality - 1  # newest observation
+        while True:
+            i = (l + r) // 2
+            before_or_at = self.observations[i % cardinality]
+            if not before_or_at.initialized:
+                l = i + 1
+                continue
+
+            at_or_after = self.observations[(i + 1) % cardinality]
+            target_at_or_after = lte(time, before_or_at.block_timestamp, target)
+            if target_at_or_after and lte(time, target, at_or_after.block_timestamp):
+                return (before_or_at, at_or_after)
+
+            if not target_at_or_after:
+                r = i - 1
+            else:
+                l = i + 1
+
+    def _get_surrounding_observations(
+        self, time: int, target: int
+    ) -> Tuple[Observation, Observation]:
+        # port of `Oracle.getSurroundingObservations`
+        before_or_at = self.observations[self.observation_index]
+        if lte(time, before_or_at.block_timestamp, target):
+            if before_or_at.block_timestamp == target:
+                return (before_or_at, Observation())
+            return (
+                before_or_at,
+                transform(before_or_at, target, self.tick, self.liquidity),
+            )
+
+        before_or_at = self.observations[
+            (self.observation_index + 1) % self.observation_cardinality
+        ]
+        if not before_or_at.initialized:
+            before_or_at = self.observations[0]
+
+        if not lte(time, before_or_at.block_timestamp, target):
+            raise ObservationTooOld()
+        return self._binary_search(time, target)
+
+    def observe_single(self, time: int, seconds_ago: int) -> Tuple[int, int]:
+        """Port of Uniswap v3 `Oracle.observeSingle`"""
+        if seconds_ago == 0:
+            last = self.observations[self.observation_index]
+            if last.block_timestamp != time:
+                last = transform(last, time, self.tick, self.liquidity)
+            return (last.tick_cumulative, last.seconds_per_liquidity_cumulative_x128)
+
+        target = (time - seconds_ago) & MAX_UINT32
+        (before_or_at, at_or_after) = self._get_surrounding_observations(time, target)
+        if target == before_or_at.block_timestamp:
+            return (
+                before_or_at.tick_cumulative,
+                before_or_at.seconds_per_liquidity_cumulative_x128,
+            )
+        elif target == at_or_after.block_timestamp:
+            return (
+                at_or_after.tick_cumulative,
+                at_or_after.seconds_per_liquidity_cumulative_x128,
+            )
+
+        # interpolate between the surrounding observations
+        observation_time_delta = (
+            at_or_after.block_timestamp - before_or_at.block_timestamp
+        ) & MAX_UINT32
+        target_delta = (target - before_or_at.block_timestamp) & MAX_UINT32
+        return (
+            wrap_int(
+                before_or_at.tick_cumulative
+                + div_trunc(
+                    wrap_int(
+                        at_or_after.tick_cumulative - before_or_at.tick_cumulative, 56
+                    ),
+                    observation_time_delta,
+                )
+                * target_delta,
+                56,
+            ),
+            (
+                before_or_at.seconds_per_liquidity_cumulative_x128
+                + (
+                    (
+                        (
+                            at_or_after.seconds_per_liquidity_cumulative_x128
+                            - before_or_at.seconds_per_liquidity_cumulative_x128
+                        )
+                        & MAX_UINT160
+                    )
+                    * target_delta
+                )
+                // observation_time_delta
+            )
+            & MAX_UINT160,
+        )
+
+    def observe(
+        self, seconds_agos: List[int], time: Optional[int] = None
+    ) -> Tuple[List[int], List[int]]:
+        """Mirrors `IUniswapV3Pool.observe` as of `time`, defaulting to `block_timestamp`"""
+        if self.observation_cardinality == 0:
+            raise OracleUninitialized()
+        time = (self.block_timestamp if time is None else time) & MAX_UINT32
+
+        tick_cumulatives = []
+        seconds_per_liquidity_cumulative_x128s = []
+        for seconds_ago in seconds_agos:
+            (
+                tick_cumulative,
+                seconds_per_liquidity_cumulative_x128,
+            ) = self.observe_single(time, seconds_ago)
+            tick_cumulatives.append(tick_cumulative)
+            seconds_per_liquidity_cumulative_x128s.append(
+                seconds_per_liquidity_cumulative_x128
+            )
+        return (tick_cumulatives, seconds_per_liquidity_cumulative_x128s)
+
+
+def pack_observation(observation: Observation) -> int:
+    """Packs an observation into the word read by `MockUniswapV3Pool.pushObservations`"""
+    return (
+        ((observation.block_timestamp & MAX_UINT32) << 224)
+        | ((observation.tick_cumulative & (2**56 - 1)) << 168)
+        | ((observation.seconds_per_liquidity_cumulative_x128 & MAX_UINT160) << 8)
+        | int(observation.initialized)
+    )
+
+
+def synthetic_observations(
+    n: int,
+    block_timestamp_start: int,
+    tick_start: int,
+    period: int = 12,
+    drift: float = 0.0,
+    volatility: float = 0.0,
+    liquidity: int = 2**64,
+    seed: int = 0,
+) -> Tuple[List[Observation], int]:
+    """Synthetic history of `n` observations `period` seconds apart, with the tick after
+
+    Ticks follow a random walk with `drift` ticks per second and Gaussian `volatility` in
+    ticks per square root second, held constant between observations as in a pool that
+    swaps once per period. Liquidity is constant.
+    """
+    rng = np.random.default_rng(seed)
+    steps = drift * period + volatility * sqrt(period) * rng.standard_normal(n)
+    ticks = np.clip(np.rint(tick_start + np.cumsum(steps)), MIN_TICK, MAX_TICK)
+
+    observations = [Observation(block_timestamp_start & MAX_UINT32, 0, 0, True)]
+    tick = tick_start
+    for tick_next in ticks[: n - 1]:
+        observations.append(
+            transform(
+                observations[-1],
+                observations[-1].block_timestamp + period,
+                tick,
+                liquidity,
+            )
+        )
+        tick = int(tick_next)
+    return (observations, tick)
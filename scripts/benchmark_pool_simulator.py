@@ -0,0 +1,78 @@
+import click
+import time
+
+from marginal_math.constants import MAX_SQRT_RATIO, MIN_SQRT_RATIO
+from marginal_math.pool import PoolSimulator
+from marginal_math.quoter import quote_open
+from marginal_math.univ3_oracle import UniswapV3Oracle
+
+BLOCK_TIMESTAMP = 1684761803
+MAINTENANCE = 250000
+LIQUIDITY = 10**24
+LIQUIDITY_DELTA = 10**18
+VALUE = 10**17  # covers liquidation rewards at zero base fee
+TARGET = 100000  # ops/s for each operation
+
+
+def make_sim() -> PoolSimulator:
+    oracle = UniswapV3Oracle(
+        BLOCK_TIMESTAMP - 86400, 0, liquidity=2**64, observation_cardinality_next=100
+    )
+    oracle.block_timestamp = BLOCK_TIMESTAMP
+    sim = PoolSimulator(MAINTENANCE, oracle, block_timestamp=BLOCK_TIMESTAMP)
+    sim.mint("alice", LIQUIDITY)
+    return sim
+
+
+def run(label: str, n: int, fn) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    click.echo(f"{label}: {elapsed:.3f}s ({n / elapsed:,.0f} ops/s)")
+    return n / elapsed
+
+
+def main():
+    n = click.prompt("Number of operations", default=100000)
+    sim = make_sim()
+
+    # @dev alternate sides so the pool price stays near where it started
+    margins = [
+        quote_open(sim.state, MAINTENANCE, zero_for_one, LIQUIDITY_DELTA).margin_minimum
+        * 2
+        for zero_for_one in (False, True)
+    ]
+    limits = [MAX_SQRT_RATIO - 1, MIN_SQRT_RATIO + 1]
+    ids = []
+
+    def open(i):
+        zero_for_one = i % 2 == 1
+        (id, *_) = sim.open(
+            "bob",
+            zero_for_one,
+            LIQUIDITY_DELTA,
+            limits[zero_for_one],
+            margins[zero_for_one],
+            VALUE,
+        )
+        ids.append(id)
+
+    def settle(i):
+        sim.settle("bob", "bob", ids[i])
+
+    def swap(i):
+        zero_for_one = i % 2 == 1
+        sim.swap("bob", zero_for_one, 10**15, limits[zero_for_one])
+
+    rates = {
+        "open": run("open", n, open),
+        "settle": run("settle", n, settle),
+        "swap": run("swap", n, swap),
+    }
+    short = [label for label, rate in rates.items() if rate < TARGET]
+    click.echo(
+        f"Below the {TARGET:,} ops/s target: {', '.join(short)}"
+        if short
+        else f"All operations meet the {TARGET:,} ops/s target"
+    )
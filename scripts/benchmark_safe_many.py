@@ -0,0 +1,47 @@
+import click
+import random
+import time
+
+from marginal_math.batch import PositionColumns, safe_many
+from marginal_math.constants import MINIMUM_SIZE
+from marginal_math.position import Info, safe
+
+
+def random_positions(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(n):
+        zero_for_one = rng.random() < 0.5
+        debt = rng.randrange(MINIMUM_SIZE, 2**100)
+        positions.append(
+            Info(
+                size=rng.randrange(MINIMUM_SIZE, 2**100),
+                debt0=debt if zero_for_one else MINIMUM_SIZE,
+                debt1=MINIMUM_SIZE if zero_for_one else debt,
+                margin=rng.randrange(0, 2**100),
+                zero_for_one=zero_for_one,
+            )
+        )
+    return positions
+
+
+def main():
+    n = click.prompt("Number of positions", default=1000000)
+    maintenance = 250000
+    sqrt_price_x96 = 1 << 96
+
+    positions = random_positions(n)
+    columns = PositionColumns.from_infos(positions)
+
+    start = time.perf_counter()
+    expected = [safe(position, sqrt_price_x96, maintenance) for position in positions]
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mask = safe_many(columns, sqrt_price_x96, maintenance)
+    vectorized = time.perf_counter() - start
+
+    assert list(mask) == expected
+    click.echo(f"Scalar loop: {scalar:.3f}s ({n / scalar:,.0f} positions/s)")
+    click.echo(f"safe_many: {vectorized:.3f}s ({n / vectorized:,.0f} positions/s)")
+    click.echo(f"Speedup: {scalar / vectorized:.1f}x")
@@ -1,11 +1,361 @@
 import click
+import json
+import os
+import rlp
+import time
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
 from ape import accounts, chain, project
+from ape.cli import NetworkBoundCommand, network_option
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+from hexbytes import HexBytes
 
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
-def main():
-    click.echo(f"Running deploy.py on chainid {chain.chain_id} ...")
+DEPLOYMENTS = ("MarginalV1PoolDeployer", "MarginalV1Factory")
+
+# @dev leverage tiers enabled by the factory constructor
+LEVERAGE_TIERS = (250000, 500000, 1000000)
+
+# @dev upper bounds, unused gas is refunded. Pipelined transactions can't be estimated
+# against contracts deployed earlier in the same batch
+GAS_LIMITS = {
+    "MarginalV1PoolDeployer": 7000000,
+    "MarginalV1Factory": 1500000,
+    "enableLeverage": 100000,
+    "createPool": 7000000,
+    "setOwner": 100000,
+}
+
+
+def create_address(sender: str, nonce: int) -> str:
+    """Address of a contract deployed by `sender` with `nonce`"""
+    return to_checksum_address(
+        keccak(rlp.encode([bytes.fromhex(sender[2:]), nonce]))[12:]
+    )
+
+
+def create2_address(sender: str, salt: bytes, init_code_hash: bytes) -> str:
+    """Address of a contract deployed by `sender` with CREATE2"""
+    return to_checksum_address(
+        keccak(b"\xff" + bytes.fromhex(sender[2:]) + salt + init_code_hash)[12:]
+    )
+
+
+def pool_address(
+    pool_deployer: str,
+    factory: str,
+    token0: str,
+    token1: str,
+    maintenance: int,
+    oracle: str,
+    bytecode: bytes,
+) -> str:
+    """Address of a Marginal v1 pool deployed through `MarginalV1PoolDeployer.deploy`
+
+    @dev Mirrors the salt and constructor args of `MarginalV1PoolDeployer`, with
+    `bytecode` the deployment bytecode of `MarginalV1Pool`
+    """
+    args = encode(
+        ["address", "address", "address", "uint24", "address"],
+        [factory, token0, token1, maintenance, oracle],
+    )
+    return create2_address(pool_deployer, keccak(args), keccak(bytecode + args))
+
+
+def sort_tokens(token_a: str, token_b: str) -> Tuple[str, str]:
+    (token_a, token_b) = (to_checksum_address(token_a), to_checksum_address(token_b))
+    return (
+        (token_a, token_b)
+        if int(token_a, 16) < int(token_b, 16)
+        else (token_b, token_a)
+    )
+
+
+@dataclass
+class Step:
+    """Transaction to bring the deployment in line with the manifest"""
+
+    kind: str  # contract deployed or factory function called
+    args: list
+    nonce: int
+    address: Optional[str] = None  # contract deployed, or pool expected to be created
+    gas_limit: Optional[int] = None
+    txn_hash: Optional[str] = None
+    failed: Optional[bool] = None
+
+
+@dataclass
+class Plan:
+    """Addresses of the deployment and the transactions still needed to reach them"""
+
+    pool_deployer: str
+    factory: str
+    pools: Dict[Tuple[str, str, int, str], str] = field(default_factory=dict)
+    steps: List[Step] = field(default_factory=list)
+
+
+def load_state(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_state(path: str, state: dict):
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+        f.write("\n")
+    os.replace(path + ".tmp", path)
+
+
+def has_code(address: Optional[str]) -> bool:
+    return address is not None and len(chain.provider.get_code(address)) > 0
+
+
+def wait_for_pending(address: str, timeout: int = 600) -> int:
+    """Waits for transactions in flight from `address`, returning its next nonce
+
+    @dev Transactions left pending by an interrupted run are mined before planning so
+    their effects are seen on chain instead of being sent again
+    """
+    web3 = chain.provider.web3
+    start = time.time()
+    while True:
+        nonce = web3.eth.get_transaction_count(address, "latest")
+        if web3.eth.get_transaction_count(address, "pending") == nonce:
+            return nonce
+        if time.time() - start > timeout:
+            raise TimeoutError(f"Transactions from {address} still pending")
+        time.sleep(1)
+
+
+def plan(manifest: dict, deployer, state: dict) -> Plan:
+    """Precomputes all deployment addresses and the transactions not yet on chain
+
+    Contracts already deployed, per the manifest or `state` from a previous run, are reused.
+    Leverage tiers and pools already on the factory are skipped. Remaining transactions
+    are assigned consecutive nonces from the deployer's next nonce.
+    """
+    nonce = wait_for_pending(deployer.address)
+    steps = []
+    config = manifest["factory"]
+    gas_limits = dict(GAS_LIMITS, **manifest.get("gasLimits", {}))
+
+    # factory deployed by a previous run fixes its pool deployer
+    factory_address = config.get("address") or state.get("factory")
+    factory_deployed = has_code(factory_address)
+    if factory_deployed:
+        factory = project.MarginalV1Factory.at(factory_address)
+        pool_deployer_address = factory.marginalV1Deployer()
+        if not has_code(pool_deployer_address):
+            raise ValueError(
+                f"Factory {factory_address} deployed with missing pool deployer "
+                + f"{pool_deployer_address}"
+            )
+    elif config.get("address") is not None:
+        raise ValueError(f"No factory deployed at {factory_address}")
+    else:
+        pool_deployer_address = config.get("marginalV1Deployer") or state.get(
+            "poolDeployer"
+        )
+        if not has_code(pool_deployer_address):
+            if config.get("marginalV1Deployer") is not None:
+                raise ValueError(f"No pool deployer at {pool_deployer_address}")
+            pool_deployer_address = create_address(deployer.address, nonce)
+            steps.append(
+                Step("MarginalV1PoolDeployer", [], nonce, pool_deployer_address)
+            )
+            nonce += 1
+
+        factory_address = create_address(deployer.address, nonce)
+        steps.append(
+            Step(
+                "MarginalV1Factory",
+                [
+                    pool_deployer_address,
+                    config["uniswapV3Factory"],
+                    config["observationCardinalityMinimum"],
+                ],
+                nonce,
+                factory_address,
+            )
+        )
+        nonce += 1
+
+    # leverage tiers
+    owner = factory.owner() if factory_deployed else deployer.address
+    enabled = set(LEVERAGE_TIERS)
+    for maintenance in manifest.get("enableLeverage", []):
+        if factory_deployed and factory.getLeverage(maintenance) > 0:
+            enabled.add(maintenance)
+            continue
+        if maintenance in enabled:
+            continue
+        if not (maintenance >= 100000 and maintenance < 1000000):
+            raise ValueError(f"Invalid maintenance {maintenance}")
+        if owner != deployer.address:
+            raise ValueError(f"Deployer not factory owner {owner}")
+        steps.append(Step("enableLeverage", [maintenance], nonce))
+        enabled.add(maintenance)
+        nonce += 1
+
+    # pools
+    univ3_factory = project.dependencies["uniswap-v3-core"]["0.8"].UniswapV3Factory.at(
+        factory.uniswapV3Factory() if factory_deployed else config["uniswapV3Factory"]
+    )
+    cardinality_minimum = (
+        factory.observationCardinalityMinimum()
+        if factory_deployed
+        else config["observationCardinalityMinimum"]
+    )
+    bytecode = HexBytes(
+        project.MarginalV1Pool.contract_type.deployment_bytecode.bytecode
+    )
+    pools = {}
+    for pool in manifest.get("pools", []):
+        (token0, token1) = sort_tokens(pool["tokenA"], pool["tokenB"])
+        maintenance = pool["maintenance"]
+        if maintenance not in enabled and not (
+            factory_deployed and factory.getLeverage(maintenance) > 0
+        ):
+            raise ValueError(f"Leverage not enabled for maintenance {maintenance}")
 
+        oracle = univ3_factory.getPool(token0, token1, pool["uniswapV3Fee"])
+        if oracle == ZERO_ADDRESS:
+            raise ValueError(
+                f"No Uniswap v3 pool for {token0}, {token1}, {pool['uniswapV3Fee']}"
+            )
+        key = (token0, token1, maintenance, oracle)
+        if key in pools:
+            continue
+
+        address = pool_address(
+            pool_deployer_address, factory_address, *key, bytecode=bytecode
+        )
+        pools[key] = address
+        if factory_deployed and factory.getPool(*key) != ZERO_ADDRESS:
+            continue
+
+        univ3_pool = project.dependencies["uniswap-v3-core"]["0.8"].UniswapV3Pool.at(
+            oracle
+        )
+        cardinality = univ3_pool.slot0().observationCardinality
+        if cardinality < cardinality_minimum:
+            raise ValueError(
+                f"Observation cardinality {cardinality} of {oracle} less than "
+                + f"{cardinality_minimum}"
+            )
+        steps.append(
+            Step(
+                "createPool",
+                [token0, token1, maintenance, pool["uniswapV3Fee"]],
+                nonce,
+                address,
+            )
+        )
+        nonce += 1
+
+    # owner last so the deployer can still enable leverage above
+    if config.get("owner") is not None and owner != to_checksum_address(
+        config["owner"]
+    ):
+        if owner != deployer.address:
+            raise ValueError(f"Deployer not factory owner {owner}")
+        steps.append(Step("setOwner", [to_checksum_address(config["owner"])], nonce))
+        nonce += 1
+
+    for step in steps:
+        step.gas_limit = gas_limits[step.kind]
+
+    return Plan(pool_deployer_address, factory_address, pools, steps)
+
+
+def submit(deployer, factory_address: str, step: Step) -> str:
+    """Signs and sends the transaction of `step` without waiting for its receipt"""
+    kwargs = dict(sender=deployer.address, nonce=step.nonce, gas_limit=step.gas_limit)
+    if step.kind in DEPLOYMENTS:
+        txn = getattr(project, step.kind).constructor.serialize_transaction(
+            *step.args, **kwargs
+        )
+    else:
+        # @dev factory may not be deployed yet so encode from the abi without a code check
+        abi = project.MarginalV1Factory.contract_type.mutable_methods[step.kind]
+        txn = chain.provider.network.ecosystem.encode_transaction(
+            factory_address, abi, *step.args, **kwargs
+        )
+
+    txn = deployer.prepare_transaction(txn)
+    txn = deployer.sign_transaction(txn)
+    if txn is None:
+        raise click.Abort()
+    return chain.provider.web3.eth.send_raw_transaction(
+        txn.serialize_transaction()
+    ).hex()
+
+
+def deploy_manifest(
+    manifest: dict, deployer, state_path: str, publish: bool = False
+) -> Plan:
+    """Deploys pool deployer, factory, leverage tiers and pools in the manifest
+
+    Transactions are sent back to back with locally assigned nonces, and receipts are
+    only waited on once all are sent. Addresses and transaction hashes are recorded in
+    `state_path` before sending, so a rerun after a partial failure plans against what
+    landed on chain and only sends the transactions still missing.
+    """
+    state = load_state(state_path)
+    if state.get("chainId", chain.chain_id) != chain.chain_id:
+        raise ValueError(f"State {state_path} is for chain {state['chainId']}")
+
+    deployment = plan(manifest, deployer, state)
+    state.update(
+        chainId=chain.chain_id,
+        deployer=deployer.address,
+        poolDeployer=deployment.pool_deployer,
+        factory=deployment.factory,
+        pools=[list(key) + [address] for key, address in deployment.pools.items()],
+    )
+    write_state(state_path, state)
+    click.echo(
+        f"Pool deployer {deployment.pool_deployer}, factory {deployment.factory}, "
+        + f"{len(deployment.steps)} transactions to send"
+    )
+
+    for step in deployment.steps:
+        step.txn_hash = submit(deployer, deployment.factory, step)
+        state.setdefault("transactions", []).append(
+            dict(kind=step.kind, args=step.args, nonce=step.nonce, hash=step.txn_hash)
+        )
+        write_state(state_path, state)
+        click.echo(f"Sent {step.kind}{tuple(step.args)} nonce {step.nonce}")
+
+    for step in deployment.steps:
+        receipt = chain.provider.get_receipt(
+            step.txn_hash,
+            required_confirmations=chain.provider.network.required_confirmations,
+        )
+        step.failed = receipt.failed
+        if step.kind == "createPool" and not step.failed:
+            step.failed = not has_code(step.address)
+        click.echo(
+            f"{step.kind}{tuple(step.args)}: {'failed' if step.failed else 'ok'}"
+            + (f" at {step.address}" if step.address is not None else "")
+        )
+
+    if publish:
+        explorer = chain.provider.network.explorer
+        for step in deployment.steps:
+            if step.kind in DEPLOYMENTS and not step.failed:
+                explorer.publish_contract(step.address)
+
+    return deployment
+
+
+def deploy_interactive():
     deployer_name = click.prompt("Deployer account name", default="")
     deployer = (
         accounts.load(deployer_name)
@@ -50,3 +400,50 @@ def main():
     if click.confirm("Change Marginal v1 factory owner?"):
         owner_address = click.prompt("Marginal v1 factory owner address", type=str)
         factory.setOwner(owner_address, sender=deployer)
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option(
+    "--manifest",
+    default=None,
+    help="JSON deployment manifest, deploys without prompts when given",
+)
+@click.option(
+    "--state",
+    default=None,
+    help="Deployment state recorded for resuming, defaults to <manifest>.state.json",
+)
+def cli(network, manifest, state):
+    """Deploys Marginal v1, prompting for each value or from a manifest"""
+    click.echo(f"Running deploy.py on chainid {chain.chain_id} ...")
+    if manifest is None:
+        deploy_interactive()
+        return
+
+    with open(manifest) as f:
+        config = json.load(f)
+
+    deployer_name = config.get("deployer", "")
+    deployer = (
+        accounts.load(deployer_name)
+        if deployer_name != ""
+        else accounts.test_accounts[0]
+    )
+    if hasattr(deployer, "set_autosign"):
+        # @dev passphrase from APE_ACCOUNTS_<alias>_PASSPHRASE
+        deployer.set_autosign(True)
+    click.echo(f"Deployer address: {deployer.address}")
+    click.echo(f"Deployer balance: {deployer.balance / 1e18} ETH")
+
+    deployment = deploy_manifest(
+        config,
+        deployer,
+        state or os.path.splitext(manifest)[0] + ".state.json",
+        publish=config.get("publish", False),
+    )
+    failed = [step for step in deployment.steps if step.failed]
+    if len(failed) > 0:
+        raise click.ClickException(
+            f"{len(failed)} transactions failed, rerun to resume"
+        )
@@ -0,0 +1,173 @@
+import click
+import glob
+import heapq
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Dict, List, Tuple
+from xml.etree import ElementTree
+
+# @dev bump when the timings format changes so stale timings are discarded
+TIMINGS_VERSION = 1
+
+OUTCOMES = ("passed", "failed", "errors", "skipped")
+
+
+def load_timings(path: str) -> Dict[str, float]:
+    """Loads recorded seconds per test module, keyed by path relative to the project root"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        data = json.load(f)
+    return data["timings"] if data.get("version") == TIMINGS_VERSION else {}
+
+
+def write_timings(path: str, timings: Dict[str, float]):
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "version": TIMINGS_VERSION,
+                "timings": {
+                    module: round(seconds, 3)
+                    for module, seconds in sorted(timings.items())
+                },
+            },
+            f,
+            indent=2,
+        )
+        f.write("\n")
+
+
+def estimate(modules: List[str], timings: Dict[str, float]) -> Dict[str, float]:
+    """Cost of each module from recorded timings
+
+    @dev Modules without a recorded timing cost the median recorded timing. Without any
+    recorded timings, modules cost their source size so larger modules are spread out
+    """
+    if not timings:
+        return {module: float(os.path.getsize(module)) for module in modules}
+
+    recorded = sorted(timings.values())
+    median = recorded[len(recorded) // 2]
+    return {module: timings.get(module, median) for module in modules}
+
+
+def shard(modules: List[str], costs: Dict[str, float], workers: int) -> List[List[str]]:
+    """Assigns modules to `workers` shards, longest first to the least loaded shard"""
+    heap = [(0.0, i) for i in range(workers)]
+    shards = [[] for _ in range(workers)]
+    for module in sorted(modules, key=lambda module: (-costs[module], module)):
+        (load, i) = heapq.heappop(heap)
+        shards[i].append(module)
+        heapq.heappush(heap, (load + costs[module], i))
+    return shards
+
+
+def parse_junit(path: str) -> Tuple[Dict[str, float], Dict[str, int]]:
+    """Seconds per test module and outcome counts from a pytest `--junitxml` report"""
+    timings = {}
+    counts = dict.fromkeys(OUTCOMES, 0)
+    for testcase in ElementTree.parse(path).getroot().iter("testcase"):
+        module = testcase.get("classname", "").replace(".", "/") + ".py"
+        timings[module] = timings.get(module, 0.0) + float(testcase.get("time", 0))
+
+        if testcase.find("failure") is not None:
+            counts["failed"] += 1
+        elif testcase.find("error") is not None:
+            counts["errors"] += 1
+        elif testcase.find("skipped") is not None:
+            counts["skipped"] += 1
+        else:
+            counts["passed"] += 1
+    return (timings, counts)
+
+
+@click.command(context_settings={"ignore_unknown_options": True})
+@click.option("--workers", default=os.cpu_count(), help="Number of worker processes")
+@click.option(
+    "-m",
+    "--markers",
+    default="not fuzzing and not integration and not gas",
+    help="Marker expression passed to each worker",
+)
+@click.option(
+    "--base-port",
+    default=8546,
+    help="Port of the first worker node, incremented per worker",
+)
+@click.option(
+    "--timings",
+    default=os.path.join("tests", "module_timings.json"),
+    help="Recorded seconds per test module used to balance shards",
+)
+@click.option(
+    "--path", default=os.path.join("tests", "functional"), help="Test directory"
+)
+@click.argument("pytest_args", nargs=-1, type=click.UNPROCESSED)
+def cli(workers, markers, base_port, timings, path, pytest_args):
+    """Shards test modules across workers, each with its own foundry node and fixtures
+
+    Extra arguments are passed through to each worker's `ape test`
+    """
+    modules = sorted(glob.glob(os.path.join(path, "**", "test_*.py"), recursive=True))
+    recorded = load_timings(timings)
+    shards = [s for s in shard(modules, estimate(modules, recorded), workers) if s]
+
+    # compile once so workers don't race on the build cache
+    subprocess.run(["ape", "compile"], check=True)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        procs = []
+        for i, modules_shard in enumerate(shards):
+            env = dict(os.environ, APE_FOUNDRY_HOST=f"http://127.0.0.1:{base_port + i}")
+            junitxml = os.path.join(tmp, f"worker-{i}.xml")
+            log = open(os.path.join(tmp, f"worker-{i}.log"), "w+")
+            cmd = [
+                "ape",
+                "test",
+                *modules_shard,
+                "-m",
+                markers,
+                "--junitxml",
+                junitxml,
+                *pytest_args,
+            ]
+            procs.append(
+                (subprocess.Popen(cmd, env=env, stdout=log, stderr=log), log, junitxml)
+            )
+
+        totals = dict.fromkeys(OUTCOMES, 0)
+        returncode = 0
+        for i, (proc, log, junitxml) in enumerate(procs):
+            proc.wait()
+            log.seek(0)
+            if proc.returncode not in (0, 5):  # 5: no tests collected
+                returncode = proc.returncode
+                click.echo(log.read())
+            log.close()
+            if not os.path.exists(junitxml):
+                click.echo(f"worker {i}: no report (exit code {proc.returncode})")
+                returncode = returncode or 1
+                continue
+
+            (module_timings, counts) = parse_junit(junitxml)
+            recorded.update(module_timings)
+            for outcome, count in counts.items():
+                totals[outcome] += count
+            click.echo(
+                f"worker {i}: {len(shards[i])} modules, "
+                + ", ".join(f"{count} {outcome}" for outcome, count in counts.items())
+                + f" in {sum(module_timings.values()):.1f}s"
+            )
+
+    write_timings(timings, recorded)
+    click.echo(
+        ", ".join(f"{count} {outcome}" for outcome, count in totals.items())
+        + f" in {time.perf_counter() - start:.1f}s across {len(shards)} workers"
+    )
+    sys.exit(returncode)
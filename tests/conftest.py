@@ -1,5 +1,108 @@
+import os
 import pytest
 
+from utils.gas import GasSnapshot
+from utils.rpc_cache import RPCCache, RPCCacheServer
+
+ALCHEMY_MAINNET_URL = "https://eth-mainnet.g.alchemy.com/v2/{}"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--gas-snapshot",
+        default=os.path.join(os.path.dirname(__file__), "gas_snapshot.json"),
+        help="Path to the gas benchmark snapshot",
+    )
+    parser.addoption(
+        "--gas-threshold",
+        type=float,
+        default=0.01,
+        help="Fraction of snapshot gas an operation may regress by before failing",
+    )
+    parser.addoption(
+        "--update-gas-snapshot",
+        action="store_true",
+        help="Overwrite snapshot gas with gas used",
+    )
+    parser.addoption(
+        "--rpc-cache",
+        default=None,
+        help="Path to the recorded upstream responses for mainnet-fork tests",
+    )
+    parser.addoption(
+        "--rpc-cache-mode",
+        choices=("auto", "record", "replay"),
+        default="auto",
+        help="Record upstream responses, replay without network access, or replay "
+        + "if the cache exists and record otherwise",
+    )
+
+
+def pytest_configure(config):
+    # @dev set per worker by scripts/parallel_test.py so each worker runs its own node
+    host = os.environ.get("APE_FOUNDRY_HOST")
+    if host is not None:
+        from ape import config as ape_config
+
+        ape_config.get_config("foundry").host = host
+
+    # @dev fork upstream through a local record/replay cache of upstream responses
+    path = config.getoption("--rpc-cache")
+    if path is not None:
+        from ape import config as ape_config
+
+        mode = config.getoption("--rpc-cache-mode")
+        if mode == "auto":
+            mode = "replay" if os.path.exists(path) else "record"
+
+        upstream_url = None
+        if mode == "record":
+            upstream_url = os.environ.get("APE_FORK_UPSTREAM_URL") or (
+                ALCHEMY_MAINNET_URL.format(os.environ["WEB3_ALCHEMY_PROJECT_ID"])
+            )
+
+        server = RPCCacheServer(RPCCache(path, upstream_url))
+        server.start()
+        config._rpc_cache_server = server
+
+        ape_config.get_config("foundry").fork["ethereum"]["mainnet"][
+            "upstream_provider"
+        ] = "geth"
+        ape_config.get_config("geth").ethereum.mainnet["uri"] = server.url
+
+
+def pytest_unconfigure(config):
+    server = getattr(config, "_rpc_cache_server", None)
+    if server is not None:
+        server.stop()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    server = getattr(config, "_rpc_cache_server", None)
+    if server is not None and server.cache.misses > 0:
+        terminalreporter.section("rpc cache")
+        terminalreporter.write_line(
+            f"{server.cache.misses} requests missed rpc cache {server.cache.path}"
+        )
+
+    snapshot = getattr(config, "_gas_snapshot", None)
+    if snapshot is not None and len(snapshot.lines) > 0:
+        terminalreporter.section("gas snapshot")
+        for line in snapshot.lines:
+            terminalreporter.write_line(line)
+
+
+@pytest.fixture(scope="session")
+def gas_snapshot(request):
+    snapshot = GasSnapshot(
+        request.config.getoption("--gas-snapshot"),
+        threshold=request.config.getoption("--gas-threshold"),
+        update=request.config.getoption("--update-gas-snapshot"),
+    )
+    request.config._gas_snapshot = snapshot
+    yield snapshot
+    snapshot.write()
+
 
 @pytest.fixture(scope="session")
 def admin(accounts):
@@ -203,6 +306,11 @@ def callee(project, accounts):
     return project.TestMarginalV1PoolCallee.deploy(sender=accounts[0])
 
 
+@pytest.fixture(scope="session")
+def pool_lens(project, accounts):
+    return project.MarginalV1PoolLens.deploy(sender=accounts[0])
+
+
 @pytest.fixture(scope="session")
 def sqrt_price_math_lib(project, accounts):
     return project.MockSqrtPriceMath.deploy(sender=accounts[0])
@@ -0,0 +1,159 @@
+import importlib.util
+import os
+import pytest
+
+from ape import project
+
+spec = importlib.util.spec_from_file_location(
+    "deploy",
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "scripts", "deploy.py"),
+)
+deploy = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(deploy)
+
+
+@pytest.fixture
+def manifest(
+    mock_univ3_factory,
+    rando_univ3_pool,
+    mock_univ3_pool,
+    bob,
+):
+    return {
+        "factory": {
+            "uniswapV3Factory": mock_univ3_factory.address,
+            "observationCardinalityMinimum": 7200,
+            "owner": bob.address,
+        },
+        "enableLeverage": [200000, 250000],
+        "pools": [
+            {
+                "tokenA": rando_univ3_pool.token1(),
+                "tokenB": rando_univ3_pool.token0(),
+                "maintenance": maintenance,
+                "uniswapV3Fee": rando_univ3_pool.fee(),
+            }
+            for maintenance in (200000, 250000, 1000000)
+        ]
+        + [
+            {
+                "tokenA": mock_univ3_pool.token0(),
+                "tokenB": mock_univ3_pool.token1(),
+                "maintenance": 500000,
+                "uniswapV3Fee": mock_univ3_pool.fee(),
+            }
+        ],
+    }
+
+
+def test_deploy_create_address__matches_deployment(admin):
+    address = deploy.create_address(admin.address, admin.nonce)
+    token = project.Token.deploy("C", 18, sender=admin)
+    assert token.address == address
+
+
+def test_deploy_manifest__deploys_all(tmp_path, manifest, admin, bob):
+    nonce = admin.nonce
+    deployment = deploy.deploy_manifest(
+        manifest, admin, os.path.join(tmp_path, "state.json")
+    )
+
+    assert [step.kind for step in deployment.steps] == [
+        "MarginalV1PoolDeployer",
+        "MarginalV1Factory",
+        "enableLeverage",
+    ] + ["createPool"] * 4 + ["setOwner"]
+    assert [step.nonce for step in deployment.steps] == list(
+        range(nonce, nonce + len(deployment.steps))
+    )
+    assert all(not step.failed for step in deployment.steps)
+    assert admin.nonce == nonce + len(deployment.steps)
+
+    factory = project.MarginalV1Factory.at(deployment.factory)
+    assert factory.marginalV1Deployer() == deployment.pool_deployer
+    assert factory.uniswapV3Factory() == manifest["factory"]["uniswapV3Factory"]
+    assert factory.observationCardinalityMinimum() == 7200
+    assert factory.getLeverage(200000) == 6000000
+    assert factory.owner() == bob.address
+
+    assert len(deployment.pools) == 4
+    for (token0, token1, maintenance, oracle), address in deployment.pools.items():
+        assert factory.getPool(token0, token1, maintenance, oracle) == address
+        pool = project.MarginalV1Pool.at(address)
+        assert pool.factory() == factory.address
+        assert pool.token0() == token0
+        assert pool.token1() == token1
+        assert pool.maintenance() == maintenance
+        assert pool.oracle() == oracle
+
+
+def test_deploy_manifest__when_rerun_sends_nothing(tmp_path, manifest, admin):
+    state_path = os.path.join(tmp_path, "state.json")
+    deployment = deploy.deploy_manifest(manifest, admin, state_path)
+
+    nonce = admin.nonce
+    rerun = deploy.deploy_manifest(manifest, admin, state_path)
+    assert rerun.steps == []
+    assert rerun.factory == deployment.factory
+    assert rerun.pools == deployment.pools
+    assert admin.nonce == nonce
+
+
+def test_deploy_manifest__when_pools_added_sends_only_new(tmp_path, manifest, admin):
+    state_path = os.path.join(tmp_path, "state.json")
+    pools = manifest["pools"]
+    deployment = deploy.deploy_manifest(
+        dict(manifest, pools=pools[:1]), admin, state_path
+    )
+    assert len(deployment.pools) == 1
+
+    rerun = deploy.deploy_manifest(manifest, admin, state_path)
+    assert [step.kind for step in rerun.steps] == ["createPool"] * 3
+    assert all(not step.failed for step in rerun.steps)
+    assert rerun.factory == deployment.factory
+    assert len(rerun.pools) == 4
+
+
+def test_deploy_manifest__resumes_after_failed_transactions(
+    tmp_path, manifest, admin, bob
+):
+    state_path = os.path.join(tmp_path, "state.json")
+    gas_limits = {"createPool": 100000}
+    deployment = deploy.deploy_manifest(
+        dict(manifest, gasLimits=gas_limits), admin, state_path
+    )
+    failed = [step.kind for step in deployment.steps if step.failed]
+    assert failed == ["createPool"] * 4
+
+    factory = project.MarginalV1Factory.at(deployment.factory)
+    assert factory.owner() == bob.address
+
+    # owner changed so leverage tiers must already be enabled to resume
+    rerun = deploy.deploy_manifest(manifest, admin, state_path)
+    assert [step.kind for step in rerun.steps] == ["createPool"] * 4
+    assert all(not step.failed for step in rerun.steps)
+    assert rerun.factory == deployment.factory
+    assert rerun.pools == deployment.pools
+    for key, address in rerun.pools.items():
+        assert factory.getPool(*key) == address
+
+
+def test_deploy_manifest__raises_when_no_oracle(tmp_path, manifest, admin):
+    nonce = admin.nonce
+    pool = dict(manifest["pools"][0], uniswapV3Fee=3000)
+    with pytest.raises(ValueError, match="No Uniswap v3 pool"):
+        deploy.deploy_manifest(
+            dict(manifest, pools=[pool]), admin, os.path.join(tmp_path, "state.json")
+        )
+    assert admin.nonce == nonce
+
+
+def test_deploy_manifest__raises_when_leverage_not_enabled(tmp_path, manifest, admin):
+    nonce = admin.nonce
+    with pytest.raises(ValueError, match="Leverage not enabled"):
+        deploy.deploy_manifest(
+            dict(manifest, enableLeverage=[]),
+            admin,
+            os.path.join(tmp_path, "state.json"),
+        )
+    assert admin.nonce == nonce
@@ -1,10 +1,19 @@
 import pytest
 
-from hypothesis import given
+from hypothesis import given, settings
 from hypothesis import strategies as st
+from datetime import timedelta
 from math import sqrt
 
+from marginal_math.liquidity_math import to_amounts
 from utils.constants import MIN_SQRT_RATIO, MAX_SQRT_RATIO
+from utils.fuzz import (
+    BLOCK_SIZE,
+    SUPPRESS_HEALTH_CHECK,
+    assert_batch_equal,
+    blocks,
+    reference_many,
+)
 from utils.utils import calc_amounts_from_liquidity_sqrt_price_x96
 
 
@@ -35,3 +44,25 @@ def test_liquidity_math_to_amounts__with_fuzz(
     )
     result = liquidity_math_lib.toAmounts(liquidity, sqrt_price_x96)
     assert result == (amount0, amount1)
+
+
+@pytest.mark.fuzzing
+@settings(
+    deadline=timedelta(milliseconds=5000),
+    max_examples=10000 // BLOCK_SIZE,
+    suppress_health_check=SUPPRESS_HEALTH_CHECK,
+)
+@given(
+    block=blocks(
+        liquidity=st.integers(min_value=1, max_value=2**128 - 1),
+        sqrt_price_x96=st.integers(min_value=MIN_SQRT_RATIO, max_value=MAX_SQRT_RATIO),
+    )
+)
+def test_liquidity_math_to_amounts__with_fuzz_batch(liquidity_math_lib, block):
+    columns = (block["liquidity"], block["sqrt_price_x96"])
+    (ok, amount0s, amount1s) = liquidity_math_lib.toAmountsBatch(*columns)
+    (expected_ok, expected0, expected1) = reference_many(
+        to_amounts, *columns, outputs=2
+    )
+    assert_batch_equal(ok, amount0s, expected_ok, expected0)
+    assert_batch_equal(ok, amount1s, expected_ok, expected1)
@@ -4,6 +4,7 @@ from hypothesis import given, settings, strategies as st
 from datetime import timedelta
 from math import sqrt
 
+from marginal_math.position import Info, safe
 from utils.constants import (
     MAINTENANCE_UNIT,
     FUNDING_PERIOD,
@@ -16,6 +17,13 @@ from utils.constants import (
     MINIMUM_LIQUIDITY,
     MINIMUM_SIZE,
 )
+from utils.fuzz import (
+    BLOCK_SIZE,
+    SUPPRESS_HEALTH_CHECK,
+    assert_batch_equal,
+    blocks,
+    reference_many,
+)
 from utils.utils import (
     calc_sqrt_price_x96_next_open,
     calc_tick_from_sqrt_price_x96,
@@ -698,3 +706,50 @@ def test_position_safe__with_fuzz(
     safe = position.margin >= calc_oracle_margin_min
     result = position_lib.safe(position, _oracle_sqrt_price_x96, maintenance)
     assert result == safe
+
+
+@pytest.mark.fuzzing
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@settings(
+    deadline=timedelta(milliseconds=5000),
+    max_examples=10000 // BLOCK_SIZE,
+    suppress_health_check=SUPPRESS_HEALTH_CHECK,
+)
+@given(
+    block=blocks(
+        size=st.integers(min_value=0, max_value=2**128 - 1),
+        debt0=st.integers(min_value=0, max_value=2**128 - 1),
+        debt1=st.integers(min_value=0, max_value=2**128 - 1),
+        margin=st.integers(min_value=0, max_value=2**128 - 1),
+        zero_for_one=st.booleans(),
+        sqrt_price_x96=st.integers(
+            min_value=MIN_SQRT_RATIO, max_value=MAX_SQRT_RATIO - 1
+        ),
+    )
+)
+def test_position_safe__with_fuzz_batch(position_lib, block, maintenance):
+    positions = [
+        Info(
+            size=size,
+            debt0=debt0,
+            debt1=debt1,
+            margin=margin,
+            zero_for_one=zero_for_one,
+        )
+        for (size, debt0, debt1, margin, zero_for_one) in zip(
+            block["size"],
+            block["debt0"],
+            block["debt1"],
+            block["margin"],
+            block["zero_for_one"],
+        )
+    ]
+    (ok, results) = position_lib.safeBatch(
+        [position.to_struct() for position in positions],
+        block["sqrt_price_x96"],
+        maintenance,
+    )
+    (expected_ok, expected) = reference_many(
+        safe, positions, block["sqrt_price_x96"], maintenance=maintenance
+    )
+    assert_batch_equal(ok, results, expected_ok, expected)
@@ -1,10 +1,19 @@
 import pytest
 
-from hypothesis import given
+from hypothesis import given, settings
 from hypothesis import strategies as st
+from datetime import timedelta
 from math import sqrt
 
+from marginal_math.sqrt_price_math import sqrt_price_x96_next_open
 from utils.constants import MIN_SQRT_RATIO, MAX_SQRT_RATIO, MINIMUM_LIQUIDITY
+from utils.fuzz import (
+    BLOCK_SIZE,
+    SUPPRESS_HEALTH_CHECK,
+    assert_batch_equal,
+    blocks,
+    reference_many,
+)
 from utils.utils import calc_sqrt_price_x96_next_open
 
 
@@ -100,3 +109,36 @@ def test_sqrt_price_math_sqrt_price_x96_next_open__with_fuzz(
     )
 
     assert pytest.approx(result_x96, rel=1e-9, abs=1) == sqrt_price_x96_next
+
+
+@pytest.mark.fuzzing
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@settings(
+    deadline=timedelta(milliseconds=5000),
+    max_examples=10000 // BLOCK_SIZE,
+    suppress_health_check=SUPPRESS_HEALTH_CHECK,
+)
+@given(
+    block=blocks(
+        liquidity=st.integers(min_value=MINIMUM_LIQUIDITY, max_value=2**128 - 1),
+        liquidity_delta=st.integers(min_value=1, max_value=2**128 - 1),
+        sqrt_price_x96=st.integers(
+            min_value=MIN_SQRT_RATIO + 1, max_value=MAX_SQRT_RATIO - 1
+        ),
+        zero_for_one=st.booleans(),
+    )
+)
+def test_sqrt_price_math_sqrt_price_x96_next_open__with_fuzz_batch(
+    sqrt_price_math_lib, block, maintenance
+):
+    columns = (
+        block["liquidity"],
+        block["sqrt_price_x96"],
+        block["liquidity_delta"],
+        block["zero_for_one"],
+    )
+    (ok, results) = sqrt_price_math_lib.sqrtPriceX96NextOpenBatch(*columns, maintenance)
+    (expected_ok, expected) = reference_many(
+        sqrt_price_x96_next_open, *columns, maintenance=maintenance
+    )
+    assert_batch_equal(ok, results, expected_ok, expected)
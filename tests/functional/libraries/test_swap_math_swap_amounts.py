@@ -4,7 +4,15 @@ from hypothesis import given, settings, strategies as st
 from datetime import timedelta
 from math import sqrt
 
+from marginal_math.swap_math import swap_amounts
 from utils.constants import MIN_SQRT_RATIO, MAX_SQRT_RATIO, MINIMUM_LIQUIDITY
+from utils.fuzz import (
+    BLOCK_SIZE,
+    SUPPRESS_HEALTH_CHECK,
+    assert_batch_equal,
+    blocks,
+    reference_many,
+)
 from utils.utils import calc_swap_amounts
 
 
@@ -120,3 +128,34 @@ def test_swap_math_swap_amounts__with_fuzz(
     result = swap_math_lib.swapAmounts(liquidity, sqrt_price_x96, sqrt_price_x96_next)
     assert pytest.approx(result[0], rel=1e-15, abs=1) == amount0_delta
     assert pytest.approx(result[1], rel=1e-15, abs=1) == amount1_delta
+
+
+@pytest.mark.fuzzing
+@settings(
+    deadline=timedelta(milliseconds=5000),
+    max_examples=10000 // BLOCK_SIZE,
+    suppress_health_check=SUPPRESS_HEALTH_CHECK,
+)
+@given(
+    block=blocks(
+        liquidity=st.integers(min_value=MINIMUM_LIQUIDITY, max_value=2**128 - 1),
+        sqrt_price_x96=st.integers(
+            min_value=MIN_SQRT_RATIO, max_value=MAX_SQRT_RATIO - 1
+        ),
+        sqrt_price_x96_next=st.integers(
+            min_value=MIN_SQRT_RATIO, max_value=MAX_SQRT_RATIO - 1
+        ),
+    )
+)
+def test_swap_math_swap_amounts__with_fuzz_batch(swap_math_lib, block):
+    columns = (
+        block["liquidity"],
+        block["sqrt_price_x96"],
+        block["sqrt_price_x96_next"],
+    )
+    (ok, amount0_deltas, amount1_deltas) = swap_math_lib.swapAmountsBatch(*columns)
+    (expected_ok, expected0, expected1) = reference_many(
+        swap_amounts, *columns, outputs=2
+    )
+    assert_batch_equal(ok, amount0_deltas, expected_ok, expected0)
+    assert_batch_equal(ok, amount1_deltas, expected_ok, expected1)
@@ -0,0 +1,115 @@
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+
+from marginal_math import position as position_math
+from marginal_math.batch import PositionColumns, safe_many
+from marginal_math.constants import MAINTENANCE_UNIT, MINIMUM_SIZE
+
+
+@pytest.fixture
+def positions_near_boundary():
+    def positions_near_boundary(sqrt_price_x96, maintenance):
+        positions = []
+        for zero_for_one in [False, True]:
+            for debt in [MINIMUM_SIZE, 2**64 + 1, 2**100 + 3, 2**127 - 1]:
+                adjusted = (debt * (MAINTENANCE_UNIT + maintenance)) // MAINTENANCE_UNIT
+                collateral = (
+                    (((adjusted * sqrt_price_x96) >> 96) * sqrt_price_x96) >> 96
+                    if zero_for_one
+                    else (((adjusted << 96) // sqrt_price_x96) << 96) // sqrt_price_x96
+                )
+                for delta in range(-3, 4):
+                    positions.append(
+                        position_math.Info(
+                            size=max(collateral + delta, 1),
+                            debt0=debt,
+                            debt1=debt,
+                            zero_for_one=zero_for_one,
+                        )
+                    )
+        return positions
+
+    yield positions_near_boundary
+
+
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@pytest.mark.parametrize(
+    "sqrt_price_x96", [2**80 + 7, 2**96, 3 * 2**96 // 2, 2**112]
+)
+def test_marginal_math_batch_safe_many__near_boundary(
+    positions_near_boundary, sqrt_price_x96, maintenance
+):
+    positions = positions_near_boundary(sqrt_price_x96, maintenance)
+    mask = safe_many(positions, sqrt_price_x96, maintenance)
+    assert list(mask) == [
+        position_math.safe(position, sqrt_price_x96, maintenance)
+        for position in positions
+    ]
+
+
+def test_marginal_math_batch_safe_many__with_position_lib(position_lib):
+    maintenance = 250000
+    sqrt_price_x96 = 1 << 96
+    positions = [
+        position_math.Info(
+            size=size,
+            margin=margin,
+            debt0=debt,
+            debt1=debt,
+            zero_for_one=zero_for_one,
+        )
+        for zero_for_one in [False, True]
+        for (size, margin, debt) in [
+            (2**70, 0, 2**70),
+            (2**70, 2**68, 2**70),
+            (MINIMUM_SIZE, MINIMUM_SIZE, MINIMUM_SIZE),
+        ]
+    ]
+    mask = safe_many(PositionColumns.from_infos(positions), sqrt_price_x96, maintenance)
+    assert list(mask) == [
+        position_lib.safe(position.to_struct(), sqrt_price_x96, maintenance)
+        for position in positions
+    ]
+
+
+def test_marginal_math_batch_safe_many__with_empty():
+    assert len(safe_many([], 1 << 96, 250000)) == 0
+
+
+@pytest.mark.fuzzing
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@settings(deadline=timedelta(milliseconds=2000), max_examples=1000)
+@given(
+    rows=st.lists(
+        st.tuples(
+            st.integers(min_value=MINIMUM_SIZE, max_value=2**128 - 1),
+            st.integers(min_value=MINIMUM_SIZE, max_value=2**128 - 1),
+            st.integers(min_value=0, max_value=2**127 - 1),
+            st.booleans(),
+        ),
+        min_size=1,
+        max_size=100,
+    ),
+    sqrt_price_x96=st.integers(
+        min_value=4295128739,
+        max_value=1461446703485210103287273052203988822378723970341,
+    ),
+)
+def test_marginal_math_batch_safe_many__with_fuzz(rows, sqrt_price_x96, maintenance):
+    positions = [
+        position_math.Info(
+            size=size,
+            debt0=debt,
+            debt1=debt,
+            margin=margin,
+            zero_for_one=zero_for_one,
+        )
+        for (size, debt, margin, zero_for_one) in rows
+    ]
+    mask = safe_many(positions, sqrt_price_x96, maintenance)
+    assert list(mask) == [
+        position_math.safe(position, sqrt_price_x96, maintenance)
+        for position in positions
+    ]
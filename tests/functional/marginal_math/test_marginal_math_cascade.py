@@ -0,0 +1,126 @@
+from copy import deepcopy
+
+from marginal_math import position as position_math
+from marginal_math.cascade import CascadeSimulator
+from marginal_math.constants import MAX_SQRT_RATIO, MIN_SQRT_RATIO
+from marginal_math.pool import PoolSimulator
+from marginal_math.quoter import quote_open
+from marginal_math.univ3_oracle import UniswapV3Oracle
+
+BLOCK_TIMESTAMP = 1684761803
+MAINTENANCE = 250000
+
+
+def make_sim(n):
+    oracle = UniswapV3Oracle(
+        BLOCK_TIMESTAMP - 86400, 0, liquidity=2**64, observation_cardinality_next=100
+    )
+    oracle.block_timestamp = BLOCK_TIMESTAMP
+    sim = PoolSimulator(MAINTENANCE, oracle, block_timestamp=BLOCK_TIMESTAMP)
+    sim.mint("alice", 10**22)
+
+    # positions with margin increasing from the minimum, alternating sides
+    for i in range(n):
+        zero_for_one = i % 2 == 0
+        quote = quote_open(sim._state_synced(), MAINTENANCE, zero_for_one, 10**19)
+        sim.open(
+            "bob",
+            zero_for_one,
+            10**19,
+            MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1,
+            quote.margin_minimum * (100 + 4 * (i // 2)) // 100,
+            10**17,
+        )
+    return sim
+
+
+def shock(sim, tick):
+    sim.block_timestamp += 12
+    sim.oracle.swap(sim.block_timestamp, tick, 2**64)
+
+
+def unsafe_by_scan(sim):
+    state = sim._state_synced()
+    (oracle_tick_cumulative_last, oracle_sqrt_price_x96_last) = sim._oracle_synced()
+    unsafe = set()
+    for key, position in sim.positions.items():
+        if position.size == 0:
+            continue
+        synced = position_math.sync(
+            position,
+            state.block_timestamp,
+            state.tick_cumulative,
+            oracle_tick_cumulative_last,
+            sim.tick_cumulative_rate_max,
+            sim.funding_period,
+        )
+        if not position_math.safe(synced, oracle_sqrt_price_x96_last, sim.maintenance):
+            unsafe.add(key)
+    return unsafe
+
+
+def test_marginal_math_cascade_run__when_no_shock():
+    sim = make_sim(10)
+    cascade = CascadeSimulator(sim)
+    rounds = cascade.run()
+    assert len(rounds) == 2
+    assert cascade.liquidated == []
+    assert rounds[-1].sqrt_price_x96 == sim.state.sqrt_price_x96
+
+
+def test_marginal_math_cascade_run__with_shock():
+    sim = make_sim(20)
+    shock(sim, -2231)  # ~20% oracle price drop
+    positions = deepcopy(sim.positions)
+
+    cascade = CascadeSimulator(sim, period=600)
+    rounds = cascade.run()
+    assert len(cascade.liquidated) > 0
+    assert all(key[1] % 2 == 1 for key in cascade.liquidated)  # oneForZero only
+
+    # snapshot leaves the simulator untouched
+    assert sim.positions == positions
+
+    # each round starts at the pool price the last left off at
+    for previous, cascade_round in zip(rounds, rounds[1:]):
+        assert cascade_round.sqrt_price_x96_start == previous.sqrt_price_x96
+        assert cascade_round.block_timestamp == previous.block_timestamp + 600
+
+    # returning oneForZero amounts locked lowers the pool price
+    for cascade_round in rounds:
+        if cascade_round.liquidated:
+            assert cascade_round.sqrt_price_x96 < cascade_round.sqrt_price_x96_start
+
+    # fixed point once the TWAP has settled at the shocked price
+    assert len(rounds[-1].liquidated) == 0
+    assert rounds[-1].oracle_sqrt_price_x96 == rounds[-2].oracle_sqrt_price_x96
+    assert unsafe_by_scan(cascade.sim) == set()
+
+
+def test_marginal_math_cascade_step__matches_scan():
+    sim = make_sim(20)
+    shock(sim, 2231)  # ~20% oracle price rise
+    reference = deepcopy(sim)
+
+    cascade = CascadeSimulator(sim, period=1800)
+    for _ in range(30):
+        reference.block_timestamp += 1800
+        reference.oracle.block_timestamp = reference.block_timestamp
+        unsafe = unsafe_by_scan(reference)
+        if unsafe:
+            reference.liquidate_many(
+                "cascade",
+                [owner for (owner, _) in sorted(unsafe)],
+                [id for (_, id) in sorted(unsafe)],
+            )
+
+        cascade_round = cascade.step()
+        assert set(cascade_round.liquidated) == unsafe
+
+        # queued furthest past the boundary first, i.e. least margin first
+        assert cascade_round.liquidated == sorted(
+            cascade_round.liquidated, key=lambda key: key[1]
+        )
+
+    assert len(cascade.liquidated) > 0
+    assert all(key[1] % 2 == 0 for key in cascade.liquidated)  # zeroForOne only
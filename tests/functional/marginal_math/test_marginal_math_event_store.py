@@ -0,0 +1,151 @@
+import numpy as np
+import os
+import pytest
+
+from types import SimpleNamespace
+
+from marginal_math.event_store import EventStore, SCHEMAS, from_limbs, to_limbs
+
+POOLS = (
+    "0x000000000000000000000000000000000000000A",
+    "0x000000000000000000000000000000000000000b",
+)
+
+
+def make_swaps(rng, n, block_start):
+    blocks = block_start + np.sort(rng.integers(0, 10 * n, size=n))
+    return [
+        SimpleNamespace(
+            event_name="Swap",
+            block_number=int(block),
+            log_index=i,
+            contract_address=POOLS[int(rng.integers(0, 2))],
+            sender=POOLS[0],
+            recipient=POOLS[1],
+            amount0=int(rng.integers(-(2**62), 2**62)) * 2**100,
+            amount1=-int(rng.integers(0, 2**62)),
+            sqrtPriceX96=int(rng.integers(1, 2**62)) * 2**96 + i,
+            liquidity=int(rng.integers(0, 2**62)) * 2**64,
+            tick=int(rng.integers(-887272, 887272)),
+        )
+        for i, block in enumerate(blocks)
+    ]
+
+
+@pytest.mark.parametrize("kind", ["uint96", "uint128", "uint160", "uint256", "int256"])
+def test_marginal_math_event_store_limbs(kind):
+    bits = int(kind.lstrip("uint"))
+    values = [0, 1, 2**64 - 1, 2**64, 2 ** (bits - 1) - 1]
+    if kind.startswith("int"):
+        values += [-1, -(2**64), -(2 ** (bits - 1))]
+    else:
+        values += [2**bits - 1]
+    limbs = to_limbs(values, kind)
+    assert limbs.dtype == np.uint64
+    assert from_limbs(limbs, kind).tolist() == values
+
+
+def test_marginal_math_event_store_append_logs(tmp_path):
+    rng = np.random.default_rng(0)
+    logs = make_swaps(rng, 500, 100)
+    store = EventStore(str(tmp_path))
+    store.append_logs(logs[:200])
+    store.append_logs(logs[200:])
+
+    table = store.table("Swap")
+    assert len(table) == 500
+    assert isinstance(table["block"], np.memmap)
+    assert table["sqrtPriceX96"].shape == (500, 3)
+    assert table["block"].tolist() == [log.block_number for log in logs]
+    assert table["tick"].tolist() == [log.tick for log in logs]
+    assert table["sender"][0] == bytes.fromhex(POOLS[0][2:])
+    for name in ("amount0", "amount1", "sqrtPriceX96", "liquidity"):
+        expected = [getattr(log, name) for log in logs]
+        assert table.ints(name).tolist() == expected
+        assert np.allclose(table.floats(name), np.array(expected, dtype=np.float64))
+
+    # persisted across reopen
+    store = EventStore(str(tmp_path))
+    assert store.table("Swap").ints("amount0").tolist() == [log.amount0 for log in logs]
+    assert len(store.table("Open")) == 0
+
+
+def test_marginal_math_event_store_range(tmp_path):
+    rng = np.random.default_rng(1)
+    logs = make_swaps(rng, 1000, 0)
+    store = EventStore(str(tmp_path))
+    store.append_logs(logs)
+
+    for start, stop in ((0, 10000), (2000, 5000), (5000, 2000), (10**6, 10**7)):
+        table = store.range("Swap", start, stop)
+        expected = [log for log in logs if start <= log.block_number <= stop]
+        assert table["log_index"].tolist() == [log.log_index for log in expected]
+        if len(table) > 0:
+            assert isinstance(table["block"], np.memmap)
+
+        table = store.range("Swap", start, stop, pool=POOLS[1])
+        expected = [log for log in expected if log.contract_address == POOLS[1]]
+        assert table["log_index"].tolist() == [log.log_index for log in expected]
+
+    assert len(store.range("Swap", 0, 10**7, pool="0xunknown")) == 0
+
+
+def test_marginal_math_event_store_append__when_out_of_order(tmp_path):
+    rng = np.random.default_rng(2)
+    logs = make_swaps(rng, 10, 100)
+    store = EventStore(str(tmp_path))
+    store.append_logs(logs[5:])
+    with pytest.raises(ValueError):
+        store.append_logs(logs[:5])
+
+    rows = {name: [] for name in ["block", "log_index", "pool"]}
+    rows.update({name: [] for name, _ in SCHEMAS["Open"]})
+    with pytest.raises(ValueError):
+        store.append(
+            "Open",
+            {
+                **{name: [0, 0] for name in rows},
+                "block": [10**6 + 1, 10**6],
+                "log_index": [0, 0],
+                "pool": list(POOLS),
+                "sender": list(POOLS),
+                "owner": list(POOLS),
+            },
+        )
+    assert len(store.table("Open")) == 0
+
+
+def test_marginal_math_event_store_init__truncates_interrupted_append(tmp_path):
+    rng = np.random.default_rng(3)
+    logs = make_swaps(rng, 10, 100)
+    store = EventStore(str(tmp_path))
+    store.append_logs(logs)
+
+    # partial rows written without advancing the count
+    with open(os.path.join(str(tmp_path), "Swap", "block.bin"), "ab") as f:
+        f.write(b"\x01" * 12)
+
+    store = EventStore(str(tmp_path))
+    assert os.path.getsize(os.path.join(str(tmp_path), "Swap", "block.bin")) == 80
+    assert store.table("Swap")["block"].tolist() == [log.block_number for log in logs]
+
+
+def test_marginal_math_event_store_append__when_invalid_value(tmp_path):
+    rng = np.random.default_rng(4)
+    logs = make_swaps(rng, 3, 100)
+    store = EventStore(str(tmp_path))
+    store.append_logs(logs[:1])
+
+    # later columns fail to convert after earlier ones succeed
+    for bad in (
+        SimpleNamespace(**dict(vars(logs[1]), tick=2**23)),
+        SimpleNamespace(**dict(vars(logs[1]), recipient="0xnot an address")),
+    ):
+        with pytest.raises(ValueError):
+            store.append_logs([bad])
+
+    store.append_logs(logs[2:])
+    table = store.table("Swap")
+    assert table["block"].tolist() == [logs[0].block_number, logs[2].block_number]
+    assert table["tick"].tolist() == [logs[0].tick, logs[2].tick]
+    assert table.ints("amount0").tolist() == [logs[0].amount0, logs[2].amount0]
@@ -0,0 +1,102 @@
+import pytest
+
+from marginal_math.indexer import (
+    Checkpoint,
+    PositionLog,
+    PositionStore,
+    fold,
+)
+from marginal_math import position as position_math
+from marginal_math.position import Info
+
+
+@pytest.fixture
+def position():
+    return Info(
+        size=2**120 + 1,
+        debt0=2**100,
+        debt1=3,
+        insurance0=4,
+        insurance1=5,
+        zero_for_one=True,
+        liquidated=False,
+        tick=-200000,
+        block_timestamp=1684761803,
+        tick_cumulative_delta=-(2**50),
+        margin=2**127,
+        liquidity_locked=2**80,
+        rewards=2**200,
+    )
+
+
+def test_marginal_math_indexer_fold__reads_open_once(position):
+    reads = []
+
+    def read(key, block_number):
+        reads.append((key, block_number))
+        return position
+
+    logs = [
+        PositionLog("Open", "alice", 1, 10, 0),
+        PositionLog("Adjust", "alice", 1, 11, 0, margin_after=7),
+        PositionLog("Adjust", "bob", 0, 11, 1, margin_after=8),
+    ]
+    positions = {("bob", 0): Info(size=1, margin=2)}
+    changed = fold(positions, logs, read, 12)
+
+    assert reads == [(("alice", 1), 12)]
+    assert changed == {("alice", 1): position, ("bob", 0): Info(size=1, margin=8)}
+    assert positions == changed
+
+
+def test_marginal_math_indexer_fold__applies_adjust_in_log_order():
+    logs = [
+        PositionLog("Adjust", "bob", 0, 11, 2, margin_after=9),
+        PositionLog("Adjust", "bob", 0, 11, 1, margin_after=8),
+    ]
+    positions = {("bob", 0): Info(size=1, margin=2)}
+    fold(positions, logs, None, 12)
+    assert positions[("bob", 0)].margin == 9
+
+
+def test_marginal_math_indexer_fold__settles_and_liquidates_without_read(position):
+    def read(key, block_number):
+        assert key == ("alice", 1)
+        return position
+
+    logs = [
+        PositionLog("Open", "alice", 1, 11, 0),
+        PositionLog("Settle", "alice", 1, 11, 1),
+        PositionLog("Adjust", "bob", 0, 11, 2, margin_after=8),
+        PositionLog("Liquidate", "bob", 0, 11, 3),
+        PositionLog("Settle", "carol", 2, 11, 4),
+    ]
+    positions = {("bob", 0): position, ("carol", 2): position}
+    changed = fold(positions, logs, read, 12, read_event_names=("Open",))
+
+    assert changed == {
+        ("alice", 1): position,
+        ("bob", 0): position_math.liquidate(position),
+        ("carol", 2): position_math.settle(position),
+    }
+    assert changed[("bob", 0)].size == 0 and changed[("bob", 0)].liquidated
+    assert changed[("carol", 2)].liquidity_locked == 0
+    assert position.margin == 2**127  # adjusted a copy
+
+
+def test_marginal_math_indexer_store__commits_and_loads(tmp_path, position):
+    path = str(tmp_path / "positions.db")
+    store = PositionStore(path, "pool")
+    assert store.checkpoint() is None
+    assert store.load() == {}
+
+    checkpoint = Checkpoint(100, "0xabc")
+    store.commit(checkpoint, {("alice", 1): position, ("bob", 2**62): Info()})
+    store.close()
+
+    store = PositionStore(path, "pool")
+    assert store.checkpoint() == checkpoint
+    assert store.load() == {("alice", 1): position, ("bob", 2**62): Info()}
+
+    with pytest.raises(ValueError):
+        PositionStore(path, "another_pool")
@@ -0,0 +1,168 @@
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+
+from marginal_math import position as position_math
+from marginal_math.constants import (
+    FUNDING_PERIOD,
+    MAX_SQRT_RATIO,
+    MIN_SQRT_RATIO,
+    MINIMUM_SIZE,
+    TICK_CUMULATIVE_RATE_MAX,
+)
+from marginal_math.liquidation_index import (
+    LiquidationIndex,
+    liquidation_sqrt_price_x96,
+)
+
+
+def unsafe_by_scan(
+    positions,
+    oracle_sqrt_price_x96,
+    maintenance,
+    block_timestamp,
+    tick_cumulative,
+    oracle_tick_cumulative,
+):
+    unsafe = set()
+    for key, position in positions.items():
+        synced = position_math.sync(
+            position,
+            block_timestamp,
+            tick_cumulative,
+            oracle_tick_cumulative,
+            TICK_CUMULATIVE_RATE_MAX,
+            FUNDING_PERIOD,
+        )
+        if not position_math.safe(synced, oracle_sqrt_price_x96, maintenance):
+            unsafe.add(key)
+    return unsafe
+
+
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@pytest.mark.parametrize("zero_for_one", [False, True])
+@pytest.mark.parametrize("margin_factor", [0, 1, 10])
+@pytest.mark.parametrize("size", [MINIMUM_SIZE, 2**64 + 1, 2**120])
+def test_marginal_math_liquidation_index_liquidation_sqrt_price_x96(
+    zero_for_one, maintenance, margin_factor, size
+):
+    position = position_math.Info(
+        size=size,
+        debt0=size,
+        debt1=size,
+        margin=(size * margin_factor) // 10,
+        zero_for_one=zero_for_one,
+    )
+    threshold = liquidation_sqrt_price_x96(position, maintenance)
+    assert threshold >= MIN_SQRT_RATIO - 1 and threshold <= MAX_SQRT_RATIO
+
+    if not zero_for_one:
+        # least safe sqrt price
+        if threshold > MIN_SQRT_RATIO:
+            assert not position_math.safe(position, threshold - 1, maintenance)
+        if threshold < MAX_SQRT_RATIO:
+            assert position_math.safe(position, threshold, maintenance)
+    else:
+        # greatest safe sqrt price
+        if threshold >= MIN_SQRT_RATIO:
+            assert position_math.safe(position, threshold, maintenance)
+        if threshold < MAX_SQRT_RATIO - 1:
+            assert not position_math.safe(position, threshold + 1, maintenance)
+
+
+def test_marginal_math_liquidation_index_update__returns_newly_unsafe():
+    maintenance = 250000
+    index = LiquidationIndex(maintenance)
+    positions = {}
+    for id, zero_for_one in enumerate([False, True]):
+        position = position_math.Info(
+            size=10**18,
+            debt0=10**18,
+            debt1=10**18,
+            margin=10**18 // 2,
+            zero_for_one=zero_for_one,
+        )
+        positions[id] = position
+        index.add(id, position)
+
+    # safe at initial price
+    sqrt_price_x96 = 1 << 96
+    assert index.update(sqrt_price_x96, 0, 0, 0) == []
+
+    # oneForZero unsafe once price falls below threshold
+    threshold = liquidation_sqrt_price_x96(positions[0], maintenance)
+    assert index.update(threshold - 1, 0, 0, 0) == [0]
+    assert index.update(threshold - 2, 0, 0, 0) == []  # already reported
+
+    # zeroForOne unsafe once price rises above threshold
+    threshold = liquidation_sqrt_price_x96(positions[1], maintenance)
+    assert index.update(threshold + 1, 0, 0, 0) == [1]
+
+    index.remove(1)
+    assert len(index) == 1 and 1 not in index
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=2000), max_examples=200)
+@given(
+    rows=st.lists(
+        st.tuples(
+            st.integers(min_value=10**15, max_value=10**18),
+            st.integers(min_value=900, max_value=1100),
+            st.integers(min_value=100, max_value=500),
+            st.booleans(),
+        ),
+        min_size=1,
+        max_size=50,
+    ),
+    steps=st.lists(
+        st.tuples(
+            st.integers(min_value=12, max_value=86400),
+            st.integers(min_value=-100, max_value=100),
+            st.integers(min_value=-100, max_value=100),
+            st.integers(min_value=-500, max_value=500),
+        ),
+        min_size=1,
+        max_size=20,
+    ),
+)
+def test_marginal_math_liquidation_index_update__with_fuzz(rows, steps):
+    maintenance = 250000
+    index = LiquidationIndex(maintenance)
+    positions = {}
+    for id, (size, debt_bps, margin_bps, zero_for_one) in enumerate(rows):
+        position = position_math.Info(
+            size=size,
+            debt0=size * debt_bps // 1000,
+            debt1=size * debt_bps // 1000,
+            margin=size * margin_bps // 1000,
+            zero_for_one=zero_for_one,
+        )
+        positions[id] = position
+        index.add(id, position)
+
+    block_timestamp = 0
+    tick_cumulative = 0
+    oracle_tick_cumulative = 0
+    sqrt_price_x96 = 1 << 96
+    unsafe_last = set()
+    for time_delta, tick, oracle_tick, price_bps in steps:
+        block_timestamp += time_delta
+        tick_cumulative += tick * time_delta
+        oracle_tick_cumulative += oracle_tick * time_delta
+        sqrt_price_x96 = sqrt_price_x96 * (100000 + price_bps) // 100000
+
+        newly = index.update(
+            sqrt_price_x96, block_timestamp, tick_cumulative, oracle_tick_cumulative
+        )
+        unsafe = unsafe_by_scan(
+            positions,
+            sqrt_price_x96,
+            maintenance,
+            block_timestamp,
+            tick_cumulative,
+            oracle_tick_cumulative,
+        )
+        assert set(newly) == unsafe - unsafe_last
+        unsafe_last = unsafe
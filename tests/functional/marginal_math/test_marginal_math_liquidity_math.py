@@ -0,0 +1,81 @@
+import pytest
+
+from ape import reverts
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+from math import sqrt
+
+from marginal_math.constants import MIN_SQRT_RATIO, MAX_SQRT_RATIO
+from marginal_math.errors import Revert
+from marginal_math.liquidity_math import (
+    liquidity_sqrt_price_x96_next,
+    to_amounts,
+    to_liquidity_sqrt_price_x96,
+)
+
+
+def test_marginal_math_to_amounts(liquidity_math_lib):
+    x = int(125.04e12)  # e.g. USDC reserves
+    y = int(71.70e21)  # e.g. WETH reserves
+    liquidity = int(sqrt(x * y))
+    sqrt_price_x96 = int(sqrt(y / x)) << 96
+
+    result = liquidity_math_lib.toAmounts(liquidity, sqrt_price_x96)
+    assert to_amounts(liquidity, sqrt_price_x96) == tuple(result)
+
+
+def test_marginal_math_to_liquidity_sqrt_price_x96(liquidity_math_lib):
+    x = int(125.04e12)  # e.g. USDC reserves
+    y = int(71.70e21)  # e.g. WETH reserves
+
+    # @dev exact where math.sqrt in utils drifts from OZ sqrt
+    result = liquidity_math_lib.toLiquiditySqrtPriceX96(x, y)
+    assert to_liquidity_sqrt_price_x96(x, y) == tuple(result)
+
+
+@pytest.mark.parametrize("amount0_pc", [-1, 0, 1])
+@pytest.mark.parametrize("amount1_pc", [-1, 0, 1])
+def test_marginal_math_liquidity_sqrt_price_x96_next(
+    liquidity_math_lib, amount0_pc, amount1_pc
+):
+    x = int(125.04e12)  # e.g. USDC reserves
+    y = int(71.70e21)  # e.g. WETH reserves
+    liquidity = int(sqrt(x * y))
+    sqrt_price_x96 = int(sqrt(y / x)) << 96
+
+    amount0 = x * amount0_pc // 100
+    amount1 = y * amount1_pc // 100
+    result = liquidity_math_lib.liquiditySqrtPriceX96Next(
+        liquidity, sqrt_price_x96, amount0, amount1
+    )
+    assert liquidity_sqrt_price_x96_next(
+        liquidity, sqrt_price_x96, amount0, amount1
+    ) == tuple(result)
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=2000), max_examples=10000)
+@given(
+    liquidity=st.integers(min_value=1, max_value=2**128 - 1),
+    sqrt_price_x96=st.integers(min_value=MIN_SQRT_RATIO, max_value=MAX_SQRT_RATIO - 1),
+    amount0=st.integers(min_value=-(2**128), max_value=2**128),
+    amount1=st.integers(min_value=-(2**128), max_value=2**128),
+)
+def test_marginal_math_liquidity_sqrt_price_x96_next__with_fuzz(
+    liquidity_math_lib, liquidity, sqrt_price_x96, amount0, amount1
+):
+    try:
+        calc = liquidity_sqrt_price_x96_next(
+            liquidity, sqrt_price_x96, amount0, amount1
+        )
+    except Revert:
+        with reverts():
+            liquidity_math_lib.liquiditySqrtPriceX96Next(
+                liquidity, sqrt_price_x96, amount0, amount1
+            )
+        return
+
+    result = liquidity_math_lib.liquiditySqrtPriceX96Next(
+        liquidity, sqrt_price_x96, amount0, amount1
+    )
+    assert calc == tuple(result)
@@ -0,0 +1,205 @@
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+
+from marginal_math import position as position_math
+from marginal_math.constants import FUNDING_PERIOD, Q192, TICK_CUMULATIVE_RATE_MAX
+from marginal_math.liquidity_math import to_amounts
+from marginal_math.nav import NAVEngine
+
+
+def claims_by_scan(
+    positions,
+    sqrt_price_x96,
+    block_timestamp,
+    tick_cumulative,
+    oracle_tick_cumulative,
+):
+    claims0 = 0
+    claims1 = 0
+    for position in positions.values():
+        if position.size == 0 or position.liquidated:
+            continue
+        synced = position_math.sync(
+            position,
+            block_timestamp,
+            tick_cumulative,
+            oracle_tick_cumulative,
+            TICK_CUMULATIVE_RATE_MAX,
+            FUNDING_PERIOD,
+        )
+        collateral = synced.size + synced.margin
+        settles = (
+            (collateral << 192) >= synced.debt0 * sqrt_price_x96**2
+            if synced.zero_for_one
+            else collateral * sqrt_price_x96**2 >= (synced.debt1 << 192)
+        )
+        if settles:
+            claims0 += synced.debt0 + synced.insurance0
+            claims1 += synced.debt1 + synced.insurance1
+        else:
+            (amount0, amount1) = position_math.amounts_locked(synced)
+            claims0 += amount0
+            claims1 += amount1
+    return (claims0, claims1)
+
+
+def make_position(size, debt_bps, margin_bps, zero_for_one, **kwargs):
+    return position_math.Info(
+        size=size,
+        debt0=size * debt_bps // 1000,
+        debt1=size * debt_bps // 1000,
+        insurance0=size // 100,
+        insurance1=size // 100,
+        margin=size * margin_bps // 1000,
+        zero_for_one=zero_for_one,
+        **kwargs,
+    )
+
+
+def engine_position(engine, key):
+    row = engine.rows[key]
+    return position_math.Info(
+        **{field: column[row] for field, column in engine.columns.items()},
+        zero_for_one=bool(engine.zero_for_one[row]),
+    )
+
+
+def test_marginal_math_nav_value__settles_at_mark():
+    engine = NAVEngine()
+    position = make_position(10**18, 1000, 500, True)
+    engine.update(0, position)
+
+    # collateral covers debt0 at price of one
+    valuation = engine.value(1 << 96, 10**18, 1 << 96, 10**18, 0, 0, 0)
+    assert valuation.claims0 == position.debt0 + position.insurance0
+    assert valuation.claims1 == position.debt1 + position.insurance1
+
+    # debt0 exceeds collateral once price doubles, so LPs keep amounts locked
+    valuation = engine.value(2 << 96, 10**18, 1 << 96, 10**18, 0, 0, 0)
+    assert (valuation.claims0, valuation.claims1) == position_math.amounts_locked(
+        position
+    )
+
+    (reserve0, reserve1) = to_amounts(10**18, 1 << 96)
+    assert valuation.reserve0 == reserve0 and valuation.reserve1 == reserve1
+    assert valuation.value1 == (valuation.amount0 * (2 << 96) ** 2) // Q192 + (
+        valuation.amount1
+    )
+    assert valuation.value1_per_share == valuation.value1 / 10**18
+
+
+def test_marginal_math_nav_values__marks_pool_and_oracle():
+    engine = NAVEngine()
+    engine.update(0, make_position(10**18, 1000, 200, False))
+
+    pool_sqrt_price_x96 = 1 << 96
+    oracle_sqrt_price_x96 = (1 << 96) // 2
+    (pool, oracle) = engine.values(
+        10**18, pool_sqrt_price_x96, oracle_sqrt_price_x96, 10**18, 0, 0, 0
+    )
+    assert pool.sqrt_price_x96 == pool_sqrt_price_x96
+    assert oracle.sqrt_price_x96 == oracle_sqrt_price_x96
+    assert (pool.reserve0, pool.reserve1) == (oracle.reserve0, oracle.reserve1)
+
+    # oneForZero settles at pool price but not once oracle price falls
+    assert (pool.claims0, pool.claims1) == claims_by_scan(
+        {0: engine_position(engine, 0)}, pool_sqrt_price_x96, 0, 0, 0
+    )
+    assert oracle.claims1 == engine_position(engine, 0).insurance1
+
+
+def test_marginal_math_nav_update__matches_from_positions():
+    positions = {
+        id: make_position(10**18 + id, 1000, 200 + id, id % 2 == 0)
+        for id in range(10)
+    }
+    engine = NAVEngine(capacity=2)
+    engine.update_many(positions)
+    assert len(engine) == 10
+
+    # adjust, settle and liquidate as events arrive
+    positions[3] = make_position(2 * 10**18, 900, 300, False)
+    engine.update(3, positions[3])
+    engine.update(5, position_math.settle(positions.pop(5)))
+    engine.update(0, position_math.liquidate(positions.pop(0)))
+    engine.remove(100)  # no op
+    assert len(engine) == 8 and 0 not in engine and 5 not in engine
+
+    expected = NAVEngine.from_positions(positions)
+    for sqrt_price_x96 in ((1 << 96) // 2, 1 << 96, 2 << 96):
+        assert engine.value(
+            sqrt_price_x96, 10**18, 1 << 96, 10**18, 0, 0, 0
+        ) == expected.value(sqrt_price_x96, 10**18, 1 << 96, 10**18, 0, 0, 0)
+        assert (
+            engine.claims(sqrt_price_x96, 0, 0, 0)[0].sum()
+            == claims_by_scan(positions, sqrt_price_x96, 0, 0, 0)[0]
+        )
+
+
+def test_marginal_math_nav_claims__when_empty():
+    engine = NAVEngine()
+    (claims0, claims1) = engine.claims(1 << 96, 0, 0, 0)
+    assert len(claims0) == 0 and len(claims1) == 0
+    assert engine.value(1 << 96, 0, 1 << 96, 0, 0, 0, 0).value1_per_share == 0.0
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=2000), max_examples=200)
+@given(
+    rows=st.lists(
+        st.tuples(
+            st.integers(min_value=10**15, max_value=10**18),
+            st.integers(min_value=900, max_value=1100),
+            st.integers(min_value=100, max_value=500),
+            st.booleans(),
+            st.integers(min_value=0, max_value=86400),
+            st.integers(min_value=-(10**6), max_value=10**6),
+        ),
+        min_size=1,
+        max_size=50,
+    ),
+    block_timestamp=st.integers(min_value=0, max_value=86400),
+    tick_cumulative=st.integers(min_value=-(10**7), max_value=10**7),
+    oracle_tick_cumulative=st.integers(min_value=-(10**7), max_value=10**7),
+    price_bps=st.integers(min_value=-5000, max_value=5000),
+)
+def test_marginal_math_nav_claims__with_fuzz(
+    rows,
+    block_timestamp,
+    tick_cumulative,
+    oracle_tick_cumulative,
+    price_bps,
+):
+    positions = {
+        id: make_position(
+            size,
+            debt_bps,
+            margin_bps,
+            zero_for_one,
+            block_timestamp=position_block_timestamp,
+            tick_cumulative_delta=tick_cumulative_delta,
+        )
+        for id, (
+            size,
+            debt_bps,
+            margin_bps,
+            zero_for_one,
+            position_block_timestamp,
+            tick_cumulative_delta,
+        ) in enumerate(rows)
+    }
+    engine = NAVEngine.from_positions(positions)
+
+    sqrt_price_x96 = (1 << 96) * (10000 + price_bps) // 10000
+    (claims0, claims1) = engine.claims(
+        sqrt_price_x96, block_timestamp, tick_cumulative, oracle_tick_cumulative
+    )
+    assert (int(claims0.sum()), int(claims1.sum())) == claims_by_scan(
+        positions,
+        sqrt_price_x96,
+        block_timestamp,
+        tick_cumulative,
+        oracle_tick_cumulative,
+    )
@@ -0,0 +1,59 @@
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+
+from marginal_math.oracle_library import (
+    oracle_sqrt_price_x96,
+    oracle_tick_cumulative_delta,
+)
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_marginal_math_oracle_sqrt_price_x96(
+    oracle_lib, rando_univ3_observations, reverse
+):
+    obs_start = rando_univ3_observations[0]
+    obs_end = rando_univ3_observations[1]
+
+    tick_cumulative_delta = obs_end[1] - obs_start[1]
+    if reverse:
+        tick_cumulative_delta = -tick_cumulative_delta
+    time_delta = obs_end[0] - obs_start[0]
+
+    result = oracle_lib.oracleSqrtPriceX96(tick_cumulative_delta, time_delta)
+    assert oracle_sqrt_price_x96(tick_cumulative_delta, time_delta) == result
+
+
+def test_marginal_math_oracle_sqrt_price_x96__rounds_toward_zero(oracle_lib):
+    # @dev floor division would round -1.5 down to -2
+    result = oracle_lib.oracleSqrtPriceX96(-3, 2)
+    assert oracle_sqrt_price_x96(-3, 2) == result
+
+
+def test_marginal_math_oracle_tick_cumulative_delta__with_overflow(oracle_lib):
+    tick_cumulative_start = -(2**55)
+    tick_cumulative_end = 2**55 - 1
+    result = oracle_lib.oracleTickCumulativeDelta(
+        tick_cumulative_start, tick_cumulative_end
+    )
+    assert (
+        oracle_tick_cumulative_delta(tick_cumulative_start, tick_cumulative_end)
+        == result
+    )
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=2000), max_examples=10000)
+@given(
+    tick_cumulative_delta=st.integers(min_value=-(2**55), max_value=2**55 - 1),
+    time_delta=st.integers(min_value=1, max_value=2**32 - 1),
+)
+def test_marginal_math_oracle_sqrt_price_x96__with_fuzz(
+    oracle_lib, tick_cumulative_delta, time_delta
+):
+    # @dev only mean ticks within tick range are valid
+    if abs(tick_cumulative_delta // time_delta) > 887271:
+        return
+    result = oracle_lib.oracleSqrtPriceX96(tick_cumulative_delta, time_delta)
+    assert oracle_sqrt_price_x96(tick_cumulative_delta, time_delta) == result
@@ -0,0 +1,183 @@
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+from math import sqrt
+
+from marginal_math import position as position_math
+from marginal_math.constants import (
+    FUNDING_PERIOD,
+    TICK_CUMULATIVE_RATE_MAX,
+    MINIMUM_SIZE,
+)
+from marginal_math.errors import Revert
+from marginal_math.sqrt_price_math import sqrt_price_x96_next_open
+from marginal_math.tick_math import get_tick_at_sqrt_ratio
+
+
+@pytest.fixture
+def assembled(rando_univ3_observations):
+    def assembled(zero_for_one, maintenance):
+        x = int(125.04e12)  # e.g. USDC reserves
+        y = int(71.70e21)  # e.g. WETH reserves
+        liquidity = int(sqrt(x * y))
+        sqrt_price_x96 = int(sqrt(y / x)) << 96
+        tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+        liquidity_delta = liquidity * 5 // 100
+
+        sqrt_price_x96_next = sqrt_price_x96_next_open(
+            liquidity, sqrt_price_x96, liquidity_delta, zero_for_one, maintenance
+        )
+        return (
+            liquidity,
+            sqrt_price_x96,
+            sqrt_price_x96_next,
+            liquidity_delta,
+            zero_for_one,
+            tick,
+            rando_univ3_observations[0][0],
+            rando_univ3_observations[0][1],
+            rando_univ3_observations[0][1],
+        )
+
+    yield assembled
+
+
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@pytest.mark.parametrize("zero_for_one", [False, True])
+def test_marginal_math_position_assemble(
+    position_lib, assembled, zero_for_one, maintenance
+):
+    args = assembled(zero_for_one, maintenance)
+    result = position_lib.assemble(*args)
+    assert position_math.assemble(*args) == position_math.Info.from_struct(result)
+
+
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@pytest.mark.parametrize("zero_for_one", [False, True])
+def test_marginal_math_position_margin_minimum(
+    position_lib, assembled, zero_for_one, maintenance
+):
+    position = position_math.assemble(*assembled(zero_for_one, maintenance))
+    result = position_lib.marginMinimum(position.to_struct(), maintenance)
+    assert position_math.margin_minimum(position, maintenance) == result
+
+
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@pytest.mark.parametrize("zero_for_one", [False, True])
+@pytest.mark.parametrize("factor", [0.99, 1.0, 1.01])
+def test_marginal_math_position_sync(
+    position_lib, assembled, zero_for_one, maintenance, factor
+):
+    args = assembled(zero_for_one, maintenance)
+    position = position_math.assemble(*args)
+    position.margin = position_math.margin_minimum(position, maintenance)
+
+    tick_next = get_tick_at_sqrt_ratio(args[2])
+    oracle_tick = get_tick_at_sqrt_ratio(int(args[2] * factor))
+
+    time_delta = FUNDING_PERIOD // 2
+    block_timestamp_last = position.block_timestamp + time_delta
+    tick_cumulative_last = args[7] + tick_next * time_delta
+    oracle_tick_cumulative_last = args[8] + oracle_tick * time_delta
+
+    result = position_lib.sync(
+        position.to_struct(),
+        block_timestamp_last,
+        tick_cumulative_last,
+        oracle_tick_cumulative_last,
+        TICK_CUMULATIVE_RATE_MAX,
+        FUNDING_PERIOD,
+    )
+    assert position_math.sync(
+        position,
+        block_timestamp_last,
+        tick_cumulative_last,
+        oracle_tick_cumulative_last,
+        TICK_CUMULATIVE_RATE_MAX,
+        FUNDING_PERIOD,
+    ) == position_math.Info.from_struct(result)
+
+
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@pytest.mark.parametrize("zero_for_one", [False, True])
+@pytest.mark.parametrize("margin_factor", [0.999, 1.0, 1.001])
+def test_marginal_math_position_safe(
+    position_lib, assembled, zero_for_one, maintenance, margin_factor
+):
+    args = assembled(zero_for_one, maintenance)
+    position = position_math.assemble(*args)
+    position.margin = int(
+        position_math.margin_minimum(position, maintenance) * margin_factor
+    )
+
+    result = position_lib.safe(position.to_struct(), args[1], maintenance)
+    assert position_math.safe(position, args[1], maintenance) == result
+
+
+@pytest.mark.fuzzing
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@settings(deadline=timedelta(milliseconds=2000), max_examples=10000)
+@given(
+    size=st.integers(min_value=MINIMUM_SIZE, max_value=2**128 - 1),
+    debt=st.integers(min_value=MINIMUM_SIZE, max_value=2**128 - 1),
+    margin=st.integers(min_value=0, max_value=2**127 - 1),
+    zero_for_one=st.booleans(),
+    tick=st.integers(min_value=-887272, max_value=887272),
+    tick_cumulative_delta=st.integers(min_value=-(2**40), max_value=2**40),
+    time_delta=st.integers(min_value=0, max_value=2**32 - 1),
+)
+def test_marginal_math_position_margin_minimum_debts_after_funding_safe__with_fuzz(
+    position_lib,
+    tick_math_lib,
+    size,
+    debt,
+    margin,
+    zero_for_one,
+    tick,
+    tick_cumulative_delta,
+    time_delta,
+    maintenance,
+):
+    position = position_math.Info(
+        size=size,
+        debt0=debt if zero_for_one else MINIMUM_SIZE,
+        debt1=MINIMUM_SIZE if zero_for_one else debt,
+        insurance0=MINIMUM_SIZE,
+        insurance1=MINIMUM_SIZE,
+        zero_for_one=zero_for_one,
+        tick=tick,
+        margin=margin,
+    )
+    sqrt_price_x96 = tick_math_lib.getSqrtRatioAtTick(tick)
+
+    try:
+        calc = position_math.margin_minimum(position, maintenance)
+    except Revert:
+        calc = None
+    if calc is not None:
+        assert calc == position_lib.marginMinimum(position.to_struct(), maintenance)
+
+    assert position_math.safe(
+        position, sqrt_price_x96, maintenance
+    ) == position_lib.safe(position.to_struct(), sqrt_price_x96, maintenance)
+
+    try:
+        calc = position_math.debts_after_funding(
+            position,
+            time_delta,
+            tick_cumulative_delta,
+            TICK_CUMULATIVE_RATE_MAX,
+            FUNDING_PERIOD,
+        )
+    except Revert:
+        return
+
+    result = position_lib.debtsAfterFunding(
+        position.to_struct(),
+        time_delta,
+        tick_cumulative_delta,
+        TICK_CUMULATIVE_RATE_MAX,
+        FUNDING_PERIOD,
+    )
+    assert calc == tuple(result)
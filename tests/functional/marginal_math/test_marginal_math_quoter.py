@@ -0,0 +1,291 @@
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+
+from dataclasses import replace
+
+from marginal_math.errors import (
+    InvalidLiquidityDelta,
+    InvalidPosition,
+    MarginLessThanMin,
+    Revert,
+    SqrtPriceX96ExceedsLimit,
+)
+from marginal_math import position as position_math
+from marginal_math.liquidity_math import to_liquidity_sqrt_price_x96
+from marginal_math.pool import PoolSimulator, State
+from marginal_math.quoter import (
+    quote_open,
+    quote_open_by_margin,
+    quote_open_by_size,
+    quote_swap,
+    quote_swaps,
+    solve_open_liquidity_delta,
+)
+from marginal_math.sqrt_price_math import sqrt_price_x96_next_open
+from marginal_math.tick_math import get_tick_at_sqrt_ratio
+
+
+@pytest.fixture(scope="module")
+def state():
+    # @dev spot reserves as in pool conftest
+    (liquidity, sqrt_price_x96) = to_liquidity_sqrt_price_x96(
+        int(125.04e12), int(71.70e21)
+    )
+    return State(
+        sqrt_price_x96=sqrt_price_x96,
+        total_positions=0,
+        liquidity=liquidity,
+        tick=get_tick_at_sqrt_ratio(sqrt_price_x96),
+        block_timestamp=1684761803,
+        tick_cumulative=0,
+        fee_protocol=0,
+        initialized=True,
+    )
+
+
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_marginal_math_quoter_quote_open_by_margin(state, maintenance, zero_for_one):
+    reserve = (
+        (state.liquidity * state.sqrt_price_x96) >> 96
+        if zero_for_one
+        else (state.liquidity << 96) // state.sqrt_price_x96
+    )
+    margin = reserve // 1000
+    quote = quote_open_by_margin(state, maintenance, zero_for_one, margin, 1.5)
+    assert quote.size >= margin // 2
+    assert margin >= quote.margin_minimum
+
+    # max leverage is 1 + 1 / M so exceeding it requires more margin
+    leverage = 1 + 2 * 1000000 // maintenance
+    with pytest.raises(MarginLessThanMin):
+        quote_open_by_margin(state, maintenance, zero_for_one, margin, leverage)
+
+
+def test_marginal_math_quoter_solve_open_liquidity_delta__reverts_when_too_large(
+    state,
+):
+    with pytest.raises(InvalidLiquidityDelta):
+        solve_open_liquidity_delta(state, 250000, True, state.liquidity << 96)
+
+
+@pytest.mark.parametrize("zero_for_one", [True, False])
+@pytest.mark.parametrize("liquidity_delta", [10**18, 10**21, 5 * 10**21])
+def test_marginal_math_quoter_solve_open_liquidity_delta__when_low_price(
+    state, zero_for_one, liquidity_delta
+):
+    # @dev USDC/WETH like price, where max liquidity delta moves sqrt price out of range
+    sqrt_price_x96 = 2**81
+    state = replace(
+        state,
+        sqrt_price_x96=sqrt_price_x96,
+        liquidity=10**22,
+        tick=get_tick_at_sqrt_ratio(sqrt_price_x96),
+    )
+    quote = quote_open(state, 250000, zero_for_one, liquidity_delta)
+    solved = solve_open_liquidity_delta(state, 250000, zero_for_one, quote.size)
+    assert solved <= liquidity_delta
+    assert quote_open(state, 250000, zero_for_one, solved).size >= quote.size
+
+
+@pytest.mark.fuzzing
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@settings(deadline=timedelta(milliseconds=2000), max_examples=200)
+@given(
+    zero_for_one=st.booleans(),
+    size_bps=st.integers(min_value=1, max_value=9000),
+    size_scale=st.integers(min_value=0, max_value=12),
+)
+def test_marginal_math_quoter_quote_open_by_size__with_fuzz(
+    state, maintenance, zero_for_one, size_bps, size_scale
+):
+    reserve = (
+        (state.liquidity * state.sqrt_price_x96) >> 96
+        if zero_for_one
+        else (state.liquidity << 96) // state.sqrt_price_x96
+    )
+    size = max((reserve * size_bps) // (10000 * 10**size_scale), 10000)
+    try:
+        liquidity_delta = solve_open_liquidity_delta(
+            state, maintenance, zero_for_one, size
+        )
+    except InvalidLiquidityDelta:
+        return
+
+    # least liquidity delta reaching size
+    assert (
+        position_math.size(
+            state.liquidity,
+            state.sqrt_price_x96,
+            sqrt_price_x96_next_open(
+                state.liquidity,
+                state.sqrt_price_x96,
+                liquidity_delta,
+                zero_for_one,
+                maintenance,
+            ),
+            zero_for_one,
+        )
+        >= size
+    )
+    assert (
+        liquidity_delta == 1
+        or position_math.size(
+            state.liquidity,
+            state.sqrt_price_x96,
+            sqrt_price_x96_next_open(
+                state.liquidity,
+                state.sqrt_price_x96,
+                liquidity_delta - 1,
+                zero_for_one,
+                maintenance,
+            ),
+            zero_for_one,
+        )
+        < size
+    )
+
+    try:
+        quote = quote_open_by_size(state, maintenance, zero_for_one, size)
+    except InvalidPosition:
+        return
+    assert quote.liquidity_delta == liquidity_delta
+    assert quote.size >= size
+    assert quote.fees == (quote.size * 1000) // 1000000
+
+
+def swap_amounts_specified(state, zero_for_one):
+    # exact input and exact output amounts from dust to past reserves
+    reserve0 = (state.liquidity << 96) // state.sqrt_price_x96
+    reserve1 = (state.liquidity * state.sqrt_price_x96) >> 96
+    (reserve_in, reserve_out) = (
+        (reserve0, reserve1) if zero_for_one else (reserve1, reserve0)
+    )
+    return (
+        [0, 1, 1000]
+        + [reserve_in // 10**k for k in range(8)]
+        + [-1, -1000]
+        + [-(reserve_out // 10**k) for k in range(8)]
+        + [-(reserve_out - 1)]
+    )
+
+
+@pytest.mark.parametrize("fee_protocol", [0, 10])
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_marginal_math_quoter_quote_swap__matches_simulator(
+    state, fee_protocol, zero_for_one
+):
+    state = replace(state, fee_protocol=fee_protocol)
+    for amount_specified in swap_amounts_specified(state, zero_for_one):
+        sim = PoolSimulator(250000, None, block_timestamp=state.block_timestamp)
+        sim.state = state.copy()
+        sim.balance0 = sim.balance1 = 2**200
+        sqrt_price_limit_x96 = (
+            state.sqrt_price_x96 // 2 if zero_for_one else state.sqrt_price_x96 * 2
+        )
+
+        try:
+            result = sim.swap(
+                "alice", zero_for_one, amount_specified, sqrt_price_limit_x96
+            )
+        except Revert as err:
+            with pytest.raises(type(err)):
+                quote_swap(state, zero_for_one, amount_specified, sqrt_price_limit_x96)
+            continue
+
+        quote = quote_swap(state, zero_for_one, amount_specified, sqrt_price_limit_x96)
+        assert (quote.amount0, quote.amount1) == result
+        assert quote.liquidity_after == sim.state.liquidity
+        assert quote.sqrt_price_x96_after == sim.state.sqrt_price_x96
+        assert quote.tick_after == sim.state.tick
+        assert quote.protocol_fees == (
+            sim.protocol_fees.token0 if zero_for_one else sim.protocol_fees.token1
+        )
+
+        # amount specified overrides calculated amount in or out
+        (amount_in, amount_out) = (
+            (quote.amount0, quote.amount1)
+            if zero_for_one
+            else (quote.amount1, quote.amount0)
+        )
+        assert (amount_in if amount_specified > 0 else amount_out) == amount_specified
+
+
+@pytest.mark.parametrize("fee_protocol", [0, 10])
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_marginal_math_quoter_quote_swaps__matches_quote_swap(
+    state, fee_protocol, zero_for_one
+):
+    state = replace(state, fee_protocol=fee_protocol)
+    amounts_specified = swap_amounts_specified(state, zero_for_one)
+    sqrt_price_limit_x96 = (
+        state.sqrt_price_x96 * 9 // 10
+        if zero_for_one
+        else state.sqrt_price_x96 * 11 // 10
+    )
+    quotes = quote_swaps(state, zero_for_one, amounts_specified, sqrt_price_limit_x96)
+    assert len(quotes) == len(amounts_specified)
+    assert not quotes.valid.all()
+
+    for i, amount_specified in enumerate(amounts_specified):
+        try:
+            quote = quote_swap(
+                state, zero_for_one, amount_specified, sqrt_price_limit_x96
+            )
+        except Revert:
+            assert quotes[i] is None
+            continue
+        assert quotes[i] == quote
+
+
+def test_marginal_math_quoter_quote_swap__reverts_when_exceeds_limit(state):
+    reserve0 = (state.liquidity << 96) // state.sqrt_price_x96
+    sqrt_price_limit_x96 = state.sqrt_price_x96 * 99 // 100
+    with pytest.raises(SqrtPriceX96ExceedsLimit):
+        quote_swap(state, True, reserve0 // 10, sqrt_price_limit_x96)
+
+    quotes = quote_swaps(
+        state, True, [reserve0 // 1000, reserve0 // 10], sqrt_price_limit_x96
+    )
+    assert quotes.valid.tolist() == [True, False]
+
+
+def test_marginal_math_quoter_quote_swaps__when_reserve0_zero(state):
+    # liquidity << 96 < sqrt price so reserve0 rounds down to zero
+    sqrt_price_x96 = state.sqrt_price_x96
+    state = replace(state, liquidity=sqrt_price_x96 // (1 << 97))
+    assert (state.liquidity << 96) // sqrt_price_x96 == 0
+
+    amounts_specified = [0, -1, -(10**6), 1, 10**6]
+    quotes = quote_swaps(state, True, amounts_specified)
+    assert not quotes.valid.any()
+    assert quotes.liquidity_after.tolist() == [0] * len(amounts_specified)
+    for i, amount_specified in enumerate(amounts_specified):
+        assert quotes[i] is None
+        with pytest.raises(Revert):
+            quote_swap(state, True, amount_specified)
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=2000), max_examples=200)
+@given(
+    zero_for_one=st.booleans(),
+    fee_protocol=st.sampled_from([0, 4, 10]),
+    amounts_specified=st.lists(
+        st.integers(min_value=-(2**128), max_value=2**128), min_size=1, max_size=20
+    ),
+)
+def test_marginal_math_quoter_quote_swaps__with_fuzz(
+    state, zero_for_one, fee_protocol, amounts_specified
+):
+    state = replace(state, fee_protocol=fee_protocol)
+    quotes = quote_swaps(state, zero_for_one, amounts_specified)
+    for i, amount_specified in enumerate(amounts_specified):
+        try:
+            quote = quote_swap(state, zero_for_one, amount_specified)
+        except Revert:
+            assert quotes[i] is None
+            continue
+        assert quotes[i] == quote
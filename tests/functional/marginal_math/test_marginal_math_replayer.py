@@ -0,0 +1,233 @@
+import random
+
+from dataclasses import replace
+
+from marginal_math.constants import MAX_SQRT_RATIO, MIN_SQRT_RATIO
+from marginal_math.errors import Revert
+from marginal_math.pool import PoolSimulator
+from marginal_math.quoter import quote_open
+from marginal_math.replayer import (
+    PoolHistoryStore,
+    PoolLog,
+    PoolReplayer,
+    PoolSnapshot,
+    replay,
+)
+from marginal_math.univ3_oracle import UniswapV3Oracle
+
+BLOCK_TIMESTAMP = 1684761803
+MAINTENANCE = 250000
+
+
+class Chain:
+    """Drives a `PoolSimulator` block by block, recording the logs the pool would emit"""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.oracle = UniswapV3Oracle(
+            BLOCK_TIMESTAMP - 86400,
+            0,
+            liquidity=2**64,
+            observation_cardinality_next=100,
+        )
+        self.oracle.block_timestamp = BLOCK_TIMESTAMP
+        self.sim = PoolSimulator(
+            MAINTENANCE, self.oracle, block_timestamp=BLOCK_TIMESTAMP
+        )
+
+        self.block_number = 0
+        self.logs = []
+        self.reads = {}
+        self.snapshots = {}
+
+    def emit(self, event_name, **fields):
+        self.logs.append(
+            PoolLog(
+                event_name=event_name,
+                block_number=self.block_number,
+                log_index=len(self.logs),
+                block_timestamp=self.sim.block_timestamp,
+                **fields,
+            )
+        )
+
+    def emit_state(self, event_name, owner, id):
+        self.emit(
+            event_name,
+            owner=owner,
+            id=id,
+            sqrt_price_x96=self.sim.state.sqrt_price_x96,
+            liquidity=self.sim.state.liquidity,
+        )
+
+    def op(self):
+        sim = self.sim
+        rng = self.rng
+        keys = [key for key, p in sim.positions.items() if p.size > 0]
+        choice = rng.random()
+        if sim.total_supply == 0 or choice < 0.1:
+            initializing = sim.total_supply == 0
+            liquidity_delta = rng.randint(10**20, 10**21)
+            sim.mint("alice", liquidity_delta)
+            if initializing:
+                self.emit(
+                    "Initialize",
+                    sqrt_price_x96=sim.state.sqrt_price_x96,
+                    tick=sim.state.tick,
+                )
+            self.emit("Mint", liquidity=liquidity_delta)
+        elif choice < 0.15:
+            (liquidity_delta, _, _) = sim.burn(
+                "alice", "alice", sim.balance_of("alice") // 10
+            )
+            self.emit("Burn", liquidity=liquidity_delta)
+        elif choice < 0.5:
+            zero_for_one = rng.random() < 0.5
+            liquidity_delta = sim.state.liquidity * rng.randint(1, 50) // 1000
+            quote = quote_open(
+                sim._state_synced(), MAINTENANCE, zero_for_one, liquidity_delta
+            )
+            (id, _, _, _, _) = sim.open(
+                "bob",
+                zero_for_one,
+                liquidity_delta,
+                MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1,
+                quote.margin_minimum * rng.randint(100, 120) // 100,
+                10**17,
+            )
+            self.emit_state("Open", "bob", id)
+        elif choice < 0.6 and keys:
+            (owner, id) = rng.choice(keys)
+            sim.adjust(owner, owner, id, sim.positions[(owner, id)].margin // 10)
+            self.emit(
+                "Adjust",
+                owner=owner,
+                id=id,
+                margin_after=sim.positions[(owner, id)].margin,
+            )
+        elif choice < 0.75 and keys:
+            (owner, id) = rng.choice(keys)
+            sim.settle(owner, owner, id)
+            self.emit_state("Settle", owner, id)
+        elif choice < 0.85 and keys:
+            (owner, id) = rng.choice(keys)
+            sim.liquidate("keeper", owner, id)
+            self.emit_state("Liquidate", owner, id)
+        else:
+            zero_for_one = rng.random() < 0.5
+            sim.balance0 = sim.balance1 = 2**200
+            sim.swap(
+                "carol",
+                zero_for_one,
+                rng.randint(10**15, 10**18),
+                MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1,
+            )
+            self.emit(
+                "Swap",
+                sqrt_price_x96=sim.state.sqrt_price_x96,
+                liquidity=sim.state.liquidity,
+                tick=sim.state.tick,
+            )
+
+    def mine(self, ops):
+        self.block_number += 1
+        self.sim.block_timestamp += 600
+        self.oracle.swap(
+            self.sim.block_timestamp,
+            self.oracle.tick + self.rng.randint(-1000, 1000),
+            2**64,
+        )
+        touched = len(self.logs)
+        for _ in range(ops):
+            try:
+                self.op()
+            except Revert:
+                pass
+
+        # positions() read at the end of the block, only needed for Open
+        for log in self.logs[touched:]:
+            if log.event_name == "Open":
+                self.reads[(log.owner, log.id, log.block_number)] = replace(
+                    self.sim.positions[(log.owner, log.id)]
+                )
+        self.snapshots[self.block_number] = PoolSnapshot(
+            self.block_number,
+            self.sim.state.copy(),
+            self.sim.liquidity_locked,
+            {key: replace(p) for key, p in self.sim.positions.items() if p.size > 0},
+        )
+
+
+def make_chain(seed, blocks=60):
+    chain = Chain(seed)
+    for _ in range(blocks):
+        chain.mine(chain.rng.randint(0, 4))
+    return chain
+
+
+def test_marginal_math_replayer_replay__matches_sim():
+    chain = make_chain(0)
+
+    def read(key, block_number):
+        return chain.reads[(*key, block_number)]
+
+    events = {log.event_name for log in chain.logs}
+    assert events == {
+        "Initialize",
+        "Mint",
+        "Burn",
+        "Open",
+        "Adjust",
+        "Settle",
+        "Liquidate",
+        "Swap",
+    }
+
+    snapshot = PoolSnapshot(0)
+    for block_number, expected in chain.snapshots.items():
+        snapshot = replay(snapshot, chain.logs, read, block_number)
+        assert snapshot == expected
+
+    # from scratch
+    assert replay(PoolSnapshot(0), chain.logs, read, 30) == chain.snapshots[30]
+
+
+def test_marginal_math_replayer_snapshot__encode_decode():
+    chain = make_chain(1, blocks=20)
+    snapshot = chain.snapshots[20]
+    assert PoolSnapshot.decode(20, snapshot.encode()) == snapshot
+
+
+def test_marginal_math_replayer_at__matches_sim(tmp_path):
+    chain = make_chain(2)
+    store = PoolHistoryStore(str(tmp_path / "history.db"), "pool")
+    replayer = PoolReplayer(None, None, store, snapshot_interval=8, start_block=1)
+
+    # extend in chunks as sync would
+    for start in range(1, 61, 25):
+        stop = min(start + 24, 60)
+        logs = [log for log in chain.logs if start <= log.block_number <= stop]
+        reads = {
+            key: info for key, info in chain.reads.items() if start <= key[2] <= stop
+        }
+        replayer.extend(logs, reads, stop)
+
+    snapshot_blocks = [
+        block_number
+        for (block_number,) in store.connection.execute(
+            "SELECT block_number FROM snapshots ORDER BY block_number"
+        )
+    ]
+    assert snapshot_blocks == list(range(8, 61, 8))
+
+    for block_number, expected in chain.snapshots.items():
+        assert replayer.at(block_number) == expected
+    assert replayer.head == chain.snapshots[60]
+
+    # resumes from the store
+    store.close()
+    store = PoolHistoryStore(str(tmp_path / "history.db"), "pool")
+    replayer = PoolReplayer(None, None, store, snapshot_interval=8)
+    assert replayer.start_block == 61
+    assert replayer.head == chain.snapshots[60]
+    assert replayer.at(45) == chain.snapshots[45]
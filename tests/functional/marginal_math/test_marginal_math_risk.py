@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from dataclasses import replace
+from datetime import timedelta
+
+from marginal_math import position as position_math
+from marginal_math.risk import RiskEngine, tick_paths
+
+
+def make_positions(n, seed=0, block_timestamp=1684761803):
+    rng = np.random.default_rng(seed)
+    positions = []
+    for i in range(n):
+        size = int(rng.integers(10**15, 10**18))
+        debt = size * int(rng.integers(900, 1100)) // 1000
+        positions.append(
+            position_math.Info(
+                size=size,
+                debt0=debt,
+                debt1=debt,
+                insurance0=size // 200,
+                insurance1=size // 200,
+                # @dev jitter keeps collateral off the exact maintenance boundary at
+                # price one, where float and exact comparisons can disagree on a tie
+                margin=size * int(rng.integers(150, 400)) // 1000
+                + int(rng.integers(1, 10**12)),
+                zero_for_one=i % 2 == 0,
+                block_timestamp=block_timestamp,
+                tick_cumulative_delta=int(rng.integers(-(10**6), 10**6)),
+            )
+        )
+    return positions
+
+
+def assert_shortfalls_close(shortfalls, exact, row):
+    assert (shortfalls.first_unsafe[row] == exact.first_unsafe[0]).all()
+    assert (shortfalls.liquidated_at[row] == exact.liquidated_at[0]).all()
+    for field in ("deficit", "shortfall"):
+        assert np.allclose(
+            getattr(shortfalls, field)[row],
+            getattr(exact, field)[0].astype(np.float64),
+            rtol=1e-9,
+            atol=2,
+        )
+
+
+def test_marginal_math_risk_tick_paths():
+    paths = tick_paths(100, 24, 200000, period=3600, drift=0.01, volatility=1.0)
+    assert paths.shape == (100, 25)
+    assert (paths[:, 0] == 200000).all()
+    assert (paths == tick_paths(100, 24, 200000, 3600, 0.01, 1.0)).all()
+
+    paths = tick_paths(10, 24, 0, period=3600, drift=1.0)
+    assert (paths[:, -1] == 24 * 3600).all()
+
+
+def test_marginal_math_risk_simulate__when_safe():
+    positions = [replace(p, margin=p.size) for p in make_positions(20)]
+    engine = RiskEngine(positions, 250000, 1684761803, 0, 0)
+    shortfalls = engine.simulate(np.zeros((5, 49), dtype=np.int64))
+    assert (shortfalls.first_unsafe == -1).all()
+    assert (shortfalls.liquidated_at == -1).all()
+    assert shortfalls.probability() == 0.0
+    assert shortfalls.quantile(0.99) == 0.0
+
+
+def test_marginal_math_risk_simulate__when_late():
+    # oneForZero position unsafe once price falls, liquidated after a delay
+    position = position_math.Info(
+        size=10**18,
+        debt0=10**18,
+        debt1=10**18,
+        insurance0=10**15,
+        insurance1=10**15,
+        margin=3 * 10**17,
+        zero_for_one=False,
+        block_timestamp=0,
+    )
+    engine = RiskEngine([position], 250000, 0, 0, 0, period=3600)
+    oracle_ticks = -100 * np.arange(49)[None, :]
+
+    on_time = engine.simulate(oracle_ticks, delay=0)
+    late = engine.simulate(oracle_ticks, delay=24)
+    assert on_time.first_unsafe[0, 0] == late.first_unsafe[0, 0] > 0
+    assert late.liquidated_at[0, 0] == on_time.liquidated_at[0, 0] + 24
+    assert on_time.shortfall[0, 0] == 0
+    assert late.shortfall[0, 0] > 0
+    assert late.probability() == 1.0
+
+    assert_shortfalls_close(late, engine.verify(oracle_ticks, delay=24), 0)
+
+
+def test_marginal_math_risk_simulate__matches_verify():
+    positions = make_positions(50, seed=1)
+    engine = RiskEngine(positions, 250000, 1684761803, 10**9, 10**9 + 12345)
+    oracle_ticks = tick_paths(8, 72, 0, volatility=20.0, seed=1)
+    pool_ticks = oracle_ticks + np.random.default_rng(1).integers(
+        -200, 200, size=oracle_ticks.shape
+    )
+    delay = np.arange(8)
+
+    shortfalls = engine.simulate(oracle_ticks, pool_ticks, delay)
+    assert (shortfalls.first_unsafe >= 0).any()
+    assert (shortfalls.shortfall > 0).any()
+    for row in range(8):
+        exact = engine.verify(
+            oracle_ticks[row : row + 1], pool_ticks[row : row + 1], delay[row]
+        )
+        assert_shortfalls_close(shortfalls, exact, row)
+
+
+def test_marginal_math_risk_engine__when_window_not_multiple_of_period():
+    with pytest.raises(ValueError):
+        RiskEngine([], 250000, 0, 0, 0, period=7)
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=10000), max_examples=50)
+@given(
+    n=st.integers(min_value=1, max_value=20),
+    seed=st.integers(min_value=0, max_value=2**32 - 1),
+    drift=st.floats(min_value=-0.5, max_value=0.5),
+    volatility=st.floats(min_value=0.0, max_value=40.0),
+    spread=st.integers(min_value=0, max_value=1000),
+    delay=st.integers(min_value=0, max_value=12),
+)
+def test_marginal_math_risk_simulate__with_fuzz(
+    n, seed, drift, volatility, spread, delay
+):
+    positions = make_positions(n, seed=seed)
+    engine = RiskEngine(positions, 250000, 1684761803, 0, 0)
+    oracle_ticks = tick_paths(2, 48, 0, drift=drift, volatility=volatility, seed=seed)
+    pool_ticks = oracle_ticks + np.random.default_rng(seed).integers(
+        -spread, spread + 1, size=oracle_ticks.shape
+    )
+
+    shortfalls = engine.simulate(oracle_ticks, pool_ticks, delay)
+    for row in range(2):
+        exact = engine.verify(
+            oracle_ticks[row : row + 1], pool_ticks[row : row + 1], delay
+        )
+        assert_shortfalls_close(shortfalls, exact, row)
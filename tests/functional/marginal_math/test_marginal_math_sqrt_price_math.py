@@ -0,0 +1,141 @@
+import pytest
+
+from ape import reverts
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+from math import sqrt
+
+from marginal_math.constants import MIN_SQRT_RATIO, MAX_SQRT_RATIO
+from marginal_math.errors import Amount0ExceedsReserve0, Revert
+from marginal_math.sqrt_price_math import (
+    sqrt_price_x96_next_open,
+    sqrt_price_x96_next_swap,
+)
+
+
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@pytest.mark.parametrize("zero_for_one", [False, True])
+def test_marginal_math_sqrt_price_x96_next_open(
+    sqrt_price_math_lib, maintenance, zero_for_one
+):
+    x = int(125.04e12)  # e.g. USDC reserves
+    y = int(71.70e21)  # e.g. WETH reserves
+    liquidity = int(sqrt(x * y))
+    sqrt_price_x96 = int(sqrt(y / x)) << 96
+    liquidity_delta = liquidity * 5 // 100
+
+    result = sqrt_price_math_lib.sqrtPriceX96NextOpen(
+        liquidity, sqrt_price_x96, liquidity_delta, zero_for_one, maintenance
+    )
+    assert (
+        sqrt_price_x96_next_open(
+            liquidity, sqrt_price_x96, liquidity_delta, zero_for_one, maintenance
+        )
+        == result
+    )
+
+
+@pytest.mark.parametrize("zero_for_one", [False, True])
+@pytest.mark.parametrize("pc", [1, -1])
+def test_marginal_math_sqrt_price_x96_next_swap(sqrt_price_math_lib, zero_for_one, pc):
+    x = int(125.04e12)  # e.g. USDC reserves
+    y = int(71.70e21)  # e.g. WETH reserves
+    liquidity = int(sqrt(x * y))
+    sqrt_price_x96 = int(sqrt(y / x)) << 96
+
+    # 1% of reserves in if exact input else out
+    known = x if zero_for_one == (pc > 0) else y
+    amount_specified = pc * known // 100
+
+    result = sqrt_price_math_lib.sqrtPriceX96NextSwap(
+        liquidity, sqrt_price_x96, zero_for_one, amount_specified
+    )
+    assert (
+        sqrt_price_x96_next_swap(
+            liquidity, sqrt_price_x96, zero_for_one, amount_specified
+        )
+        == result
+    )
+
+
+def test_marginal_math_sqrt_price_x96_next_swap__raises_when_amount0_out_exceeds_reserve0(
+    sqrt_price_math_lib,
+):
+    x = int(125.04e12)  # e.g. USDC reserves
+    y = int(71.70e21)  # e.g. WETH reserves
+    liquidity = int(sqrt(x * y))
+    sqrt_price_x96 = int(sqrt(y / x)) << 96
+    amount_specified = -x * 2
+
+    with reverts(sqrt_price_math_lib.Amount0ExceedsReserve0):
+        sqrt_price_math_lib.sqrtPriceX96NextSwap(
+            liquidity, sqrt_price_x96, False, amount_specified
+        )
+    with pytest.raises(Amount0ExceedsReserve0):
+        sqrt_price_x96_next_swap(liquidity, sqrt_price_x96, False, amount_specified)
+
+
+@pytest.mark.fuzzing
+@pytest.mark.parametrize("maintenance", [250000, 500000, 1000000])
+@settings(deadline=timedelta(milliseconds=2000), max_examples=10000)
+@given(
+    liquidity=st.integers(min_value=1, max_value=2**128 - 1),
+    sqrt_price_x96=st.integers(min_value=MIN_SQRT_RATIO, max_value=MAX_SQRT_RATIO - 1),
+    liquidity_delta_pc=st.integers(min_value=1, max_value=1000000000 - 1),
+    zero_for_one=st.booleans(),
+)
+def test_marginal_math_sqrt_price_x96_next_open__with_fuzz(
+    sqrt_price_math_lib,
+    liquidity,
+    sqrt_price_x96,
+    liquidity_delta_pc,
+    zero_for_one,
+    maintenance,
+):
+    liquidity_delta = (liquidity * liquidity_delta_pc) // 1000000000
+    try:
+        calc = sqrt_price_x96_next_open(
+            liquidity, sqrt_price_x96, liquidity_delta, zero_for_one, maintenance
+        )
+    except Revert:
+        with reverts():
+            sqrt_price_math_lib.sqrtPriceX96NextOpen(
+                liquidity, sqrt_price_x96, liquidity_delta, zero_for_one, maintenance
+            )
+        return
+
+    result = sqrt_price_math_lib.sqrtPriceX96NextOpen(
+        liquidity, sqrt_price_x96, liquidity_delta, zero_for_one, maintenance
+    )
+    assert calc == result
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=2000), max_examples=10000)
+@given(
+    liquidity=st.integers(min_value=1, max_value=2**128 - 1),
+    sqrt_price_x96=st.integers(min_value=MIN_SQRT_RATIO, max_value=MAX_SQRT_RATIO - 1),
+    zero_for_one=st.booleans(),
+    amount_specified=st.integers(min_value=-(2**255) + 1, max_value=2**255 - 1),
+)
+def test_marginal_math_sqrt_price_x96_next_swap__with_fuzz(
+    sqrt_price_math_lib, liquidity, sqrt_price_x96, zero_for_one, amount_specified
+):
+    if amount_specified == 0:
+        return
+
+    try:
+        calc = sqrt_price_x96_next_swap(
+            liquidity, sqrt_price_x96, zero_for_one, amount_specified
+        )
+    except Revert:
+        with reverts():
+            sqrt_price_math_lib.sqrtPriceX96NextSwap(
+                liquidity, sqrt_price_x96, zero_for_one, amount_specified
+            )
+        return
+
+    result = sqrt_price_math_lib.sqrtPriceX96NextSwap(
+        liquidity, sqrt_price_x96, zero_for_one, amount_specified
+    )
+    assert calc == result
@@ -0,0 +1,27 @@
+import pytest
+
+from math import sqrt
+
+from marginal_math.swap_math import swap_amounts, swap_fees
+
+
+@pytest.mark.parametrize("zero_for_one", [False, True])
+def test_marginal_math_swap_amounts(swap_math_lib, zero_for_one):
+    x = int(125.04e12)  # e.g. USDC reserves
+    y = int(71.70e21)  # e.g. WETH reserves
+    liquidity = int(sqrt(x * y))
+    sqrt_price_x96 = int(sqrt(y / x)) << 96
+    sqrt_price_x96_next = (
+        sqrt_price_x96 * 99 // 100 if zero_for_one else sqrt_price_x96 * 101 // 100
+    )
+
+    result = swap_math_lib.swapAmounts(liquidity, sqrt_price_x96, sqrt_price_x96_next)
+    assert swap_amounts(liquidity, sqrt_price_x96, sqrt_price_x96_next) == tuple(result)
+
+
+@pytest.mark.parametrize("less_fee", [False, True])
+def test_marginal_math_swap_fees(swap_math_lib, less_fee):
+    amount = int(125.04e12) // 100
+    fee = 1000
+    result = swap_math_lib.swapFees(amount, fee, less_fee)
+    assert swap_fees(amount, fee, less_fee) == result
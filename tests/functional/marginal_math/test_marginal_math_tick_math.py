@@ -0,0 +1,60 @@
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+
+from marginal_math.constants import MIN_TICK, MAX_TICK, MIN_SQRT_RATIO, MAX_SQRT_RATIO
+from marginal_math.errors import InvalidSqrtRatio, InvalidTick
+from marginal_math.tick_math import get_sqrt_ratio_at_tick, get_tick_at_sqrt_ratio
+
+
+@pytest.mark.parametrize("tick", [MIN_TICK, -200805, -1, 0, 1, 200804, MAX_TICK])
+def test_marginal_math_get_sqrt_ratio_at_tick(tick_math_lib, tick):
+    assert get_sqrt_ratio_at_tick(tick) == tick_math_lib.getSqrtRatioAtTick(tick)
+
+
+@pytest.mark.parametrize(
+    "sqrt_price_x96",
+    [
+        MIN_SQRT_RATIO,
+        1815798575707834854825150601403158,
+        1 << 96,
+        MAX_SQRT_RATIO - 1,
+    ],
+)
+def test_marginal_math_get_tick_at_sqrt_ratio(tick_math_lib, sqrt_price_x96):
+    assert get_tick_at_sqrt_ratio(sqrt_price_x96) == tick_math_lib.getTickAtSqrtRatio(
+        sqrt_price_x96
+    )
+
+
+def test_marginal_math_get_sqrt_ratio_at_tick__raises_when_tick_out_of_range():
+    with pytest.raises(InvalidTick):
+        get_sqrt_ratio_at_tick(MAX_TICK + 1)
+    with pytest.raises(InvalidTick):
+        get_sqrt_ratio_at_tick(MIN_TICK - 1)
+
+
+def test_marginal_math_get_tick_at_sqrt_ratio__raises_when_sqrt_ratio_out_of_range():
+    with pytest.raises(InvalidSqrtRatio):
+        get_tick_at_sqrt_ratio(MIN_SQRT_RATIO - 1)
+    with pytest.raises(InvalidSqrtRatio):
+        get_tick_at_sqrt_ratio(MAX_SQRT_RATIO)
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=2000), max_examples=10000)
+@given(tick=st.integers(min_value=MIN_TICK, max_value=MAX_TICK))
+def test_marginal_math_get_sqrt_ratio_at_tick__with_fuzz(tick_math_lib, tick):
+    assert get_sqrt_ratio_at_tick(tick) == tick_math_lib.getSqrtRatioAtTick(tick)
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=2000), max_examples=10000)
+@given(
+    sqrt_price_x96=st.integers(min_value=MIN_SQRT_RATIO, max_value=MAX_SQRT_RATIO - 1)
+)
+def test_marginal_math_get_tick_at_sqrt_ratio__with_fuzz(tick_math_lib, sqrt_price_x96):
+    assert get_tick_at_sqrt_ratio(sqrt_price_x96) == tick_math_lib.getTickAtSqrtRatio(
+        sqrt_price_x96
+    )
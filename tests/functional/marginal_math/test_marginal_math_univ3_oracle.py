@@ -0,0 +1,207 @@
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from datetime import timedelta
+
+from marginal_math.errors import ObservationTooOld
+from marginal_math.univ3_oracle import (
+    Observation,
+    UniswapV3Oracle,
+    lte,
+    pack_observation,
+    synthetic_observations,
+)
+
+
+def tick_cumulative_by_scan(history, time):
+    # history of (block_timestamp, tick after) from initialization at history[0]
+    tick_cumulative = 0
+    for (timestamp, tick), (timestamp_next, _) in zip(
+        history, history[1:] + [(time, None)]
+    ):
+        if timestamp >= time:
+            break
+        tick_cumulative += tick * (min(timestamp_next, time) - timestamp)
+    return tick_cumulative
+
+
+def test_marginal_math_univ3_oracle_observe__interpolates():
+    oracle = UniswapV3Oracle(1000, 10, liquidity=2**64)
+    oracle.increase_observation_cardinality_next(4)
+    oracle.swap(1100, 20, 2**64)  # writes tick 10 over [1000, 1100]
+    oracle.swap(1100, 30, 2**64)  # same block, no write
+    oracle.swap(1300, 40, 2**64)  # writes tick 30 over [1100, 1300]
+
+    assert oracle.observations[:3] == [
+        Observation(1000, 0, 0, True),
+        Observation(1100, 1000, (100 << 128) // 2**64, True),
+        Observation(1300, 7000, (300 << 128) // 2**64, True),
+    ]
+
+    (tick_cumulatives, _) = oracle.observe([300, 250, 200, 50, 0], time=1400)
+    assert tick_cumulatives == [1000, 2500, 4000, 7000 + 40 * 50, 7000 + 40 * 100]
+
+
+def test_marginal_math_univ3_oracle_observe__reverts_when_too_old():
+    oracle = UniswapV3Oracle(1000, 10)
+    oracle.swap(1100, 20, 0)
+    with pytest.raises(ObservationTooOld):
+        oracle.observe([101], time=1100)
+
+
+def test_marginal_math_univ3_oracle_modify_position__writes_in_range():
+    oracle = UniswapV3Oracle(1000, 10, liquidity=100)
+    oracle.increase_observation_cardinality_next(2)
+
+    oracle.modify_position(1100, 20, 30, 50)  # out of range
+    assert oracle.liquidity == 100 and oracle.observation_index == 0
+
+    oracle.modify_position(1100, 0, 20, 50)
+    assert oracle.liquidity == 150 and oracle.observation_index == 1
+    assert oracle.observations[1].seconds_per_liquidity_cumulative_x128 == (
+        (100 << 128) // 100
+    )
+
+
+def test_marginal_math_univ3_oracle_lte__with_overflow():
+    time = 100
+    assert lte(time, 2**32 - 1, 50)
+    assert not lte(time, 50, 2**32 - 1)
+    assert lte(time, 50, 60)
+
+
+def test_marginal_math_univ3_oracle_synthetic_observations__with_drift():
+    (observations, tick) = synthetic_observations(
+        5, 1000, 100, period=10, drift=1.0, liquidity=2**64
+    )
+    assert [observation.block_timestamp for observation in observations] == [
+        1000,
+        1010,
+        1020,
+        1030,
+        1040,
+    ]
+    history = [(1000, 100), (1010, 110), (1020, 120), (1030, 130), (1040, 140)]
+    assert [observation.tick_cumulative for observation in observations] == [
+        tick_cumulative_by_scan(history, timestamp) for (timestamp, _) in history
+    ]
+    assert tick == 140
+
+
+def test_marginal_math_univ3_oracle_synthetic_observations__with_volatility():
+    (observations, tick) = synthetic_observations(
+        1000, 1000, 0, drift=0.0, volatility=10.0, seed=1
+    )
+    assert synthetic_observations(
+        1000, 1000, 0, drift=0.0, volatility=10.0, seed=1
+    ) == (observations, tick)
+
+    deltas = [
+        (observation.tick_cumulative - observation_before.tick_cumulative) // 12
+        for observation_before, observation in zip(observations, observations[1:])
+    ]
+    assert len(set(deltas)) > 1
+
+
+def test_marginal_math_univ3_oracle_observe__matches_mock_univ3_pool(
+    project, accounts, chain, rando_token_a_address, rando_token_b_address
+):
+    # @dev bulk loads a synthetic history and compares realistic observe to the port
+    univ3_pool = project.MockUniswapV3Pool.deploy(
+        rando_token_a_address, rando_token_b_address, 500, sender=accounts[0]
+    )
+    liquidity = 2**80
+    n = 1000
+    period = 12
+    timestamp = chain.pending_timestamp
+    (observations, tick) = synthetic_observations(
+        n,
+        timestamp - n * period,
+        200000,
+        period=period,
+        drift=0.01,
+        volatility=5.0,
+        liquidity=liquidity,
+    )
+
+    univ3_pool.pushObservations(
+        [pack_observation(observation) for observation in observations],
+        sender=accounts[0],
+    )
+    univ3_pool.setSlot0((0, tick, 0, 0, 0, 0, True), sender=accounts[0])
+    univ3_pool.setLiquidity(liquidity, sender=accounts[0])
+    univ3_pool.setRealistic(True, sender=accounts[0])
+    assert Observation(*univ3_pool.observations(n - 1)) == observations[-1]
+
+    oracle = UniswapV3Oracle(
+        observations[-1].block_timestamp,
+        tick,
+        liquidity=liquidity,
+        observations=observations,
+        observation_index=n - 1,
+        observation_cardinality=n,
+        observation_cardinality_next=n,
+    )
+    # @dev back out the call timestamp from the extrapolated current tick cumulative
+    ([tick_cumulative], _) = univ3_pool.observe([0])
+    time = observations[-1].block_timestamp + (
+        (tick_cumulative - observations[-1].tick_cumulative) // tick
+    )
+    assert time >= observations[-1].block_timestamp
+
+    seconds_agos = [0, 1, period // 2, 3600, 7200, n * period // 2]
+    result = univ3_pool.observe(seconds_agos)
+    assert (
+        list(result.tickCumulatives),
+        list(result.secondsPerLiquidityCumulativeX128s),
+    ) == oracle.observe(seconds_agos, time=time)
+
+
+@pytest.mark.fuzzing
+@settings(deadline=timedelta(milliseconds=2000), max_examples=500)
+@given(
+    swaps=st.lists(
+        st.tuples(
+            st.integers(min_value=0, max_value=3600),
+            st.integers(min_value=-887272, max_value=887272),
+        ),
+        min_size=1,
+        max_size=100,
+    ),
+    cardinality_next=st.integers(min_value=1, max_value=50),
+    seconds_ago=st.integers(min_value=0, max_value=86400),
+    time_delta=st.integers(min_value=0, max_value=3600),
+)
+def test_marginal_math_univ3_oracle_observe__with_fuzz(
+    swaps, cardinality_next, seconds_ago, time_delta
+):
+    timestamp = 1684761803
+    oracle = UniswapV3Oracle(timestamp, 0, liquidity=2**64)
+    oracle.increase_observation_cardinality_next(cardinality_next)
+
+    history = [(timestamp, 0)]
+    for dt, tick in swaps:
+        timestamp += dt
+        oracle.swap(timestamp, tick, 2**64)
+        if history[-1][0] == timestamp:
+            history[-1] = (timestamp, tick)
+        else:
+            history.append((timestamp, tick))
+
+    time = timestamp + time_delta
+    target = time - seconds_ago
+    oldest = oracle.observations[
+        (oracle.observation_index + 1) % oracle.observation_cardinality
+    ]
+    if not oldest.initialized:
+        oldest = oracle.observations[0]
+
+    if target < oldest.block_timestamp:
+        with pytest.raises(ObservationTooOld):
+            oracle.observe([seconds_ago], time=time)
+    else:
+        (tick_cumulatives, _) = oracle.observe([seconds_ago, 0], time=time)
+        assert tick_cumulatives == [
+            tick_cumulative_by_scan(history, target),
+            tick_cumulative_by_scan(history, time),
+        ]
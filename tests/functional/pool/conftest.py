@@ -2,33 +2,42 @@ import pytest
 
 from math import sqrt
 
+from utils.constants import (
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    MAINTENANCE_UNIT,
+    BASE_FEE_MIN,
+    GAS_LIQUIDATE,
+)
+from utils.utils import calc_amounts_from_liquidity_sqrt_price_x96
 
-@pytest.fixture(scope="module")
+
+@pytest.fixture(scope="session")
 def spot_reserve0(pool, token_a, token_b):
     x = int(125.04e12)  # e.g. USDC reserves on spot
     y = int(71.70e21)  # e.g. WETH reserves on spot
     return x if pool.token0() == token_a.address else y
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def spot_reserve1(pool, token_a, token_b):
     x = int(125.04e12)  # e.g. USDC reserves on spot
     y = int(71.70e21)  # e.g. WETH reserves on spot
     return y if pool.token1() == token_b.address else x
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def spot_liquidity(spot_reserve0, spot_reserve1):
     return int(sqrt(spot_reserve0 * spot_reserve1))
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def sqrt_price_x96_initial(spot_reserve0, spot_reserve1):
     sqrt_price = int(sqrt(spot_reserve1 / spot_reserve0))
     return sqrt_price << 96
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def token0(pool, token_a, token_b, sender, callee, spot_reserve0):
     token0 = token_a if pool.token0() == token_a.address else token_b
     token0.approve(callee.address, 2**256 - 1, sender=sender)
@@ -36,7 +45,7 @@ def token0(pool, token_a, token_b, sender, callee, spot_reserve0):
     return token0
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def token1(pool, token_a, token_b, sender, callee, spot_reserve1):
     token1 = token_b if pool.token1() == token_b.address else token_a
     token1.approve(callee.address, 2**256 - 1, sender=sender)
@@ -44,7 +53,7 @@ def token1(pool, token_a, token_b, sender, callee, spot_reserve1):
     return token1
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def pool_initialized_with_liquidity(
     pool, callee, token0, token1, sender, spot_liquidity
 ):
@@ -55,7 +64,7 @@ def pool_initialized_with_liquidity(
     return pool
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def callee_below_min0(project, accounts, token0, token1, sender):
     callee_below = project.TestMarginalV1PoolBelowMin0Callee.deploy(sender=accounts[0])
     token0.approve(callee_below.address, 2**256 - 1, sender=sender)
@@ -63,7 +72,7 @@ def callee_below_min0(project, accounts, token0, token1, sender):
     return callee_below
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def callee_below_min1(project, accounts, token0, token1, sender):
     callee_below = project.TestMarginalV1PoolBelowMin1Callee.deploy(sender=accounts[1])
     token0.approve(callee_below.address, 2**256 - 1, sender=sender)
@@ -71,7 +80,7 @@ def callee_below_min1(project, accounts, token0, token1, sender):
     return callee_below
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def callee_for_reentrancy(project, accounts, token0, token1, sender):
     callee_reentrancy = project.TestMarginalV1PoolReentrancyCallee.deploy(
         sender=accounts[0]
@@ -81,7 +90,7 @@ def callee_for_reentrancy(project, accounts, token0, token1, sender):
     return callee_reentrancy
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def callee_for_reentrancy_with_open(project, accounts, token0, token1, sender):
     callee_reentrancy = project.TestMarginalV1PoolReentrancyWithOpenCallee.deploy(
         sender=accounts[0]
@@ -91,7 +100,7 @@ def callee_for_reentrancy_with_open(project, accounts, token0, token1, sender):
     return callee_reentrancy
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def callee_for_reentrancy_with_open_and_receive(
     project, accounts, token0, token1, sender
 ):
@@ -105,7 +114,7 @@ def callee_for_reentrancy_with_open_and_receive(
     return callee_reentrancy
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def oracle_sqrt_price_initial_x96(
     pool_initialized_with_liquidity, mock_univ3_pool, oracle_lib
 ):
@@ -117,3 +126,81 @@ def oracle_sqrt_price_initial_x96(
         seconds_ago,
     )
     return sqrt_price_x96
+
+
+@pytest.fixture
+def open_positions(
+    pool_initialized_with_liquidity,
+    callee,
+    sender,
+    token0,
+    token1,
+    chain,
+    position_lib,
+):
+    def open_positions(zero_for_ones: list):
+        """Opens a position through callee for each direction, returning their ids"""
+        state = pool_initialized_with_liquidity.state()
+        maintenance = pool_initialized_with_liquidity.maintenance()
+
+        premium = pool_initialized_with_liquidity.rewardPremium()
+        base_fee = chain.blocks[-1].base_fee
+        rewards = position_lib.liquidationRewards(
+            base_fee,
+            BASE_FEE_MIN,
+            GAS_LIQUIDATE,
+            premium,
+        )
+
+        liquidity_delta = state.liquidity * 10 // 10000  # 0.1% of pool reserves
+        (amount0, amount1) = calc_amounts_from_liquidity_sqrt_price_x96(
+            liquidity_delta, state.sqrtPriceX96
+        )
+
+        ids = []
+        for zero_for_one in zero_for_ones:
+            sqrt_price_limit_x96 = (
+                MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+            )
+            amount = amount1 if zero_for_one else amount0
+            size = int(
+                amount
+                * maintenance
+                / (maintenance + MAINTENANCE_UNIT - liquidity_delta / state.liquidity)
+            )
+            margin = (
+                int(1.15 * size) * maintenance // MAINTENANCE_UNIT
+            )  # 1.15x for breathing room
+
+            tx = callee.open(
+                pool_initialized_with_liquidity.address,
+                callee.address,
+                zero_for_one,
+                liquidity_delta,
+                sqrt_price_limit_x96,
+                margin,
+                sender=sender,
+                value=rewards,
+            )
+            ids.append(int(tx.decode_logs(callee.OpenReturn)[0].id))
+        return ids
+
+    yield open_positions
+
+
+@pytest.fixture(scope="session", autouse=True)
+def pool_world(
+    pool_initialized_with_liquidity,
+    callee_below_min0,
+    callee_below_min1,
+    callee_for_reentrancy,
+    callee_for_reentrancy_with_open,
+    callee_for_reentrancy_with_open_and_receive,
+):
+    """Builds the canonical pool test world once, before the first module snapshot
+
+    @dev ape snapshots the chain around each module and test, then reverts back to the
+    world. Every session fixture with transactions is requested here so none is first
+    deployed inside a module snapshot, where the revert would leave the fixture stale
+    """
+    return pool_initialized_with_liquidity
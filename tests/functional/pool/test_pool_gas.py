@@ -0,0 +1,300 @@
+import pytest
+
+from utils.constants import (
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    MAINTENANCE_UNIT,
+    BASE_FEE_MIN,
+    GAS_LIQUIDATE,
+    SECONDS_AGO,
+)
+from utils.utils import (
+    get_position_key,
+    calc_amounts_from_liquidity_sqrt_price_x96,
+)
+
+# @dev each benchmark runs an operation twice and records both calls. open, adjust, swap,
+# mint and burn repeat on the same pool and recipient storage the first call set. settle
+# and liquidate close two positions opened side by side, so the second is not a warm path
+pytestmark = pytest.mark.gas
+
+
+@pytest.fixture
+def record_gas(gas_snapshot):
+    def record_gas(name: str, zero_for_one, fee_protocol: int, txs: list):
+        direction = (
+            ""
+            if zero_for_one is None
+            else ("zero_for_one," if zero_for_one else "one_for_zero,")
+        )
+        for call, tx in zip(["first", "second"], txs):
+            gas_snapshot.check(
+                f"{name}[{direction}fee_protocol={fee_protocol},{call}]",
+                tx.gas_used,
+            )
+
+    yield record_gas
+
+
+@pytest.fixture
+def set_fee_protocol(pool_initialized_with_liquidity, admin):
+    def set_fee_protocol(fee_protocol: int):
+        if fee_protocol > 0:
+            pool_initialized_with_liquidity.setFeeProtocol(fee_protocol, sender=admin)
+
+    yield set_fee_protocol
+
+
+@pytest.fixture
+def open_position(
+    pool_initialized_with_liquidity,
+    callee,
+    sender,
+    token0,
+    token1,
+    chain,
+    position_lib,
+):
+    def open_position(zero_for_one: bool):
+        state = pool_initialized_with_liquidity.state()
+        maintenance = pool_initialized_with_liquidity.maintenance()
+
+        premium = pool_initialized_with_liquidity.rewardPremium()
+        base_fee = chain.blocks[-1].base_fee
+
+        liquidity_delta = state.liquidity * 100 // 10000  # 1% of pool reserves
+        sqrt_price_limit_x96 = (
+            MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        )
+
+        (amount0, amount1) = calc_amounts_from_liquidity_sqrt_price_x96(
+            liquidity_delta, state.sqrtPriceX96
+        )
+        amount = amount1 if zero_for_one else amount0
+        size = int(
+            amount
+            * maintenance
+            / (maintenance + MAINTENANCE_UNIT - liquidity_delta / state.liquidity)
+        )
+        margin = (
+            int(1.15 * size) * maintenance // MAINTENANCE_UNIT
+        )  # 1.15x for breathing room
+        rewards = position_lib.liquidationRewards(
+            base_fee,
+            BASE_FEE_MIN,
+            GAS_LIQUIDATE,
+            premium,
+        )
+
+        tx = callee.open(
+            pool_initialized_with_liquidity.address,
+            callee.address,
+            zero_for_one,
+            liquidity_delta,
+            sqrt_price_limit_x96,
+            margin,
+            sender=sender,
+            value=rewards,
+        )
+        return (tx, int(tx.decode_logs(callee.OpenReturn)[0].id))
+
+    yield open_position
+
+
+@pytest.fixture
+def oracle_next_obs(rando_univ3_observations):
+    def oracle_next_obs(zero_for_one: bool):
+        obs_last = rando_univ3_observations[-1]
+        obs_before = rando_univ3_observations[-2]
+        tick = (obs_last[1] - obs_before[1]) // (obs_last[0] - obs_before[0])
+
+        # change the oracle price 20% against the position to make it unsafe
+        pct = 120 if zero_for_one else 80
+        obs_timestamp = obs_last[0] + SECONDS_AGO
+        obs_tick_cumulative = obs_last[1] + (SECONDS_AGO * tick * pct) // 100
+        obs_liquidity_cumulative = obs_last[2]  # @dev irrelevant for test
+        return (obs_timestamp, obs_tick_cumulative, obs_liquidity_cumulative, True)
+
+    yield oracle_next_obs
+
+
+@pytest.mark.parametrize("fee_protocol", [0, 10])
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_pool_gas__open(
+    open_position, set_fee_protocol, record_gas, zero_for_one, fee_protocol
+):
+    set_fee_protocol(fee_protocol)
+    txs = [open_position(zero_for_one)[0] for _ in range(2)]
+    record_gas("open", zero_for_one, fee_protocol, txs)
+
+
+@pytest.mark.parametrize("fee_protocol", [0, 10])
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_pool_gas__adjust(
+    pool_initialized_with_liquidity,
+    callee,
+    sender,
+    alice,
+    open_position,
+    set_fee_protocol,
+    record_gas,
+    zero_for_one,
+    fee_protocol,
+):
+    set_fee_protocol(fee_protocol)
+    (_, id) = open_position(zero_for_one)
+    position = pool_initialized_with_liquidity.positions(
+        get_position_key(callee.address, id)
+    )
+    margin_delta = position.margin // 10
+
+    txs = [
+        callee.adjust(
+            pool_initialized_with_liquidity.address,
+            alice.address,
+            id,
+            margin_delta,
+            sender=sender,
+        )
+        for _ in range(2)
+    ]
+    record_gas("adjust", zero_for_one, fee_protocol, txs)
+
+
+@pytest.mark.parametrize("fee_protocol", [0, 10])
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_pool_gas__settle(
+    pool_initialized_with_liquidity,
+    callee,
+    sender,
+    alice,
+    open_position,
+    set_fee_protocol,
+    record_gas,
+    zero_for_one,
+    fee_protocol,
+):
+    set_fee_protocol(fee_protocol)
+    ids = [open_position(zero_for_one)[1] for _ in range(2)]
+
+    txs = [
+        callee.settle(
+            pool_initialized_with_liquidity.address, alice.address, id, sender=sender
+        )
+        for id in ids
+    ]
+    record_gas("settle", zero_for_one, fee_protocol, txs)
+
+
+@pytest.mark.parametrize("fee_protocol", [0, 10])
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_pool_gas__liquidate(
+    pool_initialized_with_liquidity,
+    callee,
+    mock_univ3_pool,
+    oracle_next_obs,
+    sender,
+    alice,
+    bob,
+    open_position,
+    set_fee_protocol,
+    record_gas,
+    zero_for_one,
+    fee_protocol,
+):
+    set_fee_protocol(fee_protocol)
+    ids = [open_position(zero_for_one)[1] for _ in range(2)]
+    mock_univ3_pool.pushObservation(*oracle_next_obs(zero_for_one), sender=sender)
+
+    txs = [
+        pool_initialized_with_liquidity.liquidate(
+            bob.address, callee.address, id, sender=alice
+        )
+        for id in ids
+    ]
+    record_gas("liquidate", zero_for_one, fee_protocol, txs)
+
+
+@pytest.mark.parametrize("fee_protocol", [0, 10])
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_pool_gas__swap(
+    pool_initialized_with_liquidity,
+    callee,
+    sender,
+    alice,
+    token0,
+    token1,
+    set_fee_protocol,
+    record_gas,
+    zero_for_one,
+    fee_protocol,
+):
+    set_fee_protocol(fee_protocol)
+    state = pool_initialized_with_liquidity.state()
+    (reserve0, reserve1) = calc_amounts_from_liquidity_sqrt_price_x96(
+        state.liquidity, state.sqrtPriceX96
+    )
+    amount_specified = (
+        reserve0 if zero_for_one else reserve1
+    ) // 100  # 1% of reserves in
+    sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+    txs = [
+        callee.swap(
+            pool_initialized_with_liquidity.address,
+            alice.address,
+            zero_for_one,
+            amount_specified,
+            sqrt_price_limit_x96,
+            sender=sender,
+        )
+        for _ in range(2)
+    ]
+    record_gas("swap", zero_for_one, fee_protocol, txs)
+
+
+@pytest.mark.parametrize("fee_protocol", [0, 10])
+def test_pool_gas__mint(
+    pool_initialized_with_liquidity,
+    callee,
+    sender,
+    alice,
+    token0,
+    token1,
+    set_fee_protocol,
+    record_gas,
+    fee_protocol,
+):
+    set_fee_protocol(fee_protocol)
+    state = pool_initialized_with_liquidity.state()
+    liquidity_delta = state.liquidity * 10 // 10000  # 0.1% of pool reserves
+
+    txs = [
+        callee.mint(
+            pool_initialized_with_liquidity.address,
+            alice.address,
+            liquidity_delta,
+            sender=sender,
+        )
+        for _ in range(2)
+    ]
+    record_gas("mint", None, fee_protocol, txs)
+
+
+@pytest.mark.parametrize("fee_protocol", [0, 10])
+def test_pool_gas__burn(
+    pool_initialized_with_liquidity,
+    sender,
+    alice,
+    set_fee_protocol,
+    record_gas,
+    fee_protocol,
+):
+    set_fee_protocol(fee_protocol)
+    shares = pool_initialized_with_liquidity.balanceOf(sender.address)
+
+    txs = [
+        pool_initialized_with_liquidity.burn(alice.address, shares // 3, sender=sender)
+        for _ in range(2)
+    ]
+    record_gas("burn", None, fee_protocol, txs)
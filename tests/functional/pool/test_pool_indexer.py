@@ -0,0 +1,229 @@
+import pytest
+
+from marginal_math.indexer import PositionIndexer, PositionStore, ReorgError
+from marginal_math.position import Info
+from utils.constants import (
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    MAINTENANCE_UNIT,
+    BASE_FEE_MIN,
+    GAS_LIQUIDATE,
+)
+from utils.utils import (
+    get_position_key,
+    calc_amounts_from_liquidity_sqrt_price_x96,
+)
+
+
+@pytest.fixture
+def open_position(
+    pool_initialized_with_liquidity,
+    callee,
+    sender,
+    token0,
+    token1,
+    chain,
+    position_lib,
+):
+    def open_position(zero_for_one: bool):
+        state = pool_initialized_with_liquidity.state()
+        maintenance = pool_initialized_with_liquidity.maintenance()
+
+        premium = pool_initialized_with_liquidity.rewardPremium()
+        base_fee = chain.blocks[-1].base_fee
+
+        liquidity_delta = state.liquidity * 100 // 10000  # 1% of pool reserves
+        sqrt_price_limit_x96 = (
+            MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        )
+
+        (amount0, amount1) = calc_amounts_from_liquidity_sqrt_price_x96(
+            liquidity_delta, state.sqrtPriceX96
+        )
+        amount = amount1 if zero_for_one else amount0
+        size = int(
+            amount
+            * maintenance
+            / (maintenance + MAINTENANCE_UNIT - liquidity_delta / state.liquidity)
+        )
+        margin = (
+            int(1.25 * size) * maintenance // MAINTENANCE_UNIT
+        )  # 1.25x for breathing room
+        rewards = position_lib.liquidationRewards(
+            base_fee,
+            BASE_FEE_MIN,
+            GAS_LIQUIDATE,
+            premium,
+        )
+
+        tx = callee.open(
+            pool_initialized_with_liquidity.address,
+            callee.address,
+            zero_for_one,
+            liquidity_delta,
+            sqrt_price_limit_x96,
+            margin,
+            sender=sender,
+            value=rewards,
+        )
+        return int(tx.decode_logs(callee.OpenReturn)[0].id)
+
+    yield open_position
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "positions.db")
+
+
+@pytest.fixture
+def assert_indexed(pool_initialized_with_liquidity):
+    def assert_indexed(indexer, keys):
+        assert set(indexer.positions.keys()) == set(keys)
+        for owner, id in keys:
+            position = pool_initialized_with_liquidity.positions(
+                get_position_key(owner, id)
+            )
+            assert indexer.positions[(owner, id)] == Info.from_struct(position)
+
+    yield assert_indexed
+
+
+def test_pool_indexer_sync__folds_events(
+    pool_initialized_with_liquidity,
+    callee,
+    sender,
+    alice,
+    open_position,
+    store_path,
+    assert_indexed,
+    chain,
+):
+    start_block = chain.blocks.head.number
+    ids = [open_position(True), open_position(False), open_position(True)]
+    keys = [(callee.address, id) for id in ids]
+
+    indexer = PositionIndexer(
+        pool_initialized_with_liquidity,
+        chain,
+        PositionStore(store_path, pool_initialized_with_liquidity.address),
+        confirmations=0,
+        start_block=start_block,
+    )
+    indexer.sync()
+    assert_indexed(indexer, keys)
+
+    position = pool_initialized_with_liquidity.positions(
+        get_position_key(callee.address, ids[0])
+    )
+    callee.adjust(
+        pool_initialized_with_liquidity.address,
+        alice.address,
+        ids[0],
+        position.margin,
+        sender=sender,
+    )
+    callee.settle(
+        pool_initialized_with_liquidity.address, alice.address, ids[1], sender=sender
+    )
+
+    indexer.sync()
+    assert_indexed(indexer, keys)
+    assert indexer.positions[keys[1]].size == 0
+
+
+def test_pool_indexer_sync__resumes_from_checkpoint(
+    pool_initialized_with_liquidity,
+    callee,
+    open_position,
+    store_path,
+    assert_indexed,
+    chain,
+):
+    start_block = chain.blocks.head.number
+    keys = [(callee.address, open_position(True))]
+
+    store = PositionStore(store_path, pool_initialized_with_liquidity.address)
+    indexer = PositionIndexer(
+        pool_initialized_with_liquidity,
+        chain,
+        store,
+        confirmations=0,
+        start_block=start_block,
+    )
+    head = indexer.sync()
+    store.close()
+
+    store = PositionStore(store_path, pool_initialized_with_liquidity.address)
+    indexer = PositionIndexer(
+        pool_initialized_with_liquidity, chain, store, confirmations=0
+    )
+    assert indexer.checkpoint.block_number == head
+    assert indexer.start_block == head + 1
+    assert_indexed(indexer, keys)
+
+    keys.append((callee.address, open_position(False)))
+    indexer.sync()
+    assert_indexed(indexer, keys)
+
+
+def test_pool_indexer_sync__rolls_back_unfinalized_on_reorg(
+    pool_initialized_with_liquidity,
+    callee,
+    open_position,
+    store_path,
+    assert_indexed,
+    chain,
+):
+    start_block = chain.blocks.head.number
+    keys = [(callee.address, open_position(True))]
+
+    indexer = PositionIndexer(
+        pool_initialized_with_liquidity,
+        chain,
+        PositionStore(store_path, pool_initialized_with_liquidity.address),
+        confirmations=4,
+        start_block=start_block,
+    )
+    chain.mine(4)
+    indexer.sync()  # finalizes first open
+    checkpoint = indexer.checkpoint
+
+    snapshot = chain.snapshot()
+    id = open_position(True)
+    indexer.sync()
+    assert_indexed(indexer, keys + [(callee.address, id)])
+
+    # reorg out the unfinalized open, replaced by an open the other way
+    chain.restore(snapshot)
+    id = open_position(False)
+    indexer.sync()
+    assert indexer.checkpoint == checkpoint
+    assert_indexed(indexer, keys + [(callee.address, id)])
+    assert indexer.positions[(callee.address, id)].zero_for_one is False
+
+
+def test_pool_indexer_sync__raises_when_checkpoint_reorged(
+    pool_initialized_with_liquidity,
+    callee,
+    open_position,
+    store_path,
+    chain,
+):
+    start_block = chain.blocks.head.number
+    snapshot = chain.snapshot()
+    open_position(True)
+
+    indexer = PositionIndexer(
+        pool_initialized_with_liquidity,
+        chain,
+        PositionStore(store_path, pool_initialized_with_liquidity.address),
+        confirmations=0,
+        start_block=start_block,
+    )
+    indexer.sync()
+
+    chain.restore(snapshot)
+    open_position(False)
+    with pytest.raises(ReorgError):
+        indexer.sync()
@@ -0,0 +1,195 @@
+import pytest
+
+from ape import reverts
+
+from marginal_math.lens import healths
+from utils.constants import (
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    MAINTENANCE_UNIT,
+    BASE_FEE_MIN,
+    GAS_LIQUIDATE,
+    SECONDS_AGO,
+)
+from utils.utils import (
+    get_position_key,
+    calc_amounts_from_liquidity_sqrt_price_x96,
+)
+
+
+@pytest.fixture
+def oracle_next_obs(rando_univ3_observations):
+    def oracle_next_obs(tick_bps: int):
+        obs_last = rando_univ3_observations[-1]
+        obs_before = rando_univ3_observations[-2]
+        tick = (obs_last[1] - obs_before[1]) // (obs_last[0] - obs_before[0])
+
+        obs_timestamp = obs_last[0] + SECONDS_AGO
+        obs_tick_cumulative = obs_last[1] + (SECONDS_AGO * tick * tick_bps) // 100
+        obs_liquidity_cumulative = obs_last[2]  # @dev irrelevant for test
+        return (obs_timestamp, obs_tick_cumulative, obs_liquidity_cumulative, True)
+
+    yield oracle_next_obs
+
+
+@pytest.fixture
+def open_position(
+    pool_initialized_with_liquidity,
+    callee,
+    sender,
+    token0,
+    token1,
+    chain,
+    position_lib,
+):
+    def open_position(zero_for_one: bool):
+        state = pool_initialized_with_liquidity.state()
+        maintenance = pool_initialized_with_liquidity.maintenance()
+
+        premium = pool_initialized_with_liquidity.rewardPremium()
+        base_fee = chain.blocks[-1].base_fee
+
+        liquidity_delta = state.liquidity * 100 // 10000  # 1% of pool reserves
+        sqrt_price_limit_x96 = (
+            MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        )
+
+        (amount0, amount1) = calc_amounts_from_liquidity_sqrt_price_x96(
+            liquidity_delta, state.sqrtPriceX96
+        )
+        amount = amount1 if zero_for_one else amount0
+        size = int(
+            amount
+            * maintenance
+            / (maintenance + MAINTENANCE_UNIT - liquidity_delta / state.liquidity)
+        )
+        margin = (
+            int(1.15 * size) * maintenance // MAINTENANCE_UNIT
+        )  # 1.15x for breathing room
+        rewards = position_lib.liquidationRewards(
+            base_fee,
+            BASE_FEE_MIN,
+            GAS_LIQUIDATE,
+            premium,
+        )
+
+        tx = callee.open(
+            pool_initialized_with_liquidity.address,
+            callee.address,
+            zero_for_one,
+            liquidity_delta,
+            sqrt_price_limit_x96,
+            margin,
+            sender=sender,
+            value=rewards,
+        )
+        return int(tx.decode_logs(callee.OpenReturn)[0].id)
+
+    yield open_position
+
+
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_pool_lens_healths__returns_position_health(
+    pool_initialized_with_liquidity,
+    pool_lens,
+    callee,
+    position_lib,
+    open_position,
+    zero_for_one,
+):
+    id = open_position(zero_for_one)
+    maintenance = pool_initialized_with_liquidity.maintenance()
+    position = pool_initialized_with_liquidity.positions(
+        get_position_key(callee.address, id)
+    )
+
+    oracle_sqrt_price_x96, results = pool_lens.healths(
+        pool_initialized_with_liquidity.address, [(callee.address, id)]
+    )
+    assert len(results) == 1
+    health = results[0]
+
+    assert health.size == position.size
+    assert health.margin == position.margin
+    assert health.rewards == position.rewards
+    assert health.liquidated is False
+    assert health.safe is True
+    assert health.marginMinimum >= position_lib.marginMinimum(position, maintenance)
+
+    # locked amounts and safety consistent with synced debts
+    position.debt0 = health.debt0
+    position.debt1 = health.debt1
+    assert (health.amount0Locked, health.amount1Locked) == position_lib.amountsLocked(
+        position
+    )
+    assert health.safe == position_lib.safe(
+        position, oracle_sqrt_price_x96, maintenance
+    )
+
+
+def test_pool_lens_healths__returns_unsafe_when_liquidatable(
+    pool_initialized_with_liquidity,
+    pool_lens,
+    callee,
+    mock_univ3_pool,
+    oracle_next_obs,
+    open_position,
+    sender,
+    alice,
+):
+    zero_for_one_id = open_position(True)
+    one_for_zero_id = open_position(False)
+
+    # change the oracle price up 20% to make the zero for one position unsafe
+    mock_univ3_pool.pushObservation(*oracle_next_obs(120), sender=sender)
+
+    keys = [(callee.address, zero_for_one_id), (callee.address, one_for_zero_id)]
+    _, results = pool_lens.healths(pool_initialized_with_liquidity.address, keys)
+    assert [health.safe for health in results] == [False, True]
+
+    # agrees with liquidate
+    with reverts(pool_initialized_with_liquidity.PositionSafe):
+        pool_initialized_with_liquidity.liquidate(
+            alice.address, callee.address, one_for_zero_id, sender=alice
+        )
+    pool_initialized_with_liquidity.liquidate(
+        alice.address, callee.address, zero_for_one_id, sender=alice
+    )
+
+    _, results = pool_lens.healths(pool_initialized_with_liquidity.address, keys)
+    assert results[0].liquidated is True
+    assert results[0].size == 0
+    assert results[0].safe is True
+
+
+def test_pool_lens_healths__returns_empty_with_nonexistent_position(
+    pool_initialized_with_liquidity, pool_lens, alice
+):
+    _, results = pool_lens.healths(
+        pool_initialized_with_liquidity.address, [(alice.address, 0)]
+    )
+    health = results[0]
+    assert health.size == 0
+    assert health.debt0 == 0 and health.debt1 == 0
+    assert health.rewards == 0
+    assert health.safe is True
+    assert health.liquidated is False
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 500])
+def test_pool_lens_healths__pages_in_chunks(
+    pool_initialized_with_liquidity,
+    pool_lens,
+    callee,
+    open_position,
+    chunk_size,
+):
+    keys = [(callee.address, open_position(i % 2 == 0)) for i in range(5)]
+    _, results = pool_lens.healths(pool_initialized_with_liquidity.address, keys)
+
+    paged = healths(
+        pool_lens, pool_initialized_with_liquidity.address, keys, chunk_size
+    )
+    assert [(health.owner, health.id) for health in paged] == keys
+    assert [health.size for health in paged] == [health.size for health in results]
+    assert [health.safe for health in paged] == [health.safe for health in results]
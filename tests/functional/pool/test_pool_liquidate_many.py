@@ -0,0 +1,138 @@
+import pytest
+
+from ape import reverts
+
+from utils.constants import SECONDS_AGO
+from utils.utils import get_position_key
+
+
+@pytest.fixture
+def oracle_next_obs_zero_for_one(rando_univ3_observations):
+    obs_last = rando_univ3_observations[-1]
+    obs_before = rando_univ3_observations[-2]
+    tick = (obs_last[1] - obs_before[1]) // (obs_last[0] - obs_before[0])
+
+    obs_timestamp = obs_last[0] + SECONDS_AGO
+    obs_tick_cumulative = obs_last[1] + (SECONDS_AGO * tick * 120) // 100
+    obs_liquidity_cumulative = obs_last[2]  # @dev irrelevant for test
+    obs = (obs_timestamp, obs_tick_cumulative, obs_liquidity_cumulative, True)
+    return obs
+
+
+def test_pool_liquidate_many__liquidates_unsafe_positions(
+    pool_initialized_with_liquidity,
+    callee,
+    mock_univ3_pool,
+    oracle_next_obs_zero_for_one,
+    open_positions,
+    sender,
+    alice,
+    bob,
+):
+    ids = open_positions([True, False, True])
+    positions = [
+        pool_initialized_with_liquidity.positions(get_position_key(callee.address, id))
+        for id in ids
+    ]
+
+    # change the oracle price up 20% to make the zero for one positions unsafe
+    mock_univ3_pool.pushObservation(*oracle_next_obs_zero_for_one, sender=sender)
+
+    liquidity_locked = pool_initialized_with_liquidity.liquidityLocked()
+    balance_bob = bob.balance
+
+    owners = [callee.address] * len(ids)
+    tx = pool_initialized_with_liquidity.liquidateMany(
+        bob.address, owners, ids, sender=alice
+    )
+    assert tx.return_value == (positions[0].rewards + positions[2].rewards, 2)
+    assert bob.balance == balance_bob + positions[0].rewards + positions[2].rewards
+    assert (
+        pool_initialized_with_liquidity.liquidityLocked()
+        == liquidity_locked
+        - positions[0].liquidityLocked
+        - positions[2].liquidityLocked
+    )
+
+    events = tx.decode_logs(pool_initialized_with_liquidity.Liquidate)
+    assert [event.id for event in events] == [ids[0], ids[2]]
+    assert all(event.recipient == bob.address for event in events)
+
+    results = [
+        pool_initialized_with_liquidity.positions(get_position_key(callee.address, id))
+        for id in ids
+    ]
+    assert [result.liquidated for result in results] == [True, False, True]
+    assert results[1] == positions[1]
+
+
+def test_pool_liquidate_many__skips_safe_and_settled_positions(
+    pool_initialized_with_liquidity,
+    callee,
+    open_positions,
+    sender,
+    alice,
+    bob,
+):
+    ids = open_positions([True, False])
+    callee.settle(
+        pool_initialized_with_liquidity.address, sender.address, ids[0], sender=sender
+    )
+
+    state = pool_initialized_with_liquidity.state()
+    balance_bob = bob.balance
+
+    # settled, safe and nonexistent positions
+    owners = [callee.address, callee.address, alice.address]
+    tx = pool_initialized_with_liquidity.liquidateMany(
+        bob.address, owners, ids + [0], sender=alice
+    )
+    assert tx.return_value == (0, 0)
+    assert bob.balance == balance_bob
+    assert pool_initialized_with_liquidity.state() == state
+    assert len(tx.decode_logs(pool_initialized_with_liquidity.Liquidate)) == 0
+
+
+def test_pool_liquidate_many__reverts_when_lengths_differ(
+    pool_initialized_with_liquidity, callee, alice, bob
+):
+    with reverts(pool_initialized_with_liquidity.InvalidPositionsLength):
+        pool_initialized_with_liquidity.liquidateMany(
+            bob.address, [callee.address], [0, 1], sender=alice
+        )
+
+
+@pytest.mark.gas
+@pytest.mark.parametrize("n", [1, 10, 25, 50, 100])
+def test_pool_liquidate_many__gas_per_position(
+    pool_initialized_with_liquidity,
+    callee,
+    mock_univ3_pool,
+    oracle_next_obs_zero_for_one,
+    open_positions,
+    sender,
+    alice,
+    bob,
+    chain,
+    gas_snapshot,
+    n,
+):
+    ids = open_positions([True] * n)
+    mock_univ3_pool.pushObservation(*oracle_next_obs_zero_for_one, sender=sender)
+
+    snapshot = chain.snapshot()
+    tx = pool_initialized_with_liquidity.liquidate(
+        bob.address, callee.address, ids[0], sender=alice
+    )
+    gas_single = tx.gas_used
+    chain.restore(snapshot)
+
+    tx = pool_initialized_with_liquidity.liquidateMany(
+        bob.address, [callee.address] * n, ids, sender=alice
+    )
+    assert tx.return_value[1] == n
+    gas_snapshot.check(f"liquidateMany[n={n}]", tx.gas_used)
+
+    gas_per_position = tx.gas_used // n
+    if n > 1:
+        assert gas_per_position < gas_single
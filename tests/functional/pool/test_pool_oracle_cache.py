@@ -0,0 +1,129 @@
+import pytest
+
+from utils.constants import SECONDS_AGO
+from utils.utils import get_position_key
+
+
+@pytest.fixture
+def oracle_next_obs_zero_for_one(rando_univ3_observations):
+    obs_last = rando_univ3_observations[-1]
+    obs_before = rando_univ3_observations[-2]
+    tick = (obs_last[1] - obs_before[1]) // (obs_last[0] - obs_before[0])
+
+    obs_timestamp = obs_last[0] + SECONDS_AGO
+    obs_tick_cumulative = obs_last[1] + (SECONDS_AGO * tick * 120) // 100
+    obs_liquidity_cumulative = obs_last[2]  # @dev irrelevant for test
+    obs = (obs_timestamp, obs_tick_cumulative, obs_liquidity_cumulative, True)
+    return obs
+
+
+def test_pool_oracle_cache__settle_batch_settles_positions(
+    pool_initialized_with_liquidity, callee, open_positions, sender, alice
+):
+    ids = open_positions([True] * 3)
+    tx = callee.settleBatch(
+        pool_initialized_with_liquidity.address, alice.address, ids, sender=sender
+    )
+    assert len(tx.decode_logs(pool_initialized_with_liquidity.Settle)) == 3
+    assert pool_initialized_with_liquidity.liquidityLocked() == 0
+    for id in ids:
+        position = pool_initialized_with_liquidity.positions(
+            get_position_key(callee.address, id)
+        )
+        assert position.size == 0
+
+
+def test_pool_oracle_cache__liquidate_batch_liquidates_positions(
+    pool_initialized_with_liquidity,
+    callee,
+    mock_univ3_pool,
+    oracle_next_obs_zero_for_one,
+    open_positions,
+    sender,
+    alice,
+    bob,
+):
+    ids = open_positions([True] * 3)
+    mock_univ3_pool.pushObservation(*oracle_next_obs_zero_for_one, sender=sender)
+
+    tx = callee.liquidateBatch(
+        pool_initialized_with_liquidity.address,
+        bob.address,
+        [callee.address] * len(ids),
+        ids,
+        sender=alice,
+    )
+    assert len(tx.decode_logs(pool_initialized_with_liquidity.Liquidate)) == 3
+    for id in ids:
+        position = pool_initialized_with_liquidity.positions(
+            get_position_key(callee.address, id)
+        )
+        assert position.liquidated is True
+
+
+@pytest.mark.gas
+@pytest.mark.parametrize("n", [1, 5, 10])
+def test_pool_oracle_cache__settle_batch_gas(
+    pool_initialized_with_liquidity,
+    callee,
+    open_positions,
+    sender,
+    alice,
+    chain,
+    gas_snapshot,
+    n,
+):
+    ids = open_positions([True] * n)
+
+    snapshot = chain.snapshot()
+    tx = callee.settle(
+        pool_initialized_with_liquidity.address, alice.address, ids[0], sender=sender
+    )
+    gas_single = tx.gas_used
+    chain.restore(snapshot)
+
+    # single observe call for all settles in the batch
+    tx = callee.settleBatch(
+        pool_initialized_with_liquidity.address, alice.address, ids, sender=sender
+    )
+    gas_snapshot.check(f"settleBatch[n={n}]", tx.gas_used)
+    if n > 1:
+        assert tx.gas_used // n < gas_single
+
+
+@pytest.mark.gas
+@pytest.mark.parametrize("n", [1, 5, 10])
+def test_pool_oracle_cache__liquidate_batch_gas(
+    pool_initialized_with_liquidity,
+    callee,
+    mock_univ3_pool,
+    oracle_next_obs_zero_for_one,
+    open_positions,
+    sender,
+    alice,
+    bob,
+    chain,
+    gas_snapshot,
+    n,
+):
+    ids = open_positions([True] * n)
+    mock_univ3_pool.pushObservation(*oracle_next_obs_zero_for_one, sender=sender)
+
+    snapshot = chain.snapshot()
+    tx = pool_initialized_with_liquidity.liquidate(
+        bob.address, callee.address, ids[0], sender=alice
+    )
+    gas_single = tx.gas_used
+    chain.restore(snapshot)
+
+    # single observe call for all liquidations in the batch
+    tx = callee.liquidateBatch(
+        pool_initialized_with_liquidity.address,
+        bob.address,
+        [callee.address] * n,
+        ids,
+        sender=alice,
+    )
+    gas_snapshot.check(f"liquidateBatch[n={n}]", tx.gas_used)
+    if n > 1:
+        assert tx.gas_used // n < gas_single
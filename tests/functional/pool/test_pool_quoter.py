@@ -0,0 +1,84 @@
+import pytest
+
+from ape import reverts
+
+from marginal_math.differential import load
+from marginal_math.quoter import quote_open_by_size
+from utils.constants import (
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    BASE_FEE_MIN,
+    GAS_LIQUIDATE,
+)
+from utils.utils import get_position_key
+
+
+@pytest.fixture
+def rewards(pool_initialized_with_liquidity, position_lib, chain):
+    return position_lib.liquidationRewards(
+        chain.blocks[-1].base_fee,
+        BASE_FEE_MIN,
+        GAS_LIQUIDATE,
+        pool_initialized_with_liquidity.rewardPremium(),
+    )
+
+
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_pool_quoter_quote_open_by_size__matches_open(
+    pool_initialized_with_liquidity,
+    mock_univ3_pool,
+    callee,
+    sender,
+    token0,
+    token1,
+    rewards,
+    zero_for_one,
+):
+    sim = load(pool_initialized_with_liquidity, mock_univ3_pool)
+    maintenance = pool_initialized_with_liquidity.maintenance()
+    reserve = (
+        (sim.state.liquidity * sim.state.sqrt_price_x96) >> 96
+        if zero_for_one
+        else (sim.state.liquidity << 96) // sim.state.sqrt_price_x96
+    )
+    size = reserve // 100  # 1% of pool reserves
+
+    quote = quote_open_by_size(sim.state, maintenance, zero_for_one, size)
+    sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+    # margin below quoted minimum reverts
+    with reverts(pool_initialized_with_liquidity.MarginLessThanMin):
+        callee.open(
+            pool_initialized_with_liquidity.address,
+            callee.address,
+            zero_for_one,
+            quote.liquidity_delta,
+            sqrt_price_limit_x96,
+            quote.margin_minimum - 1,
+            sender=sender,
+            value=rewards,
+        )
+
+    tx = callee.open(
+        pool_initialized_with_liquidity.address,
+        callee.address,
+        zero_for_one,
+        quote.liquidity_delta,
+        sqrt_price_limit_x96,
+        quote.margin_minimum,
+        sender=sender,
+        value=rewards,
+    )
+    result = tx.decode_logs(callee.OpenReturn)[0]
+    assert result.size == quote.size
+    assert result.size >= size
+    assert result.debt == quote.debt
+    assert (result.amount1 if zero_for_one else result.amount0) == (
+        quote.margin_minimum + quote.fees
+    )
+
+    position = pool_initialized_with_liquidity.positions(
+        get_position_key(callee.address, result.id)
+    )
+    assert position.insurance0 == quote.position.insurance0
+    assert position.insurance1 == quote.position.insurance1
@@ -0,0 +1,116 @@
+import pytest
+
+from ape import reverts
+
+from utils.utils import get_position_key
+
+
+@pytest.mark.parametrize("zero_for_ones", [[True, True], [False, False], [True, False]])
+def test_pool_settle_many__settles_positions(
+    pool_initialized_with_liquidity,
+    callee,
+    open_positions,
+    sender,
+    alice,
+    token0,
+    token1,
+    zero_for_ones,
+):
+    ids = open_positions(zero_for_ones)
+    positions = [
+        pool_initialized_with_liquidity.positions(get_position_key(callee.address, id))
+        for id in ids
+    ]
+    liquidity_locked = pool_initialized_with_liquidity.liquidityLocked()
+    balance_alice = alice.balance
+    (balance0_alice, balance1_alice) = (
+        token0.balanceOf(alice.address),
+        token1.balanceOf(alice.address),
+    )
+
+    tx = callee.settleMany(
+        pool_initialized_with_liquidity.address, alice.address, ids, sender=sender
+    )
+    (amount0, amount1, rewards) = tx.decode_logs(callee.SettleReturn)[0]
+    assert rewards == sum(position.rewards for position in positions)
+    assert alice.balance == balance_alice + rewards
+    assert pool_initialized_with_liquidity.liquidityLocked() == liquidity_locked - sum(
+        position.liquidityLocked for position in positions
+    )
+
+    # single callback with net amounts, net amounts out sent to recipient
+    callbacks = tx.decode_logs(callee.SettleCallback)
+    assert len(callbacks) == 1
+    assert (callbacks[0].amount0Delta, callbacks[0].amount1Delta) == (
+        amount0,
+        amount1,
+    )
+    assert token0.balanceOf(alice.address) == balance0_alice + max(-amount0, 0)
+    assert token1.balanceOf(alice.address) == balance1_alice + max(-amount1, 0)
+
+    events = tx.decode_logs(pool_initialized_with_liquidity.Settle)
+    assert [event.id for event in events] == ids
+    assert sum(event.amount0 for event in events) == amount0
+    assert sum(event.amount1 for event in events) == amount1
+
+    state = pool_initialized_with_liquidity.state()
+    assert all(event.liquidityAfter == state.liquidity for event in events)
+    assert all(event.sqrtPriceX96After == state.sqrtPriceX96 for event in events)
+    for id in ids:
+        position = pool_initialized_with_liquidity.positions(
+            get_position_key(callee.address, id)
+        )
+        assert position.size == 0
+
+
+def test_pool_settle_many__reverts_when_position_settled(
+    pool_initialized_with_liquidity, callee, open_positions, sender, alice
+):
+    ids = open_positions([True, False])
+    with reverts(pool_initialized_with_liquidity.InvalidPosition):
+        callee.settleMany(
+            pool_initialized_with_liquidity.address,
+            alice.address,
+            ids + ids[:1],
+            sender=sender,
+        )
+
+
+def test_pool_settle_many__reverts_when_no_positions(
+    pool_initialized_with_liquidity, callee, sender, alice
+):
+    with reverts(pool_initialized_with_liquidity.InvalidPositionsLength):
+        callee.settleMany(
+            pool_initialized_with_liquidity.address, alice.address, [], sender=sender
+        )
+
+
+@pytest.mark.gas
+@pytest.mark.parametrize("n", [1, 10, 25])
+def test_pool_settle_many__gas_per_position(
+    pool_initialized_with_liquidity,
+    callee,
+    open_positions,
+    sender,
+    alice,
+    chain,
+    gas_snapshot,
+    n,
+):
+    ids = open_positions([True] * n)
+
+    snapshot = chain.snapshot()
+    tx = callee.settle(
+        pool_initialized_with_liquidity.address, alice.address, ids[0], sender=sender
+    )
+    gas_single = tx.gas_used
+    chain.restore(snapshot)
+
+    tx = callee.settleMany(
+        pool_initialized_with_liquidity.address, alice.address, ids, sender=sender
+    )
+    gas_snapshot.check(f"settleMany[n={n}]", tx.gas_used)
+
+    gas_per_position = tx.gas_used // n
+    if n > 1:
+        assert gas_per_position < gas_single
@@ -0,0 +1,280 @@
+import pytest
+
+from datetime import timedelta
+from hypothesis import given, settings, strategies as st
+
+from marginal_math.differential import DifferentialPool, assert_in_sync, load
+from marginal_math.liquidity_math import to_amounts
+from marginal_math.position import liquidation_rewards
+from utils.constants import (
+    BASE_FEE_MIN,
+    GAS_LIQUIDATE,
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    REWARD_PREMIUM,
+)
+
+
+@pytest.fixture
+def differential_pool(
+    pool_initialized_with_liquidity,
+    mock_univ3_pool,
+    callee,
+    token0,
+    token1,
+    sender,
+    chain,
+):
+    sim = load(
+        pool_initialized_with_liquidity,
+        mock_univ3_pool,
+        holders=[sender.address],
+        token0=token0,
+        token1=token1,
+    )
+    return DifferentialPool(sim, pool_initialized_with_liquidity, callee, chain)
+
+
+@pytest.fixture
+def margin(token0, token1, sender):
+    def margin(zero_for_one: bool) -> int:
+        # margin in token1 if zero for one else token0
+        token = token1 if zero_for_one else token0
+        return token.balanceOf(sender.address) // 100
+
+    return margin
+
+
+@pytest.fixture
+def rewards(chain):
+    base_fee = chain.blocks[-1].base_fee
+    return liquidation_rewards(base_fee, BASE_FEE_MIN, GAS_LIQUIDATE, REWARD_PREMIUM)
+
+
+def test_pool_simulator__load_in_sync(
+    pool_initialized_with_liquidity, mock_univ3_pool, sender
+):
+    sim = load(
+        pool_initialized_with_liquidity, mock_univ3_pool, holders=[sender.address]
+    )
+    assert_in_sync(sim, pool_initialized_with_liquidity)
+    assert sim.balance_of(sender.address) == pool_initialized_with_liquidity.balanceOf(
+        sender.address
+    )
+
+
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_pool_simulator__open_adjust_settle_in_sync(
+    differential_pool, sender, margin, rewards, zero_for_one
+):
+    state = differential_pool.sim.state
+    liquidity_delta = state.liquidity * 500 // 10000  # 5% of pool reserves leveraged
+    sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+    (id, size, _, _, _) = differential_pool.open(
+        sender,
+        zero_for_one,
+        liquidity_delta,
+        sqrt_price_limit_x96,
+        margin(zero_for_one),
+        rewards,
+    )
+    assert size > 0
+
+    position = differential_pool.sim.get_position(differential_pool.callee.address, id)
+    assert differential_pool.adjust(sender, id, -(position.margin // 2)) is not None
+    assert differential_pool.settle(sender, id) is not None
+
+    # reverts on already settled position
+    assert differential_pool.settle(sender, id) is None
+    assert differential_pool.steps == 4
+
+
+def test_pool_simulator__settle_many_in_sync(
+    differential_pool, sender, margin, rewards
+):
+    state = differential_pool.sim.state
+    liquidity_delta = state.liquidity * 100 // 10000  # 1% of pool reserves leveraged
+
+    ids = []
+    for zero_for_one in [True, False, True]:
+        sqrt_price_limit_x96 = (
+            MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        )
+        (id, _, _, _, _) = differential_pool.open(
+            sender,
+            zero_for_one,
+            liquidity_delta,
+            sqrt_price_limit_x96,
+            margin(zero_for_one),
+            rewards,
+        )
+        ids.append(id)
+
+    assert differential_pool.settle_many(sender, ids) is not None
+
+    # reverts on already settled positions
+    assert differential_pool.settle_many(sender, ids[:1]) is None
+    assert differential_pool.settle_many(sender, []) is None
+
+
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_pool_simulator__open_reverts_in_sync(
+    differential_pool, sender, margin, rewards, zero_for_one
+):
+    state = differential_pool.sim.state
+    liquidity_delta = state.liquidity * 500 // 10000
+    sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+    # margin less than min
+    assert (
+        differential_pool.open(
+            sender, zero_for_one, liquidity_delta, sqrt_price_limit_x96, 0, rewards
+        )
+        is None
+    )
+    # rewards less than min
+    assert (
+        differential_pool.open(
+            sender,
+            zero_for_one,
+            liquidity_delta,
+            sqrt_price_limit_x96,
+            margin(zero_for_one),
+            0,
+        )
+        is None
+    )
+    # liquidity delta greater than available
+    assert (
+        differential_pool.open(
+            sender,
+            zero_for_one,
+            state.liquidity,
+            sqrt_price_limit_x96,
+            margin(zero_for_one),
+            rewards,
+        )
+        is None
+    )
+
+
+def test_pool_simulator__liquidate_safe_position_reverts_in_sync(
+    differential_pool, sender, alice, margin, rewards
+):
+    state = differential_pool.sim.state
+    liquidity_delta = state.liquidity * 500 // 10000
+    (id, _, _, _, _) = differential_pool.open(
+        sender, True, liquidity_delta, MIN_SQRT_RATIO + 1, margin(True), rewards
+    )
+    assert differential_pool.liquidate(alice, id) is None
+
+
+@pytest.mark.parametrize("zero_for_one", [True, False])
+@pytest.mark.parametrize("exact_input", [True, False])
+def test_pool_simulator__swap_in_sync(
+    differential_pool, sender, zero_for_one, exact_input
+):
+    state = differential_pool.sim.state
+    (reserve0, reserve1) = to_amounts(state.liquidity, state.sqrt_price_x96)
+    amount_specified = (
+        (reserve0 if zero_for_one else reserve1) // 100  # 1% of reserves in
+        if exact_input
+        else -(reserve1 if zero_for_one else reserve0) // 200  # 0.5% of reserves out
+    )
+
+    sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+    assert (
+        differential_pool.swap(
+            sender, zero_for_one, amount_specified, sqrt_price_limit_x96
+        )
+        is not None
+    )
+
+
+def test_pool_simulator__mint_burn_in_sync(differential_pool, sender):
+    state = differential_pool.sim.state
+    (shares, _, _) = differential_pool.mint(sender, state.liquidity // 100)
+    assert differential_pool.burn(sender, shares) is not None
+
+    # burn more than balance
+    balance = differential_pool.sim.balance_of(sender.address)
+    assert differential_pool.burn(sender, balance + 1) is None
+
+
+@pytest.mark.fuzzing
+@given(
+    ops=st.lists(
+        st.tuples(
+            st.sampled_from(["open", "settle", "swap", "mint", "burn"]),
+            st.booleans(),
+            st.integers(min_value=1, max_value=10000),
+        ),
+        min_size=1,
+        max_size=20,
+    )
+)
+@settings(deadline=timedelta(milliseconds=2000), max_examples=100)
+def test_pool_simulator__in_sync_with_fuzz(
+    pool_initialized_with_liquidity,
+    mock_univ3_pool,
+    callee,
+    token0,
+    token1,
+    sender,
+    chain,
+    ops,
+):
+    snapshot = chain.snapshot()
+    sim = load(
+        pool_initialized_with_liquidity,
+        mock_univ3_pool,
+        holders=[sender.address],
+        token0=token0,
+        token1=token1,
+    )
+    differential_pool = DifferentialPool(
+        sim, pool_initialized_with_liquidity, callee, chain, sample_every=5
+    )
+    ids = []
+
+    for op, zero_for_one, bps in ops:
+        state = differential_pool.sim.state
+        liquidity = state.liquidity
+        sqrt_price_limit_x96 = (
+            MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        )
+        if op == "open":
+            base_fee = chain.blocks[-1].base_fee
+            rewards = liquidation_rewards(
+                base_fee, BASE_FEE_MIN, GAS_LIQUIDATE, REWARD_PREMIUM
+            )
+            result = differential_pool.open(
+                sender,
+                zero_for_one,
+                liquidity * bps // 100000,
+                sqrt_price_limit_x96,
+                (token1 if zero_for_one else token0).balanceOf(sender.address) // 100,
+                rewards,
+            )
+            if result is not None:
+                ids.append(result[0])
+        elif op == "settle" and len(ids) > 0:
+            differential_pool.settle(sender, ids.pop(bps % len(ids)))
+        elif op == "swap":
+            # exact input of token0 if zero for one else exact output of token0
+            (reserve0, _) = to_amounts(liquidity, state.sqrt_price_x96)
+            differential_pool.swap(
+                sender,
+                zero_for_one,
+                (reserve0 * bps // 100000) * (1 if zero_for_one else -1),
+                sqrt_price_limit_x96,
+            )
+        elif op == "mint":
+            differential_pool.mint(sender, liquidity * bps // 100000)
+        elif op == "burn":
+            balance = differential_pool.sim.balance_of(sender.address)
+            differential_pool.burn(sender, balance * bps // 100000)
+
+    differential_pool.check()
+    chain.restore(snapshot)
@@ -0,0 +1,16 @@
+import pytest
+
+from marginal_math.univ3_oracle import UniswapV3Oracle
+from utils.constants import SECONDS_AGO
+
+
+@pytest.mark.integration
+def test_univ3_oracle_observe__matches_univ3(univ3_pool, chain):
+    block = chain.blocks.head
+    oracle = UniswapV3Oracle.from_pool(univ3_pool, block.timestamp)
+
+    seconds_agos = [SECONDS_AGO, SECONDS_AGO // 2, 3600, 1, 0]
+    assert oracle.observe(seconds_agos) == tuple(
+        list(values)
+        for values in univ3_pool.observe(seconds_agos, block_identifier=block.number)
+    )
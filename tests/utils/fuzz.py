@@ -0,0 +1,76 @@
+import numpy as np
+
+from hypothesis import HealthCheck, strategies as st
+
+# @dev examples per eth_call. Full blocks must fit Hypothesis' input buffer, which rules
+# out blocks much larger than this for six 128 bit columns
+BLOCK_SIZE = 100
+
+# @dev every block is a full block of examples, so the smallest input is large by design
+SUPPRESS_HEALTH_CHECK = [HealthCheck.large_base_example]
+
+
+def blocks(block_size: int = BLOCK_SIZE, **strategies) -> st.SearchStrategy:
+    """Draws a block of examples as columns, one list per keyword strategy
+
+    Pass to `given` in place of per example strategies so a whole block is evaluated by a
+    single batched harness call. Pass `suppress_health_check=SUPPRESS_HEALTH_CHECK` to
+    `settings`. Every block is full, so `max_examples // block_size` blocks run the same
+    number of examples.
+    """
+    return st.lists(
+        st.fixed_dictionaries(strategies), min_size=block_size, max_size=block_size
+    ).map(
+        lambda examples: {
+            name: [example[name] for example in examples] for name in strategies
+        }
+    )
+
+
+def reference_many(fn, *columns, outputs: int = 1, **kwargs):
+    """Evaluates the Python reference `fn` elementwise over columns
+
+    Returns `ok`, a boolean mask of rows that didn't raise, then an object array per output
+    of `fn`, mirroring the `ok` and result arrays returned by the batched harnesses. Rows
+    that raised are zero.
+    """
+
+    def call(*args):
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            return (False,) + (0,) * outputs
+        return (True,) + (result if outputs > 1 else (result,))
+
+    rows = np.frompyfunc(call, len(columns), 1)(
+        *[np.asarray(column, dtype=object) for column in columns]
+    )
+    columns = list(zip(*rows))
+    return (np.array(columns[0], dtype=bool),) + tuple(
+        np.array(column, dtype=object) for column in columns[1:]
+    )
+
+
+def assert_batch_equal(
+    ok, results, expected_ok, expected, rel: float = 0, abs: int = 0
+):
+    """Asserts the harness reverts where the reference raises, and results agree elsewhere
+
+    @dev Results agree within `max(rel * |expected|, abs)`, compared as exact ints
+    """
+    ok = np.asarray(ok, dtype=bool)
+    expected_ok = np.asarray(expected_ok, dtype=bool)
+    mismatched = np.flatnonzero(ok != expected_ok)
+    assert len(mismatched) == 0, f"revert mismatch at rows {mismatched[:10].tolist()}"
+
+    results = np.asarray(results, dtype=object)[ok]
+    expected = np.asarray(expected, dtype=object)[ok]
+    delta = np.abs(results - expected)
+    tolerance = np.maximum(
+        np.array([int(rel * float(e)) for e in np.abs(expected)], dtype=object), abs
+    )
+    wrong = np.flatnonzero(delta > tolerance)[:10]
+    assert len(wrong) == 0, (
+        f"results differ at rows {wrong.tolist()}: "
+        + f"{results[wrong].tolist()} != {expected[wrong].tolist()}"
+    )
@@ -0,0 +1,60 @@
+import json
+import os
+
+# @dev bump when benchmark scenarios change so stale snapshots are rebaselined
+SNAPSHOT_VERSION = 1
+
+
+class GasSnapshot:
+    """Gas used per benchmarked operation, stored as versioned JSON
+
+    Operations fail `check` when missing from the snapshot, or when gas used exceeds the
+    snapshot by more than `threshold`, a fraction of the snapshot gas. With `update` set,
+    gas used is recorded instead. Results are kept in `lines` for the terminal summary.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.01, update: bool = False):
+        self.path = path
+        self.threshold = threshold
+        self.update = update
+        self.changed = False
+        self.lines = []
+
+        self.gas = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") == SNAPSHOT_VERSION:
+                self.gas = data["gas"]
+            else:
+                self.changed = True  # rebaseline on version bump
+
+    def check(self, name: str, gas_used: int):
+        gas_snapshot = self.gas.get(name)
+        if self.update and gas_used != gas_snapshot:
+            self.gas[name] = gas_used
+            self.changed = True
+            self.lines.append(f"{name}: {gas_used} gas (recorded)")
+            return
+
+        assert (
+            gas_snapshot is not None
+        ), f"{name} not in gas snapshot, rerun with --update-gas-snapshot to record"
+
+        delta = gas_used - gas_snapshot
+        self.lines.append(f"{name}: {gas_used} gas ({delta:+d})")
+        assert gas_used <= gas_snapshot * (
+            1 + self.threshold
+        ), f"{name} regressed {delta:+d} gas from snapshot {gas_snapshot}"
+
+    def write(self):
+        if not self.changed:
+            return
+        with open(self.path, "w") as f:
+            json.dump(
+                {"version": SNAPSHOT_VERSION, "gas": dict(sorted(self.gas.items()))},
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        self.changed = False
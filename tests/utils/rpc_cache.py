@@ -0,0 +1,148 @@
+import gzip
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# @dev bump when the cache format changes so stale recordings are rerecorded
+CACHE_VERSION = 1
+
+
+def _key(request: dict) -> str:
+    return json.dumps(
+        [request["method"], request.get("params", [])],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+
+class RPCCache:
+    """Upstream JSON-RPC responses keyed by method and params, stored as gzipped JSON
+
+    With an `upstream_url`, requests missing from the cache are forwarded upstream and
+    recorded if they succeed. Upstream errors, including failed requests, are returned
+    without recording. Without one, the cache replays only and misses return a JSON-RPC
+    error, so no request leaves the machine.
+    """
+
+    def __init__(self, path: str, upstream_url: Optional[str] = None):
+        self.path = path
+        self.upstream_url = upstream_url
+        self.changed = False
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.responses = {}
+        if os.path.exists(path):
+            with gzip.open(path, "rt") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.responses = data["responses"]
+
+    def _forward(self, request: dict) -> dict:
+        body = json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": request["method"],
+                "params": request.get("params", []),
+            }
+        ).encode()
+        upstream_request = urllib.request.Request(
+            self.upstream_url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(upstream_request, timeout=60) as f:
+                response = json.load(f)
+        except (urllib.error.URLError, TimeoutError, ValueError) as err:
+            # @dev HTTPError is a URLError, ValueError covers bodies that aren't JSON
+            return {
+                "error": {
+                    "code": -32000,
+                    "message": f"{request['method']} upstream request failed: {err}",
+                }
+            }
+        return {
+            field: response[field] for field in ("result", "error") if field in response
+        }
+
+    def request(self, request: dict) -> dict:
+        key = _key(request)
+        with self._lock:
+            response = self.responses.get(key)
+
+        if response is None and self.upstream_url is None:
+            self.misses += 1
+            response = {
+                "error": {
+                    "code": -32000,
+                    "message": f"{request['method']} not in rpc cache {self.path}",
+                }
+            }
+        elif response is None:
+            response = self._forward(request)
+            # @dev errors may be transient, e.g. rate limits, so are never recorded
+            if "result" in response:
+                with self._lock:
+                    self.responses[key] = response
+                    self.changed = True
+
+        return {"jsonrpc": "2.0", "id": request.get("id"), **response}
+
+    def write(self):
+        if not self.changed:
+            return
+        with self._lock:
+            data = {"version": CACHE_VERSION, "responses": dict(self.responses)}
+            self.changed = False
+        with gzip.open(self.path, "wt") as f:
+            json.dump(data, f, sort_keys=True, separators=(",", ":"))
+
+
+class RPCCacheServer(ThreadingHTTPServer):
+    """Local JSON-RPC endpoint serving from an `RPCCache`, for use as a fork upstream"""
+
+    daemon_threads = True
+
+    def __init__(self, cache: RPCCache, port: int = 0):
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(
+                    self.rfile.read(int(self.headers["Content-Length"]))
+                )
+                response = (
+                    [cache.request(request) for request in payload]
+                    if isinstance(payload, list)
+                    else cache.request(payload)
+                )
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        super().__init__(("127.0.0.1", port), Handler)
+        self.cache = cache
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.cache.write()